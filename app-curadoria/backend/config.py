@@ -27,6 +27,25 @@ BRAND_SLUG = os.getenv("BRAND_SLUG", "best-of-opera")
 COBALT_API_URL = os.getenv("COBALT_API_URL", "https://api.cobalt.tools")
 COBALT_API_KEY = os.getenv("COBALT_API_KEY", "")
 
+# ─── YOUTUBE DATA API (cliente HTTP e cache) ───
+YT_HTTP_MAX_CONNECTIONS = int(os.getenv("YT_HTTP_MAX_CONNECTIONS", "20"))
+YT_SEARCH_CACHE_TTL = int(os.getenv("YT_SEARCH_CACHE_TTL", "1800"))     # s — search.list custa 100 pontos
+YT_DETAILS_CACHE_TTL = int(os.getenv("YT_DETAILS_CACHE_TTL", "3600"))   # s — videos.list custa 1 ponto
+YT_QUOTA_RESERVE = int(os.getenv("YT_QUOTA_RESERVE", "1500"))           # abaixo disso, reusa cache vencido
+YT_STALE_MAX_AGE = int(os.getenv("YT_STALE_MAX_AGE", "86400"))          # idade máxima do cache vencido reusado
+YT_DETAILS_BATCH_MS = int(os.getenv("YT_DETAILS_BATCH_MS", "25"))       # janela para juntar IDs de buscas simultâneas
+
+# ─── WARMUP DO CACHE DE CATEGORIAS ───
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "4"))                  # buscas simultâneas
+WARMUP_QUOTA_POINTS_PER_MIN = int(os.getenv("WARMUP_QUOTA_POINTS_PER_MIN", "1000"))  # ~10 buscas/min
+CATEGORY_CACHE_MAX_AGE_H = float(os.getenv("CATEGORY_CACHE_MAX_AGE_H", "24"))   # refresh incremental
+
+# ─── PIPELINE DE DOWNLOAD EM LOTE (fetch → probe → upload) ───
+DOWNLOAD_FETCH_WORKERS = int(os.getenv("DOWNLOAD_FETCH_WORKERS", "2"))    # yt-dlp/cobalt simultâneos
+DOWNLOAD_PROBE_WORKERS = int(os.getenv("DOWNLOAD_PROBE_WORKERS", "2"))    # ffprobe simultâneos
+DOWNLOAD_UPLOAD_WORKERS = int(os.getenv("DOWNLOAD_UPLOAD_WORKERS", "3"))  # uploads R2 simultâneos
+DOWNLOAD_STAGE_QUEUE = int(os.getenv("DOWNLOAD_STAGE_QUEUE", "2"))        # itens prontos esperando a etapa seguinte
+
 # ─── SHARED DIR ───
 PROJECTS_DIR = Path("/tmp/best-of-opera-projects")
 PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -3,11 +3,12 @@
 # Uses psycopg 3 (modern driver) with connection pooling
 # ══════════════════════════════════════════════════════════════
 
-import os, io, csv, logging
+import os, io, csv, time, logging
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
 from psycopg_pool import ConnectionPool
 
 logger = logging.getLogger(__name__)
@@ -103,6 +104,15 @@ def init_db():
                     logger.warning(f"[MIGRATION] cached_videos constraint: {e}")
             c.execute("CREATE INDEX IF NOT EXISTS idx_cached_brand ON cached_videos(brand_slug)")
 
+            # Migration: score persistido (reasons + fingerprint do config da marca que o gerou)
+            c.execute("ALTER TABLE cached_videos ADD COLUMN IF NOT EXISTS score_reasons JSONB")
+            c.execute("ALTER TABLE cached_videos ADD COLUMN IF NOT EXISTS score_fingerprint TEXT")
+            # Página de categoria = um index scan (filtro + ORDER BY score_total DESC LIMIT)
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cached_cat_brand_score "
+                "ON cached_videos(category, brand_slug, score_total DESC, id)"
+            )
+
             # Table: playlist_videos
             c.execute("""
                 CREATE TABLE IF NOT EXISTS playlist_videos (
@@ -203,69 +213,190 @@ def init_db():
     logger.info("Database initialized (PostgreSQL V7)")
 
 
+# ─── BULK WRITE ───
+
+def _merge_em_lote(c, tabela: str, colunas: List[str], chave: List[str],
+                   linhas: List[tuple], escopo: Dict) -> Tuple[int, int]:
+    """Sincroniza as linhas de um escopo (ex.: categoria+marca) com `linhas` num round trip curto.
+
+    COPY para uma staging temporária e um merge só: remove do escopo o que
+    não veio, insere o que é novo e atualiza apenas as linhas cujo conteúdo
+    mudou (as iguais nem são tocadas). Roda na transação de quem chama.
+    Se o mesmo vídeo vier repetido, vale a última ocorrência.
+    Retorna (linhas inseridas/atualizadas, linhas removidas).
+    """
+    cols = ", ".join(colunas)
+    c.execute(f"CREATE TEMP TABLE _stage ON COMMIT DROP AS SELECT {cols}, 0 AS _ord FROM {tabela} WITH NO DATA")
+    with c.copy(f"COPY _stage ({cols}, _ord) FROM STDIN") as cp:
+        for i, linha in enumerate(linhas):
+            cp.write_row((*linha, i))
+
+    filtro = " AND ".join(f"t.{k} = %s" for k in escopo)
+    c.execute(
+        f"DELETE FROM {tabela} t WHERE {filtro} "
+        f"AND NOT EXISTS (SELECT 1 FROM _stage s WHERE {' AND '.join(f's.{k} = t.{k}' for k in chave)})",
+        list(escopo.values()),
+    )
+    removidas = c.rowcount
+
+    mutaveis = [col for col in colunas if col not in chave]
+    c.execute(f"""
+        INSERT INTO {tabela} AS t ({cols})
+        SELECT DISTINCT ON ({", ".join(chave)}) {cols} FROM _stage
+        ORDER BY {", ".join(chave)}, _ord DESC
+        ON CONFLICT ({", ".join(chave)}) DO UPDATE SET
+            {", ".join(f"{col}=EXCLUDED.{col}" for col in mutaveis)}, fetched_at=CURRENT_TIMESTAMP
+        WHERE ({", ".join(f"t.{col}" for col in mutaveis)})
+              IS DISTINCT FROM ({", ".join(f"EXCLUDED.{col}" for col in mutaveis)})
+    """)
+    return c.rowcount, removidas
+
+
 # ─── CACHED VIDEOS ───
 
-def save_cached_videos(videos: List[Dict], category: str, brand_slug: str = "best-of-opera"):
+_CACHED_COLS = [
+    "video_id", "url", "title", "artist", "song", "channel", "year", "published", "duration",
+    "views", "hd", "thumbnail", "category", "score_total", "score_fixed", "score_guia",
+    "artist_match", "song_match", "posted", "brand_slug", "score_reasons", "score_fingerprint",
+]
+
+
+def _category_refresh_key(brand_slug: str, category: str) -> str:
+    return f"category_refresh:{brand_slug}:{category}"
+
+
+def save_cached_videos(videos: List[Dict], category: str, brand_slug: str = "best-of-opera",
+                       fingerprint: Optional[str] = None):
+    """Substitui o cache da categoria. `fingerprint`: config de scoring que gerou os scores."""
     if not videos:
         logger.warning(f"Skipping cache save for {category}: no videos")
         return
+    t0 = time.monotonic()
+    linhas = []
+    for v in videos:
+        score = v.get("score", {})
+        linhas.append((
+            v["video_id"], v["url"], v["title"], v["artist"], v["song"],
+            v["channel"], v["year"], v["published"], v["duration"],
+            v["views"], v["hd"], v["thumbnail"], category,
+            score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
+            score.get("artist_match"), score.get("song_match"), v.get("posted", False),
+            brand_slug, Jsonb(score.get("reasons", [])), fingerprint,
+        ))
     with _get_pool().connection() as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM cached_videos WHERE category = %s AND brand_slug = %s", (category, brand_slug))
-        for v in videos:
-            score = v.get("score", {})
+        with conn.transaction():
+            c = conn.cursor()
+            escritas, removidas = _merge_em_lote(
+                c, "cached_videos", _CACHED_COLS, ["video_id", "category", "brand_slug"],
+                linhas, {"category": category, "brand_slug": brand_slug},
+            )
+            # Marca o refresh mesmo sem linha alterada (o merge não toca fetched_at das iguais)
             c.execute("""
-                INSERT INTO cached_videos
-                (video_id, url, title, artist, song, channel, year, published, duration,
-                 views, hd, thumbnail, category, score_total, score_fixed, score_guia,
-                 artist_match, song_match, posted, brand_slug)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                ON CONFLICT (video_id, category, brand_slug) DO UPDATE SET
-                    url=EXCLUDED.url, title=EXCLUDED.title, artist=EXCLUDED.artist,
-                    song=EXCLUDED.song, channel=EXCLUDED.channel, year=EXCLUDED.year,
-                    published=EXCLUDED.published, duration=EXCLUDED.duration, views=EXCLUDED.views,
-                    hd=EXCLUDED.hd, thumbnail=EXCLUDED.thumbnail, score_total=EXCLUDED.score_total,
-                    score_fixed=EXCLUDED.score_fixed, score_guia=EXCLUDED.score_guia,
-                    artist_match=EXCLUDED.artist_match, song_match=EXCLUDED.song_match,
-                    posted=EXCLUDED.posted, fetched_at=CURRENT_TIMESTAMP
-            """, (
-                v["video_id"], v["url"], v["title"], v["artist"], v["song"],
-                v["channel"], v["year"], v["published"], v["duration"],
-                v["views"], v["hd"], v["thumbnail"], category,
-                score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
-                score.get("artist_match"), score.get("song_match"), v.get("posted", False),
-                brand_slug
-            ))
-        conn.commit()
-    logger.info(f"Cached {len(videos)} videos for: {category} [{brand_slug}]")
+                INSERT INTO system_config (key, value, updated_at)
+                VALUES (%s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = CURRENT_TIMESTAMP
+            """, (_category_refresh_key(brand_slug, category), str(len(videos))))
+    logger.info(
+        f"Cached {len(videos)} videos for: {category} [{brand_slug}] "
+        f"({escritas} gravados, {removidas} removidos, {(time.monotonic() - t0) * 1000:.0f}ms)"
+    )
 
 
-def get_cached_videos(category: str, hide_posted: bool = True, brand_slug: str = "best-of-opera") -> List[Dict]:
+def _cached_row_to_video(r: Dict) -> Dict:
+    return {
+        "video_id": r["video_id"], "url": r["url"], "title": r["title"],
+        "artist": r["artist"], "song": r["song"], "channel": r["channel"],
+        "year": r["year"], "published": r["published"], "duration": r["duration"],
+        "views": r["views"], "hd": bool(r["hd"]), "thumbnail": r["thumbnail"],
+        "category": r["category"],
+        "score": {
+            "total": r["score_total"], "reasons": r.get("score_reasons") or [],
+            "fixed": r.get("score_fixed", 0), "guia": r.get("score_guia", 0),
+            "artist_match": r["artist_match"], "song_match": r["song_match"]
+        },
+        "posted": bool(r["posted"])
+    }
+
+
+def get_cached_page(category: str, hide_posted: bool = True, brand_slug: str = "best-of-opera",
+                    limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict], int]:
+    """Página da categoria já ordenada pelo score persistido, mais o total de linhas.
+
+    Uma query só (idx_cached_cat_brand_score): ORDER BY/LIMIT/OFFSET no banco e
+    o total via COUNT(*) OVER(). limit=None devolve a categoria inteira.
+    """
     with _get_pool().connection() as conn:
         c = conn.cursor(row_factory=dict_row)
-        query = "SELECT * FROM cached_videos WHERE category = %s AND brand_slug = %s"
+        query = "SELECT *, COUNT(*) OVER() AS total_count FROM cached_videos WHERE category = %s AND brand_slug = %s"
         params: list = [category, brand_slug]
         if hide_posted:
             query += " AND posted = FALSE"
-        query += " ORDER BY score_total DESC"
+        query += " ORDER BY score_total DESC, id"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        if offset:
+            query += " OFFSET %s"
+            params.append(offset)
         c.execute(query, params)
         rows = c.fetchall()
-    return [
-        {
-            "video_id": r["video_id"], "url": r["url"], "title": r["title"],
-            "artist": r["artist"], "song": r["song"], "channel": r["channel"],
-            "year": r["year"], "published": r["published"], "duration": r["duration"],
-            "views": r["views"], "hd": bool(r["hd"]), "thumbnail": r["thumbnail"],
-            "category": r["category"],
-            "score": {
-                "total": r["score_total"], "fixed": r.get("score_fixed", 0),
-                "guia": r.get("score_guia", 0),
-                "artist_match": r["artist_match"], "song_match": r["song_match"]
-            },
-            "posted": bool(r["posted"])
-        }
-        for r in rows
-    ]
+    if not rows and offset:
+        # Página além do fim: o total ainda importa para o cliente
+        total = count_cached_videos(category, hide_posted, brand_slug)
+    else:
+        total = rows[0]["total_count"] if rows else 0
+    return [_cached_row_to_video(r) for r in rows], total
+
+
+def count_cached_videos(category: str, hide_posted: bool = True, brand_slug: str = "best-of-opera") -> int:
+    with _get_pool().connection() as conn:
+        c = conn.cursor()
+        query = "SELECT COUNT(*) FROM cached_videos WHERE category = %s AND brand_slug = %s"
+        if hide_posted:
+            query += " AND posted = FALSE"
+        c.execute(query, (category, brand_slug))
+        return c.fetchone()[0]
+
+
+def get_cached_videos(category: str, hide_posted: bool = True, brand_slug: str = "best-of-opera") -> List[Dict]:
+    return get_cached_page(category, hide_posted, brand_slug)[0]
+
+
+def get_stale_cached_videos(category: str, brand_slug: str, fingerprint: str) -> List[Dict]:
+    """Vídeos da categoria cujo score foi calculado com outro config de marca (ou nunca persistido)."""
+    with _get_pool().connection() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(
+            "SELECT * FROM cached_videos WHERE category = %s AND brand_slug = %s "
+            "AND score_fingerprint IS DISTINCT FROM %s",
+            (category, brand_slug, fingerprint),
+        )
+        rows = c.fetchall()
+    return [_cached_row_to_video(r) for r in rows]
+
+
+def update_cached_scores(videos: List[Dict], category: str, brand_slug: str, fingerprint: str):
+    """Regrava só os campos de score (após re-score com um config novo)."""
+    if not videos:
+        return
+    with _get_pool().connection() as conn:
+        c = conn.cursor()
+        c.executemany("""
+            UPDATE cached_videos SET
+                score_total=%s, score_fixed=%s, score_guia=%s, artist_match=%s, song_match=%s,
+                score_reasons=%s, score_fingerprint=%s
+            WHERE video_id=%s AND category=%s AND brand_slug=%s
+        """, [
+            (
+                v["score"].get("total", 0), v["score"].get("fixed", 0), v["score"].get("guia", 0.0),
+                v["score"].get("artist_match"), v["score"].get("song_match"),
+                Jsonb(v["score"].get("reasons", [])), fingerprint,
+                v["video_id"], category, brand_slug,
+            )
+            for v in videos
+        ])
+        conn.commit()
+    logger.info(f"Re-scored {len(videos)} cached videos for: {category} [{brand_slug}]")
 
 
 def get_cached_video_category(video_id: str) -> Optional[str]:
@@ -291,39 +422,39 @@ def get_cached_video_title(video_id: str) -> Optional[str]:
 
 # ─── PLAYLIST ───
 
+_PLAYLIST_COLS = [
+    "video_id", "url", "title", "artist", "song", "channel", "year", "published", "duration",
+    "views", "hd", "thumbnail", "score_total", "score_fixed", "score_guia",
+    "artist_match", "song_match", "posted", "position", "brand_slug",
+]
+
+
 def save_playlist_videos(videos: List[Dict], brand_slug: str = "best-of-opera"):
     if not videos:
         logger.warning("Skipping playlist save: no videos")
         return
+    t0 = time.monotonic()
+    linhas = []
+    for idx, v in enumerate(videos):
+        score = v.get("score", {})
+        linhas.append((
+            v["video_id"], v["url"], v["title"], v["artist"], v["song"],
+            v["channel"], v["year"], v["published"], v["duration"],
+            v["views"], v["hd"], v["thumbnail"],
+            score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
+            score.get("artist_match"), score.get("song_match"), v.get("posted", False), idx,
+            brand_slug,
+        ))
     with _get_pool().connection() as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM playlist_videos WHERE brand_slug = %s", (brand_slug,))
-        for idx, v in enumerate(videos):
-            score = v.get("score", {})
-            c.execute("""
-                INSERT INTO playlist_videos
-                (video_id, url, title, artist, song, channel, year, published, duration,
-                 views, hd, thumbnail, score_total, score_fixed, score_guia,
-                 artist_match, song_match, posted, position, brand_slug)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                ON CONFLICT (video_id, brand_slug) DO UPDATE SET
-                    url=EXCLUDED.url, title=EXCLUDED.title, artist=EXCLUDED.artist,
-                    song=EXCLUDED.song, channel=EXCLUDED.channel, year=EXCLUDED.year,
-                    published=EXCLUDED.published, duration=EXCLUDED.duration, views=EXCLUDED.views,
-                    hd=EXCLUDED.hd, thumbnail=EXCLUDED.thumbnail, score_total=EXCLUDED.score_total,
-                    score_fixed=EXCLUDED.score_fixed, score_guia=EXCLUDED.score_guia,
-                    artist_match=EXCLUDED.artist_match, song_match=EXCLUDED.song_match,
-                    posted=EXCLUDED.posted, position=EXCLUDED.position, fetched_at=CURRENT_TIMESTAMP
-            """, (
-                v["video_id"], v["url"], v["title"], v["artist"], v["song"],
-                v["channel"], v["year"], v["published"], v["duration"],
-                v["views"], v["hd"], v["thumbnail"],
-                score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
-                score.get("artist_match"), score.get("song_match"), v.get("posted", False), idx,
-                brand_slug,
-            ))
-        conn.commit()
-    logger.info(f"Cached {len(videos)} playlist videos for {brand_slug}")
+        with conn.transaction():
+            escritas, removidas = _merge_em_lote(
+                conn.cursor(), "playlist_videos", _PLAYLIST_COLS, ["video_id", "brand_slug"],
+                linhas, {"brand_slug": brand_slug},
+            )
+    logger.info(
+        f"Cached {len(videos)} playlist videos for {brand_slug} "
+        f"({escritas} gravados, {removidas} removidos, {(time.monotonic() - t0) * 1000:.0f}ms)"
+    )
 
 
 def get_playlist_videos(hide_posted: bool = True, brand_slug: str = "best-of-opera") -> List[Dict]:
@@ -401,6 +532,21 @@ def get_cache_status() -> Dict:
     }
 
 
+def get_category_refresh_times(brand_slug: str = "best-of-opera") -> Dict[str, datetime]:
+    """Último refresh de cada categoria da marca: o mais recente entre fetched_at e o marcador do save."""
+    with _get_pool().connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT cv.category, GREATEST(MAX(cv.fetched_at), MAX(sc.updated_at))
+            FROM cached_videos cv
+            LEFT JOIN system_config sc
+                   ON sc.key = 'category_refresh:' || cv.brand_slug || ':' || cv.category
+            WHERE cv.brand_slug = %s
+            GROUP BY cv.category
+        """, (brand_slug,))
+        return {row[0]: row[1] for row in c.fetchall()}
+
+
 def is_cache_empty() -> bool:
     with _get_pool().connection() as conn:
         c = conn.cursor()
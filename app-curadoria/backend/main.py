@@ -32,6 +32,7 @@ if _SENTRY_DSN:
         server_name="curadoria-backend",
     )
 from services.scoring import load_posted
+from services.youtube import close_http_client
 from services.download import download_worker
 from worker import worker_loop, task_queue
 from routes import curadoria, health
@@ -54,6 +55,7 @@ async def lifespan(app: FastAPI):
         logger.info("Cache empty — auto-populating with V7 seeds...")
         await task_queue.put(curadoria.populate_initial_cache())
     yield
+    await close_http_client()
     db.close_pool()
 
 
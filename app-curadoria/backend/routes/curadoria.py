@@ -4,7 +4,6 @@ from pathlib import Path
 from urllib.parse import quote
 import unicodedata as _ud
 
-import httpx
 from fastapi import APIRouter, HTTPException, Query, UploadFile, File
 from fastapi.responses import StreamingResponse, Response
 
@@ -13,14 +12,17 @@ from config import (
     YOUTUBE_API_KEY, APP_PASSWORD, PLAYLIST_ID, BRAND_SLUG,
     ANTI_SPAM, PROJECTS_DIR, load_brand_config,
 )
-from services.youtube import yt_search, yt_playlist, extract_artist_song, parse_iso_dur, classify_category
-from services.scoring import calc_score_v7, _process_v7, _rescore_cached, is_posted
+from services.youtube import (
+    yt_search, yt_playlist, extract_artist_song, parse_iso_dur, classify_category, get_http_client,
+)
+from services.warmup import aquecer_categorias, progresso as warmup_progresso
+from services.scoring import calc_score_v7, _process_v7, score_batch, score_fingerprint, is_posted
 from services.download import (
-    manager, download_semaphore, sanitize_filename,
-    _get_ydl_opts, _prepare_video_logic, _wrapped_prepare_video,
+    manager, download_semaphore, sanitize_filename, enqueue_download, pipeline_stats,
+    _get_ydl_opts,
     _download_via_cobalt, _download_via_ytdlp_cli,
 )
-from shared.storage_service import storage, check_conflict, save_youtube_marker
+from shared.storage_service import async_storage, check_conflict, save_youtube_marker
 from worker import task_queue
 
 router = APIRouter()
@@ -29,24 +31,10 @@ logger = logging.getLogger(__name__)
 
 # ─── BACKGROUND TASKS ───
 
-async def populate_initial_cache(brand_slug: str | None = None):
-    """Background: populate cache using seed 0 for each V7 category"""
+async def populate_initial_cache(brand_slug: str | None = None, only_stale: bool = False):
+    """Background: populate cache using seed 0 for each V7 category (parallel, quota-limited)"""
     logger.info("Starting V7 initial cache population...")
-    config = load_brand_config(brand_slug)
-    categories = config["categories"]
-    for cat_key, cat_data in categories.items():
-        try:
-            seed_query = cat_data["seeds"][0]
-            anti_spam = config.get("anti_spam") or ANTI_SPAM
-            full_query = f"{seed_query} {anti_spam}"
-            raw = await yt_search(full_query, 25, YOUTUBE_API_KEY)
-            result = _process_v7(raw, seed_query, False, cat_key, config)
-            db.save_cached_videos(result["videos"], cat_key, brand_slug=brand_slug or BRAND_SLUG)
-            db.save_last_seed(cat_key, 0)
-            logger.info(f"Cached {len(result['videos'])} videos for {cat_key}")
-        except Exception as e:
-            logger.error(f"Error caching {cat_key}: {e}")
-    db.set_config("last_category_refresh", datetime.now().isoformat())
+    await aquecer_categorias(brand_slug, apenas_vencidas=only_stale)
     logger.info("V7 cache population complete!")
 
 
@@ -105,6 +93,8 @@ async def search_category(
     hide_posted: bool = Query(True),
     force_refresh: bool = Query(False),
     brand_slug: str | None = Query(None, description="Slug da marca (default: env BRAND_SLUG)"),
+    limit: int | None = Query(None, ge=1, le=500, description="Paginação do cache (default: tudo)"),
+    offset: int = Query(0, ge=0),
 ):
     """Category search with V7 seed rotation"""
     config = load_brand_config(brand_slug)
@@ -118,13 +108,21 @@ async def search_category(
 
     # Serve from cache unless force_refresh
     if not force_refresh:
-        cached = db.get_cached_videos(category, hide_posted, brand_slug=brand_slug or BRAND_SLUG)
-        if cached:
-            cached = _rescore_cached(cached, category, config)
-            logger.info(f"Serving {len(cached)} cached videos for {category}")
+        slug = brand_slug or BRAND_SLUG
+        fingerprint = score_fingerprint(config)
+        # Scores persistidos valem enquanto o config da marca não mudar; só os
+        # vídeos com fingerprint diferente são recalculados (e regravados)
+        stale = db.get_stale_cached_videos(category, slug, fingerprint)
+        if stale:
+            for v, sc in zip(stale, score_batch(stale, category, config)):
+                v["score"] = sc
+            db.update_cached_scores(stale, category, slug, fingerprint)
+        cached, total = db.get_cached_page(category, hide_posted, slug, limit=limit, offset=offset)
+        if total:
+            logger.info(f"Serving {len(cached)}/{total} cached videos for {category}")
             return {
                 "query": category, "category": category,
-                "total_found": len(cached), "posted_hidden": 0,
+                "total_found": total, "posted_hidden": 0,
                 "videos": cached, "cached": True,
                 "seed_index": last_seed, "total_seeds": total_seeds,
                 "seed_query": cat_data["seeds"][last_seed % total_seeds],
@@ -141,7 +139,10 @@ async def search_category(
     db.save_last_seed(category, next_seed)
 
     result = _process_v7(raw, seed_query, hide_posted, category, config)
-    db.save_cached_videos(result["videos"], category, brand_slug=brand_slug or BRAND_SLUG)
+    db.save_cached_videos(
+        result["videos"], category, brand_slug=brand_slug or BRAND_SLUG,
+        fingerprint=score_fingerprint(config),
+    )
     result["cached"] = False
     result["seed_index"] = next_seed
     result["total_seeds"] = total_seeds
@@ -236,73 +237,75 @@ async def add_manual_video(
 
     if YOUTUBE_API_KEY:
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                r = await client.get(
-                    "https://www.googleapis.com/youtube/v3/videos",
-                    params={"part": "snippet,contentDetails,statistics", "id": video_id, "key": YOUTUBE_API_KEY},
-                )
-                if r.status_code == 200:
-                    items = r.json().get("items", [])
-                    if items:
-                        v = items[0]
-                        sn = v.get("snippet", {})
-                        det = v.get("contentDetails", {})
-                        stat = v.get("statistics", {})
-
-                        title = sn.get("title", "")
-                        artist, song = extract_artist_song(title)
-                        pub = sn.get("publishedAt", "")[:10]
-                        yr = int(pub[:4]) if pub else 0
-                        thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
-                        dur = parse_iso_dur(det.get("duration", ""))
-                        defn = det.get("definition", "sd")
-                        views = int(stat.get("viewCount", 0))
-
-                        _cat = classify_category(title)
-                        video_data = {
-                            "video_id": video_id,
-                            "url": f"https://www.youtube.com/watch?v={video_id}",
-                            "title": title, "artist": artist, "song": song or title,
-                            "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
-                            "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
-                            "thumbnail": thumb, "category": _cat,
-                        }
-
-                        try:
-                            db.register_quota_usage(search_calls=0, detail_calls=1)
-                        except Exception as e:
-                            logger.warning(f"Falha ao registrar quota usage: {e}")
-
-                        _cfg = load_brand_config(brand_slug)
-                        sc = calc_score_v7(video_data, _cat, _cfg)
-                        p = is_posted(video_data.get("artist", ""), video_data.get("song", ""))
-                        return {**video_data, "score": sc, "posted": p}
+            client = get_http_client()
+            r = await client.get(
+                "https://www.googleapis.com/youtube/v3/videos",
+                params={"part": "snippet,contentDetails,statistics", "id": video_id, "key": YOUTUBE_API_KEY},
+                timeout=15,
+            )
+            if r.status_code == 200:
+                items = r.json().get("items", [])
+                if items:
+                    v = items[0]
+                    sn = v.get("snippet", {})
+                    det = v.get("contentDetails", {})
+                    stat = v.get("statistics", {})
+
+                    title = sn.get("title", "")
+                    artist, song = extract_artist_song(title)
+                    pub = sn.get("publishedAt", "")[:10]
+                    yr = int(pub[:4]) if pub else 0
+                    thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
+                    dur = parse_iso_dur(det.get("duration", ""))
+                    defn = det.get("definition", "sd")
+                    views = int(stat.get("viewCount", 0))
+
+                    _cat = classify_category(title)
+                    video_data = {
+                        "video_id": video_id,
+                        "url": f"https://www.youtube.com/watch?v={video_id}",
+                        "title": title, "artist": artist, "song": song or title,
+                        "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
+                        "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
+                        "thumbnail": thumb, "category": _cat,
+                    }
+
+                    try:
+                        db.register_quota_usage(search_calls=0, detail_calls=1)
+                    except Exception as e:
+                        logger.warning(f"Falha ao registrar quota usage: {e}")
+
+                    _cfg = load_brand_config(brand_slug)
+                    sc = calc_score_v7(video_data, _cat, _cfg)
+                    p = is_posted(video_data.get("artist", ""), video_data.get("song", ""))
+                    return {**video_data, "score": sc, "posted": p}
         except Exception as e:
             logger.warning(f"Error fetching from YT API: {e}")
 
     # Fallback via oEmbed
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.get(
-                "https://www.youtube.com/oembed",
-                params={"url": youtube_url, "format": "json"},
-            )
-            if r.status_code == 200:
-                data = r.json()
-                title = data.get("title", "YouTube Video")
-                artist, song = extract_artist_song(title)
-                _cat = classify_category(title)
-                video_data = {
-                    "video_id": video_id,
-                    "url": f"https://www.youtube.com/watch?v={video_id}",
-                    "title": title, "artist": artist, "song": song or title,
-                    "channel": data.get("author_name", "Unknown"), "year": 0, "published": "",
-                    "duration": 0, "views": 0, "hd": False,
-                    "thumbnail": data.get("thumbnail_url", ""), "category": _cat,
-                }
-                sc = calc_score_v7(video_data, _cat, load_brand_config(brand_slug))
-                p = is_posted(video_data.get("artist", ""), video_data.get("song", ""))
-                return {**video_data, "score": sc, "posted": p}
+        client = get_http_client()
+        r = await client.get(
+            "https://www.youtube.com/oembed",
+            params={"url": youtube_url, "format": "json"},
+            timeout=15,
+        )
+        if r.status_code == 200:
+            data = r.json()
+            title = data.get("title", "YouTube Video")
+            artist, song = extract_artist_song(title)
+            _cat = classify_category(title)
+            video_data = {
+                "video_id": video_id,
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+                "title": title, "artist": artist, "song": song or title,
+                "channel": data.get("author_name", "Unknown"), "year": 0, "published": "",
+                "duration": 0, "views": 0, "hd": False,
+                "thumbnail": data.get("thumbnail_url", ""), "category": _cat,
+            }
+            sc = calc_score_v7(video_data, _cat, load_brand_config(brand_slug))
+            p = is_posted(video_data.get("artist", ""), video_data.get("song", ""))
+            return {**video_data, "score": sc, "posted": p}
     except Exception as e:
         logger.warning(f"Error fetching from oEmbed: {e}")
 
@@ -313,7 +316,7 @@ async def add_manual_video(
 
 @router.get("/api/cache/status")
 async def cache_status():
-    return db.get_cache_status()
+    return {**db.get_cache_status(), "warmup": warmup_progresso()}
 
 
 @router.post("/api/cache/populate-initial")
@@ -327,8 +330,9 @@ async def populate_cache(
 @router.post("/api/cache/refresh-categories")
 async def refresh_categories(
     brand_slug: str | None = Query(None, description="Slug da marca (default: env BRAND_SLUG)"),
+    only_stale: bool = Query(False, description="Só categorias com refresh mais velho que CATEGORY_CACHE_MAX_AGE_H"),
 ):
-    await task_queue.put(populate_initial_cache(brand_slug))
+    await task_queue.put(populate_initial_cache(brand_slug, only_stale=only_stale))
     return {"status": "started", "message": "V7 category refresh started"}
 
 
@@ -366,34 +370,16 @@ async def download_all_playlist(
     if not videos:
         return {"status": "error", "message": "Playlist vazia"}
 
-    added = 0
-    cfg = load_brand_config(brand_slug)
-    for v in videos:
-        vid = v["video_id"]
-        artist = v["artist"]
-        song = v["song"]
-        r2_prefix = cfg.get("r2_prefix", "")
-        r2_base = check_conflict(artist, song, vid, r2_prefix=r2_prefix)
-        full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
-        r2_key = f"{full_base}/video/original.mp4"
-
-        if storage.exists(r2_key):
-            manager.set_task(vid, {"status": "completed", "progress": 100, "message": "Já no R2"})
-            continue
-
-        if vid in manager.tasks and manager.tasks[vid]["status"] in ("pending", "processing"):
-            continue
-
-        manager.set_task(vid, {"status": "pending", "progress": 0, "message": "Na fila"})
-        await manager.queue.put((vid, artist, song, _wrapped_prepare_video))
-        added += 1
-
+    # A conferência "já está no R2?" roda na etapa fetch do pipeline, em paralelo
+    added = sum(
+        enqueue_download(v["video_id"], v["artist"], v["song"], brand_slug=slug) for v in videos
+    )
     return {"status": "started", "added": added, "total": len(videos)}
 
 
 @router.get("/api/playlist/download-status")
 async def get_download_status():
-    return manager.get_all_tasks()
+    return {"tasks": manager.get_all_tasks(), "pipeline": pipeline_stats()}
 
 
 # ─── QUOTA ENDPOINTS ───
@@ -455,11 +441,11 @@ async def download_video(
             try:
                 cfg = load_brand_config(brand_slug)
                 r2_prefix = cfg.get("r2_prefix", "")
-                r2_base = check_conflict(artist, song, video_id, r2_prefix=r2_prefix)
+                r2_base = await asyncio.to_thread(check_conflict, artist, song, video_id, r2_prefix=r2_prefix)
                 full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
                 r2_key = f"{full_base}/video/original.mp4"
-                storage.upload_file(dl_path_actual, r2_key)
-                save_youtube_marker(r2_base, video_id, r2_prefix=r2_prefix)
+                await async_storage.upload_file(dl_path_actual, r2_key)
+                await asyncio.to_thread(save_youtube_marker, r2_base, video_id, r2_prefix=r2_prefix)
                 r2_ok = True
                 logger.info(f"R2 upload OK: {r2_key}")
             except Exception as e:
@@ -514,10 +500,10 @@ async def prepare_video(
 
     cfg = load_brand_config(brand_slug)
     r2_prefix = cfg.get("r2_prefix", "")
-    r2_base = check_conflict(artist, song, video_id, r2_prefix=r2_prefix)
+    r2_base = await asyncio.to_thread(check_conflict, artist, song, video_id, r2_prefix=r2_prefix)
     full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
     r2_key = f"{full_base}/video/original.mp4"
-    if storage.exists(r2_key):
+    if await async_storage.exists(r2_key):
         return {
             "status": "ok",
             "r2_key": r2_key,
@@ -568,8 +554,8 @@ async def prepare_video(
             except Exception as e:
                 logger.warning(f"Failed to save download record: {e}")
 
-            storage.upload_file(dl_path_actual, r2_key)
-            save_youtube_marker(r2_base, video_id, r2_prefix=r2_prefix)
+            await async_storage.upload_file(dl_path_actual, r2_key)
+            await asyncio.to_thread(save_youtube_marker, r2_base, video_id, r2_prefix=r2_prefix)
             file_size = os.path.getsize(dl_path_actual)
             logger.info(f"R2 upload OK: {r2_key} ({file_size / 1024 / 1024:.1f}MB)")
 
@@ -605,7 +591,7 @@ async def upload_video_manual(
 
     cfg = load_brand_config(brand_slug)
     r2_prefix = cfg.get("r2_prefix", "")
-    r2_base = check_conflict(artist, song, video_id, r2_prefix=r2_prefix)
+    r2_base = await asyncio.to_thread(check_conflict, artist, song, video_id, r2_prefix=r2_prefix)
     full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
     r2_key = f"{full_base}/video/original.mp4"
 
@@ -621,8 +607,8 @@ async def upload_video_manual(
         file_size = os.path.getsize(tmp_path)
         logger.info(f"Upload manual recebido: {file.filename} ({file_size / 1024 / 1024:.1f}MB)")
 
-        storage.upload_file(tmp_path, r2_key)
-        save_youtube_marker(r2_base, video_id, r2_prefix=r2_prefix)
+        await async_storage.upload_file(tmp_path, r2_key)
+        await asyncio.to_thread(save_youtube_marker, r2_base, video_id, r2_prefix=r2_prefix)
         logger.info(f"R2 upload OK (manual): {r2_key}")
 
         youtube_url = f"https://www.youtube.com/watch?v={video_id}"
@@ -659,10 +645,10 @@ async def r2_check(
     """Verifica se o vídeo já está no R2."""
     cfg = load_brand_config(brand_slug)
     r2_prefix = cfg.get("r2_prefix", "")
-    r2_base = check_conflict(artist, song, video_id, r2_prefix=r2_prefix)
+    r2_base = await asyncio.to_thread(check_conflict, artist, song, video_id, r2_prefix=r2_prefix)
     full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
     r2_key = f"{full_base}/video/original.mp4"
-    exists = storage.exists(r2_key)
+    exists = await async_storage.exists(r2_key)
     return {"exists": exists, "r2_key": r2_key, "r2_base": r2_base}
 
 
@@ -671,7 +657,7 @@ async def r2_info(folder: str = Query(...)):
     """Retorna youtube_url, thumbnail, título e descrição do vídeo para uma pasta R2."""
     marker_key = f"{folder}/video/.youtube_id"
     try:
-        video_id = storage.read_text(marker_key).strip()
+        video_id = (await async_storage.read_text(marker_key)).strip()
         if not video_id:
             raise HTTPException(404, "YouTube ID não encontrado")
     except HTTPException:
@@ -690,17 +676,18 @@ async def r2_info(folder: str = Query(...)):
 
     if YOUTUBE_API_KEY:
         try:
-            async with httpx.AsyncClient(timeout=8) as client:
-                resp = await client.get(
-                    "https://www.googleapis.com/youtube/v3/videos",
-                    params={"part": "snippet", "id": video_id, "key": YOUTUBE_API_KEY},
-                )
-                data = resp.json()
-                items = data.get("items", [])
-                if items:
-                    snippet = items[0].get("snippet", {})
-                    result["title"] = snippet.get("title", "") or result["title"]
-                    result["description"] = snippet.get("description", "")
+            client = get_http_client()
+            resp = await client.get(
+                "https://www.googleapis.com/youtube/v3/videos",
+                params={"part": "snippet", "id": video_id, "key": YOUTUBE_API_KEY},
+                timeout=8,
+            )
+            data = resp.json()
+            items = data.get("items", [])
+            if items:
+                snippet = items[0].get("snippet", {})
+                result["title"] = snippet.get("title", "") or result["title"]
+                result["description"] = snippet.get("description", "")
         except Exception as e:
             logger.warning(f"[r2/info] Falha ao enriquecer com YouTube API para {video_id}: {e}")
 
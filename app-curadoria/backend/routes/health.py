@@ -4,6 +4,7 @@ from fastapi import APIRouter
 import database as db
 from config import YOUTUBE_API_KEY, FFMPEG_BIN, FFPROBE_BIN
 from services.scoring import posted_registry
+from services.youtube import cache_stats as yt_cache_stats
 
 router = APIRouter()
 
@@ -16,6 +17,7 @@ async def health():
         "youtube_api": bool(YOUTUBE_API_KEY),
         "posted_count": len(posted_registry),
         "quota_remaining": quota["remaining"],
+        "yt_cache": yt_cache_stats(),
     }
 
 
@@ -1,6 +1,10 @@
-import os, re, asyncio, shutil, logging, base64, subprocess
+import os, re, asyncio, shutil, logging, base64, subprocess, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -86,15 +90,17 @@ except Exception as e:
     logger.warning(f"[download] load_plugins check skipped: {e}")
 
 import database as db
-from config import PROJECTS_DIR, COBALT_API_URL, COBALT_API_KEY, load_brand_config
-from shared.storage_service import storage, check_conflict, save_youtube_marker
+from config import (
+    PROJECTS_DIR, COBALT_API_URL, COBALT_API_KEY, FFPROBE_BIN, load_brand_config,
+    DOWNLOAD_FETCH_WORKERS, DOWNLOAD_PROBE_WORKERS, DOWNLOAD_UPLOAD_WORKERS, DOWNLOAD_STAGE_QUEUE,
+)
+from shared.storage_service import async_storage, check_conflict, save_youtube_marker
 
 # ─── DOWNLOAD WORKER (ERR-055) ───
 class TaskManager:
     def __init__(self):
         self.tasks = {}  # video_id -> status dict
-        self.queue = asyncio.Queue()
-        self.current_task = None
+        self.queue = asyncio.Queue()  # entrada do pipeline (etapa fetch)
         self.lock = asyncio.Lock()
 
     def set_task(self, video_id, data):
@@ -108,6 +114,7 @@ class TaskManager:
 
 
 manager = TaskManager()
+# Downloads avulsos (/api/download, /api/prepare-video); o lote usa o pipeline abaixo
 download_semaphore = asyncio.Semaphore(2)
 
 
@@ -122,35 +129,141 @@ def sanitize_filename(s: str) -> str:
     return s[:200] if s else 'video'
 
 
-async def download_worker():
-    """Worker loop following app-editor pattern (asyncio.Queue)"""
-    logger.info("Download worker started")
+# ─── PIPELINE DE DOWNLOAD EM LOTE ───
+# fetch (yt-dlp/cobalt, rede) → probe (ffprobe, CPU) → upload (R2, I/O).
+# Cada etapa tem seu pool de workers; entre etapas, filas limitadas
+# (DOWNLOAD_STAGE_QUEUE): se o upload atrasa, o fetch para de baixar em vez de
+# encher o disco com vídeos esperando envio.
+
+@dataclass
+class ItemDownload:
+    video_id: str
+    artist: str
+    song: str
+    brand_slug: Optional[str] = None
+    project_name: str = ""
+    project_dir: Optional[Path] = None
+    dl_path: Optional[str] = None
+    tamanho: int = 0
+    r2_prefix: str = ""
+    r2_base: str = ""
+
+
+class _EstatisticaEtapa:
+    """Contadores de uma etapa: ocupação, fila, vazão no último minuto, tempo médio."""
+
+    def __init__(self, nome: str, workers: int, fila: asyncio.Queue):
+        self.nome = nome
+        self.workers = workers
+        self.fila = fila
+        self.ativos = 0
+        self.aguardando = 0  # workers com item pronto, bloqueados na fila seguinte
+        self.concluidos = 0
+        self.falhas = 0
+        self.segundos = 0.0
+        self.bytes = 0
+        self._fins: deque = deque(maxlen=1000)
+
+    def terminar(self, t0: float, ok: bool, nbytes: int = 0):
+        self.segundos += time.monotonic() - t0
+        if ok:
+            self.concluidos += 1
+            self.bytes += nbytes
+            self._fins.append(time.monotonic())
+        else:
+            self.falhas += 1
+
+    def snapshot(self) -> dict:
+        agora = time.monotonic()
+        feitos = self.concluidos + self.falhas
+        return {
+            "workers": self.workers,
+            "ativos": self.ativos,
+            "aguardando": self.aguardando,
+            "fila": self.fila.qsize(),
+            "fila_max": self.fila.maxsize or None,
+            "concluidos": self.concluidos,
+            "falhas": self.falhas,
+            "por_min": sum(1 for t in self._fins if agora - t <= 60),
+            "seg_medio": round(self.segundos / feitos, 1) if feitos else None,
+            "mb": round(self.bytes / (1024 * 1024), 1),
+        }
+
+
+_fila_probe: asyncio.Queue = asyncio.Queue(maxsize=DOWNLOAD_STAGE_QUEUE)
+_fila_upload: asyncio.Queue = asyncio.Queue(maxsize=DOWNLOAD_STAGE_QUEUE)
+_etapas = {
+    "fetch": _EstatisticaEtapa("fetch", DOWNLOAD_FETCH_WORKERS, manager.queue),
+    "probe": _EstatisticaEtapa("probe", DOWNLOAD_PROBE_WORKERS, _fila_probe),
+    "upload": _EstatisticaEtapa("upload", DOWNLOAD_UPLOAD_WORKERS, _fila_upload),
+}
+# ffprobe roda em subprocess; o pool só limita quantos rodam ao mesmo tempo
+_probe_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_PROBE_WORKERS, thread_name_prefix="ffprobe")
+
+
+def pipeline_stats() -> dict:
+    return {nome: etapa.snapshot() for nome, etapa in _etapas.items()}
+
+
+def enqueue_download(video_id: str, artist: str, song: str, brand_slug: str = None) -> bool:
+    """Põe o vídeo na entrada do pipeline. False se já está na fila/andamento."""
+    atual = manager.tasks.get(video_id)
+    if atual and atual["status"] in ("pending", "processing"):
+        return False
+    manager.set_task(video_id, {"status": "pending", "progress": 0, "message": "Na fila"})
+    manager.queue.put_nowait(ItemDownload(video_id, artist, song, brand_slug))
+    return True
+
+
+def _falhou(item: ItemDownload, etapa: str, e: Exception):
+    logger.error(f"[pipeline:{etapa}] Erro em {item.video_id}: {e}")
+    if item.project_dir and item.project_dir.exists():
+        shutil.rmtree(str(item.project_dir), ignore_errors=True)
+    manager.set_task(item.video_id, {"status": "error", "message": str(e)})
+    try:
+        import sentry_sdk
+        sentry_sdk.set_context("download", {"video_id": item.video_id, "etapa": etapa})
+        sentry_sdk.capture_exception(e)
+    except Exception as sentry_err:
+        logger.debug(f"Sentry report falhou: {sentry_err}")
+
+
+async def _worker_etapa(etapa: _EstatisticaEtapa, processar, saida: Optional[asyncio.Queue]):
+    """Consome a fila da etapa; o item segue para `saida` se `processar` retornar True."""
     while True:
+        item = await etapa.fila.get()
+        etapa.ativos += 1
+        t0 = time.monotonic()
         try:
-            video_id, artist, song, callback = await manager.queue.get()
-            manager.current_task = video_id
-            logger.info(f"Worker processing: {video_id} ({artist} - {song})")
-
+            seguir = await processar(item)
+            etapa.terminar(t0, ok=True, nbytes=item.tamanho)
+        except Exception as e:
+            etapa.terminar(t0, ok=False)
+            _falhou(item, etapa.nome, e)
+            seguir = False
+        finally:
+            etapa.ativos -= 1
+            etapa.fila.task_done()
+        if seguir and saida is not None:
+            etapa.aguardando += 1
             try:
-                manager.set_task(video_id, {"status": "processing", "progress": 0, "message": "Iniciando download..."})
-                await callback(video_id, artist, song)
-                manager.set_task(video_id, {"status": "completed", "progress": 100, "message": "Concluído!"})
-                logger.info(f"Worker completed: {video_id}")
-            except Exception as e:
-                logger.error(f"Worker error for {video_id}: {e}")
-                manager.set_task(video_id, {"status": "error", "message": str(e)})
-                try:
-                    import sentry_sdk
-                    sentry_sdk.set_context("download", {"video_id": video_id})
-                    sentry_sdk.capture_exception(e)
-                except Exception as sentry_err:
-                    logger.debug(f"Sentry report falhou: {sentry_err}")
+                await saida.put(item)
             finally:
-                manager.current_task = None
-                manager.queue.task_done()
-        except Exception as e:
-            logger.warning(f"Worker loop error: {e}")
-            await asyncio.sleep(1)
+                etapa.aguardando -= 1
+
+
+async def download_worker():
+    """Sobe os workers das três etapas do pipeline (substitui o worker único)."""
+    logger.info(
+        f"Download pipeline started: fetch={DOWNLOAD_FETCH_WORKERS} probe={DOWNLOAD_PROBE_WORKERS} "
+        f"upload={DOWNLOAD_UPLOAD_WORKERS} fila={DOWNLOAD_STAGE_QUEUE}"
+    )
+    workers = (
+        [_worker_etapa(_etapas["fetch"], _etapa_fetch, _fila_probe) for _ in range(DOWNLOAD_FETCH_WORKERS)]
+        + [_worker_etapa(_etapas["probe"], _etapa_probe, _fila_upload) for _ in range(DOWNLOAD_PROBE_WORKERS)]
+        + [_worker_etapa(_etapas["upload"], _etapa_upload, None) for _ in range(DOWNLOAD_UPLOAD_WORKERS)]
+    )
+    await asyncio.gather(*workers)
 
 
 def _get_ydl_opts(dl_path: str):
@@ -332,90 +445,110 @@ async def _download_via_cobalt(youtube_url: str, output_path: str) -> bool:
         return False
 
 
-async def _prepare_video_logic(video_id: str, artist: str, song: str):
-    safe_artist = sanitize_filename(artist)
-    safe_song = sanitize_filename(song)
-    project_name = f"{safe_artist} - {safe_song}"
-    youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+async def _etapa_fetch(item: ItemDownload) -> bool:
+    """Confere se já está no R2 e baixa (yt-dlp CLI, fallback cobalt.tools)."""
+    video_id = item.video_id
+    cfg = load_brand_config(item.brand_slug)
+    item.r2_prefix = cfg.get("r2_prefix", "")
+    item.r2_base = await asyncio.to_thread(
+        check_conflict, item.artist, item.song, video_id, r2_prefix=item.r2_prefix,
+    )
+    full_base = f"{item.r2_prefix}/{item.r2_base}" if item.r2_prefix else item.r2_base
+    if await async_storage.exists(f"{full_base}/video/original.mp4"):
+        manager.set_task(video_id, {"status": "completed", "progress": 100, "message": "Já no R2"})
+        return False
 
-    project_dir = PROJECTS_DIR / project_name
-    project_dir.mkdir(parents=True, exist_ok=True)
-    (project_dir / "video").mkdir(exist_ok=True)
-    dl_path = str(project_dir / "video" / f"{project_name}.mp4")
+    item.project_name = f"{sanitize_filename(item.artist)} - {sanitize_filename(item.song)}"
+    youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+    # video_id no diretório: com fetches paralelos, duas gravações da mesma
+    # ária (mesmo artista/música) não podem dividir — nem apagar — a pasta
+    item.project_dir = PROJECTS_DIR / f"{item.project_name} [{video_id}]"
+    (item.project_dir / "video").mkdir(parents=True, exist_ok=True)
+    dl_path = str(item.project_dir / "video" / f"{item.project_name}.mp4")
 
     manager.set_task(video_id, {"status": "processing", "progress": 30, "message": "Fazendo download (yt-dlp)..."})
 
     dl_path_actual = None
+    # PASSO 1 — yt-dlp via CLI (CLI é o único caminho com plugin bgutil ativo;
+    # a Python API no mesmo processo só entrega 360p por falta de PO Token).
     try:
-        # PASSO 1 — yt-dlp via CLI (CLI é o único caminho com plugin bgutil ativo;
-        # a Python API no mesmo processo só entrega 360p por falta de PO Token).
-        try:
-            ydl_opts = _get_ydl_opts(dl_path)
-            await _download_via_ytdlp_cli(youtube_url, ydl_opts)
-
-            if not os.path.exists(dl_path):
-                import glob as _glob
-                files = _glob.glob(str(project_dir / "video" / '*'))
-                dl_path_actual = files[0] if files else None
-            else:
-                dl_path_actual = dl_path
-
-            if not dl_path_actual:
-                raise Exception("yt-dlp terminou sem erro mas arquivo não encontrado")
-        except Exception as e:
-            logger.warning(f"[{video_id}] yt-dlp falhou: {e}")
+        ydl_opts = _get_ydl_opts(dl_path)
+        await _download_via_ytdlp_cli(youtube_url, ydl_opts)
 
-        # PASSO 2 — cobalt.tools (fallback se yt-dlp falhou)
-        if not dl_path_actual:
-            logger.info(f"[{video_id}] Tentando cobalt.tools como fallback...")
-            manager.set_task(video_id, {"status": "processing", "progress": 40, "message": "Fallback cobalt.tools..."})
-            cobalt_ok = await _download_via_cobalt(youtube_url, dl_path)
-            if cobalt_ok:
-                dl_path_actual = dl_path
+        if not os.path.exists(dl_path):
+            import glob as _glob
+            files = _glob.glob(os.path.join(_glob.escape(str(item.project_dir / "video")), '*'))
+            dl_path_actual = files[0] if files else None
+        else:
+            dl_path_actual = dl_path
 
         if not dl_path_actual:
-            raise Exception("Download falhou: yt-dlp (bot detection) e cobalt.tools falharam. Use upload manual.")
-
-        # Diagnóstico: logar resolução/codec do vídeo baixado
-        try:
-            _probe = subprocess.run(
-                ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
-                 '-show_entries', 'stream=width,height,codec_name,bit_rate',
-                 '-of', 'csv=p=0', dl_path_actual],
-                capture_output=True, text=True, timeout=10
-            )
-            _size_mb = os.path.getsize(dl_path_actual) / (1024 * 1024)
-            logger.info(f"[{video_id}] ffprobe: {_probe.stdout.strip()} | {_size_mb:.1f}MB — {dl_path_actual}")
-            if _probe.returncode != 0:
-                logger.warning(f"[{video_id}] ffprobe stderr: {_probe.stderr.strip()}")
-        except Exception as _probe_err:
-            logger.warning(f"[{video_id}] ffprobe falhou: {_probe_err}")
+            raise Exception("yt-dlp terminou sem erro mas arquivo não encontrado")
+    except Exception as e:
+        logger.warning(f"[{video_id}] yt-dlp falhou: {e}")
+
+    # PASSO 2 — cobalt.tools (fallback se yt-dlp falhou)
+    if not dl_path_actual:
+        logger.info(f"[{video_id}] Tentando cobalt.tools como fallback...")
+        manager.set_task(video_id, {"status": "processing", "progress": 40, "message": "Fallback cobalt.tools..."})
+        if await _download_via_cobalt(youtube_url, dl_path):
+            dl_path_actual = dl_path
+
+    if not dl_path_actual:
+        raise Exception("Download falhou: yt-dlp (bot detection) e cobalt.tools falharam. Use upload manual.")
+
+    item.dl_path = dl_path_actual
+    item.tamanho = os.path.getsize(dl_path_actual)
+    manager.set_task(video_id, {"status": "processing", "progress": 50, "message": "Baixado — aguardando análise"})
+    return True
+
+
+def _ffprobe(path: str):
+    return subprocess.run(
+        [FFPROBE_BIN, '-v', 'error', '-select_streams', 'v:0',
+         '-show_entries', 'stream=width,height,codec_name,bit_rate',
+         '-of', 'csv=p=0', path],
+        capture_output=True, text=True, timeout=10,
+    )
 
-        manager.set_task(video_id, {"status": "processing", "progress": 70, "message": "Enviando para o R2..."})
 
-        try:
-            db.save_download(video_id, f"{project_name}.mp4", artist, song, youtube_url)
-        except Exception as e:
-            logger.warning(f"[{video_id}] Falha ao salvar registro de download: {e}")
+async def _etapa_probe(item: ItemDownload) -> bool:
+    """Diagnóstico: loga resolução/codec do vídeo baixado (falha não bloqueia o envio)."""
+    manager.set_task(item.video_id, {"status": "processing", "progress": 60, "message": "Analisando vídeo..."})
+    try:
+        loop = asyncio.get_running_loop()
+        _probe = await loop.run_in_executor(_probe_pool, _ffprobe, item.dl_path)
+        logger.info(
+            f"[{item.video_id}] ffprobe: {_probe.stdout.strip()} | "
+            f"{item.tamanho / (1024 * 1024):.1f}MB — {item.dl_path}"
+        )
+        if _probe.returncode != 0:
+            logger.warning(f"[{item.video_id}] ffprobe stderr: {_probe.stderr.strip()}")
+    except Exception as _probe_err:
+        logger.warning(f"[{item.video_id}] ffprobe falhou: {_probe_err}")
+    manager.set_task(item.video_id, {"status": "processing", "progress": 65, "message": "Aguardando envio ao R2"})
+    return True
 
-        cfg = load_brand_config()
-        r2_prefix = cfg.get("r2_prefix", "")
-        r2_base = check_conflict(artist, song, video_id, r2_prefix=r2_prefix)
-        full_base = f"{r2_prefix}/{r2_base}" if r2_prefix else r2_base
-        r2_key = f"{full_base}/video/original.mp4"
-        storage.upload_file(dl_path_actual, r2_key)
-        save_youtube_marker(r2_base, video_id, r2_prefix=r2_prefix)
 
-        shutil.rmtree(str(project_dir), ignore_errors=True)
-        manager.set_task(video_id, {"status": "completed", "progress": 100, "message": "Concluído!"})
+async def _etapa_upload(item: ItemDownload) -> bool:
+    """Envia o original para o R2, grava o marker e o registro de download."""
+    video_id = item.video_id
+    youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+    manager.set_task(video_id, {"status": "processing", "progress": 70, "message": "Enviando para o R2..."})
 
+    try:
+        await asyncio.to_thread(
+            db.save_download, video_id, f"{item.project_name}.mp4", item.artist, item.song,
+            youtube_url, brand_slug=item.brand_slug,
+        )
     except Exception as e:
-        if project_dir.exists():
-            shutil.rmtree(str(project_dir), ignore_errors=True)
-        raise e
+        logger.warning(f"[{video_id}] Falha ao salvar registro de download: {e}")
 
+    full_base = f"{item.r2_prefix}/{item.r2_base}" if item.r2_prefix else item.r2_base
+    await async_storage.upload_file(item.dl_path, f"{full_base}/video/original.mp4")
+    await asyncio.to_thread(save_youtube_marker, item.r2_base, video_id, r2_prefix=item.r2_prefix)
 
-async def _wrapped_prepare_video(video_id, artist, song):
-    """Internal helper for the worker to call prepare_video logic"""
-    manager.set_task(video_id, {"status": "processing", "progress": 10, "message": "Baixando do YouTube..."})
-    await _prepare_video_logic(video_id, artist, song)
+    shutil.rmtree(str(item.project_dir), ignore_errors=True)
+    manager.set_task(video_id, {"status": "completed", "progress": 100, "message": "Concluído!"})
+    logger.info(f"[pipeline] Concluído: {video_id} ({item.artist} - {item.song})")
+    return False
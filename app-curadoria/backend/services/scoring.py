@@ -1,4 +1,5 @@
-import re, csv, unicodedata, logging
+import re, csv, json, hashlib, unicodedata, logging
+from collections import OrderedDict
 from pathlib import Path
 from config import DATASET_PATH
 
@@ -16,154 +17,355 @@ def normalize_str(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
+_STOP = frozenset({"", "the", "and", "de", "di", "la", "le", "el", "a", "o", "in", "of"})
+
+
+def _palavras(s: str) -> frozenset:
+    return frozenset(s.split()) - _STOP
+
+
+class _IndiceCampo:
+    """Índice de um campo (artista ou música) do registry para o match fuzzy.
+
+    Um valor do registry `r` casa com a consulta `q` quando ambos têm palavras
+    fora da stop-list e (compartilham >= min(2, |palavras(q)|) palavras, ou
+    r está contido em q, ou q está contido em r). Os candidatos saem de três
+    índices — palavra → valores, valor exato (substrings de q) e trigramas
+    (q contido em r) — e só eles são conferidos com a regra completa.
+    """
+
+    def __init__(self, valores: list):
+        self.linhas: dict = {}       # valor → ids das linhas do registry
+        self.palavras: dict = {}     # valor → palavras pré-computadas
+        self.por_palavra: dict = {}  # palavra → valores
+        self.por_trigrama: dict = {}  # trigrama → valores
+        for i, valor in enumerate(valores):
+            self.linhas.setdefault(valor, []).append(i)
+        for valor in self.linhas:
+            pw = _palavras(valor)
+            self.palavras[valor] = pw
+            if not pw:
+                continue
+            for w in pw:
+                self.por_palavra.setdefault(w, set()).add(valor)
+            for g in {valor[k:k + 3] for k in range(len(valor) - 2)}:
+                self.por_trigrama.setdefault(g, set()).add(valor)
+
+    def _contendo(self, q: str) -> set:
+        """Valores do índice que contêm q como substring."""
+        if len(q) < 3:
+            return {v for v in self.linhas if q in v and self.palavras[v]}
+        grams = sorted(
+            (self.por_trigrama.get(q[k:k + 3], ()) for k in range(len(q) - 2)), key=len,
+        )
+        if not grams[0]:
+            return set()
+        cands = set(grams[0])
+        for g in grams[1:]:
+            cands &= g
+            if not cands:
+                break
+        return {v for v in cands if q in v}
+
+    def linhas_que_casam(self, q: str) -> set:
+        qw = _palavras(q)
+        if not qw:
+            return set()
+        cands = set()
+        for w in qw:
+            cands |= self.por_palavra.get(w, set())
+        # r contido em q: todas as substrings de q que são valores do registry
+        n = len(q)
+        for a in range(n):
+            for b in range(a + 1, n + 1):
+                if q[a:b] in self.palavras:
+                    cands.add(q[a:b])
+        cands |= self._contendo(q)
+
+        minimo = min(2, len(qw))
+        resultado = set()
+        for valor in cands:
+            rw = self.palavras[valor]
+            if rw and (len(qw & rw) >= minimo or valor in q or q in valor):
+                resultado.update(self.linhas[valor])
+        return resultado
+
+
+class PostedIndex:
+    """Índice pré-construído do posted_registry (consulta sub-linear, mesma semântica)."""
+
+    def __init__(self, registry):
+        self.exatos = set(registry)
+        pares = list(self.exatos)
+        self.artistas = _IndiceCampo([a for a, _ in pares])
+        self.musicas = _IndiceCampo([s for _, s in pares])
+
+    def contem(self, na: str, ns: str) -> bool:
+        if (na, ns) in self.exatos:
+            return True
+        linhas = self.artistas.linhas_que_casam(na)
+        if not linhas:
+            return False
+        return not linhas.isdisjoint(self.musicas.linhas_que_casam(ns))
+
+
+_posted_index = None
+
+
+def _get_posted_index() -> PostedIndex:
+    """Índice do registry atual; reconstruído se o registry mudou desde o último build."""
+    global _posted_index
+    if _posted_index is None or len(_posted_index.exatos) != len(posted_registry):
+        _posted_index = PostedIndex(posted_registry)
+    return _posted_index
+
+
 def is_posted(artist: str, song: str) -> bool:
     na, ns = normalize_str(artist), normalize_str(song)
     if not na and not ns:
         return False
-    stop = {"", "the", "and", "de", "di", "la", "le", "el", "a", "o", "in", "of"}
-    for ra, rs in posted_registry:
-        if ra == na and rs == ns:
-            return True
-        aw = set(na.split()) - stop
-        rw = set(ra.split()) - stop
-        am = (len(aw & rw) >= min(2, len(aw)) or ra in na or na in ra) if aw and rw else False
-        sw = set(ns.split()) - stop
-        rsw = set(rs.split()) - stop
-        sm = (len(sw & rsw) >= min(2, len(sw)) or rs in ns or ns in rs) if sw and rsw else False
-        if am and sm:
-            return True
-    return False
+    return _get_posted_index().contem(na, ns)
 
 
 def load_posted():
-    global posted_registry
-    posted_registry = set()
+    global _posted_index
+    # Atualiza o set no lugar: routes/health.py guarda a referência do import
+    registry = set()
     if DATASET_PATH.exists():
         with open(DATASET_PATH, encoding="utf-8") as f:
             for row in csv.DictReader(f):
                 a = row.get("Nome do Cantor", "").strip()
                 s = row.get("Nome da Musica", "").strip()
                 if a:
-                    posted_registry.add((normalize_str(a), normalize_str(s)))
+                    registry.add((normalize_str(a), normalize_str(s)))
+    posted_registry.clear()
+    posted_registry.update(registry)
+    _posted_index = PostedIndex(posted_registry)
+    if DATASET_PATH.exists():
         logger.info(f"Posted registry: {len(posted_registry)} entries")
 
 
 # ─── SCORING V7 ───
+def _regex_trie(chaves) -> "re.Pattern":
+    """Regex de alternação fatorada em trie ("ave maria|ave verum" → "ave (?:maria|verum)").
+
+    O `re` testa alternativas uma a uma; fatorando os prefixos, cada posição do
+    texto custa uma ramificação por caractere em vez de uma tentativa por termo.
+    """
+    raiz: dict = {}
+    for chave in chaves:
+        no = raiz
+        for ch in chave:
+            no = no.setdefault(ch, {})
+        no[""] = True
+
+    def _rx(no: dict) -> str:
+        ramos = [re.escape(ch) + _rx(no[ch]) for ch in sorted(k for k in no if k)]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        return "(?:" + corpo + ")?" if "" in no else corpo
+
+    return re.compile(_rx(raiz))
+
+
+class _TermosCompilados:
+    """Lista de termos do config pré-processada para busca por substring.
+
+    `primeiro(*textos)` devolve o índice do primeiro termo (na ordem do config)
+    contido em algum dos textos — a mesma resposta do loop original `for termo
+    in lista: if termo.lower() in texto`. Os termos já vêm normalizados; listas
+    grandes viram uma regex em trie (custo quase independente do nº de termos),
+    listas pequenas ficam no scan com `in`, que nelas é mais rápido que o `re`.
+    """
+
+    MIN_TERMOS_REGEX = 48
+
+    def __init__(self, termos: list, minusculo: bool):
+        self.termos = list(termos)
+        self._chaves = tuple(t.lower() if minusculo else t for t in self.termos)
+        self._indice = {}
+        for i, c in enumerate(self._chaves):
+            self._indice.setdefault(c, i)
+        self._regex = _regex_trie(self._indice) if len(self._indice) >= self.MIN_TERMOS_REGEX else None
+
+    def primeiro(self, *textos: str):
+        # \x00 nunca aparece nos termos: um match não atravessa dois textos
+        texto = textos[0] if len(textos) == 1 else "\x00".join(textos)
+        if self._regex is None:
+            for i, chave in enumerate(self._chaves):
+                if chave in texto:
+                    return i
+            return None
+        m = self._regex.search(texto)
+        if m is None:
+            return None
+        # O match é o termo mais à esquerda; um termo anterior na lista pode estar mais à direita
+        achado = self._indice[m.group(0)]
+        for i in range(achado):
+            if self._chaves[i] in texto:
+                return i
+        return achado
+
+
+# Campos do config da marca que afetam o score. Mudou algum (ou a versão do
+# algoritmo) → fingerprint novo → scores persistidos são recalculados.
+SCORING_VERSION = "v7"
+_CAMPOS_SCORING = (
+    "elite_hits", "power_names", "voice_keywords",
+    "institutional_channels", "category_specialty", "scoring_weights",
+)
+
+
+class _MatcherV7:
+    """Config de scoring de uma marca pré-compilado (termos + pesos)."""
+
+    def __init__(self, config: dict = None):
+        cfg = config or {}
+        self.fingerprint = hashlib.sha1(json.dumps(
+            [SCORING_VERSION, {k: cfg.get(k) for k in _CAMPOS_SCORING}],
+            sort_keys=True, ensure_ascii=False,
+        ).encode()).hexdigest()[:16]
+        # elite_hits/power_names comparam em minúsculas; os demais como estão no config
+        self.elite = _TermosCompilados(cfg.get("elite_hits", []), minusculo=True)
+        self.power = _TermosCompilados(cfg.get("power_names", []), minusculo=True)
+        self.voice = _TermosCompilados(cfg.get("voice_keywords", []), minusculo=False)
+        self.institutional = _TermosCompilados(cfg.get("institutional_channels", []), minusculo=False)
+        self.specialty = {
+            cat: _TermosCompilados(kws, minusculo=False)
+            for cat, kws in cfg.get("category_specialty", {}).items()
+        }
+        weights = cfg.get("scoring_weights", {})
+        self.w_elite = weights.get("elite_hit", 15)
+        self.w_power = weights.get("power_name", 15)
+        self.w_specialty = weights.get("specialty", 25)
+        self.w_voice = weights.get("voice", 15)
+        self.w_institutional = weights.get("institutional", 10)
+        self.w_quality = weights.get("quality", 10)
+        self.w_views = weights.get("views", 10)
+        self.views_threshold = weights.get("views_threshold", 100000)
+        self.max_total = weights.get("max_total", 100)
+
+    def score(self, v: dict, category: str = None) -> dict:
+        reasons = []
+        total = 0
+        title_low = (v.get("title") or "").lower()
+        artist_low = (v.get("artist") or "").lower()
+        song_low = (v.get("song") or "").lower()
+        channel_low = (v.get("channel") or "").lower()
+
+        # 1. elite_hits
+        i = self.elite.primeiro(song_low, title_low)
+        hit_match = self.elite.termos[i] if i is not None else None
+        if hit_match:
+            total += self.w_elite
+            reasons.append({"tag": "elite_hit", "label": hit_match, "points": self.w_elite})
+
+        # 2. power_names
+        i = self.power.primeiro(artist_low, channel_low, title_low)
+        name_match = self.power.termos[i] if i is not None else None
+        if name_match:
+            total += self.w_power
+            reasons.append({"tag": "power_name", "label": name_match, "points": self.w_power})
+
+        # 3. specialty (dual match OR deep category keywords)
+        specialty_match = None
+        if hit_match and name_match:
+            specialty_match = f"{name_match} + {hit_match}"
+        elif category and category in self.specialty:
+            termos = self.specialty[category]
+            i = termos.primeiro(title_low, channel_low)
+            specialty_match = termos.termos[i] if i is not None else None
+        if specialty_match:
+            total += self.w_specialty
+            reasons.append({"tag": "specialty", "label": specialty_match, "points": self.w_specialty})
+
+        # 4. voice
+        i = self.voice.primeiro(title_low)
+        voice_match = self.voice.termos[i] if i is not None else None
+        if voice_match:
+            total += self.w_voice
+            reasons.append({"tag": "voice", "label": voice_match, "points": self.w_voice})
+
+        # 5. institutional
+        inst_match = v.get("channel", "") if self.institutional.primeiro(channel_low) is not None else None
+        if inst_match:
+            total += self.w_institutional
+            reasons.append({"tag": "institutional", "label": inst_match, "points": self.w_institutional})
+
+        # 6. quality (HD)
+        if v.get("hd"):
+            total += self.w_quality
+            reasons.append({"tag": "quality", "label": "HD", "points": self.w_quality})
+
+        # 7. views
+        views = v.get("views", 0)
+        if views > self.views_threshold:
+            total += self.w_views
+            reasons.append({"tag": "views", "label": f"{views:,}", "points": self.w_views})
+
+        total = min(total, self.max_total)
+
+        return {
+            "total": total,
+            "reasons": reasons,
+            # Compat fields for DB storage
+            "fixed": 0,
+            "guia": 0.0,
+            "artist_match": name_match,
+            "song_match": hit_match,
+        }
+
+
+# Matchers compilados por objeto de config. load_brand_config devolve o mesmo
+# dict enquanto o cache dele vale; um dict novo (TTL vencido, marca editada)
+# compila de novo. Guardamos o próprio config para o id() não ser reaproveitado.
+_matchers: "OrderedDict[int, tuple]" = OrderedDict()
+_MATCHERS_MAX = 16
+
+
+def _get_matcher(config: dict = None) -> _MatcherV7:
+    chave = id(config)
+    item = _matchers.get(chave)
+    if item is not None and item[0] is config:
+        _matchers.move_to_end(chave)
+        return item[1]
+    matcher = _MatcherV7(config)
+    _matchers[chave] = (config, matcher)
+    while len(_matchers) > _MATCHERS_MAX:
+        _matchers.popitem(last=False)
+    return matcher
+
+
 def calc_score_v7(v: dict, category: str = None, config: dict = None) -> dict:
     """Calcula score V7 para um vídeo. config: perfil da marca (lê do JSON).
     Fase 2: config virá do banco por perfil_id.
     """
-    elite_hits = config["elite_hits"] if config else []
-    power_names = config["power_names"] if config else []
-    voice_keywords = config["voice_keywords"] if config else []
-    institutional_channels = config["institutional_channels"] if config else []
-    category_specialty = config["category_specialty"] if config else {}
-    weights = config.get("scoring_weights", {}) if config else {}
-
-    w_elite = weights.get("elite_hit", 15)
-    w_power = weights.get("power_name", 15)
-    w_specialty = weights.get("specialty", 25)
-    w_voice = weights.get("voice", 15)
-    w_institutional = weights.get("institutional", 10)
-    w_quality = weights.get("quality", 10)
-    w_views = weights.get("views", 10)
-    views_threshold = weights.get("views_threshold", 100000)
-    max_total = weights.get("max_total", 100)
-
-    reasons = []
-    total = 0
-    title_low = (v.get("title") or "").lower()
-    artist_low = (v.get("artist") or "").lower()
-    song_low = (v.get("song") or "").lower()
-    channel_low = (v.get("channel") or "").lower()
-
-    # 1. elite_hits
-    hit_match = None
-    for hit in elite_hits:
-        hl = hit.lower()
-        if hl in song_low or hl in title_low:
-            hit_match = hit
-            break
-    if hit_match:
-        total += w_elite
-        reasons.append({"tag": "elite_hit", "label": hit_match, "points": w_elite})
-
-    # 2. power_names
-    name_match = None
-    for name in power_names:
-        nl = name.lower()
-        if nl in artist_low or nl in channel_low or nl in title_low:
-            name_match = name
-            break
-    if name_match:
-        total += w_power
-        reasons.append({"tag": "power_name", "label": name_match, "points": w_power})
-
-    # 3. specialty (dual match OR deep category keywords)
-    specialty_match = None
-    if hit_match and name_match:
-        specialty_match = f"{name_match} + {hit_match}"
-    elif category and category in category_specialty:
-        for kw in category_specialty[category]:
-            if kw in title_low or kw in channel_low:
-                specialty_match = kw
-                break
-    if specialty_match:
-        total += w_specialty
-        reasons.append({"tag": "specialty", "label": specialty_match, "points": w_specialty})
-
-    # 4. voice
-    voice_match = None
-    for kw in voice_keywords:
-        if kw in title_low:
-            voice_match = kw
-            break
-    if voice_match:
-        total += w_voice
-        reasons.append({"tag": "voice", "label": voice_match, "points": w_voice})
-
-    # 5. institutional
-    inst_match = None
-    for ch in institutional_channels:
-        if ch in channel_low:
-            inst_match = v.get("channel", "")
-            break
-    if inst_match:
-        total += w_institutional
-        reasons.append({"tag": "institutional", "label": inst_match, "points": w_institutional})
-
-    # 6. quality (HD)
-    if v.get("hd"):
-        total += w_quality
-        reasons.append({"tag": "quality", "label": "HD", "points": w_quality})
-
-    # 7. views
-    views = v.get("views", 0)
-    if views > views_threshold:
-        total += w_views
-        reasons.append({"tag": "views", "label": f"{views:,}", "points": w_views})
-
-    total = min(total, max_total)
+    return _get_matcher(config).score(v, category)
+
+
+def score_fingerprint(config: dict = None) -> str:
+    """Fingerprint do config de scoring (guardado junto dos scores em cached_videos)."""
+    return _get_matcher(config).fingerprint
 
-    return {
-        "total": total,
-        "reasons": reasons,
-        # Compat fields for DB storage
-        "fixed": 0,
-        "guia": 0.0,
-        "artist_match": name_match,
-        "song_match": hit_match,
-    }
+
+def score_batch(videos: list, category: str = None, config: dict = None) -> list:
+    """Score V7 de vários vídeos com um único lookup do matcher compilado.
+
+    Mesmo resultado de `[calc_score_v7(v, category, config) for v in videos]`.
+    """
+    matcher = _get_matcher(config)
+    return [matcher.score(v, category) for v in videos]
 
 
 def _process_v7(videos, query, hide_posted, category=None, config=None):
-    scored = []
-    for v in videos:
-        if category:
+    if category:
+        for v in videos:
             v["category"] = category
-        sc = calc_score_v7(v, category, config)
-        p = is_posted(v.get("artist", ""), v.get("song", ""))
-        scored.append({**v, "score": sc, "posted": p})
+    scored = [
+        {**v, "score": sc, "posted": is_posted(v.get("artist", ""), v.get("song", ""))}
+        for v, sc in zip(videos, score_batch(videos, category, config))
+    ]
     scored.sort(key=lambda x: x["score"]["total"], reverse=True)
     pc = sum(1 for v in scored if v["posted"])
     vis = [v for v in scored if not v["posted"]] if hide_posted else scored
@@ -175,10 +377,3 @@ def _process_v7(videos, query, hide_posted, category=None, config=None):
         "videos": vis,
     }
 
-
-def _rescore_cached(videos, category=None, config=None):
-    """Recompute V7 scores for cached videos (adds reasons)"""
-    for v in videos:
-        v["score"] = calc_score_v7(v, category, config)
-    videos.sort(key=lambda x: x["score"]["total"], reverse=True)
-    return videos
@@ -0,0 +1,135 @@
+"""Warmup do cache de categorias: buscas em paralelo, limitadas por quota.
+
+Antes o populate_initial_cache buscava e gravava uma categoria por vez — uma
+marca nova levava minutos no cold start. Agora:
+
+- até WARMUP_CONCURRENCY buscas simultâneas (semáforo);
+- orçamento de pontos da YouTube Data API por minuto (WARMUP_QUOTA_POINTS_PER_MIN)
+  e nunca abaixo da reserva diária (YT_QUOTA_RESERVE, lida de quota_usage);
+- gravação pelo merge em lote (db.save_cached_videos) fora do event loop;
+- refresh incremental: com `apenas_vencidas`, só categorias sem cache ou com
+  último refresh mais velho que CATEGORY_CACHE_MAX_AGE_H;
+- progresso por marca exposto em /api/cache/status.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import database as db
+from config import (
+    YOUTUBE_API_KEY, BRAND_SLUG, ANTI_SPAM, load_brand_config,
+    WARMUP_CONCURRENCY, WARMUP_QUOTA_POINTS_PER_MIN, CATEGORY_CACHE_MAX_AGE_H, YT_QUOTA_RESERVE,
+)
+from services.youtube import yt_search
+from services.scoring import _process_v7, score_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# search.list (100) + um videos.list (1)
+PONTOS_POR_BUSCA = 101
+
+# Progresso do último warmup por marca
+_progresso: dict = {}
+
+
+class _OrcamentoQuota:
+    """Janela deslizante de 60s dos pontos gastos pelo warmup + teto diário."""
+
+    def __init__(self, pontos_por_min: int, restante_hoje: int):
+        self.pontos_por_min = pontos_por_min
+        self.disponivel_hoje = restante_hoje - YT_QUOTA_RESERVE
+        self._gastos: deque = deque()  # (monotonic, pontos)
+        self._lock = asyncio.Lock()
+
+    async def reservar(self, pontos: int) -> bool:
+        """Espera a janela ter espaço. False se a quota do dia não comporta."""
+        async with self._lock:
+            if pontos > self.disponivel_hoje:
+                return False
+            while True:
+                agora = time.monotonic()
+                while self._gastos and agora - self._gastos[0][0] >= 60:
+                    self._gastos.popleft()
+                usado = sum(p for _, p in self._gastos)
+                if usado + pontos <= self.pontos_por_min or not self._gastos:
+                    break
+                await asyncio.sleep(60 - (agora - self._gastos[0][0]))
+            self._gastos.append((time.monotonic(), pontos))
+            self.disponivel_hoje -= pontos
+            return True
+
+
+def categorias_vencidas(categorias: dict, brand_slug: str, max_idade_h: float = CATEGORY_CACHE_MAX_AGE_H) -> list:
+    """Chaves das categorias sem cache ou com refresh mais velho que `max_idade_h`."""
+    refresh = db.get_category_refresh_times(brand_slug)
+    limite = datetime.now() - timedelta(hours=max_idade_h)
+    return [k for k in categorias if refresh.get(k) is None or refresh[k] < limite]
+
+
+def progresso() -> dict:
+    return _progresso
+
+
+async def aquecer_categorias(brand_slug: str | None = None, apenas_vencidas: bool = False):
+    """Busca (seed 0) e grava o cache das categorias da marca em paralelo."""
+    slug = brand_slug or BRAND_SLUG
+    config = load_brand_config(brand_slug)
+    categorias = config["categories"]
+    alvo = categorias_vencidas(categorias, slug) if apenas_vencidas else list(categorias)
+
+    estado = {
+        "status": "rodando", "total": len(alvo), "concluidas": 0, "falhas": 0, "sem_quota": 0,
+        "ignoradas": len(categorias) - len(alvo), "categorias": {k: "pendente" for k in alvo},
+        "inicio": datetime.now().isoformat(), "fim": None,
+    }
+    _progresso[slug] = estado
+    if not alvo:
+        estado.update(status="concluido", fim=datetime.now().isoformat())
+        logger.info(f"[warmup] {slug}: nenhuma categoria vencida")
+        return estado
+
+    orcamento = _OrcamentoQuota(WARMUP_QUOTA_POINTS_PER_MIN, db.get_quota_status()["remaining"])
+    semaforo = asyncio.Semaphore(max(1, WARMUP_CONCURRENCY))
+    anti_spam = config.get("anti_spam") or ANTI_SPAM
+    fingerprint = score_fingerprint(config)
+    t0 = time.monotonic()
+    logger.info(f"[warmup] {slug}: {len(alvo)} categoria(s), {WARMUP_CONCURRENCY} em paralelo")
+
+    async def _uma(cat_key: str):
+        async with semaforo:
+            if not await orcamento.reservar(PONTOS_POR_BUSCA):
+                estado["sem_quota"] += 1
+                estado["categorias"][cat_key] = "sem_quota"
+                return
+            estado["categorias"][cat_key] = "buscando"
+            try:
+                seed_query = categorias[cat_key]["seeds"][0]
+                raw = await yt_search(f"{seed_query} {anti_spam}", 25, YOUTUBE_API_KEY)
+                result = _process_v7(raw, seed_query, False, cat_key, config)
+                if not result["videos"]:
+                    estado["falhas"] += 1
+                    estado["categorias"][cat_key] = "vazio"
+                    return
+                await asyncio.to_thread(
+                    db.save_cached_videos, result["videos"], cat_key, slug, fingerprint,
+                )
+                db.save_last_seed(cat_key, 0)
+                estado["concluidas"] += 1
+                estado["categorias"][cat_key] = "ok"
+                logger.info(f"[warmup] Cached {len(result['videos'])} videos for {cat_key}")
+            except Exception as e:
+                estado["falhas"] += 1
+                estado["categorias"][cat_key] = "erro"
+                logger.error(f"[warmup] Error caching {cat_key}: {e}")
+
+    await asyncio.gather(*(_uma(k) for k in alvo))
+
+    db.set_config("last_category_refresh", datetime.now().isoformat())
+    estado.update(status="concluido", fim=datetime.now().isoformat())
+    logger.info(
+        f"[warmup] {slug}: {estado['concluidas']}/{len(alvo)} ok, {estado['falhas']} falha(s), "
+        f"{estado['sem_quota']} sem quota em {time.monotonic() - t0:.1f}s"
+    )
+    return estado
@@ -1,7 +1,16 @@
 import re
+import time
+import asyncio
 import logging
+from collections import OrderedDict
+from typing import Optional
+
 import httpx
 import database as db
+from config import (
+    YT_HTTP_MAX_CONNECTIONS, YT_SEARCH_CACHE_TTL, YT_DETAILS_CACHE_TTL,
+    YT_QUOTA_RESERVE, YT_STALE_MAX_AGE, YT_DETAILS_BATCH_MS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -75,148 +84,311 @@ def classify_category(title: str, description: str = "") -> str:
     return "Vocal"
 
 
-async def yt_search(query: str, max_results: int = 25, api_key: str = "") -> list:
-    if not api_key:
-        return []
-    async with httpx.AsyncClient(timeout=15) as client:
-        r1 = await client.get(
-            "https://www.googleapis.com/youtube/v3/search",
-            params={
-                "part": "snippet", "q": query, "type": "video",
-                "maxResults": min(max_results, 50),
-                "key": api_key, "videoCategoryId": "10", "order": "relevance",
-            },
-        )
-        if r1.status_code != 200:
-            logger.warning(f"YT search error {r1.status_code}: {r1.text[:200]}")
-            return []
-        items = r1.json().get("items", [])
-        if not items:
-            return []
-
-        vids = [it["id"]["videoId"] for it in items if "videoId" in it.get("id", {})]
-        if not vids:
-            return []
-
-        r2 = await client.get(
-            "https://www.googleapis.com/youtube/v3/videos",
-            params={"part": "contentDetails,statistics", "id": ",".join(vids), "key": api_key},
+# ─── CLIENTE HTTP COMPARTILHADO ───
+# Um AsyncClient por processo: /api/ranking dispara N buscas em paralelo e
+# todas reusam as mesmas conexões (HTTP/2 quando o pacote h2 está instalado).
+
+_YT_API = "https://www.googleapis.com/youtube/v3"
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        _http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(30, connect=10),
+            limits=httpx.Limits(
+                max_connections=YT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=YT_HTTP_MAX_CONNECTIONS,
+            ),
         )
-        dm = {}
-        if r2.status_code == 200:
-            for v in r2.json().get("items", []):
-                dm[v["id"]] = v
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# ─── CACHE DE RESPOSTAS (quota-aware) ───
+
+class _CacheTTL:
+    """Cache LRU com TTL. Com a quota do dia apertada, entradas vencidas
+    (até YT_STALE_MAX_AGE) são reaproveitadas em vez de gastar pontos."""
+
+    def __init__(self, ttl: int, max_itens: int = 5000):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: OrderedDict = OrderedDict()  # chave → (gravado_em, valor)
+        self.hits = 0
+        self.misses = 0
 
-        # Register quota usage
+    def get(self, chave, aceitar_vencido: bool = False):
+        item = self._itens.get(chave)
+        limite = YT_STALE_MAX_AGE if aceitar_vencido else self.ttl
+        if item is None or time.monotonic() - item[0] > limite:
+            self.misses += 1
+            return None
+        self._itens.move_to_end(chave)
+        self.hits += 1
+        return item[1]
+
+    def set(self, chave, valor):
+        self._itens[chave] = (time.monotonic(), valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"itens": len(self._itens), "hits": self.hits, "misses": self.misses}
+
+
+_search_cache = _CacheTTL(YT_SEARCH_CACHE_TTL)
+_details_cache = _CacheTTL(YT_DETAILS_CACHE_TTL, max_itens=20000)
+_buscas_em_voo: dict = {}  # (query, max_results) → Task (mesma busca simultânea = 1 chamada)
+_quota_check = {"em": 0.0, "apertada": False}
+
+
+def _quota_apertada() -> bool:
+    """True se restam menos de YT_QUOTA_RESERVE pontos hoje (consulta o banco no máx. 1x/min)."""
+    agora = time.monotonic()
+    if agora - _quota_check["em"] > 60:
+        _quota_check["em"] = agora
         try:
-            db.register_quota_usage(search_calls=1, detail_calls=1)
+            _quota_check["apertada"] = db.get_quota_status()["remaining"] < YT_QUOTA_RESERVE
         except Exception as e:
-            logger.warning(f"Quota tracking error: {e}")
-
-        results = []
-        for it in items:
-            vid = it["id"].get("videoId", "")
-            if not vid:
-                continue
-            sn = it.get("snippet", {})
-            title = sn.get("title", "")
-            pub = sn.get("publishedAt", "")[:10]
-            yr = int(pub[:4]) if pub else 0
-            thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
-            det = dm.get(vid, {})
-            dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
-            defn = det.get("contentDetails", {}).get("definition", "sd")
-            views = int(det.get("statistics", {}).get("viewCount", 0))
-            artist, song = extract_artist_song(title)
-            results.append({
-                "video_id": vid,
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "title": title, "artist": artist, "song": song or title,
-                "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
-                "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
-                "thumbnail": thumb, "category": "",
-            })
-        return results
+            logger.warning(f"Quota check error: {e}")
+    return _quota_check["apertada"]
 
 
-async def yt_playlist(playlist_id: str, max_results: int = 50, api_key: str = "") -> list:
-    if not api_key:
-        return []
+def _registrar_quota(search_calls: int = 0, detail_calls: int = 0):
+    try:
+        db.register_quota_usage(search_calls=search_calls, detail_calls=detail_calls)
+    except Exception as e:
+        logger.warning(f"Quota tracking error: {e}")
+
+
+def cache_stats() -> dict:
+    return {
+        "search": _search_cache.stats(),
+        "details": _details_cache.stats(),
+        "quota_apertada": _quota_check["apertada"],
+    }
 
-    all_items = []
-    next_page_token = None
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        while True:
-            params = {
-                "part": "snippet",
-                "playlistId": playlist_id,
-                "maxResults": 50,
-                "key": api_key,
-            }
-            if next_page_token:
-                params["pageToken"] = next_page_token
-
-            r1 = await client.get(
-                "https://www.googleapis.com/youtube/v3/playlistItems", params=params
+async def _search_items(query: str, max_results: int, api_key: str) -> Optional[list]:
+    """Itens de search.list (cacheados). None em erro da API (não cacheia)."""
+    chave = (query, min(max_results, 50))
+    items = _search_cache.get(chave, aceitar_vencido=_quota_apertada())
+    if items is not None:
+        return items
+
+    task = _buscas_em_voo.get(chave)
+    if task is None:
+        async def _buscar():
+            r1 = await get_http_client().get(
+                f"{_YT_API}/search",
+                params={
+                    "part": "snippet", "q": query, "type": "video",
+                    "maxResults": chave[1],
+                    "key": api_key, "videoCategoryId": "10", "order": "relevance",
+                },
+                timeout=15,
             )
             if r1.status_code != 200:
-                logger.warning(f"YT playlist error {r1.status_code}: {r1.text[:200]}")
-                break
+                logger.warning(f"YT search error {r1.status_code}: {r1.text[:200]}")
+                return None
+            _registrar_quota(search_calls=1)
+            found = r1.json().get("items", [])
+            _search_cache.set(chave, found)
+            return found
 
-            data = r1.json()
-            items = data.get("items", [])
-            all_items.extend(items)
+        task = asyncio.ensure_future(_buscar())
+        _buscas_em_voo[chave] = task
+        task.add_done_callback(lambda _t: _buscas_em_voo.pop(chave, None))
+    return await asyncio.shield(task)
 
-            try:
-                db.register_quota_usage(search_calls=0, detail_calls=1)
-            except Exception as e:
-                logger.warning(f"Falha ao registrar quota usage (playlist): {e}")
 
-            next_page_token = data.get("nextPageToken")
-            if not next_page_token:
-                break
+class _LoteDetalhes:
+    """Junta os IDs pedidos por buscas simultâneas em chamadas videos.list de até 50 IDs.
 
-        if not all_items:
-            return []
+    Cada ID pendente espera no máximo YT_DETAILS_BATCH_MS; 50 IDs pendentes
+    disparam a chamada na hora. IDs já cacheados nem entram no lote.
+    """
 
-        # Get details for all videos in batches of 50
-        vids = [it["snippet"]["resourceId"]["videoId"] for it in all_items]
-        dm = {}
+    LIMITE_IDS = 50
+
+    def __init__(self):
+        self._pendentes: dict = {}  # api_key → {video_id: Future}
+        self._timers: dict = {}
+
+    async def buscar(self, ids: list, api_key: str) -> dict:
+        apertada = _quota_apertada()
+        resultado, esperando = {}, {}
+        for vid in dict.fromkeys(ids):
+            det = _details_cache.get(vid, aceitar_vencido=apertada)
+            if det is not None:
+                resultado[vid] = det
+            else:
+                esperando[vid] = self._pedir(vid, api_key)
+        if esperando:
+            valores = await asyncio.gather(*esperando.values())
+            resultado.update({vid: det for vid, det in zip(esperando, valores) if det is not None})
+        return resultado
 
-        for i in range(0, len(vids), 50):
-            batch = vids[i:i + 50]
-            r2 = await client.get(
-                "https://www.googleapis.com/youtube/v3/videos",
-                params={"part": "contentDetails,statistics", "id": ",".join(batch), "key": api_key},
+    def _pedir(self, vid: str, api_key: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        pendentes = self._pendentes.setdefault(api_key, {})
+        fut = pendentes.get(vid)
+        if fut is None:
+            fut = pendentes[vid] = loop.create_future()
+        if len(pendentes) >= self.LIMITE_IDS:
+            self._disparar(api_key)
+        elif api_key not in self._timers:
+            self._timers[api_key] = loop.call_later(YT_DETAILS_BATCH_MS / 1000, self._disparar, api_key)
+        return fut
+
+    def _disparar(self, api_key: str):
+        timer = self._timers.pop(api_key, None)
+        if timer:
+            timer.cancel()
+        pendentes = self._pendentes.pop(api_key, {})
+        ids = list(pendentes)
+        for i in range(0, len(ids), self.LIMITE_IDS):
+            lote = {vid: pendentes[vid] for vid in ids[i:i + self.LIMITE_IDS]}
+            asyncio.ensure_future(self._enviar(lote, api_key))
+
+    async def _enviar(self, lote: dict, api_key: str):
+        dm = {}
+        try:
+            r2 = await get_http_client().get(
+                f"{_YT_API}/videos",
+                params={"part": "contentDetails,statistics", "id": ",".join(lote), "key": api_key},
+                timeout=15,
             )
+            _registrar_quota(detail_calls=1)
             if r2.status_code == 200:
                 for v in r2.json().get("items", []):
                     dm[v["id"]] = v
-            try:
-                db.register_quota_usage(search_calls=0, detail_calls=1)
-            except Exception as e:
-                logger.warning(f"Falha ao registrar quota usage (video details): {e}")
-
-        results = []
-        for it in all_items:
-            vid = it["snippet"]["resourceId"]["videoId"]
-            sn = it.get("snippet", {})
-            title = sn.get("title", "")
-            pub = sn.get("publishedAt", "")[:10]
-            yr = int(pub[:4]) if pub else 0
-            thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
-            det = dm.get(vid, {})
-            dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
-            defn = det.get("contentDetails", {}).get("definition", "sd")
-            views = int(det.get("statistics", {}).get("viewCount", 0))
-            artist, song = extract_artist_song(title)
-            results.append({
-                "video_id": vid,
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "title": title, "artist": artist, "song": song or title,
-                "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
-                "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
-                "thumbnail": thumb, "category": "Playlist",
-            })
-        return results
+                    _details_cache.set(v["id"], v)
+            else:
+                logger.warning(f"YT videos error {r2.status_code}: {r2.text[:200]}")
+        except Exception as e:
+            logger.warning(f"YT videos error: {e}")
+        finally:
+            for vid, fut in lote.items():
+                if not fut.done():
+                    fut.set_result(dm.get(vid))
+
+
+_lote_detalhes = _LoteDetalhes()
+
+
+async def yt_search(query: str, max_results: int = 25, api_key: str = "") -> list:
+    if not api_key:
+        return []
+    items = await _search_items(query, max_results, api_key)
+    if not items:
+        return []
+
+    vids = [it["id"]["videoId"] for it in items if "videoId" in it.get("id", {})]
+    if not vids:
+        return []
+
+    dm = await _lote_detalhes.buscar(vids, api_key)
+
+    results = []
+    for it in items:
+        vid = it["id"].get("videoId", "")
+        if not vid:
+            continue
+        sn = it.get("snippet", {})
+        title = sn.get("title", "")
+        pub = sn.get("publishedAt", "")[:10]
+        yr = int(pub[:4]) if pub else 0
+        thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
+        det = dm.get(vid, {})
+        dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
+        defn = det.get("contentDetails", {}).get("definition", "sd")
+        views = int(det.get("statistics", {}).get("viewCount", 0))
+        artist, song = extract_artist_song(title)
+        results.append({
+            "video_id": vid,
+            "url": f"https://www.youtube.com/watch?v={vid}",
+            "title": title, "artist": artist, "song": song or title,
+            "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
+            "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
+            "thumbnail": thumb, "category": "",
+        })
+    return results
+
+
+async def yt_playlist(playlist_id: str, max_results: int = 50, api_key: str = "") -> list:
+    if not api_key:
+        return []
+
+    all_items = []
+    next_page_token = None
+
+    client = get_http_client()
+    while True:
+        params = {
+            "part": "snippet",
+            "playlistId": playlist_id,
+            "maxResults": 50,
+            "key": api_key,
+        }
+        if next_page_token:
+            params["pageToken"] = next_page_token
+
+        r1 = await client.get(f"{_YT_API}/playlistItems", params=params)
+        if r1.status_code != 200:
+            logger.warning(f"YT playlist error {r1.status_code}: {r1.text[:200]}")
+            break
+
+        data = r1.json()
+        items = data.get("items", [])
+        all_items.extend(items)
+        _registrar_quota(detail_calls=1)
+
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token:
+            break
+
+    if not all_items:
+        return []
+
+    # Detalhes em lotes de 50 (compartilhados com buscas simultâneas e cacheados)
+    vids = [it["snippet"]["resourceId"]["videoId"] for it in all_items]
+    dm = await _lote_detalhes.buscar(vids, api_key)
+
+    results = []
+    for it in all_items:
+        vid = it["snippet"]["resourceId"]["videoId"]
+        sn = it.get("snippet", {})
+        title = sn.get("title", "")
+        pub = sn.get("publishedAt", "")[:10]
+        yr = int(pub[:4]) if pub else 0
+        thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
+        det = dm.get(vid, {})
+        dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
+        defn = det.get("contentDetails", {}).get("definition", "sd")
+        views = int(det.get("statistics", {}).get("viewCount", 0))
+        artist, song = extract_artist_song(title)
+        results.append({
+            "video_id": vid,
+            "url": f"https://www.youtube.com/watch?v={vid}",
+            "title": title, "artist": artist, "song": song or title,
+            "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
+            "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
+            "thumbnail": thumb, "category": "Playlist",
+        })
+    return results
@@ -19,6 +19,14 @@ import logging as _logging
 _cfg_logger = _logging.getLogger("app.config")
 if not GEMINI_API_KEY:
     _cfg_logger.warning("GEMINI_API_KEY not configured — Gemini calls will fail")
+# Áudio de análise (proxy para o Gemini): mono, taxa baixa, Opus de bitrate baixo,
+# silêncio inicial/final aparado (offset gravado para remapear os timestamps)
+AUDIO_ANALISE_ATIVO = os.getenv("AUDIO_ANALISE_ATIVO", "true").lower() == "true"
+AUDIO_ANALISE_SAMPLE_RATE = int(os.getenv("AUDIO_ANALISE_SAMPLE_RATE", "16000"))
+AUDIO_ANALISE_BITRATE = os.getenv("AUDIO_ANALISE_BITRATE", "32k")
+AUDIO_ANALISE_APARAR_SILENCIO = os.getenv("AUDIO_ANALISE_APARAR_SILENCIO", "true").lower() == "true"
+# Handle de upload do Gemini deixa de ser reusado este tanto antes de expirar (48h)
+GEMINI_FILE_REUSE_MARGIN_SEC = int(os.getenv("GEMINI_FILE_REUSE_MARGIN_SEC", "3600"))
 GOOGLE_TRANSLATE_API_KEY = os.getenv("GOOGLE_TRANSLATE_API_KEY", "")
 STORAGE_PATH = os.getenv("STORAGE_PATH", "/tmp/editor_storage")
 MAX_VIDEO_SIZE_MB = int(os.getenv("MAX_VIDEO_SIZE_MB", "500"))
@@ -43,3 +51,23 @@ SENTRY_ORG_URL = os.getenv("SENTRY_ORG_URL", "https://sentry.io")
 COBALT_API_URL = os.getenv("COBALT_API_URL", "https://api.cobalt.tools")
 COBALT_API_KEY = os.getenv("COBALT_API_KEY", "")
 JWT_EXPIRY_HOURS = int(os.getenv("JWT_EXPIRY_HOURS", "24"))
+
+# Render paralelo por idioma: 0 = automático (metade dos núcleos, mínimo 1)
+RENDER_MAX_CONCURRENCY = int(os.getenv("RENDER_MAX_CONCURRENCY", "0"))
+# Orçamento de disco: nunca iniciar um render que deixe menos que isso livre
+RENDER_MIN_FREE_DISK_MB = int(os.getenv("RENDER_MIN_FREE_DISK_MB", "200"))
+# Estimativa do tamanho final por segundo de vídeo (libx264 crf 18, 1080x1920)
+RENDER_MB_POR_SEGUNDO = float(os.getenv("RENDER_MB_POR_SEGUNDO", "1.5"))
+# Render em duas etapas: fundo (crop/scale/pad) codificado uma vez num mezanino,
+# depois só as legendas ASS (+logo) por idioma
+RENDER_DUAS_ETAPAS = os.getenv("RENDER_DUAS_ETAPAS", "true").lower() == "true"
+RENDER_MEZANINO_CRF = int(os.getenv("RENDER_MEZANINO_CRF", "10"))
+RENDER_MEZANINO_MB_POR_SEGUNDO = float(os.getenv("RENDER_MEZANINO_MB_POR_SEGUNDO", "5"))
+# Worker: slots simultâneos por faixa (cpu = render/corte, rede = download/Gemini/tradução, io = pacote)
+WORKER_CONCURRENCY_CPU = int(os.getenv("WORKER_CONCURRENCY_CPU", "2"))
+WORKER_CONCURRENCY_REDE = int(os.getenv("WORKER_CONCURRENCY_REDE", "3"))
+WORKER_CONCURRENCY_IO = int(os.getenv("WORKER_CONCURRENCY_IO", "2"))
+# Fila persistente (editor_jobs): lease do job reivindicado, polling entre containers
+JOB_LEASE_SEC = int(os.getenv("JOB_LEASE_SEC", "120"))
+JOB_POLL_SEC = float(os.getenv("JOB_POLL_SEC", "2"))
+JOB_MAX_TENTATIVAS = int(os.getenv("JOB_MAX_TENTATIVAS", "3"))
@@ -1208,6 +1208,11 @@ def _run_migrations():
         """))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_editor_usuarios_email ON editor_usuarios (email)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_editor_edicoes_status ON editor_edicoes (status)"))
+        # Fila editor_jobs: no máximo um job executando por edição (claim entre containers)
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_editor_jobs_edicao_executando "
+            "ON editor_jobs (edicao_id) WHERE status = 'executando'"
+        ))
         conn.execute(text("ALTER TABLE editor_usuarios ADD COLUMN IF NOT EXISTS must_change_password BOOLEAN DEFAULT FALSE"))
         logger.info("Migration: tabela editor_usuarios garantida")
 
@@ -1380,7 +1385,7 @@ async def lifespan(app: FastAPI):
     _run_migrations()
     # Criar diretório de storage
     Path(STORAGE_PATH).mkdir(parents=True, exist_ok=True)
-    # Iniciar worker sequencial e reagendar tasks travadas
+    # Iniciar worker (faixas cpu/rede/io) e reagendar tasks travadas
     from app.worker import worker_loop, requeue_stale_tasks
     worker_task = asyncio.create_task(worker_loop())
     requeue_stale_tasks()
@@ -8,8 +8,9 @@ from app.models.alinhamento import Alinhamento
 from app.models.traducao_letra import TraducaoLetra
 from app.models.render import Render
 from app.models.report import Report
+from app.models.job import Job
 
 __all__ = [
     "Perfil", "Edicao", "Letra", "Overlay", "Post", "Seo",
-    "Alinhamento", "TraducaoLetra", "Render", "Report",
+    "Alinhamento", "TraducaoLetra", "Render", "Report", "Job",
 ]
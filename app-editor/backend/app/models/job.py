@@ -0,0 +1,36 @@
+"""Modelo: editor_jobs — fila persistente do worker (sobrevive a restart/deploy)."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index, func, text
+
+from app.database import Base
+
+
+# No máximo UM job executando por edição, garantido pelo banco: dois containers
+# podem reivindicar jobs diferentes da mesma edição no mesmo instante (SKIP
+# LOCKED não enxerga o claim ainda não commitado do outro) — o segundo commit
+# falha aqui e o worker passa para o próximo candidato.
+_SO_EXECUTANDO = text("status = 'executando'")
+
+
+class Job(Base):
+    __tablename__ = "editor_jobs"
+    __table_args__ = (
+        Index(
+            "uq_editor_jobs_edicao_executando", "edicao_id", unique=True,
+            postgresql_where=_SO_EXECUTANDO, sqlite_where=_SO_EXECUTANDO,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    edicao_id = Column(Integer, ForeignKey("editor_edicoes.id", ondelete="CASCADE"), nullable=False, index=True)
+    tipo = Column(String(30), nullable=False)  # "render", "download", "pacote", ...
+    lane = Column(String(10), nullable=False, index=True)  # "cpu", "rede", "io"
+    params = Column(JSON, default=dict)  # kwargs da task (JSON-serializáveis)
+    status = Column(String(20), default="pendente", index=True)  # "pendente", "executando", "concluido", "erro"
+    status_edicao = Column(String(30), nullable=True)  # status da edição no enqueue (restaurado ao retomar)
+    tentativas = Column(Integer, default=0)
+    lease_owner = Column(String(100), nullable=True)  # "{hostname}:{uuid}" do worker que reivindicou
+    lease_expira = Column(DateTime, nullable=True)
+    erro_msg = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
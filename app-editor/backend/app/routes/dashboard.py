@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 from app.config import SENTRY_ORG_URL
 from app.database import get_db
 from app.models import Edicao, Render
-from app.worker import is_worker_busy, task_queue
+from app.worker import is_worker_busy, queue_size
 
 router = APIRouter(prefix="/api/v1/editor", tags=["dashboard"])
 
@@ -47,9 +47,11 @@ def dashboard_visao_geral(perfil_id: Optional[int] = None, db: Session = Depends
 
     try:
         info = is_worker_busy()
-        worker_status = "ocupado" if info.get("ocupado") else "ocioso"
-        if info.get("etapa"):
-            worker_status += f" — {info['etapa']}"
+        slots = info.get("slots") or []
+        worker_status = "ocupado" if slots else "ocioso"
+        etapas = sorted({s["etapa"] for s in slots if s.get("etapa")})
+        if etapas:
+            worker_status += f" — {', '.join(etapas)}"
     except Exception:
         worker_status = "desconhecido"
 
@@ -202,12 +204,15 @@ def dashboard_saude(perfil_id: Optional[int] = None, db: Session = Depends(get_d
     worker_progresso = 0
     try:
         info = is_worker_busy()
-        if info.get("ocupado"):
+        slots = info.get("slots") or []
+        if slots:
             worker_status = "processando"
-            prog = info.get("progresso") or {}
+            prog = slots[0].get("progresso") or {}
             if isinstance(prog, dict):
-                total = prog.get("total", 0)
-                concluidos = prog.get("concluidos", 0)
+                # Novo formato: {"render": {...}} / {"traducao": {...}}
+                inner = next((v for v in prog.values() if isinstance(v, dict) and "total" in v), prog)
+                total = inner.get("total", 0)
+                concluidos = inner.get("concluidos", 0)
                 worker_progresso = round(concluidos / total * 100) if total > 0 else 0
         else:
             worker_status = "ocioso"
@@ -216,13 +221,18 @@ def dashboard_saude(perfil_id: Optional[int] = None, db: Session = Depends(get_d
 
     # R2
     r2_ok = True
+    cache_r2 = None
     try:
-        from shared.storage_service import StorageService
+        from shared.storage_service import StorageService, storage
         s = StorageService()
         s.list_files(prefix="")
+        cache_r2 = storage.cache_stats()
     except Exception:
         r2_ok = False
 
+    from app.services.gemini import arquivos_stats
+    uploads_gemini = arquivos_stats()
+
     # Semáforo
     if not banco_ok:
         semaforo = "vermelho"
@@ -233,7 +243,7 @@ def dashboard_saude(perfil_id: Optional[int] = None, db: Session = Depends(get_d
 
     # Fila
     try:
-        fila_quantidade = task_queue.qsize()
+        fila_quantidade = queue_size()
     except Exception:
         fila_quantidade = 0
 
@@ -279,5 +289,7 @@ def dashboard_saude(perfil_id: Optional[int] = None, db: Session = Depends(get_d
             "proxima_task": proxima_task,
         },
         "ultimo_erro": ultimo_erro,
+        "cache_r2": cache_r2,
+        "uploads_gemini": uploads_gemini,
         "sentry_url": SENTRY_ORG_URL,
     }
@@ -289,7 +289,7 @@ async def importar_do_redator(
     auto_download = False
     if edicao.corte_original_inicio and edicao.corte_original_fim:
         from sqlalchemy import update as _sa_update
-        from app.worker import task_queue
+        from app.worker import enqueue
         from app.routes.pipeline import _download_task
 
         _res = db.execute(
@@ -299,7 +299,7 @@ async def importar_do_redator(
         )
         db.commit()
         if _res.rowcount:
-            task_queue.put_nowait((_download_task, edicao.id))
+            enqueue(_download_task, edicao.id)
             auto_download = True
             logger.info(f"[importar] Auto-download enfileirado edicao_id={edicao.id}")
 
@@ -1,11 +1,12 @@
 """Rotas do pipeline de edição (passos 1-9)."""
 import asyncio
 import logging
+from contextlib import ExitStack
 from datetime import datetime, timezone, timedelta
 from pathlib import Path as FilePath
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import update
 from sqlalchemy.orm import Session
@@ -16,13 +17,13 @@ logger = logging.getLogger(__name__)
 from app.models import Edicao, Overlay, Alinhamento, TraducaoLetra, Render
 from app.models.perfil import Perfil
 from app.schemas import AlinhamentoOut, AlinhamentoValidar, LetraAprovar
-from app.services.ffmpeg_service import extrair_audio_completo, cortar_na_janela_overlay
+from app.services.ffmpeg_service import extrair_audio_completo, cortar_na_janela_overlay, obter_audio_analise
 from app.services.gemini import buscar_letra as gemini_buscar_letra
 from app.services.regua import extrair_janela_do_overlay, reindexar_timestamps, recortar_lyrics_na_janela, normalizar_segmentos
 import os
 import shutil
 from app.config import STORAGE_PATH, IDIOMAS_ALVO, EXPORT_PATH, REDATOR_API_URL, CURADORIA_API_URL, COBALT_API_URL, COBALT_API_KEY
-from shared.storage_service import storage, lang_prefix, check_conflict, save_youtube_marker
+from shared.storage_service import storage, async_storage, lang_prefix, check_conflict, save_youtube_marker
 
 router = APIRouter(prefix="/api/v1/editor", tags=["pipeline"])
 
@@ -233,14 +234,14 @@ async def _auto_corte_task(edicao_id: int):
 # --- Passo 1: Garantir vídeo ---
 @router.post("/edicoes/{edicao_id}/garantir-video")
 async def garantir_video(edicao_id: int, db: Session = Depends(get_db)):
-    from app.worker import task_queue
+    from app.worker import enqueue, queue_size
 
     edicao = db.get(Edicao, edicao_id)
     if not edicao:
         raise HTTPException(404, "Edição não encontrada")
 
     # Idempotência: se já tem vídeo no R2, não baixar de novo
-    if edicao.arquivo_video_completo and storage.exists(edicao.arquivo_video_completo):
+    if edicao.arquivo_video_completo and await async_storage.exists(edicao.arquivo_video_completo):
         return {"status": "já disponível", "arquivo": edicao.arquivo_video_completo}
 
     # Check-and-set atômico: só aceitar se status permite
@@ -255,8 +256,8 @@ async def garantir_video(edicao_id: int, db: Session = Depends(get_db)):
         db.refresh(edicao)
         raise HTTPException(409, f"Status atual '{edicao.status}' não permite iniciar download")
 
-    logger.info(f"[download] Enfileirando edicao_id={edicao_id} queue={task_queue.qsize()}")
-    task_queue.put_nowait((_download_task, edicao_id))
+    logger.info(f"[download] Enfileirando edicao_id={edicao_id} queue={queue_size()}")
+    enqueue(_download_task, edicao_id)
     return {"status": "download enfileirado"}
 
 
@@ -280,7 +281,7 @@ async def upload_video(edicao_id: int, file: UploadFile = File(...), db: Session
     base = check_conflict(edicao.artista, edicao.musica, edicao.youtube_video_id or "", r2_prefix=prefix)
     full_base = f"{prefix}/{base}" if prefix else base
     r2_key = f"{full_base}/video/original.mp4"
-    storage.upload_file(local_path, r2_key)
+    await async_storage.upload_file(local_path, r2_key)
 
     # Log resolução do vídeo baixado para diagnóstico de qualidade
     try:
@@ -299,8 +300,8 @@ async def upload_video(edicao_id: int, file: UploadFile = File(...), db: Session
     db.commit()
 
     if _needs_corte:
-        from app.worker import task_queue
-        task_queue.put_nowait((_auto_corte_task, edicao_id))
+        from app.worker import enqueue
+        enqueue(_auto_corte_task, edicao_id)
         logger.info(f"[upload-video] Auto-corte enfileirado edicao_id={edicao_id}")
 
     return {"status": "ok", "arquivo": r2_key}
@@ -332,7 +333,7 @@ async def upload_render_manual(edicao_id: int, idioma: str, file: UploadFile = F
     base = edicao.r2_base or check_conflict(edicao.artista, edicao.musica, edicao.youtube_video_id or "", r2_prefix=prefix)
     full_base = f"{prefix}/{base}" if prefix else base
     r2_key = f"{full_base}/renders/{idioma}/render_manual.mp4"
-    storage.upload_file(local_path, r2_key)
+    await async_storage.upload_file(local_path, r2_key)
 
     # Upsert no editor_renders
     existing = db.query(Render).filter(
@@ -397,13 +398,13 @@ async def _download_task(edicao_id: int):
                 return
 
             # Idempotência: se já tem vídeo no R2, não baixar de novo
-            if edicao.arquivo_video_completo and storage.exists(edicao.arquivo_video_completo):
+            if edicao.arquivo_video_completo and await async_storage.exists(edicao.arquivo_video_completo):
                 logger.info(f"[{edicao_id}] Vídeo já existe no R2 ({edicao.arquivo_video_completo}), pulando download")
                 _needs_corte = _set_post_download_state(edicao)
                 db.commit()
                 if _needs_corte:
-                    from app.worker import task_queue
-                    task_queue.put_nowait((_auto_corte_task, edicao_id))
+                    from app.worker import enqueue
+                    enqueue(_auto_corte_task, edicao_id)
                 return
 
             # Check local file (fast filesystem I/O, ok dentro da sessão)
@@ -441,7 +442,7 @@ async def _download_task(edicao_id: int):
                     }
                     db.commit()
 
-            storage.upload_file(video_local, r2_key)
+            await async_storage.upload_file(video_local, r2_key)
             if youtube_video_id:
                 _save_youtube_marker(base, youtube_video_id, r2_prefix=_prefix)
 
@@ -458,8 +459,8 @@ async def _download_task(edicao_id: int):
                     db.commit()
 
             if _needs_corte:
-                from app.worker import task_queue
-                task_queue.put_nowait((_auto_corte_task, edicao_id))
+                from app.worker import enqueue
+                enqueue(_auto_corte_task, edicao_id)
 
             logger.info(f"[{edicao_id}] Download concluído via local: {r2_key}")
             return
@@ -479,7 +480,7 @@ async def _download_task(edicao_id: int):
                 }
                 db.commit()
 
-        if storage.exists(r2_key):
+        if await async_storage.exists(r2_key):
             # Vídeo já está no R2 (provavelmente upload da curadoria)
             if youtube_video_id:
                 _save_youtube_marker(base, youtube_video_id, r2_prefix=_prefix)
@@ -496,8 +497,8 @@ async def _download_task(edicao_id: int):
                     db.commit()
 
             if _needs_corte:
-                from app.worker import task_queue
-                task_queue.put_nowait((_auto_corte_task, edicao_id))
+                from app.worker import enqueue
+                enqueue(_auto_corte_task, edicao_id)
 
             logger.info(f"[{edicao_id}] Vídeo encontrado no R2 (curadoria): {r2_key}")
             return
@@ -539,8 +540,8 @@ async def _download_task(edicao_id: int):
                             db.commit()
 
                     if _needs_corte:
-                        from app.worker import task_queue
-                        task_queue.put_nowait((_auto_corte_task, edicao_id))
+                        from app.worker import enqueue
+                        enqueue(_auto_corte_task, edicao_id)
 
                     logger.info(f"[{edicao_id}] Vídeo baixado via curadoria: {cur_r2_key}")
                     return
@@ -569,7 +570,7 @@ async def _download_task(edicao_id: int):
                 base2 = _check_conflict(artista, musica, youtube_video_id, r2_prefix=_prefix)
                 full_base2 = f"{_prefix}/{base2}" if _prefix else base2
                 r2_key2 = f"{full_base2}/video/original.mp4"
-                storage.upload_file(cobalt_local, r2_key2)
+                await async_storage.upload_file(cobalt_local, r2_key2)
                 if youtube_video_id:
                     _save_youtube_marker(base2, youtube_video_id, r2_prefix=_prefix)
                 try:
@@ -589,8 +590,8 @@ async def _download_task(edicao_id: int):
                         db.commit()
 
                 if _needs_corte:
-                    from app.worker import task_queue
-                    task_queue.put_nowait((_auto_corte_task, edicao_id))
+                    from app.worker import enqueue
+                    enqueue(_auto_corte_task, edicao_id)
 
                 logger.info(f"[{edicao_id}] Download concluído via cobalt: {r2_key2}")
                 return
@@ -615,7 +616,7 @@ async def _download_task(edicao_id: int):
                 base3 = _check_conflict(artista, musica, youtube_video_id, r2_prefix=_prefix)
                 full_base3 = f"{_prefix}/{base3}" if _prefix else base3
                 r2_key3 = f"{full_base3}/video/original.mp4"
-                storage.upload_file(ytdlp_local, r2_key3)
+                await async_storage.upload_file(ytdlp_local, r2_key3)
                 if youtube_video_id:
                     _save_youtube_marker(base3, youtube_video_id, r2_prefix=_prefix)
                 try:
@@ -635,8 +636,8 @@ async def _download_task(edicao_id: int):
                         db.commit()
 
                 if _needs_corte:
-                    from app.worker import task_queue
-                    task_queue.put_nowait((_auto_corte_task, edicao_id))
+                    from app.worker import enqueue
+                    enqueue(_auto_corte_task, edicao_id)
 
                 logger.info(f"[{edicao_id}] Download concluído via yt-dlp: {r2_key3}")
                 return
@@ -772,7 +773,7 @@ _STATUS_PERMITIDOS_TRANSCRICAO = {"letra", "transcricao", "alinhamento", "erro"}
 # --- Passo 3: Transcrição ---
 @router.post("/edicoes/{edicao_id}/transcricao")
 async def iniciar_transcricao(edicao_id: int, db: Session = Depends(get_db)):
-    from app.worker import task_queue
+    from app.worker import enqueue, queue_size
 
     edicao = db.get(Edicao, edicao_id)
     if not edicao:
@@ -784,14 +785,14 @@ async def iniciar_transcricao(edicao_id: int, db: Session = Depends(get_db)):
         )
 
     # Verificar se vídeo existe no R2
-    if not storage.exists(edicao.arquivo_video_completo):
+    if not await async_storage.exists(edicao.arquivo_video_completo):
         raise HTTPException(
             409,
             "Vídeo não encontrado no R2. Faça upload manual ou verifique se a curadoria já processou este vídeo.",
         )
 
     # Extrair áudio se necessário
-    if not edicao.arquivo_audio_completo or not storage.exists(edicao.arquivo_audio_completo):
+    if not edicao.arquivo_audio_completo or not await async_storage.exists(edicao.arquivo_audio_completo):
         audio_key = await extrair_audio_completo(
             edicao.arquivo_video_completo, edicao_id, STORAGE_PATH,
             r2_base=_get_r2_base(edicao),
@@ -811,8 +812,8 @@ async def iniciar_transcricao(edicao_id: int, db: Session = Depends(get_db)):
         db.refresh(edicao)
         raise HTTPException(409, f"Status atual '{edicao.status}' não permite iniciar transcrição")
 
-    logger.info(f"[transcricao] Enfileirando edicao_id={edicao_id} queue={task_queue.qsize()}")
-    task_queue.put_nowait((_transcricao_task, edicao_id))
+    logger.info(f"[transcricao] Enfileirando edicao_id={edicao_id} queue={queue_size()}")
+    enqueue(_transcricao_task, edicao_id)
     return {"status": "transcrição enfileirada"}
 
 
@@ -826,14 +827,18 @@ async def _transcricao_task(edicao_id: int):
             mapear_estrutura_audio as _mapear_estrutura_audio,
             completar_transcricao as _completar_transcricao,
             _detect_mime_type as _detect_mime,
-            _get_client as _get_gemini_client,
+            obter_arquivo_audio as _obter_arquivo_audio,
             SafetyFilterError,
         )
         from app.services.alinhamento import (
             alinhar_letra_com_timestamps as _alinhar_letra,
             merge_transcricoes as _merge_transcricoes,
         )
-        from app.services.regua import normalizar_segmentos as _normalizar_segmentos
+        from app.services.regua import (
+            normalizar_segmentos as _normalizar_segmentos,
+            deslocar_timestamps as _deslocar_timestamps,
+            reindexar_timestamps as _reindexar_timestamps,
+        )
 
         async def _retry_on_safety(fn):
             """Retry on SafetyFilterError up to 3 times with heartbeat."""
@@ -891,8 +896,8 @@ async def _transcricao_task(edicao_id: int):
             db.commit()
 
         # PASSO B — Garantir áudio (banco FECHADO durante I/O)
-        if not arquivo_audio or not storage.exists(arquivo_audio):
-            if arquivo_video and storage.exists(arquivo_video):
+        if not arquivo_audio or not await async_storage.exists(arquivo_audio):
+            if arquivo_video and await async_storage.exists(arquivo_video):
                 arquivo_audio = await extrair_audio_completo(
                     arquivo_video, edicao_id, STORAGE_PATH, r2_base=r2_base,
                 )
@@ -910,8 +915,12 @@ async def _transcricao_task(edicao_id: int):
                         db.commit()
                 return
 
-        # Garantir áudio local para envio ao Gemini
-        audio_local = storage.ensure_local(arquivo_audio)
+        # Garantir áudio local e o proxy de análise (mono/taxa baixa, silêncio
+        # aparado) que vai ao Gemini; offset_analise devolve os timestamps ao original
+        audio_local = await async_storage.ensure_local(arquivo_audio)
+        audio_gemini, offset_analise = await obter_audio_analise(
+            arquivo_audio, audio_local, edicao_id, STORAGE_PATH,
+        )
 
         # Buscar letra (sessão curta)
         with SessionLocal() as db:
@@ -949,30 +958,17 @@ async def _transcricao_task(edicao_id: int):
 
         # Passo 1: MAPEAMENTO ESTRUTURAL (banco FECHADO)
         logger.info(f"[{edicao_id}] Passo 1: Mapeamento estrutural do áudio...")
-        genai = _get_gemini_client()
-        mime_type = _detect_mime(audio_local)
-        loop = asyncio.get_running_loop()
-        for _upload_attempt in range(3):
-            try:
-                audio_file_ref = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None, lambda: genai.upload_file(audio_local, mime_type=mime_type)
-                    ),
-                    timeout=120,
-                )
-                break
-            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
-                logger.warning(f"[{edicao_id}] upload_file tentativa {_upload_attempt+1}/3: {type(e).__name__}: {e}")
-                if _upload_attempt == 2:
-                    raise
-                await asyncio.sleep(5)
+        # Um upload por conteúdo de áudio: reaproveitado pelos passes abaixo,
+        # pelos retries de safety e por re-transcrições (Desbloquear)
+        audio_file_ref = await _obter_arquivo_audio(audio_gemini, _detect_mime(audio_gemini))
 
         melhor_cega = None
         melhor_n_cega = 0
         for tentativa in range(1, 3):
             segmentos_cegos = await _retry_on_safety(
                 lambda: _mapear_estrutura_audio(
-                    audio_file_ref, idioma, metadados, letra_texto
+                    audio_file_ref, idioma, metadados, letra_texto,
+                    audio_path=audio_gemini,
                 )
             )
             n = len(segmentos_cegos)
@@ -983,7 +979,7 @@ async def _transcricao_task(edicao_id: int):
             if n >= versos_esperados * 0.8:
                 break
 
-        segmentos_cegos = _normalizar_segmentos(melhor_cega or [])
+        segmentos_cegos = _normalizar_segmentos(_deslocar_timestamps(melhor_cega or [], offset_analise))
         logger.info(f"[{edicao_id}] Cega final: {len(segmentos_cegos)} segmentos")
 
         # Heartbeat antes da guiada (sessão curta)
@@ -1003,10 +999,11 @@ async def _transcricao_task(edicao_id: int):
         try:
             segmentos_guiados = await _retry_on_safety(
                 lambda: _transcrever_guiado_completo(
-                    audio_local, letra_texto, idioma, metadados,
+                    audio_gemini, letra_texto, idioma, metadados,
+                    audio_file_ref=audio_file_ref,
                 )
             )
-            segmentos_guiados = _normalizar_segmentos(segmentos_guiados)
+            segmentos_guiados = _normalizar_segmentos(_deslocar_timestamps(segmentos_guiados, offset_analise))
             logger.info(f"[{edicao_id}] Guiada: {len(segmentos_guiados)} segmentos")
         except Exception as e_guiada:
             guiada_falhou = True
@@ -1089,13 +1086,18 @@ async def _transcricao_task(edicao_id: int):
             try:
                 segmentos_completados = await _retry_on_safety(
                     lambda: _completar_transcricao(
-                        audio_local, letra_texto,
-                        resultado["segmentos"], idioma, metadados,
+                        audio_gemini, letra_texto,
+                        # parcial no tempo do áudio de análise
+                        _reindexar_timestamps(resultado["segmentos"], offset_analise),
+                        idioma, metadados,
+                        audio_file_ref=audio_file_ref,
                     )
                 )
                 if len(segmentos_completados) > n_resultado:
                     logger.info(f"[{edicao_id}] Completação: {n_resultado} → {len(segmentos_completados)}")
-                    segmentos_completados = _normalizar_segmentos(segmentos_completados)
+                    segmentos_completados = _normalizar_segmentos(
+                        _deslocar_timestamps(segmentos_completados, offset_analise)
+                    )
                     resultado_completado = _alinhar_letra(letra_texto, segmentos_completados)
                     if resultado_completado["confianca_media"] >= resultado["confianca_media"]:
                         resultado = resultado_completado
@@ -1305,11 +1307,11 @@ async def _aplicar_corte_impl(edicao_id: int, body: CorteParams, db: Session):
         # Modo vídeo inteiro: não precisa de overlays para definir janela.
         # Usa duração total do vídeo (campo no model ou probe via ffprobe).
         video_key = edicao.arquivo_video_completo
-        if not video_key or not storage.exists(video_key):
+        if not video_key or not await async_storage.exists(video_key):
             raise HTTPException(409, "Vídeo não encontrado no R2. Faça upload primeiro.")
         dur = edicao.duracao_total_sec
         if not dur:
-            local_video = storage.ensure_local(video_key)
+            local_video = await async_storage.ensure_local(video_key)
             from app.services.ffmpeg_service import probar_duracao
             dur = await probar_duracao(local_video)
             edicao.duracao_total_sec = dur
@@ -1374,13 +1376,13 @@ async def _aplicar_corte_impl(edicao_id: int, body: CorteParams, db: Session):
     # Cortar vídeo — usar R2 storage (ensure_local garante disponibilidade)
     r2_base = _get_r2_base(edicao)
     video_key = edicao.arquivo_video_completo
-    if not video_key or not storage.exists(video_key):
+    if not video_key or not await async_storage.exists(video_key):
         raise HTTPException(
             409,
             "Vídeo não encontrado no R2. Faça upload manual ou verifique se a curadoria já processou este vídeo.",
         )
 
-    if video_key and storage.exists(video_key):
+    if video_key and await async_storage.exists(video_key):
         resultado = await cortar_na_janela_overlay(
             video_key,
             janela["janela_inicio_sec"],
@@ -1456,10 +1458,10 @@ async def _aplicar_corte_impl(edicao_id: int, body: CorteParams, db: Session):
 
     # Enfileirar tradução automática no worker (evita deadlock silencioso).
     # Se o enqueue falhar, reverter status para evitar deadlock.
-    from app.worker import task_queue
+    from app.worker import enqueue, queue_size
     try:
-        task_queue.put_nowait((_traducao_task, edicao_id))
-        logger.info(f"[aplicar_corte] Tradução enfileirada edicao_id={edicao_id} queue={task_queue.qsize()}")
+        enqueue(_traducao_task, edicao_id)
+        logger.info(f"[aplicar_corte] Tradução enfileirada edicao_id={edicao_id} queue={queue_size()}")
     except Exception as enqueue_err:
         logger.error(f"[aplicar_corte] Falha ao enfileirar tradução edicao_id={edicao_id}: {enqueue_err}")
         edicao.status = "erro"
@@ -1719,7 +1721,7 @@ _STATUS_PERMITIDOS_PREVIEW = {"montagem", "revisao", "erro"}
 @router.post("/edicoes/{edicao_id}/renderizar")
 async def renderizar(edicao_id: int, sem_legendas: bool = False):
     from app.database import SessionLocal
-    from app.worker import task_queue, enqueue_safe
+    from app.worker import enqueue_safe
 
     with SessionLocal() as db:
         edicao = db.get(Edicao, edicao_id)
@@ -1738,16 +1740,52 @@ async def renderizar(edicao_id: int, sem_legendas: bool = False):
             raise HTTPException(409, f"Status atual '{edicao.status}' não permite iniciar renderização")
 
     if sem_legendas:
-        _sem = True
-        async def _render_sem_legendas(_eid: int):
-            await _render_task(_eid, sem_legendas=_sem)
-        enqueue_safe(_render_sem_legendas, edicao_id)
+        enqueue_safe(_render_task, edicao_id, sem_legendas=True)
     else:
         enqueue_safe(_render_task, edicao_id)
     return {"status": "renderização iniciada", "sem_legendas": sem_legendas}
 
 
+async def _gerar_mezanino_render(edicao_id: int, local_video: str, base_vf: str,
+                                 inicio_sec: float = None, fim_sec: float = None,
+                                 estimativa_mb: float = 100.0, liberar_disco=None,
+                                 ao_iniciar=None, timeout: float = 600) -> Optional[str]:
+    """Etapa 1 do render em duas etapas: fundo comum codificado uma vez.
+
+    Retorna o path do mezanino, ou None se falhar/estourar o timeout — nesse
+    caso o arquivo parcial é apagado e cada idioma renderiza direto do vídeo.
+    """
+    from app.config import RENDER_MEZANINO_CRF
+    from app.services.ffmpeg_service import gerar_mezanino
+    from app.services.render_pool import render_pool
+
+    mezanino_path = str(FilePath(STORAGE_PATH) / str(edicao_id) / "renders" / "mezanino.mkv")
+    FilePath(mezanino_path).parent.mkdir(parents=True, exist_ok=True)
+    try:
+        async with render_pool.reservar(estimativa_mb, liberar_disco=liberar_disco):
+            if ao_iniciar:
+                ao_iniciar()
+            # run_ffmpeg mata o processo no timeout: o fallback não concorre com um encode órfão
+            await asyncio.wait_for(
+                gerar_mezanino(
+                    local_video, mezanino_path, base_vf,
+                    inicio_sec=inicio_sec, fim_sec=fim_sec, crf=RENDER_MEZANINO_CRF,
+                ),
+                timeout=timeout,
+            )
+    except Exception as mez_err:
+        logger.warning(f"[{edicao_id}] Mezanino falhou ({str(mez_err)[:300]}) — render direto por idioma")
+        FilePath(mezanino_path).unlink(missing_ok=True)
+        return None
+    logger.info(
+        f"[{edicao_id}] Mezanino pronto ({FilePath(mezanino_path).stat().st_size / 1024 / 1024:.1f}MB) — "
+        f"renders por idioma aplicam só legendas/logo"
+    )
+    return mezanino_path
+
+
 async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_preview: bool = False, sem_legendas: bool = False):
+    _pins = ExitStack()  # keys do cache local que não podem ser despejadas durante a task
     try:
         from app.database import SessionLocal
         from app.services.legendas import (
@@ -1953,8 +1991,13 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
                         ))
                     db.commit()
 
-        # PASSO B — Loop de render (banco FECHADO durante FFmpeg)
+        # PASSO B — Renders concorrentes via pool (banco FECHADO durante FFmpeg)
+        from app.config import (
+            RENDER_MB_POR_SEGUNDO, RENDER_DUAS_ETAPAS, RENDER_MEZANINO_MB_POR_SEGUNDO,
+        )
+        from app.services.render_pool import render_pool
         renders_ok = 0
+        em_andamento: list = []
 
         # Limpeza preventiva de /tmp: remover *.mp4 e *.ass residuais de execuções anteriores
         import glob as _glob
@@ -1965,8 +2008,39 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
             except Exception:
                 pass
 
-        # Garantir que o vídeo está disponível localmente (baixa do R2 se necessário)
-        local_video = storage.ensure_local(arquivo_video)
+        def _limpeza_emergencia():
+            for _f in _glob.glob("/tmp/*.mp4") + _glob.glob("/tmp/*.ass"):
+                try:
+                    os.remove(_f)
+                except Exception:
+                    pass
+            # Cache local do R2: despejar tudo que nenhuma task está usando
+            _liberado = storage.trim_cache()
+            if _liberado:
+                logger.info(f"[{edicao_id}] Limpeza de emergência: {_liberado / 1024 / 1024:.0f}MB despejados do cache R2")
+
+        def _gravar_progresso():
+            """Heartbeat + progresso (sessão curta). 'atual' mantido por compatibilidade com o frontend."""
+            with SessionLocal() as db:
+                edicao = db.get(Edicao, edicao_id)
+                if edicao:
+                    edicao.task_heartbeat = datetime.now(timezone.utc)
+                    edicao.progresso_detalhe = {
+                        "render": {
+                            "etapa": "render",
+                            "total": total,
+                            "concluidos": concluidos,
+                            "atual": em_andamento[0] if em_andamento else None,
+                            "em_andamento": list(em_andamento),
+                            "erros": falhas,
+                        }
+                    }
+                    db.commit()
+
+        # Garantir que o vídeo está disponível localmente (baixa do R2 se necessário),
+        # pinado no cache até o fim da task
+        _pins.enter_context(storage.pinned(arquivo_video))
+        local_video = await async_storage.ensure_local(arquivo_video)
         if _usar_single_pass:
             logger.info(f"[{edicao_id}] Single-pass render: original + seek {_janela_inicio}-{_janela_fim}s")
         else:
@@ -1982,216 +2056,218 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
                 logger.warning(f"[{edicao_id}] Falha ao carregar fonte customizada ({font_file_r2_key_val}): {font_err} — usando fonte padrão")
                 font_file_r2_key_val = None
 
-        for idioma in faltantes:
-            # Heartbeat antes de cada render (sessão curta)
-            with SessionLocal() as db:
-                edicao = db.get(Edicao, edicao_id)
-                if edicao:
-                    edicao.task_heartbeat = datetime.now(timezone.utc)
-                    edicao.progresso_detalhe = {
-                        "render": {
-                            "etapa": "render",
-                            "total": total,
-                            "concluidos": concluidos,
-                            "atual": idioma,
-                            "erros": falhas,
-                        }
-                    }
-                    db.commit()
+        vw = video_width_val
+        vh = video_height_val
+
+        # Single-pass: input seeking (só quando usando vídeo original)
+        _seek = f'-ss {_janela_inicio} -to {_janela_fim} ' if _usar_single_pass else ''
+        _avoid_neg = '-avoid_negative_ts make_zero ' if _usar_single_pass else ''
+
+        # Crop lateral para vídeos widescreen (>4:3): brand doc exige imagem em 40-65% da tela
+        _crop = "crop=if(gt(iw/ih\\,4/3)\\,ih*4/3\\,iw):ih,"
+        _base_vf = f"{_crop}scale={vw}:{vh}:force_original_aspect_ratio=decrease,pad={vw}:{vh}:(ow-iw)/2:(oh-ih)/2:black"
+
+        # Logo/watermark: buscar do perfil se configurado
+        _logo_path = None
+        if logo_url_val:
+            from app.services.font_service import get_fontsdir as _get_fontsdir_logo
+            _fontsdir_logo = _get_fontsdir_logo()
+            _logo_candidate = _Path(_fontsdir_logo) / logo_url_val
+            if _logo_candidate.exists():
+                _logo_path = str(_logo_candidate)
+                logger.info(f"[{edicao_id}] Logo encontrada: {_logo_path}")
+            else:
+                logger.warning(f"[{edicao_id}] Logo não encontrada: {_logo_candidate}")
+
+        # Calcular posição real da imagem para marginv dinâmico (T5) — uma vez para todos os idiomas
+        # Usa dimensões pós-crop (effective width = min(src_w, src_h * 4/3))
+        _image_top_px = None
+        if not sem_legendas:
+            try:
+                from app.services.ffmpeg_service import probar_video as _probar_video, calcular_image_top as _calcular_image_top
+                _src_w, _src_h = await _probar_video(local_video)
+                _src_w_eff = min(_src_w, int(_src_h * 4 / 3))
+                _image_top_px = _calcular_image_top(_src_w_eff, _src_h, frame_w=vw, frame_h=vh)
+            except Exception:
+                logger.warning(f"[{edicao_id}] probar_video falhou — usando marginv do perfil como fallback")
+
+        # Orçamento de disco: estimativa do arquivo final de cada idioma
+        _estimativa_mb = max(50.0, (duracao_corte_ms / 1000) * RENDER_MB_POR_SEGUNDO)
+        _threads = render_pool.threads_por_processo()
+
+        # Etapa 1 (opcional): mezanino com o fundo comum — decode/crop/scale/pad uma única vez.
+        # A logo continua na etapa 2, por cima das legendas, como no render direto.
+        _entrada = local_video
+        _vf_fundo = _base_vf
+        _mezanino = None
+        if RENDER_DUAS_ETAPAS and len(faltantes) > 1:
+            _mezanino = await _gerar_mezanino_render(
+                edicao_id, local_video, _base_vf,
+                inicio_sec=_janela_inicio if _usar_single_pass else None,
+                fim_sec=_janela_fim if _usar_single_pass else None,
+                estimativa_mb=max(100.0, (duracao_corte_ms / 1000) * RENDER_MEZANINO_MB_POR_SEGUNDO),
+                liberar_disco=_limpeza_emergencia,
+                ao_iniciar=_gravar_progresso,
+            )
+            if _mezanino:
+                _entrada = _mezanino
+                _vf_fundo = ""
+                _seek = ""
+                _avoid_neg = ""
+        _vf_fundo_prefixo = f"{_vf_fundo}," if _vf_fundo else ""
+        _vf_fundo_somente = _vf_fundo or "null"
+        logger.info(
+            f"[{edicao_id}] Render pool: {render_pool.slots_para(len(faltantes))} slot(s) para "
+            f"{len(faltantes)} idioma(s), {_threads} thread(s)/processo, estimativa {_estimativa_mb:.0f}MB/render"
+        )
 
+        async def _renderizar_idioma(idioma: str):
+            nonlocal renders_ok, concluidos
             ass_path = None
             output_video = None
             try:
-                # Verificar espaço em disco antes do FFmpeg (threshold: 200MB)
-                _uso = shutil.disk_usage("/")
-                _livre_mb = _uso.free / (1024 * 1024)
-                if _livre_mb < 200:
-                    # Tentar limpar lixo antes de desistir
-                    for _f in _glob.glob("/tmp/*.mp4") + _glob.glob("/tmp/*.ass"):
-                        try:
-                            os.remove(_f)
-                        except Exception:
-                            pass
-                    _uso = shutil.disk_usage("/")
-                    _livre_mb = _uso.free / (1024 * 1024)
-                    if _livre_mb < 200:
-                        raise RuntimeError(f"Espaço em disco insuficiente: {_livre_mb:.0f}MB livre")
-                    logger.info(f"[{edicao_id}] Limpeza de emergência liberou disco: {_livre_mb:.0f}MB livre")
-
-                d = dados_idiomas[idioma]
-
-                nome_render = _nome_arquivo_render(artista_val, musica_val, idioma)
-
-                output_dir = _Path(STORAGE_PATH) / str(edicao_id) / "renders" / idioma
-                output_dir.mkdir(parents=True, exist_ok=True)
-                output_video = str(output_dir / nome_render)
-
-                vw = video_width_val
-                vh = video_height_val
-
-                # Single-pass: input seeking (só quando usando vídeo original)
-                _seek = f'-ss {_janela_inicio} -to {_janela_fim} ' if _usar_single_pass else ''
-                _avoid_neg = '-avoid_negative_ts make_zero ' if _usar_single_pass else ''
-
-                # Crop lateral para vídeos widescreen (>4:3): brand doc exige imagem em 40-65% da tela
-                _crop = "crop=if(gt(iw/ih\\,4/3)\\,ih*4/3\\,iw):ih,"
-                _base_vf = f"{_crop}scale={vw}:{vh}:force_original_aspect_ratio=decrease,pad={vw}:{vh}:(ow-iw)/2:(oh-ih)/2:black"
-
-                # Logo/watermark: buscar do perfil se configurado
-                _logo_path = None
-                if logo_url_val:
-                    from app.services.font_service import get_fontsdir as _get_fontsdir_logo
-                    _fontsdir_logo = _get_fontsdir_logo()
-                    _logo_candidate = _Path(_fontsdir_logo) / logo_url_val
-                    if _logo_candidate.exists():
-                        _logo_path = str(_logo_candidate)
-                        logger.info(f"[{edicao_id}] Logo encontrada: {_logo_path}")
-                    else:
-                        logger.warning(f"[{edicao_id}] Logo não encontrada: {_logo_candidate}")
-
-                if sem_legendas:
-                    # Sem legendas: só crop+escalar/pad (+logo se houver)
-                    if _logo_path:
-                        # Logo: 150px largura, posição fixa (870, 530) para 1080x1920
-                        _logo_w = 150
-                        _logo_x = 870
-                        _logo_y = 580
-                        cmd = (
-                            f'ffmpeg -y {_seek}-i "{local_video}" -i "{_logo_path}" '
-                            f'{_avoid_neg}'
-                            f'-filter_complex "[0:v]{_base_vf}[bg];'
-                            f'[1:v]scale={_logo_w}:-1[wm];'
-                            f'[bg][wm]overlay={_logo_x}:{_logo_y}" '
-                            f'-map 0:a -c:v libx264 -preset medium -crf 18 '
-                            f'-c:a aac -b:a 192k "{output_video}"'
-                        )
-                    else:
-                        cmd = (
-                            f'ffmpeg -y {_seek}-i "{local_video}" '
-                            f'{_avoid_neg}'
-                            f'-vf "{_base_vf}" '
-                            f'-c:v libx264 -preset medium -crf 18 '
-                            f'-c:a aac -b:a 192k "{output_video}"'
-                        )
-                else:
-                    # Calcular posição real da imagem para marginv dinâmico (T5)
-                    # Usa dimensões pós-crop (effective width = min(src_w, src_h * 4/3))
-                    _image_top_px = None
+                async with render_pool.reservar(_estimativa_mb, liberar_disco=_limpeza_emergencia):
+                    # Heartbeat ao iniciar cada idioma (sessão curta)
+                    em_andamento.append(idioma)
+                    _gravar_progresso()
                     try:
-                        from app.services.ffmpeg_service import probar_video as _probar_video, calcular_image_top as _calcular_image_top
-                        _src_w, _src_h = await _probar_video(local_video)
-                        _src_w_eff = min(_src_w, int(_src_h * 4 / 3))
-                        _image_top_px = _calcular_image_top(_src_w_eff, _src_h, frame_w=vw, frame_h=vh)
-                    except Exception:
-                        logger.warning(f"[{edicao_id}] probar_video falhou — usando marginv do perfil como fallback")
-
-                    # Gerar ASS (sync, rápido — banco já fechado)
-                    ass_obj = gerar_ass(
-                        overlay=d["overlay_segs"] or [],
-                        lyrics=lyrics_segs or [],
-                        traducao=d["traducao_segs"],
-                        idioma_versao=idioma,
-                        idioma_musica=idioma_musica,
-                        sem_lyrics=sem_lyrics_val,
-                        perfil=perfil_data,
-                        image_top_px=_image_top_px,
-                        duracao_video_ms=duracao_corte_ms,
-                    )
-
-                    ass_path = str(output_dir / f"legendas_{idioma}.ass")
-                    ass_obj.save(ass_path)
-
-                    # FFmpeg com timeout — banco FECHADO
-                    ass_escaped = ass_path.replace("\\", "/").replace(":", "\\:")
-                    from app.services.font_service import get_fontsdir as _get_fontsdir
-                    _fontsdir = _get_fontsdir()
-
-                    if _logo_path:
-                        # Com logo: 150px, posição fixa (870, 530)
-                        _logo_w = 150
-                        _logo_x = 870
-                        _logo_y = 580
-                        cmd = (
-                            f'ffmpeg -y {_seek}-i "{local_video}" -i "{_logo_path}" '
-                            f'{_avoid_neg}'
-                            f'-filter_complex "[0:v]{_base_vf},'
-                            f"ass='{ass_escaped}':fontsdir={_fontsdir}[bg];"
-                            f'[1:v]scale={_logo_w}:-1[wm];'
-                            f'[bg][wm]overlay={_logo_x}:{_logo_y}" '
-                            f'-map 0:a -c:v libx264 -preset medium -crf 18 '
-                            f'-c:a aac -b:a 192k "{output_video}"'
-                        )
-                    else:
-                        # Sem logo: -vf simples (caminho original)
-                        _ass_filter = f"ass='{ass_escaped}':fontsdir={_fontsdir}"
-                        cmd = (
-                            f'ffmpeg -y {_seek}-i "{local_video}" '
-                            f'{_avoid_neg}'
-                            f'-vf "{_base_vf},{_ass_filter}" '
-                            f'-c:v libx264 -preset medium -crf 18 '
-                            f'-c:a aac -b:a 192k "{output_video}"'
+                        d = dados_idiomas[idioma]
+
+                        nome_render = _nome_arquivo_render(artista_val, musica_val, idioma)
+
+                        output_dir = _Path(STORAGE_PATH) / str(edicao_id) / "renders" / idioma
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        output_video = str(output_dir / nome_render)
+
+                        if sem_legendas:
+                            # Sem legendas: só crop+escalar/pad (+logo se houver)
+                            if _logo_path:
+                                # Logo: 150px largura, posição fixa (870, 530) para 1080x1920
+                                _logo_w = 150
+                                _logo_x = 870
+                                _logo_y = 580
+                                cmd = (
+                                    f'ffmpeg -y {_seek}-i "{_entrada}" -i "{_logo_path}" '
+                                    f'{_avoid_neg}'
+                                    f'-filter_complex "[0:v]{_vf_fundo_somente}[bg];'
+                                    f'[1:v]scale={_logo_w}:-1[wm];'
+                                    f'[bg][wm]overlay={_logo_x}:{_logo_y}" '
+                                    f'-map 0:a -c:v libx264 -preset medium -crf 18 -threads {_threads} '
+                                    f'-c:a aac -b:a 192k "{output_video}"'
+                                )
+                            else:
+                                cmd = (
+                                    f'ffmpeg -y {_seek}-i "{_entrada}" '
+                                    f'{_avoid_neg}'
+                                    f'-vf "{_vf_fundo_somente}" '
+                                    f'-c:v libx264 -preset medium -crf 18 -threads {_threads} '
+                                    f'-c:a aac -b:a 192k "{output_video}"'
+                                )
+                        else:
+                            # Gerar ASS (sync, rápido — banco já fechado)
+                            ass_obj = gerar_ass(
+                                overlay=d["overlay_segs"] or [],
+                                lyrics=lyrics_segs or [],
+                                traducao=d["traducao_segs"],
+                                idioma_versao=idioma,
+                                idioma_musica=idioma_musica,
+                                sem_lyrics=sem_lyrics_val,
+                                perfil=perfil_data,
+                                image_top_px=_image_top_px,
+                                duracao_video_ms=duracao_corte_ms,
+                            )
+
+                            ass_path = str(output_dir / f"legendas_{idioma}.ass")
+                            ass_obj.save(ass_path)
+
+                            # FFmpeg com timeout — banco FECHADO
+                            ass_escaped = ass_path.replace("\\", "/").replace(":", "\\:")
+                            from app.services.font_service import get_fontsdir as _get_fontsdir
+                            _fontsdir = _get_fontsdir()
+
+                            if _logo_path:
+                                # Com logo: 150px, posição fixa (870, 530)
+                                _logo_w = 150
+                                _logo_x = 870
+                                _logo_y = 580
+                                cmd = (
+                                    f'ffmpeg -y {_seek}-i "{_entrada}" -i "{_logo_path}" '
+                                    f'{_avoid_neg}'
+                                    f'-filter_complex "[0:v]{_vf_fundo_prefixo}'
+                                    f"ass='{ass_escaped}':fontsdir={_fontsdir}[bg];"
+                                    f'[1:v]scale={_logo_w}:-1[wm];'
+                                    f'[bg][wm]overlay={_logo_x}:{_logo_y}" '
+                                    f'-map 0:a -c:v libx264 -preset medium -crf 18 -threads {_threads} '
+                                    f'-c:a aac -b:a 192k "{output_video}"'
+                                )
+                            else:
+                                # Sem logo: -vf simples (caminho original)
+                                _ass_filter = f"ass='{ass_escaped}':fontsdir={_fontsdir}"
+                                cmd = (
+                                    f'ffmpeg -y {_seek}-i "{_entrada}" '
+                                    f'{_avoid_neg}'
+                                    f'-vf "{_vf_fundo_prefixo}{_ass_filter}" '
+                                    f'-c:v libx264 -preset medium -crf 18 -threads {_threads} '
+                                    f'-c:a aac -b:a 192k "{output_video}"'
+                                )
+                        # ── DIAG TEMPORÁRIO: input do render ──
+                        _input_size_mb = _Path(_entrada).stat().st_size / 1024 / 1024
+                        logger.info(f"[{edicao_id}] DIAG RENDER INPUT {idioma}: {_input_size_mb:.1f}MB, file={_entrada}")
+                        logger.info(f"[{edicao_id}] DIAG RENDER CMD COMPLETO: {cmd}")
+                        # ── FIM DIAG ──
+                        processo = await asyncio.create_subprocess_shell(
+                            cmd,
+                            stdout=asyncio.subprocess.PIPE,
+                            stderr=asyncio.subprocess.PIPE,
                         )
-                # ── DIAG TEMPORÁRIO: input do render ──
-                _input_size_mb = _Path(local_video).stat().st_size / 1024 / 1024
-                try:
-                    from app.services.ffmpeg_service import probar_video as _probar_in
-                    _in_w, _in_h = await _probar_in(local_video)
-                    logger.info(f"[{edicao_id}] DIAG RENDER INPUT: {_in_w}x{_in_h}, {_input_size_mb:.1f}MB, file={local_video}")
-                except Exception:
-                    logger.info(f"[{edicao_id}] DIAG RENDER INPUT: ffprobe falhou, {_input_size_mb:.1f}MB, file={local_video}")
-                logger.info(f"[{edicao_id}] DIAG RENDER CMD COMPLETO: {cmd}")
-                # ── FIM DIAG ──
-                processo = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                try:
-                    _, stderr_out = await asyncio.wait_for(processo.communicate(), timeout=600)
-                except asyncio.TimeoutError:
-                    processo.kill()
-                    await processo.wait()
-                    raise
+                        try:
+                            _, stderr_out = await asyncio.wait_for(processo.communicate(), timeout=600)
+                        except asyncio.TimeoutError:
+                            processo.kill()
+                            await processo.wait()
+                            raise
 
-                if processo.returncode != 0:
-                    _stderr_full = stderr_out.decode()
-                    logger.info(f"[FFMPEG STDERR COMPLETO] {_stderr_full[:2000]}")
-                    raise Exception(f"FFmpeg falhou (inicio): {_stderr_full[:1000]} ... (fim): {_stderr_full[-500:]}")
+                        if processo.returncode != 0:
+                            _stderr_full = stderr_out.decode()
+                            logger.info(f"[FFMPEG STDERR COMPLETO] {_stderr_full[:2000]}")
+                            raise Exception(f"FFmpeg falhou (inicio): {_stderr_full[:1000]} ... (fim): {_stderr_full[-500:]}")
 
-                tamanho = _Path(output_video).stat().st_size
+                        tamanho = _Path(output_video).stat().st_size
 
-                # ── DIAG TEMPORÁRIO: output do render ──
-                try:
-                    from app.services.ffmpeg_service import probar_video as _probar_out
-                    _out_w, _out_h = await _probar_out(output_video)
-                    logger.info(f"[{edicao_id}] DIAG RENDER OUTPUT: {_out_w}x{_out_h}, {tamanho/1024/1024:.1f}MB, file={output_video}")
-                except Exception:
-                    logger.info(f"[{edicao_id}] DIAG RENDER OUTPUT: ffprobe falhou, {tamanho/1024/1024:.1f}MB")
-                # ── FIM DIAG ──
-
-                # 4. Upload render para R2
-                if r2_base_val:
-                    r2_key = f"{r2_prefix_val}/{r2_base_val}/{idioma}/{nome_render}"
-                    storage.upload_file(output_video, r2_key)
-                    arquivo_render = r2_key
-                else:
-                    # Sem R2 configurado — manter path local (dev/teste apenas)
-                    arquivo_render = output_video
+                        # ── DIAG TEMPORÁRIO: output do render ──
+                        try:
+                            from app.services.ffmpeg_service import probar_video as _probar_out
+                            _out_w, _out_h = await _probar_out(output_video)
+                            logger.info(f"[{edicao_id}] DIAG RENDER OUTPUT: {_out_w}x{_out_h}, {tamanho/1024/1024:.1f}MB, file={output_video}")
+                        except Exception:
+                            logger.info(f"[{edicao_id}] DIAG RENDER OUTPUT: ffprobe falhou, {tamanho/1024/1024:.1f}MB")
+                        # ── FIM DIAG ──
+
+                        # 4. Upload render para R2
+                        if r2_base_val:
+                            r2_key = f"{r2_prefix_val}/{r2_base_val}/{idioma}/{nome_render}"
+                            await async_storage.upload_file(output_video, r2_key)
+                            arquivo_render = r2_key
+                        else:
+                            # Sem R2 configurado — manter path local (dev/teste apenas)
+                            arquivo_render = output_video
 
-                # 5. Cleanup: deletar vídeo local (liberar disco antes do próximo idioma)
-                # REGRA: nunca 2 vídeos renderizados no disco ao mesmo tempo
-                try:
-                    _Path(output_video).unlink(missing_ok=True)
-                    logger.info(f"[{edicao_id}] Vídeo local deletado: {output_video}")
-                except Exception as cleanup_err:
-                    logger.warning(f"[{edicao_id}] Falha ao deletar vídeo local {output_video}: {cleanup_err}")
+                        # 5. Cleanup: deletar vídeo local ANTES de liberar o slot do pool
+                        # REGRA: o arquivo final só existe em disco enquanto sua reserva estiver ativa
+                        try:
+                            _Path(output_video).unlink(missing_ok=True)
+                            logger.info(f"[{edicao_id}] Vídeo local deletado: {output_video}")
+                        except Exception as cleanup_err:
+                            logger.warning(f"[{edicao_id}] Falha ao deletar vídeo local {output_video}: {cleanup_err}")
 
-                # 6. Cleanup: deletar ASS temporário
-                if ass_path:
-                    try:
-                        _Path(ass_path).unlink(missing_ok=True)
-                    except Exception as cleanup_err:
-                        logger.warning(f"[{edicao_id}] Falha ao deletar ASS {ass_path}: {cleanup_err}")
+                        # 6. Cleanup: deletar ASS temporário
+                        if ass_path:
+                            try:
+                                _Path(ass_path).unlink(missing_ok=True)
+                            except Exception as cleanup_err:
+                                logger.warning(f"[{edicao_id}] Falha ao deletar ASS {ass_path}: {cleanup_err}")
+                    finally:
+                        em_andamento.remove(idioma)
 
                 # 7. Salvar resultado — upsert (sessão curta)
                 with SessionLocal() as db:
@@ -2265,6 +2341,14 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
                             status="erro", erro_msg=str(e)[:500],
                         ))
                     db.commit()
+            # Heartbeat ao terminar cada idioma (sucesso ou falha)
+            _gravar_progresso()
+
+        try:
+            await asyncio.gather(*(_renderizar_idioma(i) for i in faltantes))
+        finally:
+            if _mezanino:
+                _Path(_mezanino).unlink(missing_ok=True)
 
         # PASSO C — Finalização (sessão curta)
         with SessionLocal() as db:
@@ -2298,7 +2382,8 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
                 db.commit()
 
                 if not is_preview and renders_ok > 0:
-                    _exportar_renders(edicao, db)
+                    # ensure_local (download R2 de centenas de MB) + copy2: fora do event loop
+                    await asyncio.to_thread(_exportar_renders_por_id, edicao_id)
 
         logger.info(f"[{edicao_id}] _render_task concluída: {renders_ok} OK, {len(falhas)} falhas")
 
@@ -2321,6 +2406,8 @@ async def _render_task(edicao_id: int, idiomas_renderizar: list = None, is_previ
             logger.error(f"[{edicao_id}] Não conseguiu salvar erro no banco")
         if isinstance(e, asyncio.CancelledError):
             raise
+    finally:
+        _pins.close()
 
 
 class AprovarPreviewParams(BaseModel):
@@ -2332,7 +2419,7 @@ class AprovarPreviewParams(BaseModel):
 @router.post("/edicoes/{edicao_id}/renderizar-preview")
 async def renderizar_preview(edicao_id: int, sem_legendas: bool = False):
     from app.database import SessionLocal
-    from app.worker import task_queue, _make_preview_wrapper, enqueue_safe
+    from app.worker import enqueue_safe
 
     with SessionLocal() as db:
         edicao = db.get(Edicao, edicao_id)
@@ -2357,14 +2444,17 @@ async def renderizar_preview(edicao_id: int, sem_legendas: bool = False):
             db.refresh(edicao)
             raise HTTPException(409, f"Status atual '{edicao.status}' não permite iniciar preview")
 
-    enqueue_safe(_make_preview_wrapper(edicao_id, idioma_preview, sem_legendas=sem_legendas), edicao_id)
+    enqueue_safe(
+        _render_task, edicao_id,
+        idiomas_renderizar=[idioma_preview], is_preview=True, sem_legendas=sem_legendas,
+    )
     return {"status": "preview iniciado", "idioma": idioma_preview, "sem_legendas": sem_legendas}
 
 
 @router.post("/edicoes/{edicao_id}/aprovar-preview")
 async def aprovar_preview(edicao_id: int, body: AprovarPreviewParams, sem_legendas: bool = False):
     from app.database import SessionLocal
-    from app.worker import task_queue
+    from app.worker import enqueue
 
     with SessionLocal() as db:
         edicao = db.get(Edicao, edicao_id)
@@ -2402,11 +2492,7 @@ async def aprovar_preview(edicao_id: int, body: AprovarPreviewParams, sem_legend
 
     # Enfileirar render dos idiomas restantes (fora da sessão de banco)
     if body.aprovado:
-        _sem = sem_legendas
-        async def _render_remaining(_eid: int):
-            await _render_task(_eid, idiomas_renderizar=idiomas_renderizar, sem_legendas=_sem)
-
-        task_queue.put_nowait((_render_remaining, edicao_id))
+        enqueue(_render_task, edicao_id, idiomas_renderizar=idiomas_renderizar, sem_legendas=sem_legendas)
         return {"status": "renderização dos demais idiomas iniciada", "idiomas": idiomas_renderizar}
 
 
@@ -2422,7 +2508,7 @@ async def re_renderizar_idioma(edicao_id: int, idioma: str):
     Status da edição deve ser 'concluido', 'preview_pronto' ou 'erro'.
     """
     from app.database import SessionLocal
-    from app.worker import task_queue
+    from app.worker import enqueue
 
     with SessionLocal() as db:
         edicao = db.get(Edicao, edicao_id)
@@ -2461,26 +2547,28 @@ async def re_renderizar_idioma(edicao_id: int, idioma: str):
         if render_existente:
             if render_existente.arquivo:
                 try:
-                    storage.delete(render_existente.arquivo)
+                    await async_storage.delete(render_existente.arquivo)
                 except Exception:
                     logger.warning(f"[{edicao_id}] Falha ao deletar R2 {render_existente.arquivo} (re-render)")
             db.delete(render_existente)
             db.commit()
 
-    async def _re_render_wrapper(_eid: int):
-        await _render_task(_eid, idiomas_renderizar=[idioma])
-        # Restaurar status anterior se render concluir com sucesso
-        from app.database import SessionLocal as _SL
-        with _SL() as _db:
-            _edicao = _db.get(Edicao, _eid)
-            if _edicao and _edicao.status == "concluido" and status_anterior == "preview_pronto":
-                _edicao.status = "preview_pronto"
-                _db.commit()
-
-    task_queue.put_nowait((_re_render_wrapper, edicao_id))
+    enqueue(_re_render_task, edicao_id, idioma=idioma, status_anterior=status_anterior)
     return {"status": "re-render enfileirado", "idioma": idioma}
 
 
+async def _re_render_task(edicao_id: int, idioma: str, status_anterior: str):
+    """Renderiza um único idioma e restaura preview_pronto se era o status anterior."""
+    await _render_task(edicao_id, idiomas_renderizar=[idioma])
+    # Restaurar status anterior se render concluir com sucesso
+    from app.database import SessionLocal as _SL
+    with _SL() as _db:
+        _edicao = _db.get(Edicao, edicao_id)
+        if _edicao and _edicao.status == "concluido" and status_anterior == "preview_pronto":
+            _edicao.status = "preview_pronto"
+            _db.commit()
+
+
 # --- Re-tradução individual por idioma ---
 _STATUS_PERMITIDOS_RETRAD = {"montagem", "preview_pronto", "concluido", "erro"}
 
@@ -2492,7 +2580,7 @@ async def re_traduzir_idioma(edicao_id: int, idioma: str):
     Deleta a tradução anterior e enfileira tradução só desse idioma.
     """
     from app.database import SessionLocal
-    from app.worker import task_queue
+    from app.worker import enqueue
 
     with SessionLocal() as db:
         edicao = db.get(Edicao, edicao_id)
@@ -2531,70 +2619,71 @@ async def re_traduzir_idioma(edicao_id: int, idioma: str):
             db.delete(trad_existente)
             db.commit()
 
-    async def _re_trad_wrapper(_eid: int):
-        """Traduz apenas o idioma alvo e restaura o status anterior."""
-        try:
-            from app.database import SessionLocal as _SL
-            from app.services.translate_service import traduzir_letra_cloud as _traduzir
+    enqueue(_re_traducao_task, edicao_id, idioma=idioma, status_anterior=status_anterior)
+    return {"status": "re-tradução enfileirada", "idioma": idioma}
 
-            with _SL() as _db:
-                _edicao = _db.get(Edicao, _eid)
-                if not _edicao:
-                    return
-                _alin = _db.query(Alinhamento).filter(
-                    Alinhamento.edicao_id == _eid
-                ).order_by(Alinhamento.id.desc()).first()
-                if not _alin or not _alin.segmentos_cortado:
-                    _edicao.status = "erro"
-                    _edicao.erro_msg = "Alinhamento não encontrado para re-tradução"
-                    _db.commit()
-                    return
-                segmentos = _alin.segmentos_cortado
-                idioma_origem = _edicao.idioma
-                metadados = {"musica": _edicao.musica, "compositor": _edicao.compositor}
-                _edicao.task_heartbeat = datetime.now(timezone.utc)
-                _db.commit()
 
-            resultado = await asyncio.wait_for(
-                _traduzir(segmentos, idioma_origem, idioma, metadados),
-                timeout=180,
-            )
+async def _re_traducao_task(edicao_id: int, idioma: str, status_anterior: str):
+    """Traduz apenas o idioma alvo e restaura o status anterior."""
+    try:
+        from app.database import SessionLocal as _SL
+        from app.services.translate_service import traduzir_letra_cloud as _traduzir
 
-            with _SL() as _db:
-                existing = _db.query(TraducaoLetra).filter(
-                    TraducaoLetra.edicao_id == _eid, TraducaoLetra.idioma == idioma
-                ).first()
-                if existing:
-                    existing.segmentos = resultado
-                else:
-                    _db.add(TraducaoLetra(edicao_id=_eid, idioma=idioma, segmentos=resultado))
-                _edicao = _db.get(Edicao, _eid)
-                if _edicao:
-                    _edicao.status = status_anterior
-                    _edicao.erro_msg = None
-                    _edicao.task_heartbeat = datetime.now(timezone.utc)
-                    _edicao.progresso_detalhe = {"re_traducao": {"idioma": idioma, "status": "concluido"}}
+        with _SL() as _db:
+            _edicao = _db.get(Edicao, edicao_id)
+            if not _edicao:
+                return
+            _alin = _db.query(Alinhamento).filter(
+                Alinhamento.edicao_id == edicao_id
+            ).order_by(Alinhamento.id.desc()).first()
+            if not _alin or not _alin.segmentos_cortado:
+                _edicao.status = "erro"
+                _edicao.erro_msg = "Alinhamento não encontrado para re-tradução"
                 _db.commit()
+                return
+            segmentos = _alin.segmentos_cortado
+            idioma_origem = _edicao.idioma
+            metadados = {"musica": _edicao.musica, "compositor": _edicao.compositor}
+            _edicao.task_heartbeat = datetime.now(timezone.utc)
+            _db.commit()
+
+        resultado = await asyncio.wait_for(
+            _traduzir(segmentos, idioma_origem, idioma, metadados),
+            timeout=180,
+        )
 
-            logger.info(f"[{_eid}] Re-tradução {idioma} OK → status={status_anterior}")
+        with _SL() as _db:
+            existing = _db.query(TraducaoLetra).filter(
+                TraducaoLetra.edicao_id == edicao_id, TraducaoLetra.idioma == idioma
+            ).first()
+            if existing:
+                existing.segmentos = resultado
+            else:
+                _db.add(TraducaoLetra(edicao_id=edicao_id, idioma=idioma, segmentos=resultado))
+            _edicao = _db.get(Edicao, edicao_id)
+            if _edicao:
+                _edicao.status = status_anterior
+                _edicao.erro_msg = None
+                _edicao.task_heartbeat = datetime.now(timezone.utc)
+                _edicao.progresso_detalhe = {"re_traducao": {"idioma": idioma, "status": "concluido"}}
+            _db.commit()
 
-        except BaseException as exc:
-            if isinstance(exc, asyncio.CancelledError):
-                raise
-            logger.error(f"[{_eid}] Re-tradução {idioma} falhou: {exc}", exc_info=True)
-            try:
-                from app.database import SessionLocal as _SL2
-                with _SL2() as _db2:
-                    _e = _db2.get(Edicao, _eid)
-                    if _e:
-                        _e.status = "erro"
-                        _e.erro_msg = f"Re-tradução {idioma} falhou: {str(exc)[:300]}"
-                        _db2.commit()
-            except Exception:
-                pass
+        logger.info(f"[{edicao_id}] Re-tradução {idioma} OK → status={status_anterior}")
 
-    task_queue.put_nowait((_re_trad_wrapper, edicao_id))
-    return {"status": "re-tradução enfileirada", "idioma": idioma}
+    except BaseException as exc:
+        if isinstance(exc, asyncio.CancelledError):
+            raise
+        logger.error(f"[{edicao_id}] Re-tradução {idioma} falhou: {exc}", exc_info=True)
+        try:
+            from app.database import SessionLocal as _SL2
+            with _SL2() as _db2:
+                _e = _db2.get(Edicao, edicao_id)
+                if _e:
+                    _e.status = "erro"
+                    _e.erro_msg = f"Re-tradução {idioma} falhou: {str(exc)[:300]}"
+                    _db2.commit()
+        except Exception:
+            pass
 
 
 def _exportar_renders(edicao, db):
@@ -2629,12 +2718,14 @@ def _exportar_renders(edicao, db):
     r2_base = _get_r2_base(edicao)
     _pfx = _get_perfil_r2_prefix(edicao, db)
     if r2_base:
+        # Uma listagem da pasta do projeto em vez de um head_object por arquivo
+        existentes = storage.stat_prefix(f"{_pfx}/{r2_base}/" if _pfx else f"{r2_base}/")
         for idioma_dir in IDIOMAS_ALVO:
             lp = lang_prefix(r2_base, idioma_dir)
             prefix_path = f"{_pfx}/{lp}" if _pfx else lp
             for filename in ["post.txt", "subtitles.srt", "youtube.txt"]:
                 r2_key = f"{prefix_path}/{filename}"
-                if storage.exists(r2_key):
+                if r2_key in existentes:
                     try:
                         local_file = storage.ensure_local(r2_key)
                         lang_dir = pasta_projeto / idioma_dir
@@ -2644,6 +2735,15 @@ def _exportar_renders(edicao, db):
                         logger.warning(f"Erro ao exportar texto {r2_key}: {e}")
 
 
+def _exportar_renders_por_id(edicao_id: int):
+    """`_exportar_renders` com sessão própria — para rodar em thread (asyncio.to_thread)."""
+    from app.database import SessionLocal
+    with SessionLocal() as db:
+        edicao = db.get(Edicao, edicao_id)
+        if edicao:
+            _exportar_renders(edicao, db)
+
+
 @router.post("/edicoes/{edicao_id}/exportar")
 def exportar_renders(edicao_id: int, db: Session = Depends(get_db)):
     """Exporta renders para EXPORT_PATH manualmente."""
@@ -2715,8 +2815,6 @@ def _get_pacote_status(edicao_id: int, db: Session) -> dict:
 async def _pacote_task(edicao_id: int):
     """Task assíncrona no worker que gera o ZIP e faz upload pro R2."""
     try:
-        import zipfile
-        import tempfile
         from app.database import SessionLocal
 
         logger.info(f"[pacote_task] INÍCIO edicao_id={edicao_id}")
@@ -2749,53 +2847,41 @@ async def _pacote_task(edicao_id: int):
                 edicao.task_heartbeat = datetime.now(timezone.utc)
                 db.commit()
 
-        # PASSO B — Gerar ZIP e upload (banco FECHADO durante I/O pesado)
-        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-            tmp_path = tmp.name
+        # PASSO B — ZIP em streaming direto para o R2 (banco FECHADO durante I/O pesado).
+        # Sem cópia local: renders e textos são lidos do R2 em paralelo e o ZIP
+        # vai direto para um multipart upload. Mídia em ZIP_STORED (mp4 não
+        # comprime), então o tempo é limitado pela rede, não por deflate.
+        entradas = [
+            (f"{slug}/{idioma}/{_nome_arquivo_render(artista, musica, idioma)}", arquivo)
+            for arquivo, idioma in render_data
+        ]
+        full_base_zip = f"{_pfx}/{r2_base}" if _pfx and r2_base else r2_base
+        if r2_base:
+            # Existência dos textos via uma listagem da pasta do projeto (sem HEAD por arquivo).
+            # Listagem fresca: o redator pode ter acabado de regravar os textos.
+            existentes = await async_storage.stat_prefix(f"{full_base_zip}/", max_age=0)
+            for idioma_dir in IDIOMAS_ALVO:
+                lp = lang_prefix(r2_base, idioma_dir)
+                prefix_path = f"{_pfx}/{lp}" if _pfx else lp
+                for filename in ["post.txt", "subtitles.srt", "youtube.txt"]:
+                    if f"{prefix_path}/{filename}" in existentes:
+                        entradas.append((f"{slug}/{idioma_dir}/{filename}", f"{prefix_path}/{filename}"))
 
-        try:
-            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                for arquivo, idioma in render_data:
-                    try:
-                        local_file = storage.ensure_local(arquivo)
-                        nome_video = _nome_arquivo_render(artista, musica, idioma)
-                        arcname = f"{slug}/{idioma}/{nome_video}"
-                        zf.write(local_file, arcname)
-                        logger.info(f"[pacote] Incluído render {idioma}")
-                    except Exception as e:
-                        logger.warning(f"Pacote: não conseguiu incluir render {idioma}: {e}")
-
-                if r2_base:
-                    for idioma_dir in IDIOMAS_ALVO:
-                        lp = lang_prefix(r2_base, idioma_dir)
-                        prefix_path = f"{_pfx}/{lp}" if _pfx else lp
-                        for filename in ["post.txt", "subtitles.srt", "youtube.txt"]:
-                            r2_key = f"{prefix_path}/{filename}"
-                            if storage.exists(r2_key):
-                                try:
-                                    local_file = storage.ensure_local(r2_key)
-                                    arcname = f"{slug}/{idioma_dir}/{filename}"
-                                    zf.write(local_file, arcname)
-                                except Exception as e:
-                                    logger.warning(f"Pacote: falha ao incluir {r2_key}: {e}")
-
-            # Upload ZIP para R2
-            full_base_zip = f"{_pfx}/{r2_base}" if _pfx and r2_base else r2_base
-            r2_key = f"{full_base_zip}/export/pacote.zip" if full_base_zip else f"exports/{edicao_id}/pacote.zip"
-            storage.upload_file(tmp_path, r2_key)
-            logger.info(f"[pacote] ZIP uploaded to R2: {r2_key}")
-
-            # Gerar URL presigned para download direto
-            download_url = storage.get_presigned_url(r2_key, expires_in=7200)
-
-            _set_pacote_status(edicao_id, "pronto", url=download_url, r2_key=r2_key)
-            logger.info(f"[pacote] Pacote pronto para edicao_id={edicao_id}")
+        r2_key = f"{full_base_zip}/export/pacote.zip" if full_base_zip else f"exports/{edicao_id}/pacote.zip"
+        resultado = await async_storage.upload_zip_stream(r2_key, entradas)
+        for key in resultado["faltando"]:
+            if key in dict(render_data):
+                logger.warning(f"Pacote: render não encontrado no storage: {key}")
+        logger.info(
+            f"[pacote] ZIP uploaded to R2: {r2_key} "
+            f"({len(resultado['incluidos'])} arquivos, {resultado['bytes'] / 1024 / 1024:.1f}MB)"
+        )
 
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+        # Gerar URL presigned para download direto
+        download_url = await async_storage.get_presigned_url(r2_key, expires_in=7200)
+
+        _set_pacote_status(edicao_id, "pronto", url=download_url, r2_key=r2_key)
+        logger.info(f"[pacote] Pacote pronto para edicao_id={edicao_id}")
 
         logger.info(f"[pacote_task] FINALIZOU edicao_id={edicao_id}")
 
@@ -2810,9 +2896,9 @@ async def _pacote_task(edicao_id: int):
 
 @router.post("/edicoes/{edicao_id}/pacote")
 async def iniciar_pacote(edicao_id: int, db: Session = Depends(get_db)):
-    """Inicia geração do pacote ZIP via worker sequencial. Retorna imediatamente.
+    """Inicia geração do pacote ZIP via worker (faixa io). Retorna imediatamente.
     Use GET /pacote/status para acompanhar."""
-    from app.worker import task_queue
+    from app.worker import enqueue, queue_size
 
     edicao = db.get(Edicao, edicao_id)
     if not edicao:
@@ -2824,8 +2910,8 @@ async def iniciar_pacote(edicao_id: int, db: Session = Depends(get_db)):
         return {"status": "gerando_pacote", "mensagem": "Pacote já está sendo gerado"}
 
     _set_pacote_status(edicao_id, "gerando")
-    task_queue.put_nowait((_pacote_task, edicao_id))
-    logger.info(f"[pacote] Enfileirado edicao_id={edicao_id} queue={task_queue.qsize()}")
+    enqueue(_pacote_task, edicao_id)
+    logger.info(f"[pacote] Enfileirado edicao_id={edicao_id} queue={queue_size()}")
 
     return {"status": "gerando_pacote", "mensagem": "Geração do pacote iniciada"}
 
@@ -2842,7 +2928,7 @@ def status_pacote(edicao_id: int, db: Session = Depends(get_db)):
 
 @router.get("/edicoes/{edicao_id}/pacote/download")
 def download_pacote(edicao_id: int, db: Session = Depends(get_db)):
-    """Download direto do pacote ZIP (baixa do R2 e serve via FileResponse)."""
+    """Download direto do pacote ZIP (streaming do R2, sem cópia em disco)."""
     edicao = db.get(Edicao, edicao_id)
     if not edicao:
         raise HTTPException(404, "Edição não encontrada")
@@ -2860,15 +2946,23 @@ def download_pacote(edicao_id: int, db: Session = Depends(get_db)):
         r2_key = f"{full_base_zip}/export/pacote.zip" if full_base_zip else f"exports/{edicao_id}/pacote.zip"
 
     try:
-        local_path = storage.ensure_local(r2_key)
+        chunks = storage.iter_chunks(r2_key)
+        primeiro = next(chunks, b"")
     except FileNotFoundError:
         raise HTTPException(404, "Arquivo do pacote não encontrado no storage. Gere novamente.")
 
+    from urllib.parse import quote
+
+    def _corpo():
+        yield primeiro
+        yield from chunks
+
+    # Streaming do R2 direto para o cliente — o ZIP não passa pelo cache local
     slug = _sanitize_filename(f"{edicao.artista} - {edicao.musica}")
-    return FileResponse(
-        path=local_path,
+    return StreamingResponse(
+        _corpo(),
         media_type="application/zip",
-        filename=f"{slug}.zip",
+        headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(slug + '.zip')}"},
     )
 
 
@@ -2926,12 +3020,12 @@ async def upload_video_source(
     r2_key = f"{full_base}/video/original.mp4"
 
     try:
-        storage.upload_file(local_path, r2_key)
+        await async_storage.upload_file(local_path, r2_key)
     finally:
         FilePath(local_path).unlink(missing_ok=True)
 
     # 6. Invalidar cache R2 local (sem isso, ensure_local retorna o vídeo antigo)
-    storage.invalidate_cache(r2_key)
+    await async_storage.invalidate_cache(r2_key)
 
     # 7. Atualizar edição
     edicao.arquivo_video_completo = r2_key
@@ -2951,7 +3045,7 @@ async def upload_video_source(
     else:
         # Substituição (conclusão) — invalidar cortado e renders antigos
         if edicao.arquivo_video_cortado:
-            storage.invalidate_cache(edicao.arquivo_video_cortado)
+            await async_storage.invalidate_cache(edicao.arquivo_video_cortado)
         edicao.arquivo_video_cortado = None
         edicao.arquivo_video_cru = None
         n_deleted = db.query(Render).filter(Render.edicao_id == edicao_id).delete()
@@ -3075,7 +3169,7 @@ _ACTIVE_STATUSES = {"baixando", "letra", "transcricao", "alinhamento", "corte",
 
 @router.get("/fila/status")
 async def fila_status():
-    """Verifica se o worker está ocupado processando alguma edição."""
+    """Slots em execução por faixa do worker e profundidade de cada fila."""
     from app.worker import is_worker_busy
     return is_worker_busy()
 
@@ -3139,7 +3233,7 @@ async def desbloquear_edicao(edicao_id: int, force: bool = False):
 
         tem_video = bool(
             edicao.arquivo_video_completo
-            and storage.exists(edicao.arquivo_video_completo)
+            and await async_storage.exists(edicao.arquivo_video_completo)
         )
 
         # Se status atual é "corte", o operador editou alinhamento mas ainda não
@@ -3185,6 +3279,10 @@ async def desbloquear_edicao(edicao_id: int, force: bool = False):
         edicao.tentativas_requeue = 0
         db.commit()
 
+    # Jobs ainda na fila seriam de um pipeline anterior ao desbloqueio
+    from app.worker import cancelar_jobs_pendentes
+    cancelar_jobs_pendentes(edicao_id)
+
     logger.info(
         f"[desbloquear] edicao_id={edicao_id} inferido status='{novo_status}' "
         f"baseado em: renders={n_renders}, traducoes={n_traducoes}, "
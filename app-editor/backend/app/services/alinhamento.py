@@ -1,10 +1,23 @@
-"""Serviço de alinhamento: fuzzy matching letra × timestamps."""
+"""Serviço de alinhamento: fuzzy matching letra × timestamps.
+
+Os textos são normalizados uma vez (`_Texto`) e cada comparação passa antes
+por um teto barato do SequenceMatcher (contagem de caracteres em comum, o
+mesmo limite do `quick_ratio`): só os candidatos que ainda podem vencer pagam
+o `ratio()` completo. O resultado é idêntico ao da varredura completa.
+"""
 import re
 import logging
+from bisect import bisect_left, bisect_right
+from collections import Counter
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Distância (s) em que o score temporal do merge zera; cegos além dela não são candidatos
+JANELA_TEMPORAL_SEC = 30.0
+LIMIAR_MATCH_MERGE = 0.5
+
 
 def normalizar(texto: str) -> str:
     texto = texto.lower()
@@ -14,34 +27,89 @@ def normalizar(texto: str) -> str:
     return texto
 
 
+class _Texto:
+    """Texto normalizado + contagem de caracteres (para o teto do ratio)."""
+    __slots__ = ("norm", "chars")
+
+    def __init__(self, norm: str):
+        self.norm = norm
+        self.chars = Counter(norm)
+
+
+def _teto_ratio(a: _Texto, b: _Texto) -> float:
+    """Limite superior de SequenceMatcher(None, a, b).ratio() — igual ao quick_ratio()."""
+    total = len(a.norm) + len(b.norm)
+    if not total:
+        return 1.0
+    menor, maior = (a.chars, b.chars) if len(a.chars) <= len(b.chars) else (b.chars, a.chars)
+    comum = sum(min(n, maior[c]) for c, n in menor.items() if c in maior)
+    return 2.0 * comum / total
+
+
+def _ratio(a: _Texto, b: _Texto) -> float:
+    return SequenceMatcher(None, a.norm, b.norm).ratio()
+
+
+def _contido(a: _Texto, b: _Texto) -> bool:
+    return b.norm in a.norm or a.norm in b.norm
+
+
+class _IndiceVersos:
+    """Versos (e pares de versos consecutivos) normalizados uma vez por letra."""
+
+    def __init__(self, versos: tuple):
+        # Ordem de desempate da busca original: versos isolados, depois os pares.
+        # Refrão repetido vira um candidato só — empate sempre fica com o primeiro.
+        self.candidatos = []
+        vistos = set()
+        todos = [(i, v, False) for i, v in enumerate(versos)]
+        todos += [(i, versos[i] + " " + versos[i + 1], True) for i in range(len(versos) - 1)]
+        for i, verso, eh_par in todos:
+            norm = normalizar(verso)
+            if (norm, eh_par) not in vistos:
+                vistos.add((norm, eh_par))
+                self.candidatos.append((i, verso, _Texto(norm), eh_par))
+
+    def melhor(self, texto: _Texto) -> tuple:
+        """(verso, score, índice) do candidato de maior score; empate → o primeiro."""
+        tetos = []
+        for ordem, (_, _, cand, eh_par) in enumerate(self.candidatos):
+            teto = _teto_ratio(texto, cand)
+            # Bônus de containment só vale para verso isolado
+            contido = not eh_par and _contido(cand, texto)
+            if contido:
+                teto = max(teto, 0.85)
+            tetos.append((-teto, ordem, contido))
+        tetos.sort()
+
+        melhor_score = 0
+        melhor_ordem = None
+        for neg_teto, ordem, contido in tetos:
+            if -neg_teto < melhor_score:
+                break
+            score = _ratio(texto, self.candidatos[ordem][2])
+            if contido:
+                score = max(score, 0.85)
+            if score > melhor_score or (
+                score == melhor_score and melhor_ordem is not None and ordem < melhor_ordem
+            ):
+                melhor_score = score
+                melhor_ordem = ordem
+
+        if melhor_ordem is None:
+            return "", 0, None
+        indice, verso, _, _ = self.candidatos[melhor_ordem]
+        return verso, melhor_score, indice
+
+
+@lru_cache(maxsize=16)
+def _indice_versos(versos: tuple) -> _IndiceVersos:
+    return _IndiceVersos(versos)
+
+
 def encontrar_melhor_match(texto: str, versos: list) -> tuple:
     """Encontra o verso mais similar via fuzzy matching."""
-    texto_norm = normalizar(texto)
-    melhor_score = 0
-    melhor_verso = ""
-    melhor_indice = None
-
-    for i, verso in enumerate(versos):
-        verso_norm = normalizar(verso)
-        score = SequenceMatcher(None, texto_norm, verso_norm).ratio()
-        if verso_norm in texto_norm or texto_norm in verso_norm:
-            score = max(score, 0.85)
-        if score > melhor_score:
-            melhor_score = score
-            melhor_verso = verso
-            melhor_indice = i
-
-    # Combinações de versos consecutivos
-    for i in range(len(versos) - 1):
-        combinado = versos[i] + " " + versos[i + 1]
-        combinado_norm = normalizar(combinado)
-        score = SequenceMatcher(None, texto_norm, combinado_norm).ratio()
-        if score > melhor_score:
-            melhor_score = score
-            melhor_verso = combinado
-            melhor_indice = i
-
-    return melhor_verso, melhor_score, melhor_indice
+    return _indice_versos(tuple(versos)).melhor(_Texto(normalizar(texto)))
 
 
 def alinhar_letra_com_timestamps(letra_original: str, srt_gemini: list) -> dict:
@@ -157,13 +225,68 @@ def _seconds_to_ts(sec: float) -> str:
     return f"{m:02d}:{whole:02d},{ms:03d}"
 
 
+def _cegos_na_janela(starts: list, start_sec: float) -> range:
+    """Índices dos cegos (ordenados por start) a menos de JANELA_TEMPORAL_SEC de `start_sec`."""
+    ini = bisect_right(starts, start_sec - JANELA_TEMPORAL_SEC)
+    fim = bisect_left(starts, start_sec + JANELA_TEMPORAL_SEC)
+    return range(ini, fim)
+
+
+def _score_merge(guiado: dict, cego: dict, limiar: float):
+    """Score texto×tempo do par, ou None se não pode chegar a `limiar` (poda pelo teto)."""
+    g, c = guiado["texto"], cego["texto"]
+    score_temporal = max(0, 1.0 - abs(guiado["start_sec"] - cego["start_sec"]) / JANELA_TEMPORAL_SEC)
+    contido = bool(g.norm and c.norm) and _contido(c, g)
+    teto = max(_teto_ratio(g, c), 0.85) if contido else _teto_ratio(g, c)
+    if teto * 0.7 + score_temporal * 0.3 < limiar:
+        return None
+    score_texto = _ratio(g, c)
+    # Bonus containment
+    if contido:
+        score_texto = max(score_texto, 0.85)
+    score_total = score_texto * 0.7 + score_temporal * 0.3
+    return score_total if score_total >= limiar else None
+
+
+def _atribuicao_monotonica(n: int, m: int, arestas: dict) -> dict:
+    """Atribuição guiado→cego de soma máxima sem cruzamentos no tempo.
+
+    DP de alinhamento de sequências: melhor[i][j] = maior soma usando os i
+    primeiros guiados e os j primeiros cegos. `arestas` = {(gi, ci): score}.
+    """
+    melhor = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        linha, anterior = melhor[i], melhor[i - 1]
+        for j in range(1, m + 1):
+            valor = max(anterior[j], linha[j - 1])
+            score = arestas.get((i - 1, j - 1))
+            if score is not None and anterior[j - 1] + score > valor:
+                valor = anterior[j - 1] + score
+            linha[j] = valor
+
+    pares = {}
+    i, j = n, m
+    while i > 0 and j > 0:
+        score = arestas.get((i - 1, j - 1))
+        if score is not None and melhor[i][j] == melhor[i - 1][j - 1] + score:
+            pares[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif melhor[i][j] == melhor[i - 1][j]:
+            i -= 1
+        else:
+            j -= 1
+    return pares
+
+
 def merge_transcricoes(cega: list, guiada: list, letra_original: str) -> dict:
     """Merge: texto da guiada + timestamps da cega.
 
     Estratégia:
-    1. Busca global: cada guiado procura o melhor cego (texto + proximidade temporal)
-    2. Mark-used: cegos já usados não são reutilizados
-    3. Threshold 0.5: rejeita matches fracos
+    1. Candidatos: cada guiado só considera cegos a menos de JANELA_TEMPORAL_SEC
+       (score = texto 0.7 + proximidade temporal 0.3), podados pelo teto do ratio
+    2. Threshold 0.5: rejeita matches fracos
+    3. Atribuição global: DP que maximiza a soma dos scores com pares na mesma
+       ordem temporal nas duas transcrições (cada cego usado no máximo uma vez)
     4. Fallback: se não acha match, usa timestamps originais da guiada (reais, não inventados)
     """
     versos = [v.strip() for v in letra_original.split("\n") if v.strip()]
@@ -176,62 +299,62 @@ def merge_transcricoes(cega: list, guiada: list, letra_original: str) -> dict:
     guiada_sorted = sorted(guiada, key=_sort_key)
     cega_sorted = sorted(cega, key=_sort_key)
 
-    # Pré-processar cegos
+    # Pré-processar cegos (normalização uma vez; starts ordenados para a janela)
     cegos_info = []
     for seg in cega_sorted:
         cegos_info.append({
             "seg": seg,
-            "text_norm": normalizar(seg.get("text", "")),
+            "texto": _Texto(normalizar(seg.get("text", ""))),
             "start_sec": _parse_timestamp_sec(seg.get("start", "")),
             "end_sec": _parse_timestamp_sec(seg.get("end", "")),
-            "usado": False,
         })
+    starts_cegos = [info["start_sec"] for info in cegos_info]
 
     n_cegos = len(cegos_info)
+    indice_versos = _indice_versos(tuple(versos_limpos))
 
-    # ===== Matching global com mark-used =====
-    resultado = []
-    matched_count = 0
-
-    for gi, seg_guiado in enumerate(guiada_sorted):
+    guiados_info = []
+    for seg_guiado in guiada_sorted:
         texto_guiado = seg_guiado.get("text", "")
         eh_repeticao = "[REPETIÇÃO]" in texto_guiado
         texto_limpo = texto_guiado.replace("[REPETIÇÃO]", "").strip() if eh_repeticao else texto_guiado
-        guiado_norm = normalizar(texto_limpo)
-        guiado_start_sec = _parse_timestamp_sec(seg_guiado.get("start", "0"))
+        guiados_info.append({
+            "seg": seg_guiado,
+            "texto_guiado": texto_guiado,
+            "eh_repeticao": eh_repeticao,
+            "texto": _Texto(normalizar(texto_limpo)),
+            "start_sec": _parse_timestamp_sec(seg_guiado.get("start", "0")),
+        })
+
+    # ===== Candidatos: cegos dentro da janela temporal com score ≥ limiar =====
+    arestas = {}
+    for gi, g in enumerate(guiados_info):
+        for ci in _cegos_na_janela(starts_cegos, g["start_sec"]):
+            score = _score_merge(g, cegos_info[ci], LIMIAR_MATCH_MERGE)
+            if score is not None:
+                arestas[(gi, ci)] = score
+
+    # ===== Atribuição global (DP monotônica no tempo) =====
+    pares = _atribuicao_monotonica(len(guiados_info), n_cegos, arestas)
+    cegos_usados = set(pares.values())
+
+    resultado = []
+    matched_count = len(pares)
+
+    for gi, g in enumerate(guiados_info):
+        texto_guiado = g["texto_guiado"]
+        eh_repeticao = g["eh_repeticao"]
 
         # Match com letra original
-        match_letra, score_letra, indice_letra = encontrar_melhor_match(texto_limpo, versos_limpos)
+        match_letra, score_letra, indice_letra = indice_versos.melhor(g["texto"])
         texto_final = versos[indice_letra] if indice_letra is not None else texto_guiado
 
-        # Buscar melhor cego (busca global, pula usados)
-        melhor_score_total = 0
-        melhor_ci = None
-
-        for ci, info in enumerate(cegos_info):
-            if info["usado"]:
-                continue
-            score_texto = SequenceMatcher(None, guiado_norm, info["text_norm"]).ratio()
-            # Bonus containment
-            if info["text_norm"] and guiado_norm:
-                if info["text_norm"] in guiado_norm or guiado_norm in info["text_norm"]:
-                    score_texto = max(score_texto, 0.85)
-            # Penalidade temporal (quanto mais longe no tempo, pior)
-            dist = abs(guiado_start_sec - info["start_sec"])
-            score_temporal = max(0, 1.0 - dist / 30.0)
-            score_total = score_texto * 0.7 + score_temporal * 0.3
-
-            if score_total > melhor_score_total:
-                melhor_score_total = score_total
-                melhor_ci = ci
-
-        if melhor_ci is not None and melhor_score_total >= 0.5:
+        if gi in pares:
             # Match encontrado: usar timestamps da cega
-            info = cegos_info[melhor_ci]
-            info["usado"] = True
-            matched_count += 1
+            info = cegos_info[pares[gi]]
+            score_total = arestas[(gi, pares[gi])]
 
-            flag = "VERDE" if melhor_score_total >= 0.75 else "AMARELO"
+            flag = "VERDE" if score_total >= 0.75 else "AMARELO"
             resultado.append({
                 "index": gi + 1,
                 "start": _seconds_to_ts(info["start_sec"]),
@@ -239,12 +362,19 @@ def merge_transcricoes(cega: list, guiada: list, letra_original: str) -> dict:
                 "text": texto_guiado,
                 "texto_final": texto_final,
                 "flag": flag,
-                "confianca": round(melhor_score_total, 3),
+                "confianca": round(score_total, 3),
                 "eh_repeticao": eh_repeticao,
                 "fonte_timestamp": "cega",
             })
         else:
             # Sem match: fallback para timestamps originais da guiada
+            # (confiança = melhor cego livre na janela, para diagnóstico)
+            melhor_score_total = max(
+                (_score_merge(g, cegos_info[ci], 0.0) or 0
+                 for ci in _cegos_na_janela(starts_cegos, g["start_sec"]) if ci not in cegos_usados),
+                default=0,
+            )
+            seg_guiado = g["seg"]
             start_sec = _parse_timestamp_sec(seg_guiado.get("start", "0"))
             end_sec = _parse_timestamp_sec(seg_guiado.get("end", "0"))
             resultado.append({
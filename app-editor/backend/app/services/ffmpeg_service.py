@@ -1,9 +1,18 @@
 """Serviço de processamento de vídeo via FFmpeg."""
 import asyncio
+import hashlib
+import json
+import logging
+import re
 import shutil
 from pathlib import Path
 
-from shared.storage_service import storage, lang_prefix
+from app.config import (
+    AUDIO_ANALISE_ATIVO, AUDIO_ANALISE_SAMPLE_RATE, AUDIO_ANALISE_BITRATE, AUDIO_ANALISE_APARAR_SILENCIO,
+)
+from shared.storage_service import async_storage, lang_prefix
+
+logger = logging.getLogger(__name__)
 
 
 async def probar_video(video_path: str) -> tuple:
@@ -49,21 +58,59 @@ async def probar_duracao(video_path: str) -> float:
 
 
 async def run_ffmpeg(cmd: str):
-    """Executa comando FFmpeg assíncrono."""
+    """Executa comando FFmpeg assíncrono.
+
+    Timeout (asyncio.wait_for) ou cancelamento da task mata o processo antes de
+    propagar — senão o FFmpeg segue consumindo CPU/disco fora do render pool.
+    """
     process = await asyncio.create_subprocess_shell(
         cmd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
-    stdout, stderr = await process.communicate()
+    try:
+        stdout, stderr = await process.communicate()
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
     if process.returncode != 0:
         raise Exception(f"FFmpeg falhou: {stderr.decode()}")
     return stdout.decode()
 
 
+async def gerar_mezanino(local_video: str, output_path: str, vf: str,
+                         inicio_sec: float = None, fim_sec: float = None,
+                         crf: int = 10) -> str:
+    """Codifica uma vez o fundo comum a todos os idiomas (janela + crop/scale/pad).
+
+    Quase sem perdas (libx264 CRF baixo, áudio FLAC em MKV) para servir de
+    entrada ao render final por idioma, que então só aplica ASS/logo.
+
+    Args:
+        local_video: vídeo de origem (original ou cortado)
+        output_path: path local do mezanino (.mkv)
+        vf: cadeia de filtros de fundo (crop/scale/pad)
+        inicio_sec, fim_sec: janela para input seeking (None = vídeo inteiro)
+        crf: qualidade do mezanino
+    Returns:
+        output_path
+    """
+    seek = f"-ss {inicio_sec} -to {fim_sec} " if inicio_sec is not None and fim_sec is not None else ""
+    avoid_neg = "-avoid_negative_ts make_zero " if seek else ""
+    await run_ffmpeg(
+        f'ffmpeg -y {seek}-i "{local_video}" {avoid_neg}'
+        f'-vf "{vf}" '
+        f'-c:v libx264 -preset veryfast -crf {crf} -pix_fmt yuv420p '
+        f'-c:a flac "{output_path}"'
+    )
+    return output_path
+
+
 async def extrair_audio_completo(video_key: str, video_id: int, storage_path: str,
-                                  r2_base: str = "") -> str:
-    """Extrai áudio do vídeo COMPLETO para enviar ao Gemini.
+                                 r2_base: str = "") -> str:
+    """Extrai áudio do vídeo COMPLETO (arquivo) e o áudio de análise para o Gemini.
 
     Args:
         video_key: R2 key do vídeo
@@ -73,7 +120,7 @@ async def extrair_audio_completo(video_key: str, video_id: int, storage_path: st
     Returns:
         R2 key do áudio extraído
     """
-    local_video = storage.ensure_local(video_key)
+    local_video = await async_storage.ensure_local(video_key)
 
     output_dir = Path(storage_path) / str(video_id)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -85,10 +132,145 @@ async def extrair_audio_completo(video_key: str, video_id: int, storage_path: st
 
     # Upload: {base}/video/audio_completo.ogg
     r2_key = f"{r2_base}/video/audio_completo.ogg" if r2_base else f"videos/{video_id}/audio_completo.ogg"
-    storage.upload_file(audio_local, r2_key)
+    await async_storage.upload_file(audio_local, r2_key)
+
+    # Proxy de análise ao lado do arquivo — falha aqui não impede a extração
+    if AUDIO_ANALISE_ATIVO:
+        try:
+            await _publicar_audio_analise(audio_local, r2_key, output_dir)
+        except Exception as e:
+            logger.warning(f"[{video_id}] Áudio de análise não gerado na extração: {e}")
     return r2_key
 
 
+# ─── Áudio de análise (proxy para transcrição) ───
+# A transcrição não precisa de estéreo 48kHz/128k: o Gemini recebe um Opus
+# mono de taxa baixa, com o silêncio do início/fim aparado. O trecho
+# descartado no início vira `offset_sec` (sidecar JSON ao lado do proxy) e
+# deslocar_timestamps() devolve os timestamps ao tempo do áudio original.
+
+_PERFIL_ANALISE = (
+    f"mono/{AUDIO_ANALISE_SAMPLE_RATE}Hz/opus-{AUDIO_ANALISE_BITRATE}"
+    f"/aparar={int(AUDIO_ANALISE_APARAR_SILENCIO)}"
+)
+_SILENCIO_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+_SILENCIO_MARGEM_SEC = 0.3
+
+
+def janela_sem_silencio(log_silencedetect: str, duracao: float,
+                        margem: float = _SILENCIO_MARGEM_SEC) -> tuple:
+    """(inicio, fim) do trecho com som, a partir da saída do filtro silencedetect.
+
+    Só apara silêncio encostado no início/fim do arquivo; pausas no meio ficam.
+    Mantém `margem` de cada lado para não cortar o ataque da primeira nota.
+    """
+    eventos = [(tipo, float(valor)) for tipo, valor in _SILENCIO_RE.findall(log_silencedetect)]
+    inicio, fim = 0.0, duracao
+    if len(eventos) >= 2 and eventos[0][0] == "start" and eventos[0][1] <= 0.05 and eventos[1][0] == "end":
+        inicio = eventos[1][1]
+    if eventos and eventos[-1][0] == "start":
+        fim = eventos[-1][1]
+    elif (len(eventos) >= 2 and eventos[-1][0] == "end" and eventos[-1][1] >= duracao - 0.05
+          and eventos[-2][0] == "start"):
+        fim = eventos[-2][1]
+    if fim - inicio < 1.0:
+        # Arquivo (quase) todo em silêncio: não apara nada
+        return 0.0, duracao
+    return max(0.0, inicio - margem), min(duracao, fim + margem)
+
+
+async def _detectar_silencio(fonte: str) -> str:
+    process = await asyncio.create_subprocess_shell(
+        f'ffmpeg -hide_banner -i "{fonte}" -vn -ac 1 '
+        f'-af silencedetect=noise=-50dB:d=0.5 -f null -',
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    return stderr.decode(errors="replace")
+
+
+async def gerar_audio_analise(fonte: str, destino: str) -> dict:
+    """Codifica o proxy de análise de `fonte` em `destino` (.ogg).
+
+    Returns:
+        {"offset_sec", "duracao_sec", "perfil"} — offset_sec = segundos do
+        original descartados antes do início do proxy.
+    """
+    duracao = await probar_duracao(fonte)
+    inicio, fim = 0.0, duracao
+    if AUDIO_ANALISE_APARAR_SILENCIO:
+        inicio, fim = janela_sem_silencio(await _detectar_silencio(fonte), duracao)
+    corte = f"-ss {inicio:.3f} -to {fim:.3f} " if (inicio > 0 or fim < duracao) else ""
+    await run_ffmpeg(
+        f'ffmpeg -y {corte}-i "{fonte}" -vn -ac 1 -ar {AUDIO_ANALISE_SAMPLE_RATE} '
+        f'-c:a libopus -b:a {AUDIO_ANALISE_BITRATE} "{destino}"'
+    )
+    return {"offset_sec": round(inicio, 3), "duracao_sec": round(fim - inicio, 3), "perfil": _PERFIL_ANALISE}
+
+
+def _sha256_arquivo(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _chaves_analise(audio_key: str) -> tuple:
+    base = audio_key.rsplit("/", 1)[0] if "/" in audio_key else ""
+    prefixo = f"{base}/" if base else ""
+    return f"{prefixo}audio_analise.ogg", f"{prefixo}audio_analise.json"
+
+
+async def _publicar_audio_analise(audio_local: str, audio_key: str, output_dir: Path,
+                                  fonte_sha256: str = None) -> tuple:
+    """Gera o proxy a partir do áudio local e sobe proxy + sidecar ao lado de `audio_key`.
+
+    O sidecar guarda o sha256 do áudio de origem: após uma re-extração, o
+    proxy antigo (de outra faixa) deixa de ser reaproveitado.
+    """
+    key_proxy, key_meta = _chaves_analise(audio_key)
+    proxy_local = str(output_dir / "audio_analise.ogg")
+    meta_local = str(output_dir / "audio_analise.json")
+    meta = await gerar_audio_analise(audio_local, proxy_local)
+    meta["fonte_sha256"] = fonte_sha256 or await asyncio.to_thread(_sha256_arquivo, audio_local)
+    Path(meta_local).write_text(json.dumps(meta))
+    await async_storage.upload_file(proxy_local, key_proxy)
+    await async_storage.upload_file(meta_local, key_meta)
+    logger.info(
+        f"[audio_analise] {key_proxy}: offset={meta['offset_sec']}s duracao={meta['duracao_sec']}s "
+        f"{Path(audio_local).stat().st_size / 1024 / 1024:.1f}MB → {Path(proxy_local).stat().st_size / 1024 / 1024:.1f}MB"
+    )
+    return proxy_local, meta["offset_sec"]
+
+
+async def obter_audio_analise(audio_key: str, audio_local: str, video_id: int, storage_path: str) -> tuple:
+    """(path local, offset_sec) do áudio a enviar ao Gemini.
+
+    Reaproveita o proxy já publicado no R2 (mesmo perfil e mesmo áudio de
+    origem) — o conteúdo fica estável e o upload no Gemini é reaproveitado
+    entre re-transcrições.
+    Sem proxy (desativado ou falha), devolve o próprio áudio com offset 0.
+    """
+    if not AUDIO_ANALISE_ATIVO:
+        return audio_local, 0.0
+    key_proxy, key_meta = _chaves_analise(audio_key)
+    try:
+        fonte_sha256 = await asyncio.to_thread(_sha256_arquivo, audio_local)
+        if await async_storage.exists(key_proxy) and await async_storage.exists(key_meta):
+            meta = json.loads(Path(await async_storage.ensure_local(key_meta)).read_text())
+            if meta.get("perfil") == _PERFIL_ANALISE and meta.get("fonte_sha256") == fonte_sha256:
+                return await async_storage.ensure_local(key_proxy), float(meta.get("offset_sec", 0.0))
+            logger.info(f"[{video_id}] Áudio de análise obsoleto (perfil ou áudio de origem mudou) — regerando")
+        output_dir = Path(storage_path) / str(video_id)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return await _publicar_audio_analise(audio_local, audio_key, output_dir, fonte_sha256)
+    except Exception as e:
+        logger.warning(f"[{video_id}] Áudio de análise indisponível, usando o áudio completo: {e}")
+        return audio_local, 0.0
+
+
 async def cortar_na_janela_overlay(
     video_key: str,
     janela_inicio_sec: float,
@@ -98,7 +280,7 @@ async def cortar_na_janela_overlay(
     r2_base: str = "",
 ) -> dict:
     """Corta o vídeo na janela definida pelo overlay."""
-    local_video = storage.ensure_local(video_key)
+    local_video = await async_storage.ensure_local(video_key)
 
     output_dir = Path(storage_path) / str(video_id)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -142,8 +324,10 @@ async def cortar_na_janela_overlay(
     prefix = f"{r2_base}/video" if r2_base else f"videos/{video_id}"
     r2_key_cortado = f"{prefix}/video_cortado.mp4"
     r2_key_cru = f"{prefix}/video_cru.mp4"
-    storage.upload_file(cortado_local, r2_key_cortado)
-    storage.upload_file(cru_local, r2_key_cru)
+    await asyncio.gather(
+        async_storage.upload_file(cortado_local, r2_key_cortado),
+        async_storage.upload_file(cru_local, r2_key_cru),
+    )
 
     return {
         "arquivo_cortado": r2_key_cortado,
@@ -165,7 +349,7 @@ async def renderizar_video(video_cortado_key: str, ass_file: str, output_path: s
         idioma: código do idioma (para key R2)
         fontsdir: diretório local com fontes customizadas (ex: /usr/local/share/fonts/custom)
     """
-    local_video = storage.ensure_local(video_cortado_key)
+    local_video = await async_storage.ensure_local(video_cortado_key)
 
     ass_escaped = ass_file.replace("\\", "/").replace(":", "\\:")
     # Sempre incluir fontsdir — Playfair Display (padrão) mora lá
@@ -193,6 +377,6 @@ async def renderizar_video(video_cortado_key: str, ass_file: str, output_path: s
         r2_key = f"{lang_prefix(r2_base, idioma)}/final.mp4"
     else:
         r2_key = f"renders/{Path(output_path).name}"
-    storage.upload_file(output_path, r2_key)
+    await async_storage.upload_file(output_path, r2_key)
 
     return {"arquivo": r2_key, "tamanho_bytes": size}
@@ -1,9 +1,12 @@
 """Serviço de integração com Gemini 2.5 Pro."""
 import asyncio
+import hashlib
 import json
 import logging
 import re
-from app.config import GEMINI_API_KEY
+import time
+from datetime import datetime, timedelta, timezone
+from app.config import GEMINI_API_KEY, GEMINI_FILE_REUSE_MARGIN_SEC
 from shared.retry import async_retry
 
 _logger = logging.getLogger(__name__)
@@ -75,17 +78,149 @@ def _detect_mime_type(path: str) -> str:
     return "audio/mpeg"
 
 
+# ─── Cache de arquivos enviados ao Gemini (Files API) ───
+# Cada passe da transcrição (cega, guiada, completação, retries de safety) e
+# cada re-transcrição após Desbloquear usava um upload novo do mesmo áudio.
+# O handle é reaproveitado por hash do conteúdo: em memória e, entre
+# processos, pelo nome determinístico `files/aud-<sha256[:32]>` no Gemini.
+# A Files API apaga os uploads em ~48h; o handle deixa de ser usado
+# GEMINI_FILE_REUSE_MARGIN_SEC antes de `expiration_time`.
+
+_GEMINI_FILE_TTL = timedelta(hours=48)
+_arquivos: dict = {}  # sha256 → (File, expira_em)
+_arquivos_locks: dict = {}
+_arquivos_stats = {"hits": 0, "remotos": 0, "uploads": 0}
+
+
+def _hash_arquivo(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _expira_em(arquivo) -> datetime:
+    expira = getattr(arquivo, "expiration_time", None)
+    if not isinstance(expira, datetime):
+        return datetime.now(timezone.utc) + _GEMINI_FILE_TTL
+    return expira if expira.tzinfo else expira.replace(tzinfo=timezone.utc)
+
+
+def _ainda_valido(expira: datetime) -> bool:
+    return expira - datetime.now(timezone.utc) > timedelta(seconds=GEMINI_FILE_REUSE_MARGIN_SEC)
+
+
+async def obter_arquivo_audio(path: str, mime_type: str = None):
+    """Handle do Gemini para o áudio em `path` — um upload por conteúdo.
+
+    Ordem: cache em memória → arquivo já enviado com o mesmo hash (get_file)
+    → upload com nome determinístico.
+    """
+    genai = _get_client()
+    digest = await asyncio.to_thread(_hash_arquivo, path)
+    lock = _arquivos_locks.setdefault(digest, asyncio.Lock())
+
+    async with lock:
+        em_cache = _arquivos.get(digest)
+        if em_cache and _ainda_valido(em_cache[1]):
+            _arquivos_stats["hits"] += 1
+            return em_cache[0]
+
+        loop = asyncio.get_running_loop()
+        nome = f"files/aud-{digest[:32]}"
+        try:
+            remoto = await loop.run_in_executor(None, genai.get_file, nome)
+        except Exception:
+            remoto = None
+        if remoto is not None and _ainda_valido(_expira_em(remoto)) \
+                and getattr(getattr(remoto, "state", None), "name", "ACTIVE") != "FAILED":
+            _arquivos[digest] = (remoto, _expira_em(remoto))
+            _arquivos_stats["remotos"] += 1
+            _logger.info(f"[gemini] Reusando upload {nome} (expira {_expira_em(remoto).isoformat()})")
+            return remoto
+        if remoto is not None:
+            # Vencendo ou falhou: o nome precisa estar livre para o novo upload
+            try:
+                await loop.run_in_executor(None, genai.delete_file, nome)
+            except Exception as e:
+                _logger.warning(f"[gemini] delete_file {nome} falhou: {e}")
+
+        mime = mime_type or _detect_mime_type(path)
+
+        @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(ConnectionError, OSError, asyncio.TimeoutError))
+        async def _upload():
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    None, lambda: genai.upload_file(path, mime_type=mime, name=nome)
+                ),
+                timeout=120,
+            )
+
+        t0 = time.monotonic()
+        arquivo = await _upload()
+        _arquivos[digest] = (arquivo, _expira_em(arquivo))
+        _arquivos_stats["uploads"] += 1
+        _logger.info(f"[gemini] Upload {nome} em {time.monotonic() - t0:.1f}s")
+        return arquivo
+
+
+async def esquecer_arquivo_audio(arquivo) -> None:
+    """Tira um handle do cache e apaga o remoto (Gemini não acha/recusa o arquivo).
+
+    Sem o delete, o get_file por nome determinístico em `obter_arquivo_audio`
+    poderia devolver o mesmo arquivo morto.
+    """
+    nome = getattr(arquivo, "name", None)
+    for digest, (ref, _) in list(_arquivos.items()):
+        if ref is arquivo or (nome and getattr(ref, "name", None) == nome):
+            _arquivos.pop(digest, None)
+    if nome:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _get_client().delete_file, nome)
+        except Exception as e:
+            _logger.info(f"[gemini] delete_file {nome} após arquivo indisponível: {e}")
+
+
+def _arquivo_indisponivel(exc: Exception) -> bool:
+    """Gemini apagou/recusou o upload antes do `expiration_time` (404/403)."""
+    if type(exc).__name__ in ("NotFound", "PermissionDenied"):
+        return True
+    return getattr(exc, "code", None) in (403, 404)
+
+
+async def _com_reupload(audio_file, audio_path, chamar):
+    """`chamar(audio_file)`; se o arquivo sumiu no Gemini, sobe de novo e tenta 1x."""
+    try:
+        return await chamar(audio_file)
+    except Exception as e:
+        if not audio_path or not _arquivo_indisponivel(e):
+            raise
+        _logger.warning(
+            f"[gemini] Arquivo {getattr(audio_file, 'name', '?')} indisponível ({type(e).__name__}) "
+            f"— novo upload e nova tentativa"
+        )
+        await esquecer_arquivo_audio(audio_file)
+        return await chamar(await obter_arquivo_audio(audio_path))
+
+
+def arquivos_stats() -> dict:
+    return {**_arquivos_stats, "em_cache": sum(1 for _, exp in _arquivos.values() if _ainda_valido(exp))}
+
+
 # Exceções transientes da API Gemini que justificam retry
 _GEMINI_TRANSIENT = (RuntimeError, ConnectionError, OSError)
 
 
 async def mapear_estrutura_audio(
-    audio_file_ref, idioma: str, metadados: dict, letra_original: str = ""
+    audio_file_ref, idioma: str, metadados: dict, letra_original: str = "",
+    audio_path: str = None,
 ) -> list:
     """Fase 1: Mapear a estrutura temporal do áudio.
 
     Pede ao Gemini para identificar QUANDO cada frase é cantada,
     avançando cronologicamente pelo áudio. Foco em timestamps, não em texto.
+    Com `audio_path`, um upload que o Gemini já descartou é refeito (1x).
     """
     genai = _get_client()
     model = genai.GenerativeModel(
@@ -154,14 +289,14 @@ FORMATO JSON (retorne APENAS isto):
     loop = asyncio.get_running_loop()
 
     @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(*_GEMINI_TRANSIENT, asyncio.TimeoutError))
-    async def _call():
+    async def _call(arquivo):
         response = await asyncio.wait_for(
-            loop.run_in_executor(None, model.generate_content, [audio_file_ref, prompt]),
+            loop.run_in_executor(None, model.generate_content, [arquivo, prompt]),
             timeout=300,
         )
         return parse_json_response(_extract_response_text(response))
 
-    return await _call()
+    return await _com_reupload(audio_file_ref, audio_path, _call)
 
 
 async def transcrever_cego(
@@ -185,19 +320,7 @@ async def transcrever_guiado_completo(
     if audio_file_ref is not None:
         audio_file = audio_file_ref
     else:
-        loop = asyncio.get_running_loop()
-        mime_type = _detect_mime_type(audio_completo_path)
-
-        @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(ConnectionError, OSError, asyncio.TimeoutError))
-        async def _upload():
-            return await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, lambda: genai.upload_file(audio_completo_path, mime_type=mime_type)
-                ),
-                timeout=120,
-            )
-
-        audio_file = await _upload()
+        audio_file = await obter_arquivo_audio(audio_completo_path)
 
     # Contar versos na letra para dar referência ao Gemini
     versos = [v.strip() for v in letra_original.split("\n") if v.strip()]
@@ -256,14 +379,14 @@ FORMATO JSON (retorne APENAS isto, sem markdown):
     loop = asyncio.get_running_loop()
 
     @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(*_GEMINI_TRANSIENT, asyncio.TimeoutError))
-    async def _call():
+    async def _call(arquivo):
         response = await asyncio.wait_for(
-            loop.run_in_executor(None, model.generate_content, [audio_file, prompt]),
+            loop.run_in_executor(None, model.generate_content, [arquivo, prompt]),
             timeout=300,
         )
         return parse_json_response(_extract_response_text(response))
 
-    return await _call()
+    return await _com_reupload(audio_file, audio_completo_path, _call)
 
 
 async def completar_transcricao(
@@ -288,19 +411,7 @@ async def completar_transcricao(
     if audio_file_ref is not None:
         audio_file = audio_file_ref
     else:
-        loop = asyncio.get_running_loop()
-        mime_type = _detect_mime_type(audio_completo_path)
-
-        @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(ConnectionError, OSError, asyncio.TimeoutError))
-        async def _upload():
-            return await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, lambda: genai.upload_file(audio_completo_path, mime_type=mime_type)
-                ),
-                timeout=120,
-            )
-
-        audio_file = await _upload()
+        audio_file = await obter_arquivo_audio(audio_completo_path)
 
     # Formatar resultado parcial para mostrar ao Gemini
     parcial_json = json.dumps(resultado_parcial, ensure_ascii=False, indent=2)
@@ -358,14 +469,14 @@ FORMATO JSON (retorne APENAS isto, sem markdown):
     loop = asyncio.get_running_loop()
 
     @async_retry(max_attempts=3, backoff_base=2.0, exceptions=(*_GEMINI_TRANSIENT, asyncio.TimeoutError))
-    async def _call():
+    async def _call(arquivo):
         response = await asyncio.wait_for(
-            loop.run_in_executor(None, model.generate_content, [audio_file, prompt]),
+            loop.run_in_executor(None, model.generate_content, [arquivo, prompt]),
             timeout=300,
         )
         return parse_json_response(_extract_response_text(response))
 
-    return await _call()
+    return await _com_reupload(audio_file, audio_completo_path, _call)
 
 
 async def traduzir_letra(
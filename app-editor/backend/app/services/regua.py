@@ -89,10 +89,10 @@ def seconds_to_timestamp(sec: float) -> str:
     Sem horas (não precisamos), mas COM milissegundos (precisão de alinhamento).
     """
     sec = max(0.0, min(sec, MAX_SECONDS))
-    total_min = int(sec // 60)
-    s = sec % 60
-    whole_s = int(s)
-    ms = int(round((s - whole_s) * 1000))
+    # Arredonda no total de ms (59.9996s → 01:00,000, nunca 00:59,1000)
+    total_ms = int(round(sec * 1000))
+    total_min, resto_ms = divmod(total_ms, 60000)
+    whole_s, ms = divmod(resto_ms, 1000)
     return f"{total_min:02d}:{whole_s:02d},{ms:03d}"
 
 
@@ -214,6 +214,13 @@ def reindexar_timestamps(segmentos: list, janela_inicio_sec: float) -> list:
     return normalizar_segmentos(resultado)
 
 
+def deslocar_timestamps(segmentos: list, offset_sec: float) -> list:
+    """Soma offset_sec a todos os timestamps (áudio de análise aparado → áudio original)."""
+    if not offset_sec:
+        return segmentos
+    return reindexar_timestamps(segmentos, -offset_sec)
+
+
 def recortar_lyrics_na_janela(
     lyrics_completo: list, janela_inicio_sec: float, janela_fim_sec: float
 ) -> list:
@@ -0,0 +1,112 @@
+"""Pool de renders FFmpeg concorrentes com orçamento de disco.
+
+Substitui a antiga regra "nunca 2 vídeos renderizados no disco ao mesmo tempo"
+(loop serial) por um orçamento explícito: cada render reserva a estimativa do
+seu arquivo final e só inicia se o disco livre, descontadas as reservas dos
+renders em andamento, continuar acima de RENDER_MIN_FREE_DISK_MB.
+
+O pool é global ao processo — renders de edições diferentes disputam os
+mesmos slots e o mesmo orçamento.
+"""
+import asyncio
+import logging
+import os
+import shutil
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+from app.config import RENDER_MAX_CONCURRENCY, RENDER_MIN_FREE_DISK_MB
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+class EspacoInsuficienteError(RuntimeError):
+    """Disco livre abaixo do mínimo mesmo sem nenhum render em andamento."""
+    pass
+
+
+class RenderPool:
+    """Limita renders simultâneos por número de processos e por disco livre."""
+
+    def __init__(self, max_concorrencia: int = 0, min_livre_mb: int = 200, disk_path: str = "/"):
+        cpus = os.cpu_count() or 1
+        if max_concorrencia <= 0:
+            max_concorrencia = max(1, cpus // 2)
+        self.max_concorrencia = max(1, min(max_concorrencia, cpus))
+        self.min_livre_mb = min_livre_mb
+        self.disk_path = disk_path
+        self._cpus = cpus
+        self._ativos = 0
+        self._reservado_mb = 0.0
+        self._cond: Optional[asyncio.Condition] = None
+        self._cond_loop = None
+
+    def _condition(self) -> asyncio.Condition:
+        """Condition vinculada ao event loop corrente (recriada se o loop mudar)."""
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+        return self._cond
+
+    def livre_mb(self) -> float:
+        return shutil.disk_usage(self.disk_path).free / _MB
+
+    def threads_por_processo(self) -> int:
+        """Threads do libx264 por processo, para N encoders não disputarem todos os núcleos."""
+        return max(1, self._cpus // self.max_concorrencia)
+
+    def slots_para(self, n_tarefas: int) -> int:
+        return max(1, min(self.max_concorrencia, n_tarefas))
+
+    def _cabe(self, estimativa_mb: float) -> bool:
+        livre = self.livre_mb()
+        if self._ativos == 0:
+            # Sozinho: mesma regra do loop serial (só o mínimo absoluto)
+            return livre >= self.min_livre_mb
+        return livre - self._reservado_mb - estimativa_mb >= self.min_livre_mb
+
+    @asynccontextmanager
+    async def reservar(self, estimativa_mb: float, liberar_disco: Optional[Callable[[], None]] = None):
+        """Aguarda um slot com orçamento de disco e o mantém durante o bloco.
+
+        Args:
+            estimativa_mb: tamanho estimado do arquivo final deste render
+            liberar_disco: limpeza de emergência chamada se nem sozinho o render couber
+        Raises:
+            EspacoInsuficienteError: disco abaixo do mínimo sem renders para liberar espaço
+        """
+        cond = self._condition()
+        async with cond:
+            while not (self._ativos < self.max_concorrencia and self._cabe(estimativa_mb)):
+                if self._ativos == 0:
+                    # Nenhum render em andamento vai liberar disco — limpar ou desistir
+                    if liberar_disco:
+                        liberar_disco()
+                        if self._cabe(estimativa_mb):
+                            logger.info(f"[render_pool] Limpeza de emergência liberou disco: {self.livre_mb():.0f}MB livre")
+                            break
+                    raise EspacoInsuficienteError(f"Espaço em disco insuficiente: {self.livre_mb():.0f}MB livre")
+                await cond.wait()
+            self._ativos += 1
+            self._reservado_mb += estimativa_mb
+        try:
+            yield
+        finally:
+            async with cond:
+                self._ativos -= 1
+                self._reservado_mb -= estimativa_mb
+                cond.notify_all()
+
+    def status(self) -> dict:
+        return {
+            "max_concorrencia": self.max_concorrencia,
+            "ativos": self._ativos,
+            "reservado_mb": round(self._reservado_mb, 1),
+        }
+
+
+# Singleton
+render_pool = RenderPool(RENDER_MAX_CONCURRENCY, RENDER_MIN_FREE_DISK_MB)
@@ -1,160 +1,578 @@
-"""Worker sequencial com asyncio.Queue para tasks longas.
+"""Worker com faixas (lanes) de concorrência e fila persistente no banco.
 
-Substitui BackgroundTasks do FastAPI. Roda uma task por vez no mesmo container.
+Substitui BackgroundTasks do FastAPI. Cada faixa tem seu próprio limite de
+slots simultâneos, para que um render de 10 minutos não bloqueie uma
+transcrição de 20 segundos ou um pacote ZIP de outra edição:
+
+    cpu  — render, preview, corte          (WORKER_CONCURRENCY_CPU)
+    rede — download, Gemini, tradução      (WORKER_CONCURRENCY_REDE)
+    io   — pacote ZIP                      (WORKER_CONCURRENCY_IO)
+
+A fila vive na tabela editor_jobs (não em memória): um deploy ou restart não
+perde o que estava enfileirado, e vários containers podem consumir a mesma
+fila. Cada slot reivindica um job com SELECT ... FOR UPDATE SKIP LOCKED e
+mantém um lease (JOB_LEASE_SEC) renovado enquanto a task roda. Lease vencido
+sem task_heartbeat recente da edição = worker morreu: tasks retomáveis voltam
+para "pendente" (até JOB_MAX_TENTATIVAS), as demais viram erro como antes.
+
+Tasks da MESMA edição nunca rodam ao mesmo tempo, mesmo em faixas diferentes:
+um job só é reivindicado se a edição não tiver outro job em execução.
 """
 import asyncio
+import importlib
 import logging
+import socket
+import uuid
 from datetime import datetime, timezone, timedelta
 
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import (
+    WORKER_CONCURRENCY_CPU, WORKER_CONCURRENCY_REDE, WORKER_CONCURRENCY_IO,
+    JOB_LEASE_SEC, JOB_POLL_SEC, JOB_MAX_TENTATIVAS,
+)
+
 logger = logging.getLogger(__name__)
 
-# Fila global — itens: (async_callable, edicao_id)
-task_queue: asyncio.Queue = asyncio.Queue()
+# Limite de slots por faixa (por container)
+LANES: dict[str, int] = {
+    "cpu": max(1, WORKER_CONCURRENCY_CPU),
+    "rede": max(1, WORKER_CONCURRENCY_REDE),
+    "io": max(1, WORKER_CONCURRENCY_IO),
+}
 
-# Flag real do worker — edicao_id da task em execução (None = idle)
-_current_task_edicao_id: int | None = None
+# Faixa padrão de cada task (por __name__); enqueue aceita lane explícita
+_LANE_POR_TASK = {
+    "_render_task": "cpu",
+    "_re_render_task": "cpu",
+    "_auto_corte_task": "cpu",
+    "_download_task": "rede",
+    "_transcricao_task": "rede",
+    "_traducao_task": "rede",
+    "_re_traducao_task": "rede",
+    "_pacote_task": "io",
+}
 
-# Rastreamento de edicao_ids pendentes na fila (proteção contra enqueue duplicado)
-_pending_edicao_ids: set[int] = set()
+# Tasks que NÃO são retomadas automaticamente após crash (custo alto de Gemini;
+# o operador decide via Desbloquear, como antes da fila persistente)
+_NAO_RETOMAVEIS = {"_transcricao_task"}
 
-_STALE_THRESHOLD = timedelta(minutes=5)
+# Módulo onde as tasks são procuradas ao retomar um job de outro processo
+_MODULO_TASKS = "app.routes.pipeline"
 
+# Identidade deste processo no lease ("{hostname}:{uuid curto}")
+WORKER_ID = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
 
-async def worker_loop():
-    """Consome tasks da fila uma por vez. Roda como asyncio.Task no lifespan."""
-    global _current_task_edicao_id
-    logger.info("[worker] Worker sequencial iniciado")
-    while True:
-        try:
-            logger.info("[worker] Aguardando próxima task na fila...")
-            task_func, edicao_id = await task_queue.get()
-            _pending_edicao_ids.discard(edicao_id)
-            logger.info(f"[worker] Pegou task edicao_id={edicao_id} queue={task_queue.qsize()} pending={len(_pending_edicao_ids)}")
-            _current_task_edicao_id = edicao_id
-            try:
-                logger.info(f"[worker] Chamando task_func para edicao_id={edicao_id}")
-                await task_func(edicao_id)
-                logger.info(f"[worker] task_func RETORNOU para edicao_id={edicao_id}")
-            except asyncio.CancelledError:
-                # Propagar para o shutdown — não engolir CancelledError da task
-                raise
-            except Exception as e:
-                logger.error(
-                    f"[worker] Task edicao_id={edicao_id} falhou com exceção não tratada: {e}",
-                    exc_info=True,
-                )
-                # Reportar ao Sentry se configurado
-                try:
-                    import sentry_sdk
-                    sentry_sdk.set_context("edicao", {"id": edicao_id})
-                    sentry_sdk.capture_exception(e)
-                except Exception:
-                    pass
-                # Garantir que o status não fique preso — a própria task deveria
-                # fazer isso, mas se crashou antes do try-except interno, fazemos aqui
-                try:
-                    from app.database import SessionLocal
-                    from app.models import Edicao
-                    with SessionLocal() as db:
-                        edicao = db.get(Edicao, edicao_id)
-                        if edicao and edicao.status not in ("erro", "concluido", "preview_pronto"):
-                            edicao.status = "erro"
-                            edicao.erro_msg = f"Falha no worker: {str(e)[:500]}"
-                            db.commit()
-                            logger.info(f"[worker] Status da edicao_id={edicao_id} marcado como 'erro'")
-                except Exception:
-                    logger.error(f"[worker] Não conseguiu salvar status 'erro' para edicao_id={edicao_id}")
-            finally:
-                _current_task_edicao_id = None
-                task_queue.task_done()
-                logger.info(f"[worker] task_done() chamado, fila tem {task_queue.qsize()} items")
-        except asyncio.CancelledError:
-            logger.info("[worker] CancelledError — encerrando cleanly")
-            raise
-        except Exception as e:
-            # Proteção contra crash inesperado no próprio loop (ex: falha em task_queue.get)
-            # O loop NUNCA deve morrer — continuar consumindo a próxima task
-            logger.error(f"[worker] Erro inesperado no loop principal: {e}", exc_info=True)
+# Tasks já vistas neste processo (nome → callable)
+_tasks: dict = {}
+
+# Sinal de "há job novo" por faixa (evita esperar o próximo polling)
+_acordar: dict[str, asyncio.Event] = {lane: asyncio.Event() for lane in LANES}
+
+# Slots em execução neste processo — slot ("cpu-0") → (edicao_id, nome da task)
+_running: dict[str, tuple[int, str]] = {}
+
+# Jobs finalizados há mais tempo que isto são apagados pelo zelador
+_RETENCAO_JOBS = timedelta(days=7)
+
+_ERRO_RESTART = "Interrompido por restart do servidor. Use Desbloquear para retomar."
+
+
+def _agora() -> datetime:
+    """UTC naive — mesmo formato que as colunas DateTime guardam."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def lane_da_task(task_func) -> str:
+    """Faixa padrão de uma task pelo nome da função (fallback: cpu)."""
+    return _LANE_POR_TASK.get(getattr(task_func, "__name__", ""), "cpu")
+
+
+def _resolver_task(nome: str):
+    """Callable de um job: registrada neste processo ou procurada no módulo de tasks."""
+    task_func = _tasks.get(nome)
+    if task_func is None:
+        task_func = getattr(importlib.import_module(_MODULO_TASKS), nome)
+        _tasks[nome] = task_func
+    return task_func
+
+
+def _acordar_faixas(lane: str = None):
+    for nome, evento in _acordar.items():
+        if lane is None or nome == lane:
+            evento.set()
+
+
+def _marcar_erro_pos_crash(edicao_id: int, e: Exception):
+    """Garante que o status não fique preso se a task crashou antes do try-except interno."""
+    try:
+        import sentry_sdk
+        sentry_sdk.set_context("edicao", {"id": edicao_id})
+        sentry_sdk.capture_exception(e)
+    except Exception:
+        pass
+    try:
+        from app.database import SessionLocal
+        from app.models import Edicao
+        with SessionLocal() as db:
+            edicao = db.get(Edicao, edicao_id)
+            if edicao and edicao.status not in ("erro", "concluido", "preview_pronto"):
+                edicao.status = "erro"
+                edicao.erro_msg = f"Falha no worker: {str(e)[:500]}"
+                db.commit()
+                logger.info(f"[worker] Status da edicao_id={edicao_id} marcado como 'erro'")
+    except Exception:
+        logger.error(f"[worker] Não conseguiu salvar status 'erro' para edicao_id={edicao_id}")
+
+
+# --- Fila persistente ---
+
+def enqueue(task_func, edicao_id: int, lane: str = None, **params) -> int:
+    """Grava um job na fila (sem checagem de duplicata). Retorna o id do job.
+
+    params são repassados como kwargs para a task e precisam ser JSON-serializáveis
+    (o job pode ser retomado por outro processo).
+    """
+    from app.database import SessionLocal
+    from app.models import Edicao, Job
+
+    nome = task_func.__name__
+    lane = lane or lane_da_task(task_func)
+    _tasks[nome] = task_func
+
+    with SessionLocal() as db:
+        edicao = db.get(Edicao, edicao_id)
+        job = Job(
+            edicao_id=edicao_id,
+            tipo=nome,
+            lane=lane,
+            params=params,
+            status="pendente",
+            status_edicao=edicao.status if edicao else None,
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+        na_fila = db.query(Job).filter(Job.lane == lane, Job.status == "pendente").count()
 
+    _acordar_faixas(lane)
+    logger.info(f"[worker] enqueue: job={job_id} {nome} edicao_id={edicao_id} lane={lane} fila={na_fila}")
+    return job_id
 
-def enqueue_safe(task_func, edicao_id: int) -> bool:
+
+def enqueue_safe(task_func, edicao_id: int, lane: str = None, **params) -> bool:
     """Enfileira task com proteção contra duplicatas.
 
-    Retorna True se enfileirou, False se edicao_id já estava pendente ou em execução.
+    Retorna True se enfileirou, False se a edição já tem job pendente ou em
+    execução (em qualquer faixa e em qualquer container).
     """
-    if edicao_id == _current_task_edicao_id:
-        logger.info(f"[worker] enqueue_safe: edicao_id={edicao_id} já em execução — ignorando")
-        return False
-    if edicao_id in _pending_edicao_ids:
-        logger.info(f"[worker] enqueue_safe: edicao_id={edicao_id} já na fila — ignorando")
+    from app.database import SessionLocal
+    from app.models import Job
+
+    with SessionLocal() as db:
+        ativo = db.query(Job.status).filter(
+            Job.edicao_id == edicao_id,
+            Job.status.in_(["pendente", "executando"]),
+        ).first()
+    if ativo:
+        logger.info(f"[worker] enqueue_safe: edicao_id={edicao_id} já {ativo[0]} — ignorando")
         return False
-    _pending_edicao_ids.add(edicao_id)
-    task_queue.put_nowait((task_func, edicao_id))
-    logger.info(f"[worker] enqueue_safe: edicao_id={edicao_id} enfileirado queue={task_queue.qsize()}")
+    enqueue(task_func, edicao_id, lane, **params)
     return True
 
 
-def _make_preview_wrapper(eid: int, idioma: str, sem_legendas: bool = False):
-    """Cria wrapper para _render_task com is_preview=True e idioma fixo."""
-    async def _preview_task(_ignored_id: int):
-        from app.routes.pipeline import _render_task
-        await _render_task(eid, idiomas_renderizar=[idioma], is_preview=True, sem_legendas=sem_legendas)
-    return _preview_task
+def queue_size() -> int:
+    """Total de jobs aguardando em todas as faixas."""
+    from app.database import SessionLocal
+    from app.models import Job
 
+    with SessionLocal() as db:
+        return db.query(Job).filter(Job.status == "pendente").count()
 
-def requeue_stale_tasks():
-    """No startup, marca como erro TODAS as edições presas em status ativo.
 
-    NÃO reenfileira automaticamente — evita tasks fantasma que competem
-    com tasks novas disparadas pelo usuário. O usuário pode re-disparar
-    manualmente via botão Desbloquear na UI.
+def cancelar_jobs_pendentes(edicao_id: int) -> int:
+    """Descarta jobs ainda não iniciados da edição (ex.: Desbloquear)."""
+    from app.database import SessionLocal
+    from app.models import Job
+
+    with SessionLocal() as db:
+        n = db.query(Job).filter(
+            Job.edicao_id == edicao_id, Job.status == "pendente"
+        ).update(
+            {"status": "erro", "erro_msg": "Cancelado", "finished_at": _agora()},
+            synchronize_session=False,
+        )
+        db.commit()
+    if n:
+        logger.info(f"[worker] {n} job(s) pendente(s) da edicao_id={edicao_id} cancelado(s)")
+    return n
+
+
+def _edicoes_ocupadas():
+    """Subquery das edições com job em execução (visão commitada deste instante)."""
+    from app.models import Job
+
+    return select(Job.edicao_id).where(Job.status == "executando")
+
+
+def _reivindicar_job(lane: str):
+    """Reivindica o job pendente mais antigo da faixa cuja edição esteja livre.
+
+    O filtro por edição ocupada não basta entre containers: dois workers podem
+    travar (SKIP LOCKED) jobs diferentes da mesma edição antes de qualquer
+    commit. O índice único parcial uq_editor_jobs_edicao_executando rejeita o
+    segundo claim; aqui a edição é descartada e o próximo candidato é tentado.
+
+    Retorna (job_id, edicao_id, tipo, params) ou None.
     """
     from app.database import SessionLocal
+    from app.models import Job
+
+    descartadas: set[int] = set()
+    with SessionLocal() as db:
+        while True:
+            filtros = [
+                Job.lane == lane,
+                Job.status == "pendente",
+                Job.edicao_id.notin_(_edicoes_ocupadas()),
+            ]
+            if descartadas:
+                filtros.append(Job.edicao_id.notin_(descartadas))
+            job = (
+                db.query(Job)
+                .filter(*filtros)
+                .order_by(Job.id)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                return None
+            agora = _agora()
+            job.status = "executando"
+            job.lease_owner = WORKER_ID
+            job.lease_expira = agora + timedelta(seconds=JOB_LEASE_SEC)
+            job.started_at = agora
+            job.tentativas = (job.tentativas or 0) + 1
+            edicao_id = job.edicao_id
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                descartadas.add(edicao_id)
+                logger.info(f"[worker] edicao_id={edicao_id} reivindicada por outro worker — próximo job")
+                continue
+            return job.id, job.edicao_id, job.tipo, dict(job.params or {})
+
+
+def _finalizar_job(job_id: int, status: str, erro: str = None):
+    from app.database import SessionLocal
+    from app.models import Job
+
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        if job:
+            job.status = status
+            job.erro_msg = erro[:500] if erro else None
+            job.lease_owner = None
+            job.lease_expira = None
+            job.finished_at = _agora()
+            db.commit()
+
+
+def _renovar_lease(job_id: int):
+    from app.database import SessionLocal
+    from app.models import Job
+
+    with SessionLocal() as db:
+        db.query(Job).filter(
+            Job.id == job_id, Job.lease_owner == WORKER_ID
+        ).update(
+            {"lease_expira": _agora() + timedelta(seconds=JOB_LEASE_SEC)},
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+async def _manter_lease(job_id: int):
+    """Renova o lease do job a cada terço do prazo enquanto a task roda."""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SEC / 3)
+        try:
+            _renovar_lease(job_id)
+        except Exception as e:
+            logger.warning(f"[worker] Falha ao renovar lease do job={job_id}: {e}")
+
+
+def _reabrir_ou_falhar(db, job, motivo: str):
+    """Job órfão (dono morreu): volta para a fila se retomável, senão vira erro."""
     from app.models import Edicao
 
+    edicao = db.get(Edicao, job.edicao_id)
+    retomavel = job.tipo not in _NAO_RETOMAVEIS and (job.tentativas or 0) < JOB_MAX_TENTATIVAS
+    job.lease_owner = None
+    job.lease_expira = None
+
+    if retomavel:
+        job.status = "pendente"
+        if edicao and edicao.status == "erro" and job.status_edicao:
+            edicao.status = job.status_edicao
+            edicao.erro_msg = None
+        logger.info(
+            f"[worker] job={job.id} {job.tipo} edicao_id={job.edicao_id} retomado "
+            f"({motivo}, tentativa {job.tentativas}/{JOB_MAX_TENTATIVAS})"
+        )
+        return
+
+    job.status = "erro"
+    job.erro_msg = motivo
+    job.finished_at = _agora()
+    if edicao and edicao.status not in ("erro", "concluido", "preview_pronto"):
+        edicao.status = "erro"
+        edicao.erro_msg = _ERRO_RESTART
+        edicao.task_heartbeat = None
+        edicao.progresso_detalhe = {}
+    logger.info(f"[worker] job={job.id} {job.tipo} edicao_id={job.edicao_id} → erro ({motivo})")
+
+
+def _devolver_job(job_id: int):
+    """Shutdown no meio da task: devolve o job para a fila (ou erro se não retomável)."""
+    from app.database import SessionLocal
+    from app.models import Job
+
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        if job and job.status == "executando":
+            # Shutdown limpo não conta como tentativa
+            job.tentativas = max(0, (job.tentativas or 1) - 1)
+            _reabrir_ou_falhar(db, job, "interrompido por shutdown")
+            db.commit()
+
+
+def recuperar_jobs_expirados() -> int:
+    """Reabre jobs cujo lease venceu sem heartbeat recente da edição.
+
+    Um lease vencido com task_heartbeat recente só indica que a renovação
+    atrasou (event loop ocupado) — o lease é estendido em vez de retomado.
+    """
+    from app.database import SessionLocal
+    from app.models import Edicao, Job
+
+    prazo = timedelta(seconds=JOB_LEASE_SEC)
+    agora = _agora()
+    recuperados = 0
+    with SessionLocal() as db:
+        expirados = (
+            db.query(Job)
+            .filter(Job.status == "executando", Job.lease_expira < agora)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for job in expirados:
+            edicao = db.get(Edicao, job.edicao_id)
+            hb = edicao.task_heartbeat if edicao else None
+            if hb is not None and hb.tzinfo is not None:
+                hb = hb.astimezone(timezone.utc).replace(tzinfo=None)
+            if hb is not None and agora - hb < prazo:
+                job.lease_expira = agora + prazo
+                continue
+            _reabrir_ou_falhar(db, job, "lease expirado")
+            recuperados += 1
+
+        # Limpeza de histórico
+        db.query(Job).filter(
+            Job.status.in_(["concluido", "erro"]),
+            Job.finished_at < agora - _RETENCAO_JOBS,
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    if recuperados:
+        _acordar_faixas()
+    return recuperados
+
+
+async def _zelador_loop():
+    """Varre leases vencidos periodicamente (jobs de containers que morreram)."""
+    while True:
+        await asyncio.sleep(max(1.0, JOB_LEASE_SEC / 2))
+        try:
+            recuperar_jobs_expirados()
+        except Exception as e:
+            logger.error(f"[worker] Erro no zelador da fila: {e}", exc_info=True)
+
+
+# --- Execução ---
+
+async def _executar_job(slot: str, job_id: int, edicao_id: int, nome: str, params: dict):
+    _running[slot] = (edicao_id, nome)
+    renovador = asyncio.create_task(_manter_lease(job_id))
+    try:
+        task_func = _resolver_task(nome)
+        logger.info(f"[worker:{slot}] Chamando {nome} job={job_id} edicao_id={edicao_id}")
+        await task_func(edicao_id, **params)
+        logger.info(f"[worker:{slot}] {nome} RETORNOU job={job_id} edicao_id={edicao_id}")
+        _finalizar_job(job_id, "concluido")
+    except asyncio.CancelledError:
+        # Propagar para o shutdown — mas deixar o job retomável por outro worker
+        try:
+            _devolver_job(job_id)
+        except Exception:
+            logger.error(f"[worker:{slot}] Falha ao devolver job={job_id} no shutdown")
+        raise
+    except Exception as e:
+        logger.error(
+            f"[worker:{slot}] Task {nome} edicao_id={edicao_id} falhou com exceção não tratada: {e}",
+            exc_info=True,
+        )
+        _finalizar_job(job_id, "erro", str(e))
+        _marcar_erro_pos_crash(edicao_id, e)
+    finally:
+        renovador.cancel()
+        _running.pop(slot, None)
+        # Jobs da mesma edição em outras faixas podem ter ficado elegíveis
+        _acordar_faixas()
+
+
+async def _aguardar_job(lane: str):
+    evento = _acordar[lane]
+    try:
+        await asyncio.wait_for(evento.wait(), JOB_POLL_SEC)
+    except asyncio.TimeoutError:
+        pass
+    evento.clear()
+
+
+async def _slot_loop(lane: str, idx: int):
+    """Reivindica e executa jobs da faixa, um por vez neste slot."""
+    slot = f"{lane}-{idx}"
+    while True:
+        try:
+            job = _reivindicar_job(lane)
+            if job is None:
+                await _aguardar_job(lane)
+                continue
+            job_id, edicao_id, nome, params = job
+            logger.info(f"[worker:{slot}] Pegou job={job_id} {nome} edicao_id={edicao_id}")
+            await _executar_job(slot, job_id, edicao_id, nome, params)
+        except asyncio.CancelledError:
+            logger.info(f"[worker:{slot}] CancelledError — encerrando cleanly")
+            raise
+        except Exception as e:
+            # Proteção contra crash inesperado no próprio loop (ex: banco fora do ar)
+            # O slot NUNCA deve morrer — esperar e tentar de novo
+            logger.error(f"[worker:{slot}] Erro inesperado no loop principal: {e}", exc_info=True)
+            await asyncio.sleep(JOB_POLL_SEC)
+
+
+async def worker_loop():
+    """Sobe todos os slots de todas as faixas e o zelador. Roda como asyncio.Task no lifespan."""
+    logger.info(f"[worker] Worker {WORKER_ID} iniciado com faixas {LANES}")
+    await asyncio.gather(
+        _zelador_loop(),
+        *(
+            _slot_loop(lane, idx)
+            for lane, limite in LANES.items()
+            for idx in range(limite)
+        ),
+    )
+
+
+def requeue_stale_tasks():
+    """No startup, recupera jobs deste host e marca edições órfãs como erro.
+
+    - Jobs em execução por um processo anterior do MESMO host (restart do
+      container) são retomados imediatamente, sem esperar o lease vencer.
+      Jobs de outros hosts seguem o lease (podem estar rodando de verdade).
+    - Edições em status ativo sem nenhum job pendente/em execução (ex.: tasks
+      anteriores à fila persistente) são marcadas como erro — o usuário
+      re-dispara via botão Desbloquear na UI.
+    """
+    from app.database import SessionLocal
+    from app.models import Edicao, Job
+
+    host = WORKER_ID.split(":", 1)[0]
     with SessionLocal() as db:
+        orfaos = db.query(Job).filter(
+            Job.status == "executando",
+            Job.lease_owner.like(f"{host}:%"),
+            Job.lease_owner != WORKER_ID,
+        ).all()
+        for job in orfaos:
+            _reabrir_ou_falhar(db, job, "restart do servidor")
+        db.commit()
+
+        com_job = select(Job.edicao_id).where(Job.status.in_(["pendente", "executando"]))
         candidatos = db.query(Edicao).filter(
-            Edicao.status.in_(["baixando", "transcricao", "traducao", "renderizando", "preview"])
+            Edicao.status.in_(["baixando", "transcricao", "traducao", "renderizando", "preview"]),
+            Edicao.id.notin_(com_job),
         ).all()
 
         marcados = 0
         for edicao in candidatos:
             eid, status = edicao.id, edicao.status
             edicao.status = "erro"
-            edicao.erro_msg = "Interrompido por restart do servidor. Use Desbloquear para retomar."
+            edicao.erro_msg = _ERRO_RESTART
             edicao.task_heartbeat = None
             edicao.progresso_detalhe = {}
             db.commit()
             marcados += 1
             logger.info(
                 f"[worker] startup: edicao_id={eid} status={status} → erro "
-                f"(interrompido por restart)"
+                f"(interrompido por restart, sem job na fila)"
             )
 
-    logger.info(f"[worker] requeue_stale_tasks: {marcados} edição(ões) marcada(s) como erro")
+    logger.info(
+        f"[worker] requeue_stale_tasks: {len(orfaos)} job(s) deste host recuperado(s), "
+        f"{marcados} edição(ões) marcada(s) como erro"
+    )
 
 
 def is_worker_busy() -> dict:
-    """Verifica se o worker está executando uma task.
+    """Estado do worker: slots em execução neste processo e profundidade de cada fila.
 
-    Usa a flag real _current_task_edicao_id (setada pelo worker_loop)
-    em vez de consultar o banco, evitando falsos positivos quando o
-    status no banco ainda não foi limpo.
+    Campos legados (ocupado/edicao_id/etapa/progresso) refletem a faixa cpu:
+    "ocupado" significa que um novo render teria que esperar — é o que a tela
+    de conclusão usa para bloquear o botão de render.
     """
-    if _current_task_edicao_id is not None:
-        from app.database import SessionLocal
-        from app.models import Edicao
+    from app.database import SessionLocal
+    from app.models import Edicao, Job
 
-        with SessionLocal() as db:
-            edicao = db.get(Edicao, _current_task_edicao_id)
-            if edicao:
-                return {
-                    "ocupado": True,
-                    "edicao_id": edicao.id,
-                    "etapa": edicao.status,
-                    "progresso": edicao.progresso_detalhe or {},
-                }
-        # Flag set mas edição não encontrada — inconsistência, reportar idle
-        return {"ocupado": False}
-
-    return {"ocupado": False}
+    slots = []
+    with SessionLocal() as db:
+        for slot, (edicao_id, nome) in sorted(_running.items()):
+            edicao = db.get(Edicao, edicao_id)
+            slots.append({
+                "slot": slot,
+                "lane": slot.rsplit("-", 1)[0],
+                "edicao_id": edicao_id,
+                "task": nome,
+                "etapa": edicao.status if edicao else None,
+                "progresso": (edicao.progresso_detalhe or {}) if edicao else {},
+            })
+        na_fila = dict(
+            db.query(Job.lane, func.count(Job.id))
+            .filter(Job.status == "pendente")
+            .group_by(Job.lane)
+            .all()
+        )
+
+    filas = {
+        lane: {
+            "limite": limite,
+            "executando": sum(1 for s in slots if s["lane"] == lane),
+            "na_fila": na_fila.get(lane, 0),
+        }
+        for lane, limite in LANES.items()
+    }
+
+    result = {"ocupado": False, "slots": slots, "filas": filas}
+    slots_cpu = [s for s in slots if s["lane"] == "cpu"]
+    if slots_cpu and filas["cpu"]["executando"] >= filas["cpu"]["limite"]:
+        primeiro = slots_cpu[0]
+        result.update({
+            "ocupado": True,
+            "edicao_id": primeiro["edicao_id"],
+            "etapa": primeiro["etapa"],
+            "progresso": primeiro["progresso"],
+        })
+    return result
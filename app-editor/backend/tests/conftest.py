@@ -1,10 +1,16 @@
 """Fixtures de teste para o app-editor."""
+import sys
+from pathlib import Path
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.database import Base
 
+# shared/ fica ao lado de app/ no container (Dockerfile: COPY shared/ ./shared/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
 
 @pytest.fixture(scope="session")
 def engine_mem():
@@ -0,0 +1,75 @@
+"""Testes — alinhador indexado (letra × timestamps e merge cega/guiada)."""
+import random
+from difflib import SequenceMatcher
+
+from app.services import alinhamento
+from app.services.alinhamento import encontrar_melhor_match, merge_transcricoes, normalizar
+
+
+def _melhor_match_varredura(texto, versos):
+    """Varredura completa (semântica de referência do encontrar_melhor_match)."""
+    texto_norm = normalizar(texto)
+    melhor = ("", 0, None)
+    for i, verso in enumerate(versos):
+        verso_norm = normalizar(verso)
+        score = SequenceMatcher(None, texto_norm, verso_norm).ratio()
+        if verso_norm in texto_norm or texto_norm in verso_norm:
+            score = max(score, 0.85)
+        if score > melhor[1]:
+            melhor = (verso, score, i)
+    for i in range(len(versos) - 1):
+        combinado = versos[i] + " " + versos[i + 1]
+        score = SequenceMatcher(None, texto_norm, normalizar(combinado)).ratio()
+        if score > melhor[1]:
+            melhor = (combinado, score, i)
+    return melhor
+
+
+def test_melhor_match_igual_a_varredura_completa():
+    rnd = random.Random(3)
+    palavras = "la donna è mobile qual piuma al vento muta d'accento [REPETIÇÃO]".split()
+
+    def frase():
+        return " ".join(rnd.choice(palavras) for _ in range(rnd.randint(0, 6)))
+
+    for _ in range(500):
+        versos = [frase() for _ in range(rnd.randint(0, 10))]
+        texto = frase()
+        assert encontrar_melhor_match(texto, versos) == _melhor_match_varredura(texto, versos)
+
+
+def _seg(start, end, text):
+    return {"start": f"00:{start:02d},000", "end": f"00:{end:02d},000", "text": text}
+
+
+def test_merge_atribuicao_global_respeita_ordem_do_refrao():
+    # Refrão repetido com a guiada atrasada: o guloso dava ao 1º guiado o cego
+    # mais próximo (o 2º refrão) e o 2º guiado ficava com o 1º — pares cruzados.
+    letra = "nessun dorma\nvincerò"
+    cega = [_seg(10, 13, "nessun dorma"), _seg(20, 23, "nessun dorma")]
+    guiada = [_seg(16, 19, "nessun dorma"), _seg(24, 27, "[REPETIÇÃO] nessun dorma")]
+    r = merge_transcricoes(cega, guiada, letra)
+    assert [s["fonte_timestamp"] for s in r["segmentos"]] == ["cega", "cega"]
+    assert [s["start"] for s in r["segmentos"]] == ["00:10,000", "00:20,000"]
+    assert [s["eh_repeticao"] for s in r["segmentos"]] == [False, True]
+
+
+def test_merge_ignora_cego_fora_da_janela_temporal():
+    cega = [_seg(0, 3, "amor ti vieta")]
+    guiada = [{"start": "00:45,000", "end": "00:48,000", "text": "amor ti vieta"}]
+    r = merge_transcricoes(cega, guiada, "amor ti vieta")
+    seg = r["segmentos"][0]
+    assert alinhamento.JANELA_TEMPORAL_SEC < 45
+    assert seg["fonte_timestamp"] == "guiada"
+    assert seg["flag"] == "VERMELHO"
+    assert seg["start"] == "00:45,000"
+
+
+def test_merge_usa_timestamps_da_cega_e_texto_da_letra():
+    letra = "[Verso 1]\nLa donna è mobile\nQual piuma al vento"
+    cega = [_seg(5, 8, "la dona e mobile"), _seg(9, 12, "qual piuma al vento")]
+    guiada = [_seg(6, 9, "La donna è mobile"), _seg(10, 13, "Qual piuma al vento")]
+    r = merge_transcricoes(cega, guiada, letra)
+    assert [s["start"] for s in r["segmentos"]] == ["00:05,000", "00:09,000"]
+    assert [s["texto_final"] for s in r["segmentos"]] == ["La donna è mobile", "Qual piuma al vento"]
+    assert r["total_vermelho"] == 0
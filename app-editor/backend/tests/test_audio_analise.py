@@ -0,0 +1,137 @@
+"""Testes — áudio de análise (proxy do Gemini) e remapeamento de timestamps."""
+import asyncio
+
+import pytest
+
+from app.services import ffmpeg_service
+from app.services.ffmpeg_service import janela_sem_silencio
+from app.services.regua import (
+    deslocar_timestamps, reindexar_timestamps, seconds_to_timestamp, timestamp_to_seconds,
+)
+
+
+def _log(*eventos):
+    """Saída do silencedetect: ("start", 0.0), ("end", 2.1) ..."""
+    linhas = []
+    for tipo, t in eventos:
+        sufixo = " | silence_duration: 1.0" if tipo == "end" else ""
+        linhas.append(f"[silencedetect @ 0x55d0] silence_{tipo}: {t}{sufixo}")
+    return "\n".join(linhas)
+
+
+def test_janela_apara_silencio_do_inicio_e_do_fim():
+    log = _log(("start", 0), ("end", 4.2), ("start", 60.0), ("end", 61.5), ("start", 178.0))
+    assert janela_sem_silencio(log, 180.0) == pytest.approx((3.9, 178.3))
+
+
+def test_janela_fim_com_silence_end_na_duracao():
+    log = _log(("start", 170.0), ("end", 180.0))
+    assert janela_sem_silencio(log, 180.0) == pytest.approx((0.0, 170.3))
+
+
+def test_janela_sem_silencio_ou_tudo_silencio_nao_apara():
+    assert janela_sem_silencio("", 95.0) == (0.0, 95.0)
+    assert janela_sem_silencio(_log(("start", 0)), 95.0) == (0.0, 95.0)
+
+
+def test_deslocar_devolve_timestamps_ao_audio_original():
+    # Gemini ouviu o proxy aparado 3.9s: "00:01,100" no proxy = 5.0s no original
+    proxy = [
+        {"index": 1, "start": "00:01,100", "end": "00:04,000", "text": "Nessun dorma"},
+        {"index": 2, "start": "00:58,950", "end": "01:02,600", "text": "Tu pure"},
+    ]
+    original = deslocar_timestamps(proxy, 3.9)
+    assert [(s["start"], s["end"]) for s in original] == [
+        ("00:05,000", "00:07,900"), ("01:02,850", "01:06,500"),
+    ]
+    # ida e volta (parcial enviado à completação) preserva os tempos
+    assert reindexar_timestamps(original, 3.9) == proxy
+
+
+def test_deslocar_sem_offset_nao_altera():
+    segs = [{"start": "00:01,000", "end": "00:02,000", "text": "x"}]
+    assert deslocar_timestamps(segs, 0.0) is segs
+
+
+def test_timestamp_canonico_arredonda_no_total_de_ms():
+    assert seconds_to_timestamp(59.9996) == "01:00,000"
+    assert timestamp_to_seconds(seconds_to_timestamp(123.4567)) == pytest.approx(123.457)
+
+
+def test_gerar_audio_analise_corta_e_registra_offset(monkeypatch):
+    comandos = []
+
+    async def _duracao(_):
+        return 180.0
+
+    async def _silencio(_):
+        return _log(("start", 0), ("end", 4.2), ("start", 178.0))
+
+    async def _ffmpeg(cmd):
+        comandos.append(cmd)
+        return ""
+
+    monkeypatch.setattr(ffmpeg_service, "probar_duracao", _duracao)
+    monkeypatch.setattr(ffmpeg_service, "_detectar_silencio", _silencio)
+    monkeypatch.setattr(ffmpeg_service, "run_ffmpeg", _ffmpeg)
+    monkeypatch.setattr(ffmpeg_service, "AUDIO_ANALISE_APARAR_SILENCIO", True)
+
+    meta = asyncio.run(ffmpeg_service.gerar_audio_analise("in.ogg", "out.ogg"))
+    assert meta["offset_sec"] == pytest.approx(3.9)
+    assert meta["duracao_sec"] == pytest.approx(174.4)
+    (cmd,) = comandos
+    assert "-ss 3.900 -to 178.300" in cmd
+    assert "-ac 1" in cmd and "-c:a libopus" in cmd
+    assert f"-ar {ffmpeg_service.AUDIO_ANALISE_SAMPLE_RATE}" in cmd
+
+
+class _R2Falso:
+    """exists/ensure_local/upload_file sobre um dict key → cópia local."""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self.objetos = {}
+
+    async def exists(self, key):
+        return key in self.objetos
+
+    async def ensure_local(self, key):
+        return self.objetos[key]
+
+    async def upload_file(self, local_path, key):
+        destino = self.raiz / key.replace("/", "_")
+        destino.write_bytes(open(local_path, "rb").read())
+        self.objetos[key] = str(destino)
+
+
+def test_proxy_publicado_so_e_reaproveitado_para_o_mesmo_audio(monkeypatch, tmp_path):
+    r2 = _R2Falso(tmp_path)
+    gerados = []
+
+    async def _gerar(fonte, destino):
+        gerados.append(fonte)
+        with open(destino, "wb") as f:
+            f.write(b"proxy de " + open(fonte, "rb").read())
+        return {"offset_sec": 1.5, "duracao_sec": 10.0, "perfil": ffmpeg_service._PERFIL_ANALISE}
+
+    monkeypatch.setattr(ffmpeg_service, "async_storage", r2)
+    monkeypatch.setattr(ffmpeg_service, "gerar_audio_analise", _gerar)
+    monkeypatch.setattr(ffmpeg_service, "AUDIO_ANALISE_ATIVO", True)
+    audio = tmp_path / "audio_completo.ogg"
+    chave = "Pavarotti - Nessun Dorma/video/audio_completo.ogg"
+
+    def _obter():
+        return asyncio.run(ffmpeg_service.obter_audio_analise(chave, str(audio), 7, str(tmp_path)))
+
+    audio.write_bytes(b"faixa A")
+    _obter()
+    proxy, offset = _obter()
+    assert len(gerados) == 1
+    assert offset == 1.5
+    assert open(proxy, "rb").read() == b"proxy de faixa A"
+
+    # Re-extração (ex.: vídeo trocado): o proxy da faixa anterior não serve mais
+    audio.write_bytes(b"faixa B")
+    proxy, _ = _obter()
+    assert len(gerados) == 2
+    assert open(proxy, "rb").read() == b"proxy de faixa B"
@@ -0,0 +1,122 @@
+"""Testes — cache de uploads de áudio no Gemini (um upload por conteúdo)."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import gemini
+
+
+class _GenaiFake:
+    """Files API mínima: get_file/upload_file/delete_file em memória."""
+
+    def __init__(self):
+        self.remotos = {}
+        self.uploads = []
+        self.deletes = []
+
+    def get_file(self, name):
+        if name not in self.remotos:
+            raise LookupError(name)
+        return self.remotos[name]
+
+    def upload_file(self, path, mime_type=None, name=None):
+        self.uploads.append(name)
+        arquivo = SimpleNamespace(
+            name=name, state=SimpleNamespace(name="ACTIVE"),
+            expiration_time=datetime.now(timezone.utc) + timedelta(hours=48),
+        )
+        self.remotos[name] = arquivo
+        return arquivo
+
+    def delete_file(self, name):
+        self.deletes.append(name)
+        self.remotos.pop(name, None)
+
+
+@pytest.fixture
+def genai(monkeypatch):
+    fake = _GenaiFake()
+    monkeypatch.setattr(gemini, "_get_client", lambda: fake)
+    monkeypatch.setattr(gemini, "_arquivos", {})
+    monkeypatch.setattr(gemini, "_arquivos_locks", {})
+    return fake
+
+
+def _audio(tmp_path, nome, conteudo):
+    p = tmp_path / nome
+    p.write_bytes(conteudo)
+    return str(p)
+
+
+def test_mesmo_conteudo_sobe_uma_vez(genai, tmp_path):
+    a = _audio(tmp_path, "a.mp3", b"audio-1" * 1000)
+    copia = _audio(tmp_path, "copia.mp3", b"audio-1" * 1000)
+    outro = _audio(tmp_path, "b.mp3", b"audio-2" * 1000)
+
+    async def _main():
+        # passes concorrentes do mesmo áudio esperam o mesmo upload
+        r1, r2 = await asyncio.gather(gemini.obter_arquivo_audio(a), gemini.obter_arquivo_audio(copia))
+        r3 = await gemini.obter_arquivo_audio(outro)
+        return r1, r2, r3
+
+    r1, r2, r3 = asyncio.run(_main())
+    assert r1 is r2
+    assert r3 is not r1
+    assert len(genai.uploads) == 2
+    assert all(n.startswith("files/aud-") and len(n) <= 46 for n in genai.uploads)
+
+
+def test_reusa_upload_de_outro_processo_pelo_nome(genai, tmp_path):
+    a = _audio(tmp_path, "a.mp3", b"x" * 5000)
+    asyncio.run(gemini.obter_arquivo_audio(a))
+    gemini._arquivos.clear()  # "reinício": cache em memória perdido
+
+    asyncio.run(gemini.obter_arquivo_audio(a))
+    assert len(genai.uploads) == 1
+
+
+def test_upload_perto_de_expirar_e_refeito(genai, tmp_path):
+    a = _audio(tmp_path, "a.mp3", b"y" * 5000)
+    ref = asyncio.run(gemini.obter_arquivo_audio(a))
+    ref.expiration_time = datetime.now(timezone.utc) + timedelta(minutes=5)
+    gemini._arquivos.clear()
+
+    novo = asyncio.run(gemini.obter_arquivo_audio(a))
+    assert genai.deletes == [ref.name]
+    assert len(genai.uploads) == 2
+    assert novo is not ref
+
+
+class NotFound(Exception):
+    """Mesmo nome da exceção do google.api_core para arquivo inexistente."""
+
+
+def test_arquivo_descartado_pelo_gemini_e_reenviado_uma_vez(genai, tmp_path):
+    a = _audio(tmp_path, "a.mp3", b"z" * 5000)
+    chamadas = []
+
+    class _Modelo:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def generate_content(self, partes):
+            arquivo = partes[0]
+            chamadas.append(arquivo)
+            if arquivo is morto:
+                raise NotFound(f"{arquivo.name} not found")
+            return SimpleNamespace(text='[{"index": 1, "start": "00:01,000", "end": "00:02,000", "text": "a"}]')
+
+    genai.GenerativeModel = _Modelo
+    genai.GenerationConfig = lambda **kw: kw
+
+    morto = asyncio.run(gemini.obter_arquivo_audio(a))
+    segmentos = asyncio.run(gemini.transcrever_guiado_completo(a, "a", "it", {}, audio_file_ref=morto))
+
+    assert len(segmentos) == 1
+    assert len(chamadas) == 2 and chamadas[1] is not morto
+    assert genai.deletes == [morto.name]
+    assert len(genai.uploads) == 2
+    # o handle novo ficou no cache para os próximos passes
+    assert asyncio.run(gemini.obter_arquivo_audio(a)) is chamadas[1]
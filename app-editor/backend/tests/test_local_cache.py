@@ -0,0 +1,124 @@
+"""Testes — LocalCache: despejo LRU, pinning e revalidação contra o R2."""
+import os
+
+import pytest
+
+from shared import storage_service
+from shared.local_cache import LocalCache
+from shared.storage_service import StorageService
+
+
+def _gravar(cache: LocalCache, key: str, tamanho: int, etag: str = None) -> str:
+    caminho = f"{cache.raiz}/{key}"
+    with open(caminho, "wb") as f:
+        f.write(b"x" * tamanho)
+    cache.registrar(key, caminho, etag)
+    return caminho
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LocalCache(str(tmp_path), max_bytes=30, validar_a_cada_sec=0)
+
+
+def test_reservar_despeja_o_menos_usado_primeiro(cache):
+    for key in ("a", "b", "c"):
+        _gravar(cache, key, 10)
+    cache.buscar("a")  # "a" volta a ser o mais recente; "b" vira o LRU
+
+    cache.reservar(10)
+
+    assert cache.buscar("b") is None
+    assert cache.buscar("a") is not None
+    assert cache.buscar("c") is not None
+
+
+def test_entrada_pinada_sobrevive_ao_reservar(cache):
+    for key in ("a", "b", "c"):
+        _gravar(cache, key, 10)
+
+    with cache.pinned("a"):
+        cache.reservar(10)
+        assert cache.buscar("a") is not None
+        assert cache.buscar("b") is None
+
+    cache.reservar(30)
+    assert cache.buscar("a") is None
+
+
+def test_pin_antes_do_download_e_levado_pelo_registrar(cache):
+    with cache.pinned("novo"):
+        _gravar(cache, "novo", 10)
+        _gravar(cache, "outro", 10)
+        cache.reservar(30)
+        assert cache.buscar("novo") is not None
+        assert cache.buscar("outro") is None
+    assert cache.stats()["arquivos"] == 1
+
+
+def test_lock_da_chave_nao_acumula_keys(cache):
+    with cache.lock_da_chave("a"):
+        with cache.lock_da_chave("b"):
+            assert set(cache._locks_chave) == {"a", "b"}
+    assert cache._locks_chave == {}
+
+
+class _StorageFalso(StorageService):
+    """R2 simulado: `head` configurável e downloads contados."""
+
+    def __init__(self, head):
+        self.head = head
+        self.downloads = 0
+
+    def _head(self, key):
+        return self.head
+
+    def _download(self, key, dest, head=None):
+        self.downloads += 1
+        with open(dest, "wb") as f:
+            f.write(b"y" * head["ContentLength"])
+        return dest
+
+
+@pytest.fixture
+def r2(monkeypatch, cache):
+    monkeypatch.setattr(storage_service, "_r2_configured", lambda: True)
+    monkeypatch.setattr(storage_service, "_cache", cache)
+    monkeypatch.setattr(storage_service, "_local_path_for_key", lambda key: f"{cache.raiz}/{key}")
+    return cache
+
+
+@pytest.mark.parametrize("head", [
+    {"ETag": '"v2"', "ContentLength": 10},
+    {"ETag": '"v1"', "ContentLength": 12},
+])
+def test_etag_ou_tamanho_diferente_baixa_de_novo(r2, head):
+    _gravar(r2, "video.mp4", 10, etag='"v1"')
+    storage = _StorageFalso(head)
+
+    caminho = storage.ensure_local("video.mp4")
+
+    assert storage.downloads == 1
+    assert r2.buscar("video.mp4").etag == head["ETag"]
+    with open(caminho, "rb") as f:
+        assert len(f.read()) == head["ContentLength"]
+
+
+def test_copia_valida_nao_baixa_de_novo(r2):
+    _gravar(r2, "video.mp4", 10, etag='"v1"')
+    storage = _StorageFalso({"ETag": '"v1"', "ContentLength": 10})
+
+    storage.ensure_local("video.mp4")
+
+    assert storage.downloads == 0
+
+
+def test_objeto_apagado_no_r2_despeja_a_copia_local(r2):
+    caminho = _gravar(r2, "video.mp4", 10, etag='"v1"')
+    storage = _StorageFalso(None)
+
+    with pytest.raises(FileNotFoundError):
+        storage.ensure_local("video.mp4")
+
+    assert r2.buscar("video.mp4") is None
+    assert not os.path.exists(caminho)
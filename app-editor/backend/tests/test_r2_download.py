@@ -0,0 +1,109 @@
+"""Testes — download retomável do R2 (shared/r2_transfer.py)."""
+import io
+import os
+
+import pytest
+from botocore.exceptions import ClientError, IncompleteReadError
+
+from shared import r2_transfer
+
+_CHUNK = 10
+
+
+class _CorpoQuebrado(io.BytesIO):
+    """Entrega metade da parte e cai, como uma conexão derrubada."""
+
+    def read(self, n=-1):
+        if self.tell():
+            raise IncompleteReadError(actual_bytes=self.tell(), expected_bytes=_CHUNK)
+        return super().read(_CHUNK // 2)
+
+
+class _R2Falso:
+    """head_object/get_object com Range e If-Match; `falhar` derruba partes uma vez."""
+
+    def __init__(self, dados: bytes, etag: str = '"v1"'):
+        self.dados = dados
+        self.etag = etag
+        self.falhar: set[int] = set()
+        self.ranges: list[int] = []
+
+    def head_object(self, **kw):
+        return {"ETag": self.etag, "ContentLength": len(self.dados)}
+
+    def get_object(self, Range, IfMatch=None, **kw):
+        if IfMatch and IfMatch != self.etag:
+            raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "GetObject")
+        ini, fim = (int(x) for x in Range.removeprefix("bytes=").split("-"))
+        parte = ini // _CHUNK
+        self.ranges.append(parte)
+        if parte in self.falhar:
+            self.falhar.discard(parte)
+            return {"Body": _CorpoQuebrado(self.dados[ini:fim + 1])}
+        return {"Body": io.BytesIO(self.dados[ini:fim + 1])}
+
+
+@pytest.fixture(autouse=True)
+def _partes_pequenas(monkeypatch):
+    # 1 "MB" = 10 bytes: 35 bytes viram 4 partes
+    monkeypatch.setattr(r2_transfer, "_MB", _CHUNK)
+    monkeypatch.setattr(r2_transfer, "R2_MULTIPART_CHUNK_MB", 1)
+    monkeypatch.setattr(r2_transfer, "R2_TRANSFER_CONCURRENCY", 1)
+
+
+@pytest.fixture
+def dest(tmp_path):
+    return str(tmp_path / "original.mp4")
+
+
+def _baixar(r2, dest):
+    return r2_transfer.download_retomavel(r2, "bucket", "original.mp4", dest)
+
+
+def _ler(caminho):
+    with open(caminho, "rb") as f:
+        return f.read()
+
+
+def test_queda_no_meio_retoma_so_as_partes_que_faltam(dest):
+    r2 = _R2Falso(bytes(range(35)))
+    r2.falhar = {2}
+
+    with pytest.raises(ConnectionError):
+        _baixar(r2, dest)
+    assert not os.path.exists(dest)
+    assert os.path.exists(dest + r2_transfer.SUFIXO_ESTADO)
+
+    r2.ranges.clear()
+    assert _baixar(r2, dest) == dest
+    assert r2.ranges == [2]
+    assert _ler(dest) == r2.dados
+    assert not os.path.exists(dest + r2_transfer.SUFIXO_PARCIAL)
+    assert not os.path.exists(dest + r2_transfer.SUFIXO_ESTADO)
+
+
+def test_etag_diferente_do_parcial_recomeca_do_zero(dest):
+    r2 = _R2Falso(bytes(range(35)))
+    r2.falhar = {2}
+    with pytest.raises(ConnectionError):
+        _baixar(r2, dest)
+
+    r2.dados, r2.etag = bytes(range(100, 135)), '"v2"'
+    r2.ranges.clear()
+    _baixar(r2, dest)
+
+    assert sorted(r2.ranges) == [0, 1, 2, 3]
+    assert _ler(dest) == r2.dados
+
+
+def test_objeto_muda_durante_o_download_descarta_o_progresso(dest):
+    r2 = _R2Falso(bytes(range(35)))
+    head_antigo = r2.head_object()
+    r2.dados, r2.etag = bytes(range(100, 135)), '"v2"'
+
+    with pytest.raises(ConnectionError, match="mudou"):
+        r2_transfer.download_retomavel(r2, "bucket", "original.mp4", dest, head_antigo)
+    assert not os.path.exists(dest + r2_transfer.SUFIXO_ESTADO)
+
+    _baixar(r2, dest)
+    assert _ler(dest) == r2.dados
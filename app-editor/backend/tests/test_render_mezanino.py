@@ -0,0 +1,111 @@
+"""Testes — render em duas etapas: mezanino do fundo comum e fallback para render direto."""
+import asyncio
+import os
+
+import pytest
+
+from app.routes import pipeline
+from app.services import ffmpeg_service
+from app.services.render_pool import render_pool
+
+_VF = "crop=if(gt(iw/ih\\,4/3)\\,ih*4/3\\,iw):ih,scale=1080:1920:force_original_aspect_ratio=decrease"
+
+
+class _ProcessoTravado:
+    """Subprocesso que nunca termina sozinho — só com kill()."""
+
+    def __init__(self):
+        self.returncode = None
+        self.morto = False
+
+    async def communicate(self):
+        await asyncio.sleep(3600)
+
+    def kill(self):
+        self.morto = True
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def processo(monkeypatch):
+    proc = _ProcessoTravado()
+
+    async def _criar(cmd, **kw):
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_shell", _criar)
+    return proc
+
+
+@pytest.fixture
+def storage_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(render_pool, "livre_mb", lambda: 100_000)
+    return tmp_path
+
+
+def test_timeout_mata_o_ffmpeg(processo):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(ffmpeg_service.run_ffmpeg("ffmpeg -i x y"), timeout=0.05))
+    assert processo.morto
+
+
+def test_cancelamento_mata_o_ffmpeg(processo):
+    async def _main():
+        task = asyncio.create_task(ffmpeg_service.run_ffmpeg("ffmpeg -i x y"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_main())
+    assert processo.morto
+
+
+def test_mezanino_aplica_janela_e_fundo_quase_sem_perdas(monkeypatch):
+    comandos = []
+
+    async def _run(cmd):
+        comandos.append(cmd)
+
+    monkeypatch.setattr(ffmpeg_service, "run_ffmpeg", _run)
+    asyncio.run(ffmpeg_service.gerar_mezanino("/v/original.mp4", "/r/mezanino.mkv", _VF, 12.5, 42.0, crf=10))
+
+    (cmd,) = comandos
+    assert cmd.startswith('ffmpeg -y -ss 12.5 -to 42.0 -i "/v/original.mp4" -avoid_negative_ts make_zero ')
+    assert f'-vf "{_VF}"' in cmd
+    assert "-c:v libx264 -preset veryfast -crf 10" in cmd
+    assert cmd.endswith('-c:a flac "/r/mezanino.mkv"')
+
+
+def test_mezanino_pronto_vira_entrada_dos_renders(monkeypatch, storage_tmp):
+    async def _gerar(local_video, output_path, vf, **kw):
+        with open(output_path, "wb") as f:
+            f.write(b"mkv")
+        return output_path
+
+    monkeypatch.setattr(ffmpeg_service, "gerar_mezanino", _gerar)
+    caminho = asyncio.run(pipeline._gerar_mezanino_render(7, "/v/original.mp4", _VF))
+
+    assert caminho == str(storage_tmp / "7" / "renders" / "mezanino.mkv")
+    assert os.path.exists(caminho)
+
+
+@pytest.mark.parametrize("falha", ["erro", "timeout"])
+def test_mezanino_falho_volta_para_render_direto(monkeypatch, storage_tmp, falha):
+    async def _gerar(local_video, output_path, vf, **kw):
+        with open(output_path, "wb") as f:
+            f.write(b"parcial")
+        if falha == "erro":
+            raise Exception("FFmpeg falhou: sem espaço")
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(ffmpeg_service, "gerar_mezanino", _gerar)
+    caminho = asyncio.run(pipeline._gerar_mezanino_render(7, "/v/original.mp4", _VF, timeout=0.05))
+
+    assert caminho is None
+    assert not (storage_tmp / "7" / "renders" / "mezanino.mkv").exists()
+    assert render_pool.status()["ativos"] == 0
@@ -0,0 +1,66 @@
+"""Testes — RenderPool: limite de processos e orçamento de disco."""
+import asyncio
+
+import pytest
+
+from app.services.render_pool import RenderPool, EspacoInsuficienteError
+
+
+def _pool(max_concorrencia: int, livre_mb: float, min_livre_mb: int = 200) -> RenderPool:
+    pool = RenderPool(max_concorrencia=max_concorrencia, min_livre_mb=min_livre_mb)
+    # Fixar concorrência independente dos núcleos da máquina de teste
+    pool.max_concorrencia = max_concorrencia
+    pool.livre_mb = lambda: livre_mb
+    return pool
+
+
+def _pico_concorrencia(pool: RenderPool, n_tarefas: int, estimativa_mb: float) -> int:
+    ativos = 0
+    pico = 0
+
+    async def _tarefa():
+        nonlocal ativos, pico
+        async with pool.reservar(estimativa_mb):
+            ativos += 1
+            pico = max(pico, ativos)
+            await asyncio.sleep(0.01)
+            ativos -= 1
+
+    async def _main():
+        await asyncio.gather(*(_tarefa() for _ in range(n_tarefas)))
+
+    asyncio.run(_main())
+    return pico
+
+
+def test_respeita_max_concorrencia():
+    pool = _pool(max_concorrencia=3, livre_mb=100_000)
+    assert _pico_concorrencia(pool, n_tarefas=7, estimativa_mb=100) == 3
+    assert pool.status()["ativos"] == 0
+    assert pool.status()["reservado_mb"] == 0
+
+
+def test_orcamento_de_disco_limita_concorrencia():
+    # 1000MB livres, mínimo 200, 300MB por render → 1000 - 2*300 = 400 ok, 1000 - 3*300 < 200
+    pool = _pool(max_concorrencia=4, livre_mb=1000)
+    assert _pico_concorrencia(pool, n_tarefas=5, estimativa_mb=300) == 2
+
+
+def test_sozinho_abaixo_do_minimo_chama_limpeza_e_falha():
+    pool = _pool(max_concorrencia=2, livre_mb=100)
+    chamadas = []
+
+    async def _main():
+        async with pool.reservar(50, liberar_disco=lambda: chamadas.append(1)):
+            pass
+
+    with pytest.raises(EspacoInsuficienteError):
+        asyncio.run(_main())
+    assert chamadas == [1]
+
+
+def test_threads_por_processo_divide_nucleos():
+    pool = RenderPool(max_concorrencia=1)
+    assert pool.threads_por_processo() >= 1
+    assert pool.slots_para(0) == 1
+    assert pool.slots_para(10) == pool.max_concorrencia
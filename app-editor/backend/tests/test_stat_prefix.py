@@ -0,0 +1,122 @@
+"""Testes — StorageService.stat_prefix: listagem em cache, sub-prefixos e invalidação."""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from shared import storage_service
+from shared.local_cache import LocalCache
+from shared.storage_service import StorageService
+
+_BASE = "ReelsClassics/Pavarotti - Nessun Dorma/"
+
+
+class _S3Falso:
+    """list_objects_v2 (paginado), upload_file/head_object e delete_object sobre um dict."""
+
+    def __init__(self, keys):
+        self.objetos = {k: b"x" for k in keys}
+        self.listagens = 0
+
+    def get_paginator(self, nome):
+        assert nome == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        self.listagens += 1
+        agora = datetime.datetime(2026, 1, 1)
+        yield {"Contents": [
+            {"Key": k, "Size": len(v), "ETag": '"e"', "LastModified": agora}
+            for k, v in sorted(self.objetos.items()) if k.startswith(Prefix)
+        ]}
+
+    def upload_file(self, local_path, bucket, key, **kw):
+        with open(local_path, "rb") as f:
+            self.objetos[key] = f.read()
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": '"e"', "ContentLength": len(self.objetos[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objetos.pop(Key, None)
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(storage_service, "time", SimpleNamespace(monotonic=lambda: agora[0]))
+    return agora
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path, relogio):
+    cliente = _S3Falso([f"{_BASE}video/original.mp4", f"{_BASE}en/render.mp4", f"{_BASE}pt/render.mp4"])
+    monkeypatch.setattr(storage_service, "_r2_configured", lambda: True)
+    monkeypatch.setattr(storage_service, "_get_s3_client", lambda: cliente)
+    monkeypatch.setattr(storage_service, "_stat_cache", {})
+    monkeypatch.setattr(storage_service, "_cache", LocalCache(str(tmp_path / "cache"), 10**9))
+    monkeypatch.setattr(storage_service, "_local_path_for_key", lambda key: str(tmp_path / "cache" / key))
+    return cliente
+
+
+def test_listagem_fica_em_cache_ate_expirar(s3, relogio):
+    storage = StorageService()
+    primeira = storage.stat_prefix(_BASE, max_age=30)
+    relogio[0] += 29
+    assert storage.stat_prefix(_BASE, max_age=30) == primeira
+    assert s3.listagens == 1
+
+    relogio[0] += 2
+    storage.stat_prefix(_BASE, max_age=30)
+    assert s3.listagens == 2
+
+
+def test_sub_prefixo_e_atendido_pela_listagem_do_pai(s3):
+    storage = StorageService()
+    storage.stat_prefix(_BASE)
+
+    en = storage.stat_prefix(f"{_BASE}en/")
+
+    assert list(en) == [f"{_BASE}en/render.mp4"]
+    assert s3.listagens == 1
+
+
+def test_max_age_zero_sempre_lista(s3):
+    storage = StorageService()
+    storage.stat_prefix(_BASE)
+    storage.stat_prefix(_BASE, max_age=0)
+    assert s3.listagens == 2
+
+
+def test_upload_invalida_a_listagem_do_prefixo(s3, tmp_path):
+    storage = StorageService()
+    storage.stat_prefix(_BASE)
+    local = tmp_path / "post.json"
+    local.write_text("{}")
+
+    storage.upload_file(str(local), f"{_BASE}en/post.json")
+
+    assert f"{_BASE}en/post.json" in storage.stat_prefix(f"{_BASE}en/")
+    assert s3.listagens == 2
+
+
+def test_delete_invalida_a_listagem_do_prefixo(s3):
+    storage = StorageService()
+    storage.stat_prefix(_BASE)
+
+    assert storage.delete(f"{_BASE}pt/render.mp4")
+
+    assert f"{_BASE}pt/render.mp4" not in storage.stat_prefix(_BASE)
+    assert s3.listagens == 2
+
+
+def test_escrita_em_outro_projeto_nao_invalida(s3, tmp_path):
+    storage = StorageService()
+    storage.stat_prefix(_BASE)
+    local = tmp_path / "post.json"
+    local.write_text("{}")
+
+    storage.upload_file(str(local), "ReelsClassics/Callas - Casta Diva/en/post.json")
+
+    storage.stat_prefix(_BASE)
+    assert s3.listagens == 1
@@ -0,0 +1,220 @@
+"""Testes — worker com faixas e fila persistente (editor_jobs)."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, false, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import database, worker
+from app.database import Base
+from app.models import Edicao, Job
+
+
+@pytest.fixture
+def fila(monkeypatch):
+    """Banco novo e estado do worker limpo por teste."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+    monkeypatch.setattr(worker, "LANES", {"cpu": 1, "rede": 2, "io": 1})
+    # asyncio.Event fica preso ao loop do primeiro uso
+    monkeypatch.setattr(worker, "_acordar", {lane: asyncio.Event() for lane in worker.LANES})
+    monkeypatch.setattr(worker, "_running", {})
+    monkeypatch.setattr(worker, "_tasks", {})
+    monkeypatch.setattr(worker, "JOB_POLL_SEC", 0.02)
+    with Session() as db:
+        for eid in range(1, 10):
+            db.add(Edicao(id=eid, artista="A", musica=f"M{eid}", idioma="it", status="renderizando"))
+        db.commit()
+    yield Session
+    engine.dispose()
+
+
+def _rodar(tarefas: list, timeout: float = 2.0):
+    """Enfileira (func, edicao_id, lane) e roda o worker até não restar job ativo."""
+    async def _main():
+        for func, eid, lane in tarefas:
+            worker.enqueue(func, eid, lane)
+        loop_task = asyncio.create_task(worker.worker_loop())
+
+        async def _esvaziar():
+            while True:
+                with database.SessionLocal() as db:
+                    ativos = db.query(Job).filter(Job.status.in_(["pendente", "executando"])).count()
+                if not ativos:
+                    return
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(_esvaziar(), timeout)
+        loop_task.cancel()
+        try:
+            await loop_task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_main())
+
+
+def _task(nome: str, eventos: list, duracao: float = 0.05):
+    async def _f(edicao_id: int, **params):
+        eventos.append(("inicio", nome, edicao_id))
+        await asyncio.sleep(duracao)
+        eventos.append(("fim", nome, edicao_id))
+    _f.__name__ = nome
+    return _f
+
+
+def test_faixas_diferentes_rodam_em_paralelo(fila):
+    eventos = []
+    render = _task("_render_task", eventos, duracao=0.2)
+    transcricao = _task("_transcricao_task", eventos, duracao=0.01)
+    _rodar([(render, 1, None), (transcricao, 2, None)])
+    # A transcrição (rede) termina antes do render (cpu) acabar
+    assert eventos.index(("fim", "_transcricao_task", 2)) < eventos.index(("fim", "_render_task", 1))
+
+
+def test_mesma_edicao_nunca_roda_em_paralelo(fila):
+    eventos = []
+    render = _task("_render_task", eventos, duracao=0.1)
+    pacote = _task("_pacote_task", eventos, duracao=0.01)
+    _rodar([(render, 7, None), (pacote, 7, None)])
+    assert eventos == [
+        ("inicio", "_render_task", 7), ("fim", "_render_task", 7),
+        ("inicio", "_pacote_task", 7), ("fim", "_pacote_task", 7),
+    ]
+    with fila() as db:
+        assert {j.status for j in db.query(Job).all()} == {"concluido"}
+
+
+def test_claim_concorrente_da_mesma_edicao_e_rejeitado_pelo_banco(fila, monkeypatch):
+    async def _render_task(edicao_id: int):
+        pass
+
+    async def _traducao_task(edicao_id: int):
+        pass
+
+    worker.enqueue(_render_task, 1)
+    worker.enqueue(_traducao_task, 1)
+    worker.enqueue(_traducao_task, 2)
+    assert worker._reivindicar_job("cpu")[1] == 1
+
+    # Outro container: travou o job de rede da edição 1 antes de ver o claim acima
+    monkeypatch.setattr(worker, "_edicoes_ocupadas", lambda: select(Job.edicao_id).where(false()))
+    job_id, edicao_id, tipo, _ = worker._reivindicar_job("rede")
+
+    assert (edicao_id, tipo) == (2, "_traducao_task")
+    with fila() as db:
+        executando = db.query(Job).filter(Job.status == "executando").all()
+        assert sorted(j.edicao_id for j in executando) == [1, 2]
+        pendente = db.query(Job).filter(Job.status == "pendente").one()
+        assert (pendente.edicao_id, pendente.tentativas) == (1, 0)
+
+
+def test_limite_por_faixa(fila):
+    eventos = []
+    renders = [_task("_render_task", eventos, duracao=0.02) for _ in range(3)]
+    _rodar([(r, i + 1, None) for i, r in enumerate(renders)])
+    # cpu tem 1 slot: cada render começa só depois do anterior terminar
+    tipos = [e[0] for e in eventos]
+    assert tipos == ["inicio", "fim"] * 3
+
+
+def test_params_sao_repassados_para_a_task(fila):
+    recebidos = []
+
+    async def _render_task(edicao_id: int, idiomas_renderizar=None, is_preview=False):
+        recebidos.append((edicao_id, idiomas_renderizar, is_preview))
+
+    worker.enqueue(_render_task, 3, idiomas_renderizar=["pt"], is_preview=True)
+    _rodar([])
+    assert recebidos == [(3, ["pt"], True)]
+
+
+def test_enqueue_safe_rejeita_duplicata(fila):
+    async def _render_task(edicao_id: int):
+        pass
+    assert worker.enqueue_safe(_render_task, 5) is True
+    assert worker.enqueue_safe(_render_task, 5) is False
+    assert worker.queue_size() == 1
+    assert worker.cancelar_jobs_pendentes(5) == 1
+    assert worker.queue_size() == 0
+    assert worker.enqueue_safe(_render_task, 5) is True
+
+
+def test_lease_expirado_volta_para_fila(fila):
+    async def _render_task(edicao_id: int):
+        pass
+    async def _transcricao_task(edicao_id: int):
+        pass
+    worker.enqueue(_render_task, 1)
+    worker.enqueue(_transcricao_task, 2)
+    assert worker._reivindicar_job("cpu")[1] == 1
+    assert worker._reivindicar_job("rede")[1] == 2
+
+    with fila() as db:
+        # Worker "morreu": lease vencido, sem heartbeat; edição marcada erro por outro caminho
+        for job in db.query(Job).all():
+            job.lease_expira = worker._agora() - timedelta(seconds=1)
+        db.get(Edicao, 1).status = "erro"
+        db.commit()
+
+    assert worker.recuperar_jobs_expirados() == 2
+    with fila() as db:
+        render = db.query(Job).filter(Job.edicao_id == 1).one()
+        transcricao = db.query(Job).filter(Job.edicao_id == 2).one()
+        # Render é retomável: volta para a fila e a edição volta ao status do enqueue
+        assert render.status == "pendente"
+        assert db.get(Edicao, 1).status == "renderizando"
+        # Transcrição não é retomada automaticamente
+        assert transcricao.status == "erro"
+        assert db.get(Edicao, 2).status == "erro"
+
+
+def test_lease_expirado_com_heartbeat_recente_e_estendido(fila):
+    async def _render_task(edicao_id: int):
+        pass
+    worker.enqueue(_render_task, 4)
+    worker._reivindicar_job("cpu")
+    with fila() as db:
+        db.query(Job).one().lease_expira = worker._agora() - timedelta(seconds=1)
+        db.get(Edicao, 4).task_heartbeat = worker._agora()
+        db.commit()
+
+    assert worker.recuperar_jobs_expirados() == 0
+    with fila() as db:
+        job = db.query(Job).one()
+        assert job.status == "executando"
+        assert job.lease_expira > worker._agora()
+
+
+def test_startup_retoma_jobs_do_mesmo_host(fila, monkeypatch):
+    async def _render_task(edicao_id: int):
+        pass
+    worker.enqueue(_render_task, 6)
+    worker._reivindicar_job("cpu")
+    # Novo processo no mesmo host
+    host = worker.WORKER_ID.split(":", 1)[0]
+    monkeypatch.setattr(worker, "WORKER_ID", f"{host}:novo")
+
+    worker.requeue_stale_tasks()
+    with fila() as db:
+        assert db.query(Job).one().status == "pendente"
+        assert db.get(Edicao, 6).status == "renderizando"
+        # Edições ativas sem job na fila continuam indo para erro
+        assert db.get(Edicao, 8).status == "erro"
+
+
+def test_lane_da_task():
+    async def _pacote_task(_eid):
+        pass
+
+    async def _wrapper(_eid):
+        pass
+
+    assert worker.lane_da_task(_pacote_task) == "io"
+    assert worker.lane_da_task(_wrapper) == "cpu"
@@ -0,0 +1,121 @@
+"""Testes — ZIP em streaming do pacote (shared/r2_transfer.py)."""
+import io
+import zipfile
+
+from shared import r2_transfer
+
+
+class _SoEscrita:
+    """Stream sem seek, como o multipart upload."""
+
+    def __init__(self):
+        self.buf = io.BytesIO()
+
+    def write(self, dados):
+        return self.buf.write(dados)
+
+    def flush(self):
+        pass
+
+
+class _ClienteFalso:
+    def __init__(self, falhar_parte: int = None):
+        self.partes = {}
+        self.completo = None
+        self.abortado = False
+        self.falhar_parte = falhar_parte
+
+    def create_multipart_upload(self, **kw):
+        return {"UploadId": "u1"}
+
+    def upload_part(self, PartNumber, Body, **kw):
+        if PartNumber == self.falhar_parte:
+            raise ValueError(f"parte {PartNumber} rejeitada")
+        self.partes[PartNumber] = Body
+        return {"ETag": f'"p{PartNumber}"'}
+
+    def complete_multipart_upload(self, MultipartUpload, **kw):
+        self.completo = b"".join(self.partes[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, **kw):
+        self.abortado = True
+
+    def head_object(self, **kw):
+        return {"ContentLength": len(self.completo)}
+
+
+def _fontes(objetos: dict):
+    def abrir(key):
+        if key not in objetos:
+            return None
+        dados = objetos[key]
+        return len(dados), (dados[i:i + 7] for i in range(0, len(dados), 7))
+    return abrir
+
+
+def test_zip_streaming_midia_stored_texto_deflated_e_faltando_pulado():
+    objetos = {"r/pt.mp4": bytes(range(256)) * 40, "t/post.txt": b"ola " * 500}
+    destino = _SoEscrita()
+    resultado = r2_transfer.escrever_zip_streaming(
+        destino,
+        [("S/pt/v.mp4", "r/pt.mp4"), ("S/pt/subtitles.srt", "t/nao-existe"), ("S/pt/post.txt", "t/post.txt")],
+        _fontes(objetos), prefetch=2,
+    )
+    assert resultado["incluidos"] == ["S/pt/v.mp4", "S/pt/post.txt"]
+    assert resultado["faltando"] == ["t/nao-existe"]
+
+    zf = zipfile.ZipFile(io.BytesIO(destino.buf.getvalue()))
+    assert zf.read("S/pt/v.mp4") == objetos["r/pt.mp4"]
+    assert zf.read("S/pt/post.txt") == objetos["t/post.txt"]
+    assert zf.getinfo("S/pt/v.mp4").compress_type == zipfile.ZIP_STORED
+    assert zf.getinfo("S/pt/post.txt").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_zip_streaming_erro_na_fonte_propaga():
+    def abrir(key):
+        def _blocos():
+            yield b"abc"
+            raise ConnectionError("queda")
+        return 10, _blocos()
+
+    try:
+        r2_transfer.escrever_zip_streaming(_SoEscrita(), [("a.mp4", "k")], abrir)
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("erro da fonte deveria propagar")
+
+
+def test_multipart_writer_divide_em_partes(monkeypatch):
+    monkeypatch.setattr(r2_transfer.MultipartUploadWriter, "_PARTE_MINIMA", 10)
+    monkeypatch.setattr(r2_transfer, "R2_MULTIPART_CHUNK_MB", 0)
+    cliente = _ClienteFalso()
+    with r2_transfer.MultipartUploadWriter(cliente, "b", "k.zip") as w:
+        for _ in range(5):
+            w.write(b"0123456")
+    assert cliente.completo == b"0123456" * 5
+    assert len(cliente.partes) == 4
+
+    cliente = _ClienteFalso()
+    try:
+        with r2_transfer.MultipartUploadWriter(cliente, "b", "k.zip") as w:
+            w.write(b"x" * 25)
+            raise RuntimeError("falhou no meio")
+    except RuntimeError:
+        pass
+    assert cliente.abortado and cliente.completo is None
+
+
+def test_multipart_writer_falha_de_parte_no_close_aborta(monkeypatch):
+    monkeypatch.setattr(r2_transfer.MultipartUploadWriter, "_PARTE_MINIMA", 10)
+    monkeypatch.setattr(r2_transfer, "R2_MULTIPART_CHUNK_MB", 0)
+    # Última parte (subida só no close, na saída limpa do with) falha
+    cliente = _ClienteFalso(falhar_parte=3)
+    try:
+        with r2_transfer.MultipartUploadWriter(cliente, "b", "k.zip") as w:
+            w.write(b"x" * 25)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("falha da parte deveria propagar")
+    assert cliente.abortado and cliente.completo is None
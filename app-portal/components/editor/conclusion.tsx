@@ -559,6 +559,7 @@ export function EditorConclusion({ edicaoId }: { edicaoId: number }) {
   const isPreview = edicao.status === "preview"
   const isRevisao = edicao.status === "revisao"
   const sistemaBloqueado = !!(filaStatus?.ocupado && filaStatus.edicao_id !== edicaoId)
+  const slotDaEdicao = filaStatus?.slots?.find(s => s.edicao_id === edicaoId)
 
   const isErro = edicao.status === "erro"
   const isMontagem = edicao.status === "montagem"
@@ -717,12 +718,12 @@ export function EditorConclusion({ edicaoId }: { edicaoId: number }) {
       )}
 
       {/* Granular progress / current edicao being processed */}
-      {isProcessing && filaStatus?.ocupado && filaStatus.edicao_id === edicaoId && (
+      {isProcessing && (slotDaEdicao || (filaStatus?.ocupado && filaStatus.edicao_id === edicaoId)) && (
         <div className="bg-blue-50 border border-blue-200 rounded-lg px-4 py-2 mb-4 text-sm text-blue-700 flex items-center gap-2">
           <RefreshCw className="h-3.5 w-3.5 animate-spin flex-shrink-0" />
           {formatProgresso(getProgresso(edicao.progresso_detalhe, edicao.status === "traducao" ? "traducao" : "render"))
-            ?? formatProgresso(getProgresso(filaStatus.progresso, filaStatus.etapa === "traducao" ? "traducao" : "render"))
-            ?? `Processando: ${filaStatus.etapa ?? edicao.status}…`}
+            ?? formatProgresso(getProgresso(slotDaEdicao?.progresso ?? filaStatus?.progresso ?? null, (slotDaEdicao?.etapa ?? filaStatus?.etapa) === "traducao" ? "traducao" : "render"))
+            ?? `Processando: ${slotDaEdicao?.etapa ?? filaStatus?.etapa ?? edicao.status}…`}
         </div>
       )}
 
@@ -125,7 +125,7 @@ export function RedatorApproveHooksRC({ projectId }: { projectId: number }) {
     setRegenerating(true)
     setError("")
     try {
-      await redatorApi.generateHooksRC(projectId)
+      await redatorApi.generateHooksRC(projectId, true)
       const p = await redatorApi.getProject(projectId)
       setProject(p)
     } catch (e: any) {
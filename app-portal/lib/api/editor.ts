@@ -106,11 +106,28 @@ export interface ProgressoDetalheInner {
  */
 export type ProgressoDetalhe = Record<string, ProgressoDetalheInner> | ProgressoDetalheInner | null
 
+export interface FilaSlot {
+  slot: string
+  lane: string
+  edicao_id: number
+  task: string
+  etapa: string | null
+  progresso: ProgressoDetalhe
+}
+
+export interface FilaLane {
+  limite: number
+  executando: number
+  na_fila: number
+}
+
 export interface FilaStatus {
   ocupado: boolean
   edicao_id: number | null
   etapa: string | null
   progresso: ProgressoDetalhe
+  slots?: FilaSlot[]
+  filas?: Record<string, FilaLane>
 }
 
 export interface PacoteStatus {
@@ -1,4 +1,4 @@
-import { request, requestFormData, API_URLS } from "./base"
+import { request, requestFormData, API_URLS, ApiError } from "./base"
 
 function BASE() { return API_URLS.redator + "/api" }
 
@@ -46,6 +46,33 @@ export interface OverlayAudit {
   }
 }
 
+/** Job em background do redator (generate, automation RC, translate). */
+export interface RedatorJob {
+  job_id: string
+  project_id: number
+  tipo: string
+  status: "pendente" | "executando" | "concluido" | "erro"
+  etapa: string | null
+  etapas: { etapa: string; duracao_sec: number }[]
+  resultado: any
+  erro: string | null
+  http_status: number | null
+}
+
+const JOB_POLL_MS = 2000
+
+/** Acompanha GET /api/jobs/{id} até o fim; devolve o resultado ou lança o erro do job. */
+async function aguardarJob<T>(job: RedatorJob, onProgresso?: (job: RedatorJob) => void): Promise<T> {
+  onProgresso?.(job)
+  while (job.status !== "concluido" && job.status !== "erro") {
+    await new Promise(r => setTimeout(r, JOB_POLL_MS))
+    job = await request<RedatorJob>(`${BASE()}/jobs/${job.job_id}`)
+    onProgresso?.(job)
+  }
+  if (job.status === "erro") throw new ApiError(job.http_status || 500, job.erro || "Job failed")
+  return job.resultado as T
+}
+
 export interface Project {
   id: number
   created_at: string
@@ -189,25 +216,28 @@ export const redatorApi = {
   updateProject: (id: number, data: Record<string, string>) =>
     request<Project>(`${BASE()}/projects/${id}`, { method: "PUT", body: JSON.stringify(data) }),
 
-  generate: (id: number) =>
-    request<Project>(`${BASE()}/projects/${id}/generate`, { method: "POST", timeout: 90000 }),
+  generate: async (id: number, onProgresso?: (job: RedatorJob) => void) =>
+    aguardarJob<Project>(
+      await request<RedatorJob>(`${BASE()}/projects/${id}/generate`, { method: "POST" }),
+      onProgresso,
+    ),
   regenerateOverlay: (id: number, customPrompt?: string) =>
     request<Project>(`${BASE()}/projects/${id}/regenerate-overlay`, {
       method: "POST",
       timeout: 90000,
-      body: JSON.stringify({ custom_prompt: customPrompt || null }),
+      body: JSON.stringify({ custom_prompt: customPrompt || null, forcar_nova: true }),
     }),
   regeneratePost: (id: number, customPrompt?: string) =>
     request<Project>(`${BASE()}/projects/${id}/regenerate-post`, {
       method: "POST",
       timeout: 90000,
-      body: JSON.stringify({ custom_prompt: customPrompt || null }),
+      body: JSON.stringify({ custom_prompt: customPrompt || null, forcar_nova: true }),
     }),
   regenerateYoutube: (id: number, customPrompt?: string) =>
     request<Project>(`${BASE()}/projects/${id}/regenerate-youtube`, {
       method: "POST",
       timeout: 90000,
-      body: JSON.stringify({ custom_prompt: customPrompt || null }),
+      body: JSON.stringify({ custom_prompt: customPrompt || null, forcar_nova: true }),
     }),
 
   regenerateOverlayEntry: (id: number, entryIndex: number, data: { instruction?: string; brand_slug?: string }) =>
@@ -233,14 +263,14 @@ export const redatorApi = {
     }),
 
   // BO research
-  generateResearchBO: (id: number) =>
-    request<Record<string, any>>(`${BASE()}/projects/${id}/generate-research-bo`, { method: "POST", timeout: 180000 }),
+  generateResearchBO: (id: number, forcarNova = false) =>
+    request<Record<string, any>>(`${BASE()}/projects/${id}/generate-research-bo${forcarNova ? "?forcar_nova=true" : ""}`, { method: "POST", timeout: 180000 }),
 
   // RC (Reels Classics) endpoints
   generateResearchRC: (id: number) =>
     request<Record<string, any>>(`${BASE()}/projects/${id}/generate-research-rc`, { method: "POST", timeout: 180000 }),
-  generateHooksRC: (id: number) =>
-    request<Record<string, any>>(`${BASE()}/projects/${id}/generate-hooks-rc`, { method: "POST", timeout: 120000 }),
+  generateHooksRC: (id: number, forcarNova = false) =>
+    request<Record<string, any>>(`${BASE()}/projects/${id}/generate-hooks-rc${forcarNova ? "?forcar_nova=true" : ""}`, { method: "POST", timeout: 120000 }),
   selectHook: (id: number, body: { hook_index?: number; custom_hook?: string }) =>
     request<Project>(`${BASE()}/projects/${id}/select-hook`, {
       method: "PUT",
@@ -250,13 +280,19 @@ export const redatorApi = {
     request<Record<string, any>>(`${BASE()}/projects/${id}/generate-overlay-rc`, { method: "POST", timeout: 120000 }),
   generatePostRC: (id: number) =>
     request<Record<string, any>>(`${BASE()}/projects/${id}/generate-post-rc`, { method: "POST", timeout: 120000 }),
-  generateAutomationRC: (id: number) =>
-    request<Record<string, any>>(`${BASE()}/projects/${id}/generate-automation-rc`, { method: "POST", timeout: 120000 }),
+  generateAutomationRC: async (id: number, onProgresso?: (job: RedatorJob) => void) =>
+    aguardarJob<Record<string, any>>(
+      await request<RedatorJob>(`${BASE()}/projects/${id}/generate-automation-rc`, { method: "POST" }),
+      onProgresso,
+    ),
   approveAutomation: (id: number) =>
     request<Project>(`${BASE()}/projects/${id}/approve-automation`, { method: "PUT" }),
 
-  translate: (id: number) =>
-    request<Project>(`${BASE()}/projects/${id}/translate`, { method: "POST", timeout: 180000 }),
+  translate: async (id: number, onProgresso?: (job: RedatorJob) => void) =>
+    aguardarJob<Project>(
+      await request<RedatorJob>(`${BASE()}/projects/${id}/translate`, { method: "POST" }),
+      onProgresso,
+    ),
   retranslate: (id: number, lang: string) =>
     request<ExportData>(`${BASE()}/projects/${id}/retranslate/${lang}`, { method: "POST", timeout: 60000 }),
   updateTranslation: (id: number, lang: string, data: Partial<ExportData>) =>
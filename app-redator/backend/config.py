@@ -30,6 +30,32 @@ BRAND_SLUG = os.getenv("BRAND_SLUG")  # sem default — None se não configurado
 PIPELINE_V2_ENABLED = os.getenv("PIPELINE_V2_ENABLED", "false").lower() == "true"
 USE_ANTHROPIC_WEB_SEARCH = os.getenv("USE_ANTHROPIC_WEB_SEARCH", "true").lower() == "true"
 
+# Prompt caching Anthropic: na tradução BO paralela, o 1º idioma escreve o
+# prefixo fixo no cache e os outros 5 saem este tanto depois para lê-lo
+# (a entrada só fica disponível quando a 1ª resposta começa). 0 desliga.
+PROMPT_CACHE_STAGGER_SEC = float(os.getenv("PROMPT_CACHE_STAGGER_SEC", "2.0"))
+
+# Governador Anthropic (backend/services/llm_gateway.py) — limites do processo
+# inteiro, somando todos os usuários. Ajustar ao tier da conta. Tokens contam
+# input não cacheado + output. Parte das vagas fica reservada ao interativo:
+# a tradução em lote usa no máximo LLM_MAX_CONCORRENTES - 2 threads.
+LLM_RPM = int(os.getenv("LLM_RPM", "50"))
+LLM_TPM = int(os.getenv("LLM_TPM", "100000"))
+LLM_MAX_CONCORRENTES = int(os.getenv("LLM_MAX_CONCORRENTES", "8"))
+
+# Cache de respostas LLM (backend/services/llm_cache.py), por hash de
+# modelo + temperatura + prompt completo. Etapas determinísticas (pesquisa,
+# detecção de metadados, temperatura 0) guardam por dias; gerações criativas
+# só pelo tempo de um duplo clique / retry após 503. 0 desliga a faixa.
+LLM_CACHE_ATIVO = os.getenv("LLM_CACHE_ATIVO", "true").lower() == "true"
+LLM_CACHE_TTL_DETERMINISTICO_SEC = int(os.getenv("LLM_CACHE_TTL_DETERMINISTICO_SEC", str(7 * 24 * 3600)))
+LLM_CACHE_TTL_CRIATIVO_SEC = int(os.getenv("LLM_CACHE_TTL_CRIATIVO_SEC", "120"))
+
+# Jobs em background (backend/services/jobs.py): generate, automation RC e
+# tradução rodam fora das threads de request. Cada job ocupa uma thread pelo
+# tempo da cadeia LLM inteira; o ritmo de chamadas continua no llm_gateway.
+REDATOR_JOBS_WORKERS = int(os.getenv("REDATOR_JOBS_WORKERS", "4"))
+
 _brand_config_cache: dict = {}
 _CACHE_TTL = 300
 
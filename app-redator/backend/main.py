@@ -19,7 +19,7 @@ if _SENTRY_DSN:
         attach_stacktrace=True,
         server_name="redator-backend",
     )
-from backend.routers import projects, generation, approval, translation, export, health, calendar
+from backend.routers import projects, generation, approval, translation, export, health, calendar, jobs
 
 Base.metadata.create_all(bind=engine)
 
@@ -119,9 +119,13 @@ _run_migrations()
 
 
 def _recover_stuck_projects():
-    """Marca projetos em status transitório como awaiting_approval no startup."""
+    """Marca projetos em status transitório como awaiting_approval no startup.
+
+    Jobs em background (redator_jobs) que estavam na fila ou rodando viram erro.
+    """
     from backend.database import SessionLocal
     from backend.models import Project
+    from backend.services.jobs import recuperar_orfaos
 
     db = SessionLocal()
     try:
@@ -141,6 +145,11 @@ def _recover_stuck_projects():
                 )
             db.commit()
             print(f"[RECOVERY] {len(stuck)} projetos recuperados no startup", flush=True)
+
+        orfaos = recuperar_orfaos(db)
+        if orfaos:
+            db.commit()
+            print(f"[RECOVERY] {orfaos} jobs interrompidos marcados como erro", flush=True)
     except Exception as e:
         print(f"[RECOVERY] Erro na recuperação: {e}", flush=True)
         db.rollback()
@@ -173,6 +182,7 @@ app.include_router(projects.router)     # catch-all /{project_id} depois
 app.include_router(generation.router)
 app.include_router(approval.router)
 app.include_router(translation.router)
+app.include_router(jobs.router)         # /api/jobs — prefix próprio
 app.include_router(health.router)
 
 # Serve frontend in production
@@ -117,3 +117,58 @@ class Translation(Base):
     stale_reason: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
 
     project: Mapped["Project"] = relationship(back_populates="translations")
+
+
+class MemoriaTraducao(Base):
+    """Memória de tradução do Google Translate: (texto, idioma) → tradução.
+
+    Hashtags, valores de crédito, instrumentos e tags se repetem entre
+    projetos — servidos daqui sem nova chamada. Chave = sha256(idioma, texto).
+    """
+    __tablename__ = "memoria_traducao"
+
+    chave: Mapped[str] = mapped_column(String(64), primary_key=True)
+    idioma: Mapped[str] = mapped_column(String(10))
+    texto: Mapped[str] = mapped_column(Text)
+    traducao: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+
+
+class RespostaLLMCache(Base):
+    """Resposta Anthropic cacheada por hash de (modelo, temperatura, prompt completo)."""
+    __tablename__ = "cache_respostas_llm"
+
+    chave: Mapped[str] = mapped_column(String(64), primary_key=True)
+    origem: Mapped[str] = mapped_column(String(50))
+    resposta: Mapped[dict] = mapped_column(JSON)  # {"textos": [...], "stop_reason": ...}
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+    expira_em: Mapped[datetime.datetime] = mapped_column(DateTime, index=True)
+
+
+class JobRedator(Base):
+    """Execução em background de generate / automation RC / tradução.
+
+    A rota valida, cria o job e responde 202 com o id; o cliente acompanha
+    por polling (GET /api/jobs/{id}) ou SSE (/api/jobs/{id}/eventos).
+    """
+    __tablename__ = "redator_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), index=True)
+    tipo: Mapped[str] = mapped_column(String(30))  # generate, automation_rc, translate
+    status: Mapped[str] = mapped_column(String(20), default="pendente")  # pendente, executando, concluido, erro
+    etapa: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    # [{"etapa": "post", "duracao_sec": 12.3}, ...] na ordem de execução
+    etapas: Mapped[list] = mapped_column(JSON, default=list)
+    resultado: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    erro: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    http_status: Mapped[Optional[int]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+    started_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
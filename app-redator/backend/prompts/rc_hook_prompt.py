@@ -26,54 +26,22 @@ def _build_rc_brand_section(brand_config: dict | None) -> str:
     if escopo:
         parts.append(f"ESCOPO: {escopo}")
     return f"""
-═══ DIRETRIZES DA MARCA (complementam as regras abaixo) ═══
+═══ DIRETRIZES DA MARCA (complementam as regras das instruções) ═══
 {chr(10).join(parts)}
 ═══════════════════════════════════════════════════════════════
 """
 
 
-def build_rc_hook_prompt(metadata: dict, research_data: dict, brand_config: dict | None = None) -> str:
-    """
-    Constrói o prompt de geração de ganchos RC.
-
-    metadata: dados básicos do vídeo
-    research_data: JSON retornado pelo rc_research_prompt
-    brand_config: configuração da marca (opcional, complementar)
-    """
-
-    artist = metadata.get("artist", "").strip()
-    work = metadata.get("work", "").strip()
-    composer = metadata.get("composer", "").strip()
-    instrument = metadata.get("instrument_formation", "").strip()
-
-    # Serializa research_data para injetar no prompt
-    import json
-    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
-
-    brand_section = _build_rc_brand_section(brand_config)
-
-    prompt = f"""<role>
+# Instruções fixas do prompt — iguais para todo vídeo. Vão no bloco system
+# com cache_control (prompt caching); diretrizes da marca, dados do vídeo e
+# pesquisa ficam no <context> e vão na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é um roteirista de vídeos curtos virais de música clássica. Sua única habilidade que importa agora: escrever a PRIMEIRA FRASE que aparece na tela — a frase que decide se 100% das pessoas vão embora ou se 30% param o scroll para assistir.
 
 Você sabe que um gancho funciona quando provoca uma REAÇÃO FÍSICA — o polegar para de mover. Isso não acontece com trivia ("1.8 bilhão de vezes por dia"). Acontece com EMOÇÃO ("Como algo tão sombrio pode ser tão bonito?").
 
 Você NÃO é um copywriter. Você NÃO vende nada. Você é alguém que encontra o ângulo de uma história que faz ser IMPOSSÍVEL não querer saber o resto.
 </role>
-{brand_section}
-<context>
-Canal: REELS CLASSICS — vídeos curtos de música clássica para leigos.
-Público: pessoas que nunca ouviram uma sinfonia. A primeira reação delas a um gancho decide tudo.
-Idioma: Português brasileiro, tom de conversa.
-
-DADOS DO VÍDEO:
-Compositor: {composer}
-Obra: {work}
-Intérprete: {artist}
-Instrumento/Formação: {instrument}
-
-PESQUISA PROFUNDA DISPONÍVEL:
-{research_json}
-</context>
 
 <task>
 Gere ganchos seguindo este processo OBRIGATÓRIO:
@@ -202,9 +170,9 @@ FORMATO TEXTUAL:
 Responda em JSON válido:
 
 ```json
-{{
+{
   "ganchos": [
-    {{
+    {
       "rank": 1,
       "texto": "",
       "linhas": 1 ou 2,
@@ -213,16 +181,16 @@ Responda em JSON válido:
       "fio_narrativo": "",
       "cadeia_base": "nome da cadeia de eventos da pesquisa que sustenta este gancho",
       "por_que_funciona": ""
-    }},
+    },
     ...
   ],
   "descartados_e_motivos": [
-    {{
+    {
       "texto": "",
       "motivo_descarte": ""
-    }}
+    }
   ]
-}}
+}
 ```
 
 OBRIGATÓRIO: Incluir 2-3 ganchos descartados com motivo. Isso demonstra que o filtro foi aplicado e ajuda o operador a entender o critério.
@@ -244,4 +212,59 @@ Antes de entregar, para CADA gancho selecionado, execute mentalmente:
 Se QUALQUER gancho falhar em QUALQUER teste, substituir antes de entregar.
 </self_check>"""
 
-    return prompt
+
+def build_rc_hook_prompt_partes(metadata: dict, research_data: dict, brand_config: dict | None = None) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_rc_hook_prompt`.
+    """
+
+    artist = metadata.get("artist", "").strip()
+    work = metadata.get("work", "").strip()
+    composer = metadata.get("composer", "").strip()
+    instrument = metadata.get("instrument_formation", "").strip()
+
+    # Serializa research_data para injetar no prompt
+    import json
+    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
+
+    brand_section = _build_rc_brand_section(brand_config)
+
+    contexto = f"""{brand_section}
+<context>
+Canal: REELS CLASSICS — vídeos curtos de música clássica para leigos.
+Público: pessoas que nunca ouviram uma sinfonia. A primeira reação delas a um gancho decide tudo.
+Idioma: Português brasileiro, tom de conversa.
+
+DADOS DO VÍDEO:
+Compositor: {composer}
+Obra: {work}
+Intérprete: {artist}
+Instrumento/Formação: {instrument}
+
+PESQUISA PROFUNDA DISPONÍVEL:
+{research_json}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_rc_hook_prompt(metadata: dict, research_data: dict, brand_config: dict | None = None) -> str:
+    """
+    Constrói o prompt de geração de ganchos RC.
+
+    metadata: dados básicos do vídeo
+    research_data: JSON retornado pelo rc_research_prompt
+    brand_config: configuração da marca (opcional, complementar)
+
+    Instruções fixas + <context>; o service usa `build_rc_hook_prompt_partes`
+    para mandar as instruções fixas como system cacheável.
+    """
+    estatico, dinamico = build_rc_hook_prompt_partes(
+        metadata=metadata, research_data=research_data, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
@@ -23,6 +23,9 @@ B. FIO NARRATIVO DINÂMICO — substitui regra de fio único rígido. Princípio
    nem diluir em vários fios, nem maçante em um só. Detectar esgotamento
    (2+ legendas sem avanço narrativo) e virar para fio complementar
    legítimo com ponte suave, OU manter fio principal se ainda rico.
+
+Instruções fixas separadas do <context> (`build_rc_overlay_prompt_partes`):
+o chamador manda as fixas como bloco system com cache_control.
 """
 
 
@@ -55,44 +58,10 @@ def _estimar_faixa_legendas(duracao_seg: int) -> tuple:
     return (min_legendas, max_legendas)
 
 
-def build_rc_overlay_prompt(
-    metadata: dict,
-    research_data: dict,
-    selected_hook: str,
-    hook_fio_narrativo: str = "",
-    hook_tipo: str = "",
-) -> str:
-    """
-    Constrói o prompt v3 de geração de overlay RC.
-
-    metadata: dados do vídeo
-    research_data: JSON do rc_research_prompt
-    selected_hook: texto do gancho aprovado
-    hook_fio_narrativo: fio narrativo do gancho (do hooks_json)
-    hook_tipo: tipo do ângulo (emocional|cultural|estrutural|específico)
-    """
-    composer = metadata.get("composer", "").strip()
-    work = metadata.get("work", "").strip()
-    artist = metadata.get("artist", "").strip()
-    instrument = metadata.get("instrument_formation", "").strip()
-    cut_start = metadata.get("cut_start", "00:00").strip()
-    cut_end = metadata.get("cut_end", "01:00").strip()
-
-    duracao = _calcular_duracao(cut_start, cut_end)
-    n_min, n_max = _estimar_faixa_legendas(duracao)
-    min_eventos = max(6, n_min - 2)
-
-    import json
-    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
-
-    fio_block = ""
-    if hook_fio_narrativo:
-        fio_block = f"\nFIO NARRATIVO DEFINIDO: {hook_fio_narrativo}"
-    tipo_block = ""
-    if hook_tipo:
-        tipo_block = f"\nTIPO DE ÂNGULO: {hook_tipo}"
-
-    prompt = f"""<role>
+# Instruções fixas do prompt v3.1 — iguais para todo vídeo. Vão no bloco
+# system com cache_control (prompt caching); dados do vídeo, gancho e
+# pesquisa ficam no <context> e vão na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é o roteirista do canal REELS CLASSICS. Escreve as legendas que aparecem sobre vídeos curtos de música clássica para leigos.
 
 Você NÃO escreve copy de Instagram. NÃO escreve narração de documentário. NÃO escreve poesia abstrata. Você escreve frases curtas e carregadas que funcionam como elos de uma cadeia narrativa sincronizada com o áudio do vídeo.
@@ -104,25 +73,7 @@ Equilíbrio: ~50% educativo (fatos, contexto, história) + ~50% emocional (arrep
 IMPORTANTE: você NÃO entrega a primeira versão que produz. Você produz 3 versões internas, julga as 3 contra a rubric, e reescreve a melhor. A primeira versão de qualquer modelo é estatisticamente a mais média. Três versões + autocrítica + reescrita é o único caminho para qualidade consistente.
 </role>
 
-<context>
-VÍDEO:
-Compositor: {composer}
-Obra: {work}
-Intérprete: {artist}
-Instrumento/Formação: {instrument}
-Duração do trecho: {duracao} segundos
-Faixa de quantidade de legendas: entre ~{n_min} e ~{n_max} narrativas (excluindo CTA fixo)
-  — Esta faixa é REFERÊNCIA, não limite. A quantidade REAL emerge da
-  distribuição dinâmica: cada legenda dura 4-6s conforme peso textual.
-  Ver seção <duracao_dinamica> para a regra completa.
-
-GANCHO APROVADO (Legenda 1 — texto exato, não alterar):
-"{selected_hook}"
-{tipo_block}{fio_block}
-
-PESQUISA PROFUNDA:
-{research_json}
-
+<principios_fundadores>
 PRINCÍPIOS FUNDADORES (regem toda a geração):
 1. FILTRO DO SENTIR vs PROCESSAR — toda legenda provoca reação no corpo (<1s), não na cabeça
 2. EVENTOS ANTES DE ESTADOS — verbos de ação, não verbos de estado
@@ -133,7 +84,7 @@ PRINCÍPIOS FUNDADORES (regem toda a geração):
 7. ORALIDADE — vocabulário de sussurro, não de texto escrito
 8. CORTE DO EVIDENTE — se imagem/áudio comunica algo, o texto não repete
 9. DURAÇÃO DINÂMICA DE LEGENDAS — cada legenda dura 4-6s conforme peso textual e duração total do vídeo; não é divisão aritmética fixa. Ver seção <duracao_dinamica>.
-</context>
+</principios_fundadores>
 
 <duracao_dinamica>
 ═══ REGRA DE DURAÇÃO DINÂMICA (nova em v3.1) ═══
@@ -157,7 +108,7 @@ COMO APLICAR:
 4. Some as durações. Confira se encaixa na duração total do vídeo menos CTA
 5. Se não encaixa: a solução NÃO é forçar quantidade fixa; a solução é REBALANCEAR o peso textual das legendas (mais densas ou mais leves) OU ajustar quantidade para caber
 
-A faixa {n_min}-{n_max} no <context> é REFERÊNCIA para orientar quantidade aproximada. Pode ficar um pouco acima ou abaixo conforme a distribuição dinâmica. NÃO é limite rígido.
+A faixa de quantidade no <context> é REFERÊNCIA para orientar quantidade aproximada. Pode ficar um pouco acima ou abaixo conforme a distribuição dinâmica. NÃO é limite rígido.
 
 PROIBIDO:
 - Legenda com menos de 4s (espectador não lê)
@@ -227,7 +178,7 @@ O ponto ótimo: sentir progressão narrativa do início ao fim, sem patinação
 
 PASSO 1.1 — IDENTIFICAR O FIO PRINCIPAL E AVALIAR PROFUNDIDADE
 
-O gancho "{selected_hook}" define o FIO PRINCIPAL do overlay. Escreva internamente, em 1 frase, qual é esse fio.
+O gancho aprovado (Legenda 1 no <context>) define o FIO PRINCIPAL do overlay. Escreva internamente, em 1 frase, qual é esse fio.
 
 Em seguida, AVALIE a profundidade do fio principal contra a duração do vídeo:
 
@@ -253,7 +204,7 @@ E1 → E2 → E3 → E4 → ... → Fechamento
 
 REGRAS DO MAPA:
 - Cada evento usa verbo de ação (compôs, fugiu, encomendou, insistiu, confessou, recusou, quebrou, escondeu, convenceu-se)
-- Mínimo {min_eventos} eventos
+- Mínimo de eventos: o indicado no <context>
 - O gancho NÃO é E1 — é a PORTA para E1
 - O fechamento RETOMA ou RESPONDE a tensão do gancho
 
@@ -588,46 +539,46 @@ Por que falha:
 Responda em JSON válido (será processado pelo código que calcula timestamps deterministicamente):
 
 ```json
-{{
+{
   "fio_unico_identificado": "1 frase descrevendo o fio narrativo",
   "mapa_eventos_interno": "E1: verbo → E2: verbo → ... (para referência)",
   "pontes_planejadas": ["ponte 1: entre X e Y", "ponte 2: entre A e B"],
   "legendas": [
-    {{
+    {
       "numero": 1,
       "tipo": "gancho",
-      "texto": "{selected_hook}",
+      "texto": "<gancho aprovado — texto exato do <context>>",
       "linhas": 2,
       "evento_mapa": "—",
       "funcao": "Gancho aprovado pelo operador"
-    }},
-    {{
+    },
+    {
       "numero": 2,
       "tipo": "corpo",
       "texto": "",
       "linhas": 2,
       "evento_mapa": "E1",
       "funcao": "Construção — contexto temporal"
-    }},
+    },
     ...
-    {{
+    {
       "numero": N-1,
       "tipo": "fechamento",
       "texto": "",
       "linhas": 2,
       "evento_mapa": "—",
       "funcao": "Fechamento — retoma/responde gancho"
-    }},
-    {{
+    },
+    {
       "numero": N,
       "tipo": "cta",
       "texto": "Siga, o melhor da música clássica,\\ndiariamente no seu feed. ❤️",
       "linhas": 2,
       "evento_mapa": "—",
       "funcao": "CTA fixo"
-    }}
+    }
   ],
-  "verificacoes": {{
+  "verificacoes": {
     "total_legendas": 0,
     "fio_unico_respeitado": true,
     "pontes_causais_inseridas": ["legenda X liga A e B"],
@@ -639,14 +590,14 @@ Responda em JSON válido (será processado pelo código que calcula timestamps d
     "metaforas_sensoriais": 0,
     "travessoes": 0,
     "cortes_aplicados": [
-      {{
+      {
         "tipo": "fio_secundario | evidente | cena_generica | repeticao",
         "texto_candidato": "texto que seria legenda se não fosse cortado",
         "motivo": "explicação em 1 linha de por que foi cortado"
-      }}
+      }
     ]
-  }}
-}}
+  }
+}
 ```
 
 IMPORTANTE:
@@ -686,7 +637,7 @@ ANTES DE ENTREGAR O JSON, execute CADA verificação. Se qualquer uma falhar, CO
 
 12. VOCABULÁRIO BANIDO: alguma palavra da lista aparece?
 
-13. QUANTIDADE COERENTE: overlay tem entre ~{n_min} e ~{n_max} legendas narrativas (faixa referência)? Quantidade emergiu de distribuição dinâmica 4-6s por legenda, não de divisão fixa?
+13. QUANTIDADE COERENTE: overlay está dentro da faixa de legendas narrativas do <context> (faixa referência)? Quantidade emergiu de distribuição dinâmica 4-6s por legenda, não de divisão fixa?
 
 14. COERÊNCIA GLOBAL: lendo tudo em sequência, sente progressão narrativa sem patinar nem diluir?
 
@@ -695,4 +646,89 @@ ANTES DE ENTREGAR O JSON, execute CADA verificação. Se qualquer uma falhar, CO
 Se qualquer item falhar, corrigir ANTES de retornar JSON.
 </self_check>
 """
-    return prompt
+
+
+def build_rc_overlay_prompt_partes(
+    metadata: dict,
+    research_data: dict,
+    selected_hook: str,
+    hook_fio_narrativo: str = "",
+    hook_tipo: str = "",
+) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_rc_overlay_prompt`.
+    """
+    composer = metadata.get("composer", "").strip()
+    work = metadata.get("work", "").strip()
+    artist = metadata.get("artist", "").strip()
+    instrument = metadata.get("instrument_formation", "").strip()
+    cut_start = metadata.get("cut_start", "00:00").strip()
+    cut_end = metadata.get("cut_end", "01:00").strip()
+
+    duracao = _calcular_duracao(cut_start, cut_end)
+    n_min, n_max = _estimar_faixa_legendas(duracao)
+    min_eventos = max(6, n_min - 2)
+
+    import json
+    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
+
+    fio_block = ""
+    if hook_fio_narrativo:
+        fio_block = f"\nFIO NARRATIVO DEFINIDO: {hook_fio_narrativo}"
+    tipo_block = ""
+    if hook_tipo:
+        tipo_block = f"\nTIPO DE ÂNGULO: {hook_tipo}"
+
+    contexto = f"""<context>
+VÍDEO:
+Compositor: {composer}
+Obra: {work}
+Intérprete: {artist}
+Instrumento/Formação: {instrument}
+Duração do trecho: {duracao} segundos
+Faixa de quantidade de legendas: entre ~{n_min} e ~{n_max} narrativas (excluindo CTA fixo)
+  — Esta faixa é REFERÊNCIA, não limite. A quantidade REAL emerge da
+  distribuição dinâmica: cada legenda dura 4-6s conforme peso textual.
+  Ver seção <duracao_dinamica> para a regra completa.
+Mínimo de eventos no mapa de eventos (Fase 1): {min_eventos}
+
+GANCHO APROVADO (Legenda 1 — texto exato, não alterar):
+"{selected_hook}"
+{tipo_block}{fio_block}
+
+PESQUISA PROFUNDA:
+{research_json}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_rc_overlay_prompt(
+    metadata: dict,
+    research_data: dict,
+    selected_hook: str,
+    hook_fio_narrativo: str = "",
+    hook_tipo: str = "",
+) -> str:
+    """
+    Constrói o prompt v3 de geração de overlay RC.
+
+    metadata: dados do vídeo
+    research_data: JSON do rc_research_prompt
+    selected_hook: texto do gancho aprovado
+    hook_fio_narrativo: fio narrativo do gancho (do hooks_json)
+    hook_tipo: tipo do ângulo (emocional|cultural|estrutural|específico)
+
+    Instruções fixas + <context>; o service usa `build_rc_overlay_prompt_partes`
+    para mandar as instruções fixas como system cacheável.
+    """
+    estatico, dinamico = build_rc_overlay_prompt_partes(
+        metadata=metadata, research_data=research_data, selected_hook=selected_hook,
+        hook_fio_narrativo=hook_fio_narrativo, hook_tipo=hook_tipo,
+    )
+    return f"{estatico}\n\n{dinamico}"
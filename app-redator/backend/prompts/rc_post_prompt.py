@@ -19,80 +19,10 @@ MUDANÇAS v2 → v3:
 """
 
 
-def build_rc_post_prompt(
-    metadata: dict,
-    research_data: dict,
-    overlay_legendas: list,
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói o prompt v3 de geração de descrição RC.
-
-    metadata: dados básicos do vídeo
-    research_data: JSON do rc_research_prompt
-    overlay_legendas: lista de dicts com as legendas aprovadas do overlay
-    brand_config: configuração da marca (opcional, complementar)
-    """
-
-    artist = metadata.get("artist", "").strip()
-    work = metadata.get("work", "").strip()
-    composer = metadata.get("composer", "").strip()
-    instrument = metadata.get("instrument_formation", "").strip()
-    orchestra = metadata.get("orchestra", "").strip()
-    conductor = metadata.get("conductor", "").strip()
-    year = metadata.get("composition_year", "").strip()
-    album_opera = metadata.get("album_opera", "").strip()
-
-    import json
-    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
-
-    # Extrai textos do overlay para anti-repetição, ignorando CTA
-    overlay_textos = []
-    for leg in overlay_legendas or []:
-        if not isinstance(leg, dict):
-            continue
-        if leg.get("_is_cta"):
-            continue
-        texto = leg.get("texto", leg.get("text", ""))
-        tipo = leg.get("tipo", leg.get("type", "corpo"))
-        if tipo == "cta" or not texto:
-            continue
-        overlay_textos.append(texto)
-
-    overlay_resumo = "\n".join(
-        f"Legenda {i+1}: {t}" for i, t in enumerate(overlay_textos)
-    )
-
-    # Header contextual (informativo — não é template literal do prompt)
-    header_context = f"{composer} – {work}"
-    if year:
-        header_context += f" ({year})"
-    performer_line = f"{artist} – {instrument}"
-    if orchestra and conductor:
-        performer_line += f"\n{orchestra} – {conductor}"
-    elif orchestra:
-        performer_line += f"\n{orchestra}"
-
-    # Brand directives (complementares — preservado do v2 para isolamento multi-brand SPEC-009)
-    brand_section = ""
-    if brand_config:
-        bc_parts = []
-        for k, label in [
-            ("identity_prompt_redator", "IDENTIDADE"),
-            ("tom_de_voz_redator", "TOM DE VOZ"),
-            ("escopo_conteudo", "ESCOPO"),
-        ]:
-            v = brand_config.get(k, "")
-            if v:
-                bc_parts.append(f"{label}: {v}")
-        if bc_parts:
-            brand_section = (
-                "\n═══ DIRETRIZES DA MARCA (complementam as regras abaixo) ═══\n"
-                + "\n".join(bc_parts)
-                + "\n═══════════════════════════════════════════════════════════════\n"
-            )
-
-    prompt = f"""<role>
+# Instruções fixas do prompt — iguais para todo vídeo. Vão no bloco system
+# com cache_control (prompt caching); diretrizes da marca, dados do vídeo,
+# overlay e pesquisa ficam no <context> e vão na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é o redator-chefe do canal REELS CLASSICS. Escreve as descrições que acompanham os vídeos no Instagram.
 
 Seu trabalho NÃO é repetir o overlay. É COMPLEMENTAR. Quem lê a descrição JÁ assistiu o vídeo e JÁ viu o overlay. Você entrega profundidade que não coube em 12 legendas de 3 linhas.
@@ -101,31 +31,6 @@ Tom: íntimo, informado, apaixonado mas contido. Como alguém que acabou de assi
 
 Keywords de busca aparecem em prosa natural, não em lista forçada. O leitor não deve perceber que há keywords sendo trabalhadas — deve sentir história bem contada.
 </role>
-{brand_section}
-<context>
-A descrição é lida por quem parou para saber mais — já capturado pelo vídeo. Não compete pela atenção. RECOMPENSA quem decidiu ler.
-
-Princípios centrais:
-- Overlay e descrição contam a MESMA história de ÂNGULOS DIFERENTES — NUNCA repetem fato nem TEMA
-- "Tema" é mais amplo que "fato". Reformular fato com palavras diferentes TAMBÉM conta como repetição
-- Primeira frase de P1 é a ÚNICA visível no feed antes de "mais..." — deve ser forte o suficiente para o leitor expandir
-- Keywords primárias aparecem distribuídas em prosa natural, não concentradas em hashtags
-
-DADOS DO VÍDEO:
-Compositor: {composer}
-Obra: {work}
-Intérprete: {artist}
-Instrumento/Formação: {instrument}
-{"Orquestra: " + orchestra if orchestra else ""}
-{"Regente: " + conductor if conductor else ""}
-{"Parte de: " + album_opera if album_opera else ""}
-
-OVERLAY APROVADO (o espectador JÁ VIU estas legendas):
-{overlay_resumo}
-
-PESQUISA PROFUNDA:
-{research_json}
-</context>
 
 <estrutura>
 A descrição segue esta ordem fixa (montada pelo backend a partir do seu JSON):
@@ -176,9 +81,9 @@ Se o overlay usou o tema X, a descrição usa outros temas. Se o overlay contou
 ═══ PASSO 2 — IDENTIFICAR KEYWORDS PRIMÁRIAS E SECUNDÁRIAS ═══
 
 KEYWORDS PRIMÁRIAS (obrigatórias, aparecem em prosa natural dentro do corpo):
-- Nome do compositor ({composer})
-- Nome da peça ({work})
-- Instrumento ou formação ({instrument})
+- Nome do compositor (DADOS DO VÍDEO no <context>)
+- Nome da peça (DADOS DO VÍDEO no <context>)
+- Instrumento ou formação (DADOS DO VÍDEO no <context>)
 - "música clássica"
 
 KEYWORDS SECUNDÁRIAS (aparecem se couberem organicamente):
@@ -192,9 +97,11 @@ Keywords aparecem integradas ao texto — nunca forçadas, nunca destacadas, nun
 
 ═══ PASSO 3 — HEADER TÉCNICO (2-3 LINHAS) ═══
 
-Linha 1: [2 emojis temáticos] {composer} – {work}
-Linha 2: {artist} – {instrument} [emoji do instrumento]
-Linha 3 (opcional): {orchestra} – {conductor}
+Linha 1: [2 emojis temáticos] [Compositor] – [Obra]
+Linha 2: [Intérprete] – [Instrumento/Formação] [emoji do instrumento]
+Linha 3 (opcional): [Orquestra] – [Regente]
+
+(Valores entre colchetes: DADOS DO VÍDEO no <context>.)
 
 REGRAS DO HEADER:
 - Emojis ESPECÍFICOS (🎹🌙 Moonlight, ❄️🎻 Vivaldi Inverno, 🦢 Cisne de Saint-Saëns) — NUNCA genéricos (🎵🎶)
@@ -407,9 +314,9 @@ Por que falha: vocabulário banido (mergulhe, fascinante, obra-prima sem justifi
 Responda em JSON válido:
 
 ```json
-{{
-  "header_linha1": "[emojis] {composer} – {work}",
-  "header_linha2": "{artist} – {instrument} [emoji]",
+{
+  "header_linha1": "[emojis] [Compositor] – [Obra]",
+  "header_linha2": "[Intérprete] – [Instrumento/Formação] [emoji]",
   "header_linha3": "",
   "paragrafo1": "",
   "paragrafo2": "",
@@ -417,22 +324,22 @@ Responda em JSON válido:
   "save_cta": "",
   "follow_cta": "👉 Siga, o melhor da música clássica, diariamente no seu feed.",
   "hashtags": ["#...", "#...", "#...", "#..."],
-  "analise_keywords": {{
+  "analise_keywords": {
     "keywords_primarias_usadas": [
       "compositor: N vezes em prosa (fora do header)",
       "peca: N vezes em prosa",
       "instrumento: N vezes em prosa",
       "musica classica: N vezes em prosa"
     ]
-  }},
-  "anti_repeticao": {{
+  },
+  "anti_repeticao": {
     "fatos_overlay": ["lista de fatos que o overlay usou"],
     "temas_overlay": ["lista de temas amplos que o overlay tocou"],
     "fatos_descricao": ["lista de fatos novos usados na descrição"],
     "temas_descricao": ["lista de temas da descrição"],
     "algum_repetido": false
-  }}
-}}
+  }
+}
 ```
 
 O campo `anti_repeticao` é OBRIGATÓRIO. Se `algum_repetido=true`, reescrever ANTES de entregar.
@@ -476,4 +383,128 @@ ANTES DE ENTREGAR O JSON, execute cada verificação:
 Se qualquer item falhar, corrigir ANTES de retornar JSON.
 </self_check>"""
 
-    return prompt
+
+def build_rc_post_prompt_partes(
+    metadata: dict,
+    research_data: dict,
+    overlay_legendas: list,
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_rc_post_prompt`.
+    """
+
+    artist = metadata.get("artist", "").strip()
+    work = metadata.get("work", "").strip()
+    composer = metadata.get("composer", "").strip()
+    instrument = metadata.get("instrument_formation", "").strip()
+    orchestra = metadata.get("orchestra", "").strip()
+    conductor = metadata.get("conductor", "").strip()
+    year = metadata.get("composition_year", "").strip()
+    album_opera = metadata.get("album_opera", "").strip()
+
+    import json
+    research_json = json.dumps(research_data, ensure_ascii=False, indent=2)
+
+    # Extrai textos do overlay para anti-repetição, ignorando CTA
+    overlay_textos = []
+    for leg in overlay_legendas or []:
+        if not isinstance(leg, dict):
+            continue
+        if leg.get("_is_cta"):
+            continue
+        texto = leg.get("texto", leg.get("text", ""))
+        tipo = leg.get("tipo", leg.get("type", "corpo"))
+        if tipo == "cta" or not texto:
+            continue
+        overlay_textos.append(texto)
+
+    overlay_resumo = "\n".join(
+        f"Legenda {i+1}: {t}" for i, t in enumerate(overlay_textos)
+    )
+
+    # Header contextual (informativo — não é template literal do prompt)
+    header_context = f"{composer} – {work}"
+    if year:
+        header_context += f" ({year})"
+    performer_line = f"{artist} – {instrument}"
+    if orchestra and conductor:
+        performer_line += f"\n{orchestra} – {conductor}"
+    elif orchestra:
+        performer_line += f"\n{orchestra}"
+
+    # Brand directives (complementares — preservado do v2 para isolamento multi-brand SPEC-009)
+    brand_section = ""
+    if brand_config:
+        bc_parts = []
+        for k, label in [
+            ("identity_prompt_redator", "IDENTIDADE"),
+            ("tom_de_voz_redator", "TOM DE VOZ"),
+            ("escopo_conteudo", "ESCOPO"),
+        ]:
+            v = brand_config.get(k, "")
+            if v:
+                bc_parts.append(f"{label}: {v}")
+        if bc_parts:
+            brand_section = (
+                "\n═══ DIRETRIZES DA MARCA (complementam as regras das instruções) ═══\n"
+                + "\n".join(bc_parts)
+                + "\n═══════════════════════════════════════════════════════════════\n"
+            )
+
+    contexto = f"""{brand_section}
+<context>
+A descrição é lida por quem parou para saber mais — já capturado pelo vídeo. Não compete pela atenção. RECOMPENSA quem decidiu ler.
+
+Princípios centrais:
+- Overlay e descrição contam a MESMA história de ÂNGULOS DIFERENTES — NUNCA repetem fato nem TEMA
+- "Tema" é mais amplo que "fato". Reformular fato com palavras diferentes TAMBÉM conta como repetição
+- Primeira frase de P1 é a ÚNICA visível no feed antes de "mais..." — deve ser forte o suficiente para o leitor expandir
+- Keywords primárias aparecem distribuídas em prosa natural, não concentradas em hashtags
+
+DADOS DO VÍDEO:
+Compositor: {composer}
+Obra: {work}
+Intérprete: {artist}
+Instrumento/Formação: {instrument}
+{"Orquestra: " + orchestra if orchestra else ""}
+{"Regente: " + conductor if conductor else ""}
+{"Parte de: " + album_opera if album_opera else ""}
+
+OVERLAY APROVADO (o espectador JÁ VIU estas legendas):
+{overlay_resumo}
+
+PESQUISA PROFUNDA:
+{research_json}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_rc_post_prompt(
+    metadata: dict,
+    research_data: dict,
+    overlay_legendas: list,
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói o prompt v3 de geração de descrição RC.
+
+    metadata: dados básicos do vídeo
+    research_data: JSON do rc_research_prompt
+    overlay_legendas: lista de dicts com as legendas aprovadas do overlay
+    brand_config: configuração da marca (opcional, complementar)
+
+    Instruções fixas + <context>; o service usa `build_rc_post_prompt_partes`
+    para mandar as instruções fixas como system cacheável.
+    """
+    estatico, dinamico = build_rc_post_prompt_partes(
+        metadata=metadata, research_data=research_data,
+        overlay_legendas=overlay_legendas, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
@@ -1,6 +1,7 @@
 import base64
 import logging
 from fastapi import APIRouter, Depends, HTTPException, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -10,6 +11,8 @@ from backend.models import Project
 logger = logging.getLogger("rc_pipeline")
 from backend.schemas import ProjectOut, RegenerateRequest, DetectMetadataResponse, SelectHookRequest  # noqa: F401
 from backend.config import load_brand_config
+from backend.services import llm_cache
+from backend.services.jobs import Progresso, enfileirar, job_out
 from backend.services.claude_service import (
     generate_overlay, generate_post, generate_youtube, generate_hooks,
     generate_research_bo,
@@ -48,14 +51,20 @@ class DetectFromTextRequest(BaseModel):
 
 @router.post("/detect-metadata-text", response_model=DetectMetadataResponse)
 async def detect_metadata_text_endpoint(body: DetectFromTextRequest):
+    # Rotas async: a chamada LLM é sync e pode esperar na fila do llm_gateway
+    # — roda no threadpool para não travar o event loop.
     logger.info(f"[Detect Text] brand_slug='{body.brand_slug}' title='{body.title[:80]}' url='{body.youtube_url[:60]}'")
     try:
         if body.brand_slug == "reels-classics":
             logger.info("[Detect Text] Usando prompt RC")
-            result = detect_metadata_from_text_rc(body.youtube_url, body.title, body.description)
+            result = await run_in_threadpool(
+                detect_metadata_from_text_rc, body.youtube_url, body.title, body.description
+            )
         else:
             logger.info("[Detect Text] Usando prompt BO")
-            result = detect_metadata_from_text(body.youtube_url, body.title, body.description)
+            result = await run_in_threadpool(
+                detect_metadata_from_text, body.youtube_url, body.title, body.description
+            )
         logger.info(f"[Detect Text] Resultado: {list(result.keys())}")
         return DetectMetadataResponse(**result)
     except Exception as e:
@@ -77,9 +86,9 @@ async def detect_metadata_endpoint(
         media_type = file.content_type or "image/png"
         logger.info(f"[Detect Screenshot] file={file.filename} size={len(image_bytes)} type={media_type} url='{youtube_url[:60]}' brand='{brand_slug}'")
         if brand_slug == "reels-classics":
-            result = detect_metadata_rc(youtube_url, image_b64, media_type)
+            result = await run_in_threadpool(detect_metadata_rc, youtube_url, image_b64, media_type)
         else:
-            result = detect_metadata(youtube_url, image_b64, media_type)
+            result = await run_in_threadpool(detect_metadata, youtube_url, image_b64, media_type)
         logger.info(f"[Detect Screenshot] Resultado: {list(result.keys())}")
         return DetectMetadataResponse(**result)
     except HTTPException:
@@ -89,34 +98,41 @@ async def detect_metadata_endpoint(
         raise HTTPException(500, f"Detection failed: {e}")
 
 
-@router.post("/{project_id}/generate", response_model=ProjectOut)
+@router.post("/{project_id}/generate", status_code=202)
 def generate_all(project_id: int, db: Session = Depends(get_db)):
-    import time as _time
-    _t0 = _time.time()
-
+    """Enfileira post + overlay + YouTube; resultado (ProjectOut) em GET /api/jobs/{job_id}."""
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
 
     _validate_project_metadata(project)
 
-    project.status = "generating"
-    db.commit()
-
     brand_slug = getattr(project, 'brand_slug', None)
     if not brand_slug:
         raise HTTPException(400, "Projeto sem brand_slug definido. Recrie o projeto selecionando uma marca.")
-    brand_config = load_brand_config(brand_slug)
+
+    project.status = "generating"
+    db.commit()
+    return job_out(enfileirar(db, "generate", project_id, _generate_all_job))
+
+
+def _generate_all_job(db: Session, progresso: Progresso) -> dict:
+    project_id = progresso.project_id
+    project = db.get(Project, project_id)
+    brand_config = load_brand_config(project.brand_slug)
 
     warnings = []
     try:
         # Post PRIMEIRO: fornece material narrativo para o overlay via fallback
-        post_result = generate_post(project, brand_config=brand_config)
+        with progresso.etapa("post"):
+            post_result = generate_post(project, brand_config=brand_config)
         project.post_text = post_result["text"]
         if post_result.get("warning"):
             warnings.append(post_result["warning"])
-        project.overlay_json = generate_overlay(project, brand_config=brand_config)
-        title, tags = generate_youtube(project, brand_config=brand_config)
+        with progresso.etapa("overlay"):
+            project.overlay_json = generate_overlay(project, brand_config=brand_config)
+        with progresso.etapa("youtube"):
+            title, tags = generate_youtube(project, brand_config=brand_config)
         project.youtube_title = title
         project.youtube_tags = tags
         project.status = "awaiting_approval"
@@ -133,10 +149,9 @@ def generate_all(project_id: int, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(project)
-    print(f"[TIMING] generate_all projeto={project_id}: {_time.time() - _t0:.1f}s", flush=True)
     out = ProjectOut.model_validate(project)
     out.warnings = warnings
-    return out
+    return out.model_dump(mode="json")
 
 
 @router.post("/{project_id}/regenerate-overlay", response_model=ProjectOut)
@@ -152,7 +167,8 @@ def regenerate_overlay(
         raise HTTPException(400, "Projeto sem brand_slug definido. Recrie o projeto selecionando uma marca.")
     brand_config = load_brand_config(brand_slug)
     try:
-        project.overlay_json = generate_overlay(project, body.custom_prompt, brand_config=brand_config)
+        with llm_cache.ignorar(body.forcar_nova):
+            project.overlay_json = generate_overlay(project, body.custom_prompt, brand_config=brand_config)
     except Exception as e:
         if "overloaded" in str(e).lower() or "529" in str(e):
             raise HTTPException(503, "O serviço de IA está temporariamente sobrecarregado. Tente novamente em alguns segundos.")
@@ -296,7 +312,8 @@ def regenerate_post(
         raise HTTPException(400, "Projeto sem brand_slug definido. Recrie o projeto selecionando uma marca.")
     brand_config = load_brand_config(brand_slug)
     try:
-        post_result = generate_post(project, body.custom_prompt, brand_config=brand_config)
+        with llm_cache.ignorar(body.forcar_nova):
+            post_result = generate_post(project, body.custom_prompt, brand_config=brand_config)
     except Exception as e:
         if "overloaded" in str(e).lower() or "529" in str(e):
             raise HTTPException(503, "O serviço de IA está temporariamente sobrecarregado. Tente novamente em alguns segundos.")
@@ -326,7 +343,8 @@ def regenerate_youtube(
         raise HTTPException(400, "Projeto sem brand_slug definido. Recrie o projeto selecionando uma marca.")
     brand_config = load_brand_config(brand_slug)
     try:
-        title, tags = generate_youtube(project, body.custom_prompt, brand_config=brand_config)
+        with llm_cache.ignorar(body.forcar_nova):
+            title, tags = generate_youtube(project, body.custom_prompt, brand_config=brand_config)
     except Exception as e:
         if "overloaded" in str(e).lower() or "529" in str(e):
             raise HTTPException(503, "O serviço de IA está temporariamente sobrecarregado. Tente novamente em alguns segundos.")
@@ -342,9 +360,11 @@ def regenerate_youtube(
 
 
 @router.post("/{project_id}/generate-hooks")
-def generate_hooks_endpoint(project_id: int, db: Session = Depends(get_db)):
+def generate_hooks_endpoint(
+    project_id: int, forcar_nova: bool = False, db: Session = Depends(get_db)
+):
     """Gera 5 hooks específicos ao vídeo para o operador escolher.
-    Retorna JSON array sem alterar o Project."""
+    Retorna JSON array sem alterar o Project. `?forcar_nova=true` ignora o cache de respostas."""
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
@@ -357,7 +377,8 @@ def generate_hooks_endpoint(project_id: int, db: Session = Depends(get_db)):
     brand_config = load_brand_config(brand_slug)
 
     try:
-        hooks = generate_hooks(project, brand_config=brand_config)
+        with llm_cache.ignorar(forcar_nova):
+            hooks = generate_hooks(project, brand_config=brand_config)
         return {"hooks": hooks}
     except Exception as e:
         error_str = str(e)
@@ -367,8 +388,13 @@ def generate_hooks_endpoint(project_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{project_id}/generate-research-bo")
-def generate_research_bo_endpoint(project_id: int, db: Session = Depends(get_db)):
-    """BO: pesquisa aprofundada sobre a obra/artista. Salva em research_data."""
+def generate_research_bo_endpoint(
+    project_id: int, forcar_nova: bool = False, db: Session = Depends(get_db)
+):
+    """BO: pesquisa aprofundada sobre a obra/artista. Salva em research_data.
+
+    A pesquisa é cacheada por prompt (llm_cache); `?forcar_nova=true` refaz.
+    """
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
@@ -378,7 +404,8 @@ def generate_research_bo_endpoint(project_id: int, db: Session = Depends(get_db)
         raise HTTPException(400, "Projeto sem brand_slug definido.")
     brand_config = load_brand_config(brand_slug)
     try:
-        result = generate_research_bo(project, brand_config=brand_config)
+        with llm_cache.ignorar(forcar_nova):
+            result = generate_research_bo(project, brand_config=brand_config)
         db.commit()
         logger.info(f"[BO Endpoint] generate-research-bo OK project={project_id}")
         return {"status": "research_complete", "research_data": result}
@@ -394,15 +421,21 @@ def generate_research_bo_endpoint(project_id: int, db: Session = Depends(get_db)
 # ── RC (Reels Classics) endpoints ──────────────────────────────
 
 @router.post("/{project_id}/generate-research-rc")
-def generate_research_rc_endpoint(project_id: int, db: Session = Depends(get_db)):
-    """RC: pesquisa aprofundada sobre a obra/artista."""
+def generate_research_rc_endpoint(
+    project_id: int, forcar_nova: bool = False, db: Session = Depends(get_db)
+):
+    """RC: pesquisa aprofundada sobre a obra/artista.
+
+    A pesquisa é cacheada por prompt (llm_cache); `?forcar_nova=true` refaz.
+    """
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
     if getattr(project, 'brand_slug', '') != "reels-classics":
         raise HTTPException(400, "Este endpoint é exclusivo para Reels Classics")
     try:
-        result = generate_research_rc(project)
+        with llm_cache.ignorar(forcar_nova):
+            result = generate_research_rc(project)
         db.commit()
         logger.info(f"[RC Endpoint] generate-research-rc OK project={project_id}")
         return {"status": "research_complete", "research_data": result}
@@ -419,8 +452,10 @@ def generate_research_rc_endpoint(project_id: int, db: Session = Depends(get_db)
 
 
 @router.post("/{project_id}/generate-hooks-rc")
-def generate_hooks_rc_endpoint(project_id: int, db: Session = Depends(get_db)):
-    """RC: gera hooks baseados na pesquisa."""
+def generate_hooks_rc_endpoint(
+    project_id: int, forcar_nova: bool = False, db: Session = Depends(get_db)
+):
+    """RC: gera hooks baseados na pesquisa. `?forcar_nova=true` ignora o cache de respostas."""
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
@@ -430,7 +465,8 @@ def generate_hooks_rc_endpoint(project_id: int, db: Session = Depends(get_db)):
         raise HTTPException(400, "Gere a pesquisa primeiro (generate-research-rc)")
     brand_config = load_brand_config("reels-classics")
     try:
-        result = generate_hooks_rc(project, brand_config=brand_config)
+        with llm_cache.ignorar(forcar_nova):
+            result = generate_hooks_rc(project, brand_config=brand_config)
         db.commit()
         logger.info(f"[RC Endpoint] generate-hooks-rc OK project={project_id}")
         return {"status": "hooks_complete", "hooks_json": result}
@@ -530,9 +566,9 @@ def generate_post_rc_endpoint(project_id: int, db: Session = Depends(get_db)):
         raise HTTPException(500, f"Erro na geração RC: {error_str}")
 
 
-@router.post("/{project_id}/generate-automation-rc")
+@router.post("/{project_id}/generate-automation-rc", status_code=202)
 def generate_automation_rc_endpoint(project_id: int, db: Session = Depends(get_db)):
-    """RC: gera automation JSON."""
+    """RC: enfileira o automation JSON; resultado em GET /api/jobs/{job_id}."""
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
@@ -540,8 +576,15 @@ def generate_automation_rc_endpoint(project_id: int, db: Session = Depends(get_d
         raise HTTPException(400, "Este endpoint é exclusivo para Reels Classics")
     if not project.post_text:
         raise HTTPException(400, "Gere a descrição primeiro (generate-post-rc)")
+    return job_out(enfileirar(db, "automation_rc", project_id, _generate_automation_rc_job))
+
+
+def _generate_automation_rc_job(db: Session, progresso: Progresso) -> dict:
+    project_id = progresso.project_id
+    project = db.get(Project, project_id)
     try:
-        result = generate_automation_rc(project)
+        with progresso.etapa("automation"):
+            result = generate_automation_rc(project)
         db.commit()
         logger.info(f"[RC Endpoint] generate-automation-rc OK project={project_id}")
         return {"status": "automation_complete", "automation_json": result}
@@ -1,8 +1,18 @@
 from fastapi import APIRouter
 
+from backend.services.llm_cache import cache_stats
+from backend.services.llm_gateway import gateway_stats
+from backend.services.prompt_cache import uso_stats
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 def health_check():
     return {"status": "ok", "app": "Best of Opera — Redator", "version": "1.0.0"}
+
+
+@router.get("/health/llm")
+def llm_stats():
+    """Governador Anthropic (fila, retries, espera) + uso de tokens + cache de respostas."""
+    return {"governador": gateway_stats(), "uso": uso_stats(), "cache": cache_stats()}
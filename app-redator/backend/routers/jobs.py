@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from backend.services import jobs
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Intervalo entre leituras do job no stream SSE
+_SSE_INTERVALO_SEC = 1.0
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """Estado do job: status, etapa atual, duração por etapa e resultado/erro."""
+    job = jobs.buscar(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.get("/{job_id}/eventos")
+async def job_eventos(job_id: str):
+    """SSE: um evento `data:` a cada mudança do job; fecha ao concluir ou falhar."""
+    if await run_in_threadpool(jobs.buscar, job_id) is None:
+        raise HTTPException(404, "Job not found")
+
+    async def _stream():
+        ultimo = None
+        while True:
+            estado = await run_in_threadpool(jobs.buscar, job_id)
+            if estado is None:
+                return
+            if estado != ultimo:
+                yield f"data: {json.dumps(estado, ensure_ascii=False)}\n\n"
+                ultimo = estado
+            if estado["status"] in jobs.TERMINAIS:
+                return
+            await asyncio.sleep(_SSE_INTERVALO_SEC)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -16,6 +16,7 @@ from backend.services.translate_service import (
     RC_CTA,
 )
 from backend.services.export_service import save_texts_to_r2
+from backend.services.jobs import Progresso, enfileirar, job_out
 from pydantic import BaseModel
 from typing import Optional
 import logging
@@ -32,11 +33,9 @@ class UpdateTranslationRequest(BaseModel):
 router = APIRouter(prefix="/api/projects", tags=["translation"])
 
 
-@router.post("/{project_id}/translate", response_model=ProjectOut)
+@router.post("/{project_id}/translate", status_code=202)
 def translate_project(project_id: int, db: Session = Depends(get_db)):
-    import time as _time
-    _t0 = _time.time()
-
+    """Enfileira a tradução; resultado (ProjectOut) em GET /api/jobs/{job_id}."""
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(404, "Project not found")
@@ -51,11 +50,14 @@ def translate_project(project_id: int, db: Session = Depends(get_db)):
 
     project.status = "translating"
     db.commit()
+    return job_out(enfileirar(db, "translate", project_id, _translate_project_job))
 
-    try:
-        # Remove existing translations
-        db.query(Translation).filter(Translation.project_id == project_id).delete()
 
+def _translate_project_job(db: Session, progresso: Progresso) -> dict:
+    project_id = progresso.project_id
+    project = db.get(Project, project_id)
+
+    try:
         # Original content is always generated in Portuguese (hook categories are in PT).
         # Using detect_language on the hook is unreliable — short hooks with proper
         # nouns (aria names, composers) often get misdetected as another language,
@@ -74,61 +76,67 @@ def translate_project(project_id: int, db: Session = Depends(get_db)):
         # Fallback automático para Google se Claude falhar
         claude_results = {}
         if project.overlay_json or project.post_text:
-            claude_results = translate_project_parallel(
-                project=project,
-                overlay_json=project.overlay_json or [],
-                post_text=project.post_text or "",
-                brand_slug=project.brand_slug or "",
-                target_languages=langs_to_translate,
-            )
-
-        for lang in target_langs:
-            if lang == source_lang:
-                # Cópia do original para idioma fonte
-                translated_overlay = project.overlay_json
-                translated_post = project.post_text
-                translated_title = project.youtube_title
-                translated_tags_val = project.youtube_tags
-            else:
-                cr = claude_results.get(lang)
-                if cr and cr.get("data"):
-                    # Claude/fallback já traduziu overlay + post
-                    translated_overlay = cr["data"].get("overlay")
-                    translated_post = cr["data"].get("post", "")
-                    logger.info(f"[{project_id}] {lang}: {cr.get('source', '?')} para overlay+post")
+            with progresso.etapa("claude"):
+                claude_results = translate_project_parallel(
+                    project=project,
+                    overlay_json=project.overlay_json or [],
+                    post_text=project.post_text or "",
+                    brand_slug=project.brand_slug or "",
+                    target_languages=langs_to_translate,
+                )
+
+        novas: list[Translation] = []
+        with progresso.etapa("google"):
+            for lang in target_langs:
+                if lang == source_lang:
+                    # Cópia do original para idioma fonte
+                    translated_overlay = project.overlay_json
+                    translated_post = project.post_text
+                    translated_title = project.youtube_title
+                    translated_tags_val = project.youtube_tags
                 else:
-                    # Sem resultado — fallback Google direto
-                    translated_overlay = (
-                        translate_overlay_json(project.overlay_json, lang,
-                                              brand_slug=project.brand_slug,
-                                              protected_names=_names)
-                        if project.overlay_json else None
+                    cr = claude_results.get(lang)
+                    if cr and cr.get("data"):
+                        # Claude/fallback já traduziu overlay + post
+                        translated_overlay = cr["data"].get("overlay")
+                        translated_post = cr["data"].get("post", "")
+                        logger.info(f"[{project_id}] {lang}: {cr.get('source', '?')} para overlay+post")
+                    else:
+                        # Sem resultado — fallback Google direto
+                        translated_overlay = (
+                            translate_overlay_json(project.overlay_json, lang,
+                                                  brand_slug=project.brand_slug,
+                                                  protected_names=_names)
+                            if project.overlay_json else None
+                        )
+                        translated_post = (
+                            translate_post_text(project.post_text, lang, protected_names=_names)
+                            if project.post_text else None
+                        )
+
+                    # Tags e YouTube: SEMPRE Google (conteúdo simples, rápido, barato)
+                    translated_title = (
+                        translate_text(project.youtube_title, lang)
+                        if project.youtube_title else None
                     )
-                    translated_post = (
-                        translate_post_text(project.post_text, lang, protected_names=_names)
-                        if project.post_text else None
+                    translated_tags_val = (
+                        translate_tags(project.youtube_tags, lang)
+                        if project.youtube_tags else None
                     )
 
-                # Tags e YouTube: SEMPRE Google (conteúdo simples, rápido, barato)
-                translated_title = (
-                    translate_text(project.youtube_title, lang)
-                    if project.youtube_title else None
-                )
-                translated_tags_val = (
-                    translate_tags(project.youtube_tags, lang)
-                    if project.youtube_tags else None
-                )
-
-            translation = Translation(
-                project_id=project_id,
-                language=lang,
-                overlay_json=translated_overlay,
-                post_text=translated_post,
-                youtube_title=translated_title,
-                youtube_tags=translated_tags_val,
-            )
-            db.add(translation)
-
+                novas.append(Translation(
+                    project_id=project_id,
+                    language=lang,
+                    overlay_json=translated_overlay,
+                    post_text=translated_post,
+                    youtube_title=translated_title,
+                    youtube_tags=translated_tags_val,
+                ))
+
+        # Remove existing translations — só agora, com as novas prontas: a
+        # transação de escrita não fica aberta durante as chamadas de tradução
+        db.query(Translation).filter(Translation.project_id == project_id).delete()
+        db.add_all(novas)
         project.status = "export_ready"
     except Exception as e:
         project.status = "awaiting_approval"
@@ -137,15 +145,15 @@ def translate_project(project_id: int, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(project)
-    print(f"[TIMING] translate_project projeto={project_id}: {_time.time() - _t0:.1f}s", flush=True)
 
     # Salvar textos no R2 para o Editor consumir
-    try:
-        save_texts_to_r2(project)
-    except Exception as e:
-        logger.warning(f"[{project_id}] Falha ao salvar textos no R2: {e}")
+    with progresso.etapa("r2"):
+        try:
+            save_texts_to_r2(project)
+        except Exception as e:
+            logger.warning(f"[{project_id}] Falha ao salvar textos no R2: {e}")
 
-    return project
+    return ProjectOut.model_validate(project).model_dump(mode="json")
 
 
 @router.post("/{project_id}/retranslate/{lang}")
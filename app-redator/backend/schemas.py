@@ -174,6 +174,8 @@ class R2AvailableItem(BaseModel):
 
 class RegenerateRequest(BaseModel):
     custom_prompt: Optional[str] = None
+    # True = ignora o cache de respostas LLM e pede uma versão nova
+    forcar_nova: bool = False
 
 
 class ApproveOverlayRequest(BaseModel):
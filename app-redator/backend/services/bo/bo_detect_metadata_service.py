@@ -39,6 +39,7 @@ from backend.services.bo.prompts.bo_detect_metadata_prompt_v1 import (
     DIMENSAO_3_SUBCATEGORIAS,
     build_bo_detect_metadata_prompt,
 )
+from backend.services.llm_gateway import criar_mensagem
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,8 @@ def _call_anthropic_multimodal(prompt: str, screenshot_base64: str | None, clien
         })
     content_blocks.append({"type": "text", "text": prompt})
 
-    response = client.messages.create(
+    response = criar_mensagem(
+        client, origem="bo_detect_metadata",
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
@@ -179,7 +181,7 @@ def detect_metadata_bo(
             operator_hints=operator_hints,
         )
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=60.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=60.0, max_retries=0)
         parsed = _call_anthropic_multimodal(prompt, screenshot_base64, client)
 
         # Validação de enums (V-I-23) — levanta DetectMetadataError se inválido
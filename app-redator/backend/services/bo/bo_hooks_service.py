@@ -34,7 +34,9 @@ import anthropic
 
 from backend.config import ANTHROPIC_API_KEY
 from backend.services.bo.antipadroes_loader import format_banned_terms_for_prompt
-from backend.services.bo.prompts.bo_hooks_prompt_v1 import build_bo_hooks_prompt
+from backend.services.bo.prompts.bo_hooks_prompt_v1 import build_bo_hooks_prompt_partes
+from backend.services.llm_gateway import criar_mensagem
+from backend.services.prompt_cache import system_cacheavel
 
 logger = logging.getLogger(__name__)
 
@@ -104,16 +106,22 @@ def validate_hooks(data: dict) -> list[str]:
     return errors
 
 
-def _call_anthropic_hooks(prompt: str, client) -> dict:
-    """Chama Anthropic e parse JSON da resposta."""
+def _call_anthropic_hooks(prompt: str, client, system: str | None = None) -> dict:
+    """Chama Anthropic e parse JSON da resposta.
+
+    `system`: instruções fixas do prompt, enviadas como bloco cacheável.
+    """
     _assert_test_mock_configured(client)
 
-    response = client.messages.create(
+    kwargs: dict[str, Any] = dict(
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
         messages=[{"role": "user", "content": prompt}],
     )
+    if system:
+        kwargs["system"] = system_cacheavel(system)
+    response = criar_mensagem(client, origem="bo_hooks", **kwargs)
 
     text_blocks = [b for b in response.content if hasattr(b, "text")]
     if not text_blocks:
@@ -152,7 +160,7 @@ def run_bo_hooks(project_id: int, db_session=None) -> dict:
             )
 
         antipadroes_pt = format_banned_terms_for_prompt("pt")
-        base_prompt = build_bo_hooks_prompt(
+        system, base_prompt = build_bo_hooks_prompt_partes(
             research_data=project.research_data,
             work=project.work or "",
             artist=project.artist or "",
@@ -160,7 +168,7 @@ def run_bo_hooks(project_id: int, db_session=None) -> dict:
             antipadroes_pt=antipadroes_pt,
         )
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0, max_retries=0)
         last_errors: list[str] = []
 
         # Retry NÃO-acumulativo (V-I-15)
@@ -174,7 +182,7 @@ def run_bo_hooks(project_id: int, db_session=None) -> dict:
                     + "\n".join(f"- {e}" for e in last_errors)
                 )
 
-            data = _call_anthropic_hooks(current_prompt, client)
+            data = _call_anthropic_hooks(current_prompt, client, system=system)
             errors = validate_hooks(data)
 
             if not errors:
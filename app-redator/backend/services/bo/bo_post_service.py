@@ -30,7 +30,9 @@ import anthropic
 
 from backend.config import ANTHROPIC_API_KEY
 from backend.services.bo.antipadroes_loader import format_banned_terms_for_prompt
-from backend.services.bo.prompts.bo_post_prompt_v1 import build_bo_post_prompt
+from backend.services.bo.prompts.bo_post_prompt_v1 import build_bo_post_prompt_partes
+from backend.services.llm_gateway import criar_mensagem
+from backend.services.prompt_cache import system_cacheavel
 
 logger = logging.getLogger(__name__)
 
@@ -149,14 +151,22 @@ def validate_post_schema(data: dict) -> tuple[list[str], list[str]]:
     return errors, warnings
 
 
-def _call_anthropic_post(prompt: str, client) -> dict:
+def _call_anthropic_post(prompt: str, client, system: str | None = None) -> dict:
+    """Chama Anthropic e parse JSON da resposta.
+
+    `system`: instruções fixas do prompt, enviadas como bloco cacheável.
+    """
     _assert_test_mock_configured(client)
-    response = client.messages.create(
+
+    kwargs: dict[str, Any] = dict(
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
         messages=[{"role": "user", "content": prompt}],
     )
+    if system:
+        kwargs["system"] = system_cacheavel(system)
+    response = criar_mensagem(client, origem="bo_post", **kwargs)
     text_blocks = [b for b in response.content if hasattr(b, "text")]
     if not text_blocks:
         raise PostSchemaError("anthropic.no_text_block_in_response")
@@ -190,14 +200,14 @@ def run_bo_post(project_id: int, db_session=None) -> dict:
             raise ValueError(f"projeto {project_id} sem overlay_json aprovado")
 
         antipadroes_pt = format_banned_terms_for_prompt("pt")
-        base_prompt = build_bo_post_prompt(
+        system, base_prompt = build_bo_post_prompt_partes(
             research_data=project.research_data,
             hook_escolhido=project.hook_escolhido_json,
             overlay_aprovado=project.overlay_json,
             antipadroes_pt=antipadroes_pt,
         )
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0, max_retries=0)
         last_errors: list[str] = []
 
         for attempt in range(MAX_VALIDATION_RETRIES + 1):
@@ -209,7 +219,7 @@ def run_bo_post(project_id: int, db_session=None) -> dict:
                     + "\n".join(f"- {e}" for e in last_errors)
                 )
 
-            data = _call_anthropic_post(current_prompt, client)
+            data = _call_anthropic_post(current_prompt, client, system=system)
             errors, warnings = validate_post_schema(data)
 
             if not errors:
@@ -32,6 +32,7 @@ import anthropic
 from backend.config import ANTHROPIC_API_KEY, USE_ANTHROPIC_WEB_SEARCH
 from backend.services.bo.antipadroes_loader import format_banned_terms_for_prompt
 from backend.services.bo.prompts.bo_research_prompt_v1 import build_bo_research_prompt
+from backend.services.llm_gateway import criar_mensagem
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,8 @@ def _call_anthropic_with_websearch(prompt: str, client) -> dict:
     """
     _assert_test_mock_configured(client)
 
-    response = client.messages.create(
+    response = criar_mensagem(
+        client, origem="bo_research",
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
@@ -205,7 +207,7 @@ def run_bo_research(project_id: int, db_session=None) -> dict:
             dimensao_3_sub_detectada=project.dim_3_sub_detectada or "",
         )
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0, max_retries=0)
         last_errors: list[str] = []
         last_exc: Exception | None = None
 
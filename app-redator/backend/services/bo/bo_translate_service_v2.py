@@ -7,8 +7,9 @@ TODAS as funções deste módulo são sync (`def`, NÃO `async def`).
 
 Razões:
 1. translate_project_parallel (RC v1) é sync — paridade arquitetural
-2. Paralelismo dos 6 idiomas via ThreadPoolExecutor(max_workers=6),
-   NÃO via asyncio.gather — IO-bound (Anthropic API) é eficaz com threads
+2. Paralelismo dos 6 idiomas via threads (pool compartilhado
+   `llm_gateway.executor_lote()`), NÃO via asyncio.gather — IO-bound
+   (Anthropic API) é eficaz com threads
 3. Endpoint Fase 2 vai rodar em rota sync FastAPI — sync casa direto
 4. Onde plano mestre dizia `async def`, ADAPTO para sync. Dispatcher
    espelha sync sem `await`. Mistura sync→sync no callgraph é segura;
@@ -19,7 +20,7 @@ Achados V-* cobertos:
 - V-I-08: validador RECOMPUTA chars do texto traduzido (l1/l2 ≤ 38)
 - V-I-15: retry NÃO-acumulativo
 - V-I-16: MAX_VALIDATION_RETRIES=1 (documentado vs overlay 2)
-- V-I-18: @retry tenacity backoff exponencial 2s→60s p/ APIStatusError
+- V-I-18: retry de 429/529/5xx no llm_gateway (respeita retry-after; antes tenacity 2s→60s)
 - V-I-19: timestamps PRESERVADOS — math.isclose para floats, == para int (index)
 - V-I-34: mark_translations_stale para invalidação por endpoints da Fase 2
 """
@@ -29,21 +30,18 @@ import json
 import logging
 import math
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import as_completed
 from typing import Any
 
 import anthropic
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
-
-from backend.config import ANTHROPIC_API_KEY
+
+from backend.config import ANTHROPIC_API_KEY, PROMPT_CACHE_STAGGER_SEC
 from backend.services.bo.antipadroes_loader import format_banned_terms_for_prompt
 from backend.services.bo.bo_ctas import get_cta_overlay
-from backend.services.bo.prompts.bo_translation_prompt_v1 import build_bo_translation_prompt
+from backend.services.bo.prompts.bo_translation_prompt_v1 import build_bo_translation_prompt_partes
+from backend.services.llm_gateway import LOTE, criar_mensagem, executor_lote
+from backend.services.prompt_cache import system_cacheavel
 
 logger = logging.getLogger(__name__)
 
@@ -182,21 +180,21 @@ def _substitute_cta_post_llm(parsed: dict, target_lang: str) -> dict:
     return parsed
 
 
-@retry(
-    wait=wait_exponential(multiplier=1, min=2, max=60),
-    stop=stop_after_attempt(3),
-    retry=retry_if_exception_type(anthropic.APIStatusError),
-    reraise=True,
-)
-def _call_anthropic_translation(prompt: str, client) -> dict:
-    """Chama Anthropic com tenacity backoff exponencial 2s→60s para 429/503 (V-I-18)."""
+def _call_anthropic_translation(prompt: str, client, system: str | None = None) -> dict:
+    """Chama Anthropic via llm_gateway com prioridade LOTE (retry 429/529: V-I-18).
+
+    `system`: instruções fixas do prompt, enviadas como bloco cacheável.
+    """
     _assert_test_mock_configured(client)
-    response = client.messages.create(
+    kwargs: dict[str, Any] = dict(
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
         messages=[{"role": "user", "content": prompt}],
     )
+    if system:
+        kwargs["system"] = system_cacheavel(system)
+    response = criar_mensagem(client, origem="bo_translate", prioridade=LOTE, **kwargs)
     text_blocks = [b for b in response.content if hasattr(b, "text")]
     if not text_blocks:
         raise TranslationSchemaError("anthropic.no_text_block_in_response")
@@ -218,9 +216,9 @@ def _translate_one_language(
     youtube_pt: dict,
     client,
 ) -> dict:
-    """Traduz para 1 idioma. Sync, rodado dentro do ThreadPoolExecutor."""
+    """Traduz para 1 idioma. Sync, rodado no pool `executor_lote()`."""
     antipadroes = format_banned_terms_for_prompt(target_lang)
-    base_prompt = build_bo_translation_prompt(
+    system, base_prompt = build_bo_translation_prompt_partes(
         target_language=target_lang,
         overlay_pt=overlay_pt,
         post_pt=post_pt,
@@ -240,7 +238,7 @@ def _translate_one_language(
                 + "\n".join(f"- {e}" for e in last_errors)
             )
 
-        parsed = _call_anthropic_translation(current_prompt, client)
+        parsed = _call_anthropic_translation(current_prompt, client, system=system)
         # CTA substituído pós-LLM byte-a-byte
         parsed = _substitute_cta_post_llm(parsed, target_lang)
 
@@ -263,7 +261,7 @@ def _translate_one_language(
 
 
 def translate_project_bo_v2(project_id: int, db_session=None) -> None:
-    """Orquestra tradução BO V2 paralela em 6 idiomas via ThreadPoolExecutor.
+    """Orquestra tradução BO V2 paralela em 6 idiomas via `executor_lote()`.
 
     - PT é cópia byte-a-byte (NÃO passa pelo LLM)
     - Cada idioma → uma chamada Anthropic + validate_translation_schema
@@ -290,7 +288,7 @@ def translate_project_bo_v2(project_id: int, db_session=None) -> None:
             "tags_list": project.youtube_tags_list or [],
         }
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0, max_retries=0)
 
         # PT é cópia byte-a-byte
         pt_translation = Translation(
@@ -303,24 +301,31 @@ def translate_project_bo_v2(project_id: int, db_session=None) -> None:
         )
         db.merge(pt_translation)
 
-        # 6 idiomas paralelos via ThreadPoolExecutor
+        # 6 idiomas paralelos no pool compartilhado do processo: traduções de
+        # vários usuários dividem as mesmas threads e o governador do
+        # llm_gateway (RPM/TPM, prioridade LOTE) freia as chamadas.
         results: dict[str, dict] = {}
         errors_by_lang: dict[str, str] = {}
 
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            futures = {
-                executor.submit(
-                    _translate_one_language, lang, overlay_pt, post_pt, youtube_pt, client
-                ): lang
-                for lang in TARGET_LANGUAGES
-            }
-            for future in as_completed(futures):
-                lang = futures[future]
-                try:
-                    results[lang] = future.result()
-                except Exception as exc:
-                    errors_by_lang[lang] = str(exc)
-                    logger.error("bo_translate: %s falhou: %s", lang, exc)
+        executor = executor_lote()
+        # O 1º idioma grava as instruções fixas no prompt cache; os outros
+        # 5 saem PROMPT_CACHE_STAGGER_SEC depois e leem o prefixo em vez
+        # de cada um pagar a escrita do mesmo prefixo.
+        futures = {}
+        for i, lang in enumerate(TARGET_LANGUAGES):
+            if i == 1 and PROMPT_CACHE_STAGGER_SEC > 0:
+                time.sleep(PROMPT_CACHE_STAGGER_SEC)
+            future = executor.submit(
+                _translate_one_language, lang, overlay_pt, post_pt, youtube_pt, client
+            )
+            futures[future] = lang
+        for future in as_completed(futures):
+            lang = futures[future]
+            try:
+                results[lang] = future.result()
+            except Exception as exc:
+                errors_by_lang[lang] = str(exc)
+                logger.error("bo_translate: %s falhou: %s", lang, exc)
 
         if errors_by_lang:
             raise TranslationSchemaError(
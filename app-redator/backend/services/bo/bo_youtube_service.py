@@ -29,7 +29,9 @@ import anthropic
 
 from backend.config import ANTHROPIC_API_KEY
 from backend.services.bo.antipadroes_loader import format_banned_terms_for_prompt
-from backend.services.bo.prompts.bo_youtube_prompt_v1 import build_bo_youtube_prompt
+from backend.services.bo.prompts.bo_youtube_prompt_v1 import build_bo_youtube_prompt_partes
+from backend.services.llm_gateway import criar_mensagem
+from backend.services.prompt_cache import system_cacheavel
 
 logger = logging.getLogger(__name__)
 
@@ -116,14 +118,22 @@ def validate_youtube_schema(data: dict) -> tuple[list[str], list[str]]:
     return errors, warnings
 
 
-def _call_anthropic_youtube(prompt: str, client) -> dict:
+def _call_anthropic_youtube(prompt: str, client, system: str | None = None) -> dict:
+    """Chama Anthropic e parse JSON da resposta.
+
+    `system`: instruções fixas do prompt, enviadas como bloco cacheável.
+    """
     _assert_test_mock_configured(client)
-    response = client.messages.create(
+
+    kwargs: dict[str, Any] = dict(
         model=MODEL,
         max_tokens=MAX_TOKENS,
         temperature=TEMPERATURE,
         messages=[{"role": "user", "content": prompt}],
     )
+    if system:
+        kwargs["system"] = system_cacheavel(system)
+    response = criar_mensagem(client, origem="bo_youtube", **kwargs)
     text_blocks = [b for b in response.content if hasattr(b, "text")]
     if not text_blocks:
         raise YoutubeSchemaError("anthropic.no_text_block_in_response")
@@ -155,7 +165,7 @@ def run_bo_youtube(project_id: int, db_session=None) -> dict:
             )
 
         antipadroes_pt = format_banned_terms_for_prompt("pt")
-        base_prompt = build_bo_youtube_prompt(
+        system, base_prompt = build_bo_youtube_prompt_partes(
             research_data=project.research_data,
             hook_escolhido=project.hook_escolhido_json,
             overlay_aprovado=project.overlay_json,
@@ -163,7 +173,7 @@ def run_bo_youtube(project_id: int, db_session=None) -> dict:
             antipadroes_pt=antipadroes_pt,
         )
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=60.0)
+        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=60.0, max_retries=0)
         last_errors: list[str] = []
 
         for attempt in range(MAX_VALIDATION_RETRIES + 1):
@@ -175,7 +185,7 @@ def run_bo_youtube(project_id: int, db_session=None) -> dict:
                     + "\n".join(f"- {e}" for e in last_errors)
                 )
 
-            data = _call_anthropic_youtube(current_prompt, client)
+            data = _call_anthropic_youtube(current_prompt, client, system=system)
             errors, warnings = validate_youtube_schema(data)
 
             if not errors:
@@ -19,52 +19,16 @@ MUDANÇAS vs versão original do ZIP:
 - Convenção de contagem de chars UNIFICADA: `linha_1_chars` e `linha_2_chars`
   contam apenas caracteres textuais (sem `\\n`); `total_chars = linha_1_chars
   + linha_2_chars` (sem somar `\\n`). Padrão idêntico ao overlay.
+- Instruções fixas separadas do <context> do projeto
+  (`build_bo_hooks_prompt_partes`): o service manda as fixas como bloco
+  system com cache_control (prompt caching)
 """
 
 
-def build_bo_hooks_prompt(
-    research_data: dict,
-    work: str,
-    artist: str,
-    composer: str,
-    antipadroes_pt: str,
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói prompt de geração de 5 hooks ranqueados para Best of Opera.
-
-    Parâmetros:
-    - research_data: dict com output de BO_research_v1
-    - work, artist, composer: metadados redundantes para referência rápida
-    - antipadroes_pt: string formatada de antipadrões PT (de BO_ANTIPADROES.json)
-    - brand_config: configuração da marca
-
-    Retorna: string do prompt completo.
-    """
-    import json as _json
-
-    bc = brand_config or {}
-    brand_identity = bc.get("identity_prompt_redator", "")
-    brand_tom = bc.get("tom_de_voz_redator", "")
-
-    brand_block_parts = []
-    if brand_identity:
-        brand_block_parts.append(f"**Identidade:** {brand_identity}")
-    if brand_tom:
-        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
-
-    brand_block = ""
-    if brand_block_parts:
-        brand_block = (
-            "\n\n═══════════════════════════════\n"
-            "CONTEXTO DA MARCA (Best of Opera)\n"
-            "═══════════════════════════════\n"
-            + "\n".join(brand_block_parts)
-        )
-
-    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:6000]
-
-    return f"""<role>
+# Instruções fixas do prompt — iguais para todo projeto. Vão no bloco system
+# com cache_control (prompt caching); o que varia por projeto fica no
+# <context> e vai na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é um especialista em criar ganchos narrativos para redes sociais no universo da música vocal clássica. Seu papel: gerar a PRIMEIRA LEGENDA de vídeos curtos do canal "Best of Opera" (ópera, coros, música sacra, Lieder, voz humana em geral).
 
 O gancho aparece em 00:00:00 sobre o vídeo. Em menos de 2 segundos de leitura, decide se o espectador:
@@ -77,33 +41,11 @@ Sua régua editorial é:
 - **Paradoxo, choque, contra-intuição sempre superam descrição**
 - **Trocar o nome do intérprete ou da peça torna o gancho falso ou sem sentido** (teste de especificidade)
 
-Você domina a diferença entre gancho viral e gancho genérico. "A voz que parou o tempo" é genérico (funciona para qualquer cantor) e falha. "Aos 17, escolheu a ária mais difícil do bel canto" é específico (só funciona para esta cantora específica) e prende.{brand_block}
+Você domina a diferença entre gancho viral e gancho genérico. "A voz que parou o tempo" é genérico (funciona para qualquer cantor) e falha. "Aos 17, escolheu a ária mais difícil do bel canto" é específico (só funciona para esta cantora específica) e prende.
 </role>
 
-<context>
-## RESEARCH DO VÍDEO (fonte primária de material factual)
-
-{research_str}
-
-## METADADOS DE REFERÊNCIA RÁPIDA
-- Obra: {work}
-- Intérprete: {artist}
-- Compositor: {composer}
-
-## IMPORTANTE
-
-Todo fato que você usar em qualquer gancho deve vir deste research. Não invente. Não use conhecimento externo. Se o research não trouxe um fato, você não tem esse fato disponível.
-
-A classificação (Dimensões 1, 2, 3) calibra os ganchos:
-- Solo operístico: pode focar em intérprete individual, ária específica, cena dramática
-- Coro: foca na obra, compositor, tradição, textura
-- Lied: foca na relação cantor-pianista, poema, intimidade da forma
-- Sacro litúrgico: foca no texto, tradição, compositor, contexto histórico
-- Oratório: foca no drama narrado, solistas, obra como um todo
-</context>
-
 <task>
-Gere EXATAMENTE 5 ganchos em português brasileiro para o primeiro slot do overlay deste vídeo. Ranqueie do mais forte ao mais fraco.
+Gere EXATAMENTE 5 ganchos em português brasileiro para o primeiro slot do overlay do vídeo descrito no <context> (mensagem do usuário). Ranqueie do mais forte ao mais fraco.
 
 ## REQUISITOS ABSOLUTOS DE CADA GANCHO
 
@@ -201,9 +143,7 @@ Ordene do MAIS FORTE (#1) ao MAIS FRACO (#5). Força medida por:
 - **Quebra de linha explicitada como `\\n` no hook_text**.
 - **Idioma: português brasileiro.** Natural, direto.
 - **Zero travessões** `—` e `–`: use ponto, vírgula, dois pontos.
-- **Zero adjetivos banidos** (lista PT abaixo):
-
-{antipadroes_pt}
+- **Zero adjetivos banidos** (lista PT na seção ANTI-PADRÕES PROIBIDOS do <context>).
 
 **Regra de ouro**: adjetivo só é banido quando usado **vazio**. Com fato concreto, passa.
 
@@ -218,9 +158,9 @@ Ordene do MAIS FORTE (#1) ao MAIS FRACO (#5). Força medida por:
 <format>
 Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentários:
 
-{{
+{
   "hooks": [
-    {{
+    {
       "rank": 1,
       "hook_text": "Texto do gancho mais forte\\ncom quebra explícita",
       "linha_1_chars": 26,
@@ -230,8 +170,8 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
       "thread": "1-2 linhas sobre o arco narrativo que o overlay seguiria.",
       "specificity_check": "Por que trocar nome quebra este gancho.",
       "fato_fonte": "Qual fato específico do research este hook usa."
-    }},
-    {{
+    },
+    {
       "rank": 2,
       "hook_text": "...",
       "linha_1_chars": 0,
@@ -241,10 +181,10 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
       "thread": "...",
       "specificity_check": "...",
       "fato_fonte": "..."
-    }}
+    }
   ],
 
-  "verificacoes": {{
+  "verificacoes": {
     "total_hooks": 5,
     "todos_dentro_76c": true,
     "todos_dentro_38c_por_linha": true,
@@ -255,8 +195,8 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
     "travessoes_detectados": 0,
     "ordem_ranking_justificada": "1 frase explicando o critério aplicado.",
     "alertas": []
-  }}
-}}
+  }
+}
 
 Nota: o array `hooks` deve ter EXATAMENTE 5 elementos com rank 1 a 5 em ordem.
 </format>
@@ -280,7 +220,7 @@ V7: **Teste de especificidade**: para cada hook, troque mentalmente o nome. Se c
 
 V8: **Fato verificável**: cada hook ancora em fato do research.
 
-V9: **Adjetivos banidos zerados**: releia os 5 hooks contra a lista em <constraints>. Substitua vazios.
+V9: **Adjetivos banidos zerados**: releia os 5 hooks contra a lista de anti-padrões do <context>. Substitua vazios.
 
 V10: **Travessões zerados**: nenhum `—` nem `–`.
 
@@ -292,3 +232,100 @@ V13: **Zero markdown** no output. Apenas JSON puro.
 
 Se qualquer verificação falha, corrija antes de retornar.
 </self_check>"""
+
+
+def build_bo_hooks_prompt_partes(
+    research_data: dict,
+    work: str,
+    artist: str,
+    composer: str,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_bo_hooks_prompt`.
+    """
+    import json as _json
+
+    bc = brand_config or {}
+    brand_identity = bc.get("identity_prompt_redator", "")
+    brand_tom = bc.get("tom_de_voz_redator", "")
+
+    brand_block_parts = []
+    if brand_identity:
+        brand_block_parts.append(f"**Identidade:** {brand_identity}")
+    if brand_tom:
+        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
+
+    brand_block = ""
+    if brand_block_parts:
+        brand_block = (
+            "\n\n═══════════════════════════════\n"
+            "CONTEXTO DA MARCA (Best of Opera)\n"
+            "═══════════════════════════════\n"
+            + "\n".join(brand_block_parts)
+        )
+
+    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:6000]
+
+    contexto = f"""<context>{brand_block}
+
+## RESEARCH DO VÍDEO (fonte primária de material factual)
+
+{research_str}
+
+## METADADOS DE REFERÊNCIA RÁPIDA
+- Obra: {work}
+- Intérprete: {artist}
+- Compositor: {composer}
+
+## IMPORTANTE
+
+Todo fato que você usar em qualquer gancho deve vir deste research. Não invente. Não use conhecimento externo. Se o research não trouxe um fato, você não tem esse fato disponível.
+
+A classificação (Dimensões 1, 2, 3) calibra os ganchos:
+- Solo operístico: pode focar em intérprete individual, ária específica, cena dramática
+- Coro: foca na obra, compositor, tradição, textura
+- Lied: foca na relação cantor-pianista, poema, intimidade da forma
+- Sacro litúrgico: foca no texto, tradição, compositor, contexto histórico
+- Oratório: foca no drama narrado, solistas, obra como um todo
+
+## ANTI-PADRÕES PROIBIDOS (PT)
+
+{antipadroes_pt}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_bo_hooks_prompt(
+    research_data: dict,
+    work: str,
+    artist: str,
+    composer: str,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói prompt de geração de 5 hooks ranqueados para Best of Opera.
+
+    Parâmetros:
+    - research_data: dict com output de BO_research_v1
+    - work, artist, composer: metadados redundantes para referência rápida
+    - antipadroes_pt: string formatada de antipadrões PT (de BO_ANTIPADROES.json)
+    - brand_config: configuração da marca
+
+    Retorna: string do prompt completo (instruções fixas + <context>). O
+    service usa `build_bo_hooks_prompt_partes` para mandar as instruções fixas como
+    system cacheável.
+    """
+    estatico, dinamico = build_bo_hooks_prompt_partes(
+        research_data=research_data, work=work, artist=artist, composer=composer,
+        antipadroes_pt=antipadroes_pt, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
@@ -44,6 +44,10 @@ MUDANÇAS vs versão original do ZIP:
 
 8. `text_full` com `\\n` é a forma canônica; `text_line_1`/`text_line_2`
    são derivações. Documentado qual é o primário.
+
+9. Instruções fixas (role/task/constraints/format/self_check) separadas do
+   <context> do projeto (`build_bo_overlay_prompt_partes`): o service manda
+   as fixas como bloco system com cache_control (prompt caching).
 """
 
 import math
@@ -119,70 +123,14 @@ def _calc_faixa_legendas(video_duration_seconds: float) -> tuple[int, int]:
     return qtd_min, qtd_max
 
 
-def build_bo_overlay_prompt(
-    research_data: dict,
-    hook_escolhido: dict,
-    video_duration_seconds: float,
-    antipadroes_pt: str,
-    cut_start: str = "",
-    cut_end: str = "",
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói prompt de geração de overlay para Best of Opera.
-
-    Parâmetros:
-    - research_data: output completo do BO_research_v1
-    - hook_escolhido: dict com `hook_text`, `angle`, `thread`, `fato_fonte`
-    - video_duration_seconds: duração total do vídeo em segundos (float).
-                              Levanta ValueError se < 20s.
-    - antipadroes_pt: string formatada de antipadrões PT (de BO_ANTIPADROES.json)
-    - cut_start, cut_end: timestamps do trecho no vídeo original (referência)
-    - brand_config: configuração da marca (identity, tom)
-
-    Retorna: string do prompt completo.
-
-    Raises:
-      ValueError: se video_duration_seconds < MIN_VIDEO_DURATION
-    """
-    import json as _json
-
-    bc = brand_config or {}
-    brand_identity = bc.get("identity_prompt_redator", "")
-    brand_tom = bc.get("tom_de_voz_redator", "")
-
-    brand_block_parts = []
-    if brand_identity:
-        brand_block_parts.append(f"**Identidade:** {brand_identity}")
-    if brand_tom:
-        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
-
-    brand_block = ""
-    if brand_block_parts:
-        brand_block = (
-            "\n\n═══════════════════════════════\n"
-            "CONTEXTO DA MARCA (Best of Opera)\n"
-            "═══════════════════════════════\n"
-            + "\n".join(brand_block_parts)
-        )
-
-    # Extrair informação essencial do research
-    classificacao = research_data.get("classificacao_refinada", {})
-    dim_1 = classificacao.get("dimensao_1_formacao", "")
-    dim_3_pai = classificacao.get("dimensao_3_pai", "")
-    dim_3_sub = classificacao.get("dimensao_3_sub", "")
-
-    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:8000]
-    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
-
-    # Calcular faixa viável (pode levantar ValueError se vídeo curto demais)
-    qtd_min, qtd_max = _calc_faixa_legendas(video_duration_seconds)
+# CTA-PT canônico (fonte única) — fixo, entra nas instruções estáticas
+_CTA_L1, _CTA_L2 = get_cta_overlay("pt")
+_CTA_FORMATTED = f"{_CTA_L1}\\n{_CTA_L2}"
 
-    # CTA-PT canônico (fonte única)
-    cta_l1, cta_l2 = get_cta_overlay("pt")
-    cta_formatted = f"{cta_l1}\\n{cta_l2}"
-
-    return f"""<role>
+# Instruções fixas do prompt — iguais para todo projeto. Vão no bloco system
+# com cache_control; o que varia por projeto (research, hook, duração e
+# faixa de legendas, classificação, antipadrões, marca) fica no <context>.
+_PROMPT_ESTATICO = f"""<role>
 Você é o redator editorial do canal "Best of Opera", canal de ópera, coros, música sacra, Lieder e voz humana clássica em geral. Sua função: escrever as legendas narrativas (overlay) que aparecem sobre o vídeo enquanto o espectador ouve a voz.
 
 ## Princípio absoluto
@@ -208,56 +156,12 @@ Você não é:
 
 Trocar o nome do intérprete ou da peça torna a legenda FALSA ou SEM SENTIDO. É o teste de especificidade, aplicado a TODAS as legendas (inclusive o gancho).
 
-Legenda só com fato (sem ressonância) é seca. Legenda só com emoção (sem fato) é vazia. Legenda boa combina os dois em densidade natural.{brand_block}
+Legenda só com fato (sem ressonância) é seca. Legenda só com emoção (sem fato) é vazia. Legenda boa combina os dois em densidade natural.
 </role>
 
-<context>
-## 1. RESEARCH DO VÍDEO (fonte primária de material factual)
-
-{research_str}
-
-## 2. HOOK ESCOLHIDO PELO OPERADOR
-
-{hook_str}
-
-**IMPORTANTE**: o texto do `hook_text` acima é a PRIMEIRA LEGENDA do overlay. Você deve copiar EXATAMENTE como está — operador aprovou este texto. Não reformule, não troque pontuação, não mude quebras de linha. É a legenda 1, timestamp start_seconds = 0.0.
-
-O campo `thread` indica o arco narrativo que você deve desenvolver. O fio do overlay sai do hook e se desdobra conforme a thread orienta.
-
-## 3. METADADOS TÉCNICOS DO VÍDEO
-
-- Corte do trecho: {cut_start} → {cut_end}
-- Duração total do vídeo final: {video_duration_seconds:.1f} segundos
-- Faixa esperada de legendas NARRATIVAS (sem contar o CTA): {qtd_min} a {qtd_max} legendas
-- CTA é a última legenda, duração elástica ({DURATION_CTA_MIN:.0f}-{DURATION_CTA_MAX_RAZOAVEL:.0f}s recomendado; pode crescer se sobrar tempo)
-
-## 4. CLASSIFICAÇÃO DA PEÇA (adapta linguagem)
-
-- Formação vocal: {dim_1}
-- Gênero/tradição: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
-
-**Adaptação automática por formação:**
-
-- **Solo**: pode usar pronomes individuais ("ela/ele", "sua voz", "suas mãos")
-- **Dueto/trio/ensemble pequeno**: nomeie cada solista quando relevante; use coletivo quando falar do conjunto
-- **Coro / ensemble sem solista**: NÃO use "ela/ele" individualizante. Use nome do coro, coletivos ("as vozes", "o coro"), ou voz ativa sem sujeito individualizado
-- **Lied**: pianista e cantor formam unidade artística. Menção ao pianista é válida e muitas vezes necessária
-- **Solistas + coro (+ orquestra)**: tratamento híbrido
-
-## 5. CTA FIXO DA MARCA (PT)
-
-A ÚLTIMA legenda do overlay é o CTA FIXO do BO em PT. Texto EXATO (não altere uma vírgula):
-
-```
-{cta_l1}
-{cta_l2}
-```
-
-Esse texto vai como `text_full` da legenda CTA, no formato `"{cta_formatted}"`. Duração do CTA é elástica: start_seconds = end_seconds da legenda narrativa anterior; end_seconds = video_duration_seconds.
-</context>
 
 <task>
-Gere o overlay completo em JSON estruturado seguindo o formato em <format>. Siga os princípios e regras abaixo.
+Gere o overlay completo em JSON estruturado seguindo o formato em <format>, a partir do material do <context> (mensagem do usuário). Siga os princípios e regras abaixo.
 
 ## PRINCÍPIO 1 — 50/50 fato + ressonância por legenda
 
@@ -352,7 +256,7 @@ Calibração por peso textual:
 - Primeira legenda (hook): start_seconds = 0.0
 - Segunda legenda: start_seconds = end_seconds da primeira (matematicamente idêntico)
 - Continua assim até o CTA
-- CTA: end_seconds = video_duration_seconds ({video_duration_seconds})
+- CTA: end_seconds = video_duration_seconds (seção 3 do <context>)
 
 Não existe momento sem legenda. Ponto.
 
@@ -370,16 +274,16 @@ Termos técnicos (coloratura, tessitura, legato, portamento): use apenas quando
 
 ## PRINCÍPIO 12 — Quantidade emerge da duração (com tradeoff matemático)
 
-Para vídeo de {video_duration_seconds:.0f}s, faixa esperada: **{qtd_min} a {qtd_max} legendas narrativas + 1 CTA**.
+A faixa esperada `qtd_min` a `qtd_max` de legendas narrativas (+ 1 CTA) para este vídeo está na seção 3 do <context>, junto com a duração exata que a soma das legendas deve fechar.
 
 **Tradeoff quantidade × duração (VALIDAR antes de retornar)**:
 
-A soma das durações narrativas + CTA = {video_duration_seconds:.1f}s EXATOS. Cada narrativa entre 5-7s; CTA ≥ 5s.
+A soma das durações narrativas + CTA = video_duration_seconds EXATOS. Cada narrativa entre 5-7s; CTA ≥ 5s.
 
-- Se você escolher **perto de qtd_min ({qtd_min})**: cada narrativa pode ser mais longa (~6.5-7s) e o CTA fica elástico (até ~12s).
-- Se você escolher **perto de qtd_max ({qtd_max})**: cada narrativa tem que ser mais curta (~5-5.5s) e o CTA fica no mínimo (~5s). Durações médias de 6-7s NÃO vão caber em qtd_max — vão estourar o vídeo.
+- Se você escolher **perto de qtd_min**: cada narrativa pode ser mais longa (~6.5-7s) e o CTA fica elástico (até ~12s).
+- Se você escolher **perto de qtd_max**: cada narrativa tem que ser mais curta (~5-5.5s) e o CTA fica no mínimo (~5s). Durações médias de 6-7s NÃO vão caber em qtd_max — vão estourar o vídeo.
 
-**Regra prática**: antes de fechar, calcule `sum(end_seconds - start_seconds for cada narrativa)` + duração do CTA. Deve dar EXATAMENTE {video_duration_seconds:.1f}. Se não dá, ajuste durações individuais das narrativas dentro do range 5-7s até fechar.
+**Regra prática**: antes de fechar, calcule `sum(end_seconds - start_seconds for cada narrativa)` + duração do CTA. Deve dar EXATAMENTE video_duration_seconds. Se não dá, ajuste durações individuais das narrativas dentro do range 5-7s até fechar.
 
 Se o research dá material para mais legendas que qtd_max, escolha as melhores e corte o restante. **Cortar o fraco é serviço editorial** — registre em `quality_checks.cortes_aplicados`.
 
@@ -428,8 +332,8 @@ Foi uma das últimas vezes
 que cantou esta ária completa.
 
 [CTA] start=49.5 end=60.0 (10.5s — elástico)
-{cta_l1}
-{cta_l2}
+{_CTA_L1}
+{_CTA_L2}
 ```
 
 **Observações**:
@@ -476,9 +380,7 @@ Adaptação: texto litúrgico, contexto devocional.
 
 ## ANTI-PADRÕES PROIBIDOS (PT)
 
-Lista completa carregada de BO_ANTIPADROES.json:
-
-{antipadroes_pt}
+Lista completa carregada de BO_ANTIPADROES.json: seção 6 do <context>.
 
 **Regra de ouro**: adjetivo só é banido quando usado **vazio**. Com fato concreto, passa.
 
@@ -506,7 +408,7 @@ Lista completa carregada de BO_ANTIPADROES.json:
 - **Duração do CTA ≥ {DURATION_CTA_MIN:.1f}s** (sem limite superior; normal é 5-12s; eventualmente mais).
 - **Gap zero**: `end_seconds` da legenda N = `start_seconds` da legenda N+1. Exato, float preciso.
 - **Primeira legenda**: `start_seconds = 0.0`.
-- **Última legenda (CTA)**: `end_seconds = video_duration_seconds` = {video_duration_seconds}.
+- **Última legenda (CTA)**: `end_seconds = video_duration_seconds` (seção 3 do <context>).
 - **Timestamps em segundos float** (ex: 6.0, 12.5, 43.5). Formato textual (HH:MM:SS,mmm) é gerado por código downstream, NÃO por você.
 
 ## Editoriais (regras duras)
@@ -527,7 +429,7 @@ Lista completa carregada de BO_ANTIPADROES.json:
 </constraints>
 
 <format>
-Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentários:
+Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentários. Os campos entre `<...>` vêm do <context>:
 
 {{
   "captions": [
@@ -550,12 +452,12 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
   "cta": {{
     "index": 9,
     "start_seconds": 49.5,
-    "end_seconds": {video_duration_seconds},
-    "text_line_1": "{cta_l1}",
-    "text_line_2": "{cta_l2}",
-    "text_full": "{cta_formatted}",
-    "line_1_chars": {len(cta_l1)},
-    "line_2_chars": {len(cta_l2)},
+    "end_seconds": <video_duration_seconds>,
+    "text_line_1": "{_CTA_L1}",
+    "text_line_2": "{_CTA_L2}",
+    "text_full": "{_CTA_FORMATTED}",
+    "line_1_chars": {len(_CTA_L1)},
+    "line_2_chars": {len(_CTA_L2)},
     "is_cta": true,
     "elastic_duration": true
   }},
@@ -563,7 +465,7 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
   "metadata": {{
     "total_narrative_captions": 8,
     "total_captions_including_cta": 9,
-    "video_duration_seconds": {video_duration_seconds},
+    "video_duration_seconds": <video_duration_seconds>,
     "fio_principal": "Resumo em 1 frase do fio narrativo.",
     "viradas_de_fio": [
       {{
@@ -573,7 +475,7 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
       }}
     ],
     "classificacao_adaptada": {{
-      "formacao": "{dim_1}",
+      "formacao": "<formação vocal da seção 4>",
       "pronomes_usados": "individuais (ela) | coletivos | híbrido",
       "adaptacao_aplicada": "explicação breve"
     }}
@@ -634,13 +536,13 @@ V6: **Gap zero**: para cada par consecutivo (incluindo última narrativa → CTA
 
 V7: **Primeira em zero**: `captions[0].start_seconds == 0.0`.
 
-V8: **Última termina no fim**: `cta.end_seconds == {video_duration_seconds}` EXATO.
+V8: **Última termina no fim**: `cta.end_seconds == video_duration_seconds` EXATO.
 
 V9: **Hook copiado exatamente**: `captions[0].text_full == hook_escolhido.hook_text`. Sem uma vírgula diferente. Convenção: `\\n` no JSON representa char LF real (ord 10) após parsing — comparação é feita após `json.loads`.
 
-V10: **CTA texto fixo**: `cta.text_line_1 == "{cta_l1}"` e `cta.text_line_2 == "{cta_l2}"`. Sem desvio.
+V10: **CTA texto fixo**: `cta.text_line_1 == "{_CTA_L1}"` e `cta.text_line_2 == "{_CTA_L2}"`. Sem desvio.
 
-V11: **Adjetivos banidos zerados**: releia cada legenda contra a lista em <task>. Se encontrar termo sem fato qualificador, substitua.
+V11: **Adjetivos banidos zerados**: releia cada legenda contra a lista da seção 6 do <context>. Se encontrar termo sem fato qualificador, substitua.
 
 V12: **Travessões zerados**: nenhum `—` nem `–` em nenhuma legenda narrativa.
 
@@ -656,9 +558,156 @@ V17: **Adaptação por formação**: coro sem "ela/ele" individualizante; Lied c
 
 V18: **Zero invenção**: cada fato está no research. Se usou algo não presente, corte.
 
-V19: **Quantidade razoável**: entre {qtd_min} e {qtd_max} legendas narrativas. Se está fora, revise o material.
+V19: **Quantidade razoável**: entre qtd_min e qtd_max legendas narrativas (seção 3 do <context>). Se está fora, revise o material.
 
 V20: **JSON válido**: todos os campos obrigatórios preenchidos; tipos corretos (floats para timestamps, ints para chars, arrays para listas).
 
 Se qualquer verificação falha, corrija antes de retornar.
 </self_check>"""
+
+
+def build_bo_overlay_prompt_partes(
+    research_data: dict,
+    hook_escolhido: dict,
+    video_duration_seconds: float,
+    antipadroes_pt: str,
+    cut_start: str = "",
+    cut_end: str = "",
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt de overlay BO separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_bo_overlay_prompt`.
+
+    Raises:
+      ValueError: se video_duration_seconds < MIN_VIDEO_DURATION
+    """
+    import json as _json
+
+    bc = brand_config or {}
+    brand_identity = bc.get("identity_prompt_redator", "")
+    brand_tom = bc.get("tom_de_voz_redator", "")
+
+    brand_block_parts = []
+    if brand_identity:
+        brand_block_parts.append(f"**Identidade:** {brand_identity}")
+    if brand_tom:
+        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
+
+    brand_block = ""
+    if brand_block_parts:
+        brand_block = (
+            "═══════════════════════════════\n"
+            "CONTEXTO DA MARCA (Best of Opera)\n"
+            "═══════════════════════════════\n"
+            + "\n".join(brand_block_parts)
+            + "\n\n"
+        )
+
+    # Extrair informação essencial do research
+    classificacao = research_data.get("classificacao_refinada", {})
+    dim_1 = classificacao.get("dimensao_1_formacao", "")
+    dim_3_pai = classificacao.get("dimensao_3_pai", "")
+    dim_3_sub = classificacao.get("dimensao_3_sub", "")
+
+    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:8000]
+    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
+
+    # Calcular faixa viável (pode levantar ValueError se vídeo curto demais)
+    qtd_min, qtd_max = _calc_faixa_legendas(video_duration_seconds)
+
+    cta_l1, cta_l2, cta_formatted = _CTA_L1, _CTA_L2, _CTA_FORMATTED
+
+    contexto = f"""<context>
+{brand_block}## 1. RESEARCH DO VÍDEO (fonte primária de material factual)
+
+{research_str}
+
+## 2. HOOK ESCOLHIDO PELO OPERADOR
+
+{hook_str}
+
+**IMPORTANTE**: o texto do `hook_text` acima é a PRIMEIRA LEGENDA do overlay. Você deve copiar EXATAMENTE como está — operador aprovou este texto. Não reformule, não troque pontuação, não mude quebras de linha. É a legenda 1, timestamp start_seconds = 0.0.
+
+O campo `thread` indica o arco narrativo que você deve desenvolver. O fio do overlay sai do hook e se desdobra conforme a thread orienta.
+
+## 3. METADADOS TÉCNICOS DO VÍDEO
+
+- Corte do trecho: {cut_start} → {cut_end}
+- Duração total do vídeo final: {video_duration_seconds:.1f} segundos (`video_duration_seconds` = {video_duration_seconds})
+- Faixa esperada de legendas NARRATIVAS (sem contar o CTA): {qtd_min} a {qtd_max} legendas (`qtd_min` = {qtd_min}, `qtd_max` = {qtd_max})
+- CTA é a última legenda, duração elástica ({DURATION_CTA_MIN:.0f}-{DURATION_CTA_MAX_RAZOAVEL:.0f}s recomendado; pode crescer se sobrar tempo)
+
+Para vídeo de {video_duration_seconds:.0f}s, faixa esperada: **{qtd_min} a {qtd_max} legendas narrativas + 1 CTA**. A soma das durações narrativas + CTA = {video_duration_seconds:.1f}s EXATOS.
+
+## 4. CLASSIFICAÇÃO DA PEÇA (adapta linguagem)
+
+- Formação vocal: {dim_1}
+- Gênero/tradição: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
+
+**Adaptação automática por formação:**
+
+- **Solo**: pode usar pronomes individuais ("ela/ele", "sua voz", "suas mãos")
+- **Dueto/trio/ensemble pequeno**: nomeie cada solista quando relevante; use coletivo quando falar do conjunto
+- **Coro / ensemble sem solista**: NÃO use "ela/ele" individualizante. Use nome do coro, coletivos ("as vozes", "o coro"), ou voz ativa sem sujeito individualizado
+- **Lied**: pianista e cantor formam unidade artística. Menção ao pianista é válida e muitas vezes necessária
+- **Solistas + coro (+ orquestra)**: tratamento híbrido
+
+## 5. CTA FIXO DA MARCA (PT)
+
+A ÚLTIMA legenda do overlay é o CTA FIXO do BO em PT. Texto EXATO (não altere uma vírgula):
+
+```
+{cta_l1}
+{cta_l2}
+```
+
+Esse texto vai como `text_full` da legenda CTA, no formato `"{cta_formatted}"`. Duração do CTA é elástica: start_seconds = end_seconds da legenda narrativa anterior; end_seconds = video_duration_seconds.
+
+## 6. ANTI-PADRÕES PROIBIDOS (PT)
+
+Lista completa carregada de BO_ANTIPADROES.json:
+
+{antipadroes_pt}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_bo_overlay_prompt(
+    research_data: dict,
+    hook_escolhido: dict,
+    video_duration_seconds: float,
+    antipadroes_pt: str,
+    cut_start: str = "",
+    cut_end: str = "",
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói prompt de geração de overlay para Best of Opera.
+
+    Parâmetros:
+    - research_data: output completo do BO_research_v1
+    - hook_escolhido: dict com `hook_text`, `angle`, `thread`, `fato_fonte`
+    - video_duration_seconds: duração total do vídeo em segundos (float).
+                              Levanta ValueError se < 20s.
+    - antipadroes_pt: string formatada de antipadrões PT (de BO_ANTIPADROES.json)
+    - cut_start, cut_end: timestamps do trecho no vídeo original (referência)
+    - brand_config: configuração da marca (identity, tom)
+
+    Retorna: string do prompt completo (instruções fixas + <context>). O
+    service usa `build_bo_overlay_prompt_partes` para mandar as instruções
+    fixas como system cacheável.
+
+    Raises:
+      ValueError: se video_duration_seconds < MIN_VIDEO_DURATION
+    """
+    estatico, dinamico = build_bo_overlay_prompt_partes(
+        research_data, hook_escolhido, video_duration_seconds, antipadroes_pt,
+        cut_start=cut_start, cut_end=cut_end, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
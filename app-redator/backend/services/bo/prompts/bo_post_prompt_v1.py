@@ -26,75 +26,16 @@ MUDANÇAS vs versão original do ZIP:
   como no código atual). Garante separação temática real.
 - Validação "quantidade de parágrafos narrativos" precisa de campos no
   quality_checks.
+- Instruções fixas separadas do <context> do projeto
+  (`build_bo_post_prompt_partes`): o service manda as fixas como bloco
+  system com cache_control (prompt caching)
 """
 
 
-def build_bo_post_prompt(
-    research_data: dict,
-    hook_escolhido: dict,
-    overlay_aprovado: dict,
-    antipadroes_pt: str,
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói prompt de geração de post/descrição para Best of Opera.
-
-    Parâmetros:
-    - research_data: output completo do BO_research_v1
-    - hook_escolhido: hook escolhido pelo operador (BO_hooks_v1)
-    - overlay_aprovado: overlay completo APROVADO pelo operador (BO_overlay_v1).
-                       Schema: {captions: [...], cta: {...}, metadata: {...},
-                       quality_checks: {...}}
-    - antipadroes_pt: string formatada de antipadrões PT
-    - brand_config: configuração da marca
-
-    Retorna: string do prompt completo.
-
-    Raises:
-        KeyError: se overlay_aprovado não tiver `captions` (schema novo v1)
-    """
-    import json as _json
-
-    if "captions" not in overlay_aprovado:
-        raise KeyError(
-            "overlay_aprovado deve estar no schema v1 com chave 'captions'. "
-            "Recebido: " + str(list(overlay_aprovado.keys()))
-        )
-
-    bc = brand_config or {}
-    brand_identity = bc.get("identity_prompt_redator", "")
-    brand_tom = bc.get("tom_de_voz_redator", "")
-
-    brand_block_parts = []
-    if brand_identity:
-        brand_block_parts.append(f"**Identidade:** {brand_identity}")
-    if brand_tom:
-        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
-
-    brand_block = ""
-    if brand_block_parts:
-        brand_block = (
-            "\n\n═══════════════════════════════\n"
-            "CONTEXTO DA MARCA (Best of Opera)\n"
-            "═══════════════════════════════\n"
-            + "\n".join(brand_block_parts)
-        )
-
-    # Extrair classificação
-    classificacao = research_data.get("classificacao_refinada", {})
-    dim_1 = classificacao.get("dimensao_1_formacao", "")
-    dim_3_pai = classificacao.get("dimensao_3_pai", "")
-    dim_3_sub = classificacao.get("dimensao_3_sub", "")
-
-    # Extrair textos do overlay aprovado (schema novo)
-    overlay_captions = overlay_aprovado.get("captions", [])
-    overlay_texts = [c.get("text_full", "") for c in overlay_captions]
-    overlay_summary = "\n".join(f"- {t}" for t in overlay_texts)
-
-    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:8000]
-    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
-
-    return f"""<role>
+# Instruções fixas do prompt — iguais para todo projeto. Vão no bloco system
+# com cache_control (prompt caching); o que varia por projeto fica no
+# <context> e vai na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é o redator do post/descrição do canal "Best of Opera" (Instagram + YouTube). Seu papel: escrever o texto que acompanha o vídeo no feed, COMPLEMENTANDO o overlay que o espectador vê sobre o vídeo.
 
 ## Princípio central — separação temática
@@ -115,36 +56,11 @@ Você é um amigo bem informado em música vocal clássica escrevendo para algu
 - **Especificidade**, não genérico
 - **Ritmo de conversa**, não de Wikipedia
 
-Princípio absoluto: **fato específico sempre supera generalidade emocional**.{brand_block}
+Princípio absoluto: **fato específico sempre supera generalidade emocional**.
 </role>
 
-<context>
-## 1. RESEARCH DO VÍDEO (fonte primária de material factual)
-
-{research_str}
-
-## 2. HOOK ESCOLHIDO (contexto do overlay)
-
-{hook_str}
-
-## 3. OVERLAY APROVADO (o que JÁ ESTÁ dito, para você evitar repetir)
-
-Legendas do overlay que o espectador verá sobre o vídeo:
-
-{overlay_summary}
-
-**Regra crítica**: os fatos acima estão no overlay. O post NÃO deve repetir esses fatos. Complemente com OUTROS fatos do research.
-
-## 4. CLASSIFICAÇÃO (adapta estrutura)
-
-- Formação vocal: {dim_1}
-- Gênero/tradição: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
-
-A classificação afeta a estrutura da ficha técnica (seção FICHA TÉCNICA em <task>).
-</context>
-
 <task>
-Gere o post completo em português brasileiro (corpo) com ficha técnica em inglês e hashtags em inglês. Respeite EXATAMENTE a estrutura abaixo.
+Gere o post completo do vídeo descrito no <context> (mensagem do usuário) em português brasileiro (corpo) com ficha técnica em inglês e hashtags em inglês. Respeite EXATAMENTE a estrutura abaixo.
 
 ## ESTRUTURA DO POST
 
@@ -352,9 +268,7 @@ Original language: Italian
 
 ## ANTI-PADRÕES PROIBIDOS (PT)
 
-Lista completa carregada de BO_ANTIPADROES.json:
-
-{antipadroes_pt}
+Lista completa carregada de BO_ANTIPADROES.json: seção 5 do <context>.
 
 **Regra de ouro**: adjetivo só é banido quando usado **vazio**. Com fato concreto, passa.
 
@@ -406,18 +320,18 @@ Lista completa carregada de BO_ANTIPADROES.json:
 <format>
 Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentários:
 
-{{
+{
   "post_text": "🎶 [Obra] — [Intérprete]\\n\\n🎭 [P1 completo sobre compositor/criação]\\n\\n✨ [P2 narrativo]\\n\\n🕊 [P3 narrativo, com pergunta inline ao fim ou bloco separado]\\n\\n🎤 [Intérprete] [bandeira]\\nNationality: ...\\nVoice type: ...\\nDate of Birth: ...\\n\\n🎼 [Obra]\\nFrom: ...\\nComposer: ... [bandeira]\\n...\\n\\n#BestOfOpera #X #Y #Z",
 
-  "metadata": {{
+  "metadata": {
     "total_chars": 0,
     "paragraphs_count": 3,
     "hashtags": ["#BestOfOpera", "#X", "#Y", "#Z"],
     "ficha_interprete_template": "5.A | 5.B | 5.C | 5.D | 5.E",
     "ficha_obra_fields_filled": ["From", "Composer", "Composition date", "Libretto", "Original language"]
-  }},
+  },
 
-  "quality_checks": {{
+  "quality_checks": {
     "total_chars_within_1900": true,
     "header_format_correct": true,
     "p1_has_theater_emoji": true,
@@ -442,8 +356,8 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentár
       "Breve descrição do fato do overlay que o post evitou repetir"
     ],
     "alertas": []
-  }}
-}}
+  }
+}
 </format>
 
 <self_check>
@@ -467,7 +381,7 @@ V8: **Hashtags**: exatamente 4, linha única ao final. Primeira `#BestOfOpera`.
 
 V9: **Separação temática com overlay**: releia as legendas do overlay em <context>. Para cada fato específico do overlay, verifique que NÃO reaparece no post. Registre fatos usados e evitados em `facts_used_from_research` e `facts_avoided_because_in_overlay`.
 
-V10: **Adjetivos banidos zerados**: releia corpo contra lista em <task>. Substitua vazios.
+V10: **Adjetivos banidos zerados**: releia corpo contra a lista da seção 5 do <context>. Substitua vazios.
 
 V11: **Travessões zerados no corpo**: o único travessão permitido é o do header. No corpo, nenhum `—` nem `–`.
 
@@ -483,3 +397,128 @@ V16: **JSON válido**: `post_text` com quebras de linha escapadas; `metadata` e
 
 Se qualquer verificação falha, corrija antes de retornar.
 </self_check>"""
+
+
+def build_bo_post_prompt_partes(
+    research_data: dict,
+    hook_escolhido: dict,
+    overlay_aprovado: dict,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_bo_post_prompt`.
+    """
+    import json as _json
+
+    if "captions" not in overlay_aprovado:
+        raise KeyError(
+            "overlay_aprovado deve estar no schema v1 com chave 'captions'. "
+            "Recebido: " + str(list(overlay_aprovado.keys()))
+        )
+
+    bc = brand_config or {}
+    brand_identity = bc.get("identity_prompt_redator", "")
+    brand_tom = bc.get("tom_de_voz_redator", "")
+
+    brand_block_parts = []
+    if brand_identity:
+        brand_block_parts.append(f"**Identidade:** {brand_identity}")
+    if brand_tom:
+        brand_block_parts.append(f"**Tom de voz:** {brand_tom}")
+
+    brand_block = ""
+    if brand_block_parts:
+        brand_block = (
+            "\n\n═══════════════════════════════\n"
+            "CONTEXTO DA MARCA (Best of Opera)\n"
+            "═══════════════════════════════\n"
+            + "\n".join(brand_block_parts)
+        )
+
+    # Extrair classificação
+    classificacao = research_data.get("classificacao_refinada", {})
+    dim_1 = classificacao.get("dimensao_1_formacao", "")
+    dim_3_pai = classificacao.get("dimensao_3_pai", "")
+    dim_3_sub = classificacao.get("dimensao_3_sub", "")
+
+    # Extrair textos do overlay aprovado (schema novo)
+    overlay_captions = overlay_aprovado.get("captions", [])
+    overlay_texts = [c.get("text_full", "") for c in overlay_captions]
+    overlay_summary = "\n".join(f"- {t}" for t in overlay_texts)
+
+    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:8000]
+    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
+
+    contexto = f"""<context>{brand_block}
+
+## 1. RESEARCH DO VÍDEO (fonte primária de material factual)
+
+{research_str}
+
+## 2. HOOK ESCOLHIDO (contexto do overlay)
+
+{hook_str}
+
+## 3. OVERLAY APROVADO (o que JÁ ESTÁ dito, para você evitar repetir)
+
+Legendas do overlay que o espectador verá sobre o vídeo:
+
+{overlay_summary}
+
+**Regra crítica**: os fatos acima estão no overlay. O post NÃO deve repetir esses fatos. Complemente com OUTROS fatos do research.
+
+## 4. CLASSIFICAÇÃO (adapta estrutura)
+
+- Formação vocal: {dim_1}
+- Gênero/tradição: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
+
+A classificação afeta a estrutura da ficha técnica (seção FICHA TÉCNICA em <task>).
+
+## 5. ANTI-PADRÕES PROIBIDOS (PT)
+
+Lista completa carregada de BO_ANTIPADROES.json:
+
+{antipadroes_pt}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_bo_post_prompt(
+    research_data: dict,
+    hook_escolhido: dict,
+    overlay_aprovado: dict,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói prompt de geração de post/descrição para Best of Opera.
+
+    Parâmetros:
+    - research_data: output completo do BO_research_v1
+    - hook_escolhido: hook escolhido pelo operador (BO_hooks_v1)
+    - overlay_aprovado: overlay completo APROVADO pelo operador (BO_overlay_v1).
+                       Schema: {captions: [...], cta: {...}, metadata: {...},
+                       quality_checks: {...}}
+    - antipadroes_pt: string formatada de antipadrões PT
+    - brand_config: configuração da marca
+
+    Retorna: string do prompt completo (instruções fixas + <context>). O
+    service usa `build_bo_post_prompt_partes` para mandar as instruções fixas como
+    system cacheável.
+
+    Raises:
+        KeyError: se overlay_aprovado não tiver `captions` (schema novo v1)
+    """
+    estatico, dinamico = build_bo_post_prompt_partes(
+        research_data=research_data, hook_escolhido=hook_escolhido,
+        overlay_aprovado=overlay_aprovado, antipadroes_pt=antipadroes_pt,
+        brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
@@ -26,6 +26,9 @@ MUDANÇAS vs versão original do ZIP:
 - Labels da ficha técnica expandidos para cobrir templates 5.B (coro) e 5.C
   (Lied/pianista) além do 5.A (solista)
 - Validação de schema dos inputs (captions em overlay_pt)
+- Instruções fixas separadas do <context> por idioma
+  (`build_bo_translation_prompt_partes`): o service manda as fixas como
+  bloco system com cache_control — o prefixo é o mesmo nos 6 idiomas
 """
 
 from backend.services.bo.bo_ctas import get_cta_overlay
@@ -144,77 +147,16 @@ _FICHA_LABELS = {
 }
 
 
-def build_bo_translation_prompt(
-    target_language: str,
-    overlay_pt: dict,
-    post_pt: str,
-    youtube_pt: dict,
-    antipadroes_idioma_alvo_formatado: str,
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói prompt de tradução BO para um idioma-alvo.
-
-    Parâmetros:
-    - target_language: string do idioma (en | es | de | fr | it | pl)
-    - overlay_pt: dict do overlay aprovado em PT (schema v1 com `captions`)
-    - post_pt: string do post aprovado em PT
-    - youtube_pt: dict com `title`, `tags` aprovados em PT
-    - antipadroes_idioma_alvo_formatado: lista formatada de antipadrões para o
-          idioma-alvo, carregada de BO_ANTIPADROES.json['idiomas'][target_language]
-    - brand_config: configuração da marca
-
-    Retorna: string do prompt completo.
-
-    Raises:
-        ValueError: se target_language inválido
-        KeyError: se overlay_pt não tiver `captions` (schema errado)
-    """
-    import json as _json
-
-    if target_language not in _IDIOMA_NOMES:
-        raise ValueError(
-            f"target_language '{target_language}' inválido. "
-            f"Use um de: {list(_IDIOMA_NOMES.keys())}"
-        )
-
-    if "captions" not in overlay_pt:
-        raise KeyError(
-            "overlay_pt deve estar no schema v1 com chave 'captions'. "
-            "Recebido: " + str(list(overlay_pt.keys()))
-        )
-
-    idioma_nome = _IDIOMA_NOMES[target_language]
-    cta_l1, cta_l2 = get_cta_overlay(target_language)
-    labels = _FICHA_LABELS[target_language]
-
-    bc = brand_config or {}
-    brand_identity = bc.get("identity_prompt_redator", "")
-
-    brand_block = ""
-    if brand_identity:
-        brand_block = (
-            "\n\n═══════════════════════════════\n"
-            "CONTEXTO DA MARCA (Best of Opera)\n"
-            "═══════════════════════════════\n"
-            f"{brand_identity}"
-        )
-
-    overlay_str = _json.dumps(overlay_pt, ensure_ascii=False, indent=2)[:6000]
-    youtube_str = _json.dumps(youtube_pt, ensure_ascii=False, indent=2)
-
-    # Tabela de rótulos da ficha técnica para este idioma
-    labels_table = "\n".join(
-        f"  - {_FICHA_LABELS['en'][k]} → {v}"
-        for k, v in labels.items()
-    )
-
-    return f"""<role>
+# Instruções fixas do prompt — idênticas para os 6 idiomas e para todos os
+# projetos. Vão no bloco system com cache_control (prompt caching Anthropic):
+# as 6 chamadas paralelas, os retries de validação e os projetos seguintes
+# leem o prefixo do cache em vez de reprocessá-lo. Tudo que varia por
+# idioma/projeto (idioma-alvo, fontes PT, CTA, rótulos, antipadrões) fica em
+# `_build_contexto` e vai na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é um tradutor editorial especializado em música vocal clássica, traduzindo para o canal "Best of Opera" (Instagram + YouTube).
 
-## Idioma-alvo desta chamada
-
-Você vai traduzir para: **{idioma_nome}**.
+O idioma-alvo de cada chamada está no início do <context> (mensagem do usuário). Toda menção a "idioma-alvo" abaixo se refere a ele.
 
 ## Sua régua editorial
 
@@ -229,76 +171,30 @@ A segunda versão EN preserva o contraste dramático (doença + entrega) e cabe
 
 ## Princípios centrais
 
-- **Cada legenda do overlay fica dentro de 38 caracteres por linha em {idioma_nome}**. Regra DURA. Sem exceção.
+- **Cada legenda do overlay fica dentro de 38 caracteres por linha no idioma-alvo**. Regra DURA. Sem exceção.
 - **Timestamps NÃO são alterados**. Você traduz só o texto.
 - **Efeito > literalidade** quando há conflito
-- **Fato > adjetivo** em {idioma_nome} também (clichês do idioma-alvo são banidos)
+- **Fato > adjetivo** no idioma-alvo também (clichês do idioma-alvo são banidos)
 - **Preservar o TOM do original** (conversacional, específico, direto)
-- **Ordem narrativa preservada** nas legendas e parágrafos do post{brand_block}
+- **Ordem narrativa preservada** nas legendas e parágrafos do post
 </role>
 
-<context>
-## 1. OVERLAY APROVADO EM PT (fonte)
-
-{overlay_str}
-
-## 2. POST APROVADO EM PT (fonte)
-
-{post_pt[:3000]}
-
-## 3. YOUTUBE APROVADO EM PT (fonte)
-
-{youtube_str}
-
-## 4. CTA FIXO DO OVERLAY EM {idioma_nome.upper()}
-
-A última legenda do overlay (CTA) NÃO é traduzida por você. Use o texto fixo abaixo, já aprovado e validado:
-
-```
-Linha 1: {cta_l1}
-Linha 2: {cta_l2}
-```
-
-Isso vira `cta.text_line_1` e `cta.text_line_2` no output. O timestamp do CTA preserva o do original PT.
-
-## 5. RÓTULOS DA FICHA TÉCNICA EM {idioma_nome.upper()}
-
-Traduza os rótulos da ficha conforme tabela abaixo. Valores (nacionalidade, tipo vocal, etc.) também traduzem para {idioma_nome}, EXCETO nomes próprios (intérprete, obra, compositor — preservados).
-
-{labels_table}
-
-Exemplos de valores que traduzem:
-- "Italian" → "{labels.get('nationality', 'Nationality')}": value em {idioma_nome}
-- "Lyric tenor" → equivalente em {idioma_nome}
-- "Italian" (Original language) → traduz
-
-Nomes próprios NÃO traduzem:
-- "Luciano Pavarotti" → preserva
-- "Nessun Dorma" → preserva
-- "Turandot" → preserva
-- "Giacomo Puccini" → preserva
-
-## 6. HASHTAGS DO POST
-
-**Hashtags preservam-se EXATAMENTE em inglês**. Não traduza `#BestOfOpera`, `#Puccini`, `#Turandot`, etc. Copie byte-a-byte.
-</context>
-
 <task>
-Produza JSON com traduções dos 3 artefatos para {idioma_nome}. Siga as regras técnicas e editoriais abaixo.
+Produza JSON com traduções dos 3 artefatos (seções 1-3 do <context>) para o idioma-alvo. Siga as regras técnicas e editoriais abaixo.
 
 ## OVERLAY
 
 Para cada legenda narrativa do overlay PT:
 
-1. **Traduza o texto preservando o efeito**. Se literal cabe em 38c/linha e preserva o efeito, use literal. Senão, reformule em {idioma_nome} mantendo o efeito dramático.
+1. **Traduza o texto preservando o efeito**. Se literal cabe em 38c/linha e preserva o efeito, use literal. Senão, reformule no idioma-alvo mantendo o efeito dramático.
 
 2. **Timestamps copiados EXATAMENTE**: `index`, `start_seconds`, `end_seconds`, `is_hook`, `is_cta`, `anchor_type` — idênticos ao PT. Não recalcular duração (é derivada).
 
 3. **Distribua texto em 2 linhas**: conte caracteres de cada linha. Se linha 1 ou 2 estoura 38c, reformule.
 
-4. **CTA é FIXO**: última legenda usa os textos aprovados acima (seção 4 do <context>). Timestamp do CTA preserva o do original.
+4. **CTA é FIXO**: última legenda usa os textos aprovados (seção 4 do <context>). Timestamp do CTA preserva o do original.
 
-5. **Hook escolhido traduz preservando o impacto**: o hook foi escolhido pelo operador em PT; a versão em {idioma_nome} tenta manter o mesmo tipo de gancho (paradoxo, choque, fato surpreendente) mesmo que a formulação literal não caiba.
+5. **Hook escolhido traduz preservando o impacto**: o hook foi escolhido pelo operador em PT; a versão no idioma-alvo tenta manter o mesmo tipo de gancho (paradoxo, choque, fato surpreendente) mesmo que a formulação literal não caiba.
 
 ## POST
 
@@ -306,9 +202,9 @@ Para cada legenda narrativa do overlay PT:
 
 2. **Emojis preservados exatamente**: 🎶, 🎭, ✨, 🎤, 🕊, 🕊️, 🎬, 🎼, bandeiras.
 
-3. **Corpo narrativo traduzido para {idioma_nome}**: PT → {idioma_nome}, com efeito preservado. Sem clichês do idioma-alvo.
+3. **Corpo narrativo traduzido para o idioma-alvo**: PT → idioma-alvo, com efeito preservado. Sem clichês do idioma-alvo.
 
-4. **Ficha técnica com rótulos E valores traduzidos para {idioma_nome}**: use tabela da seção 5. Valores comuns (nacionalidade, tipo vocal) traduzem; nomes próprios preservam.
+4. **Ficha técnica com rótulos E valores traduzidos para o idioma-alvo**: use tabela da seção 5 do <context>. Valores comuns (nacionalidade, tipo vocal) traduzem; nomes próprios preservam.
 
 5. **Hashtags preservadas byte-a-byte em EN**: `#BestOfOpera #Puccini #Turandot #LyricTenor` → idênticas.
 
@@ -316,19 +212,17 @@ Para cada legenda narrativa do overlay PT:
 
 ## YOUTUBE
 
-1. **Title traduzido para {idioma_nome}** preservando ponto-chave narrativo + elementos buscáveis. Máximo 100c.
+1. **Title traduzido para o idioma-alvo** preservando ponto-chave narrativo + elementos buscáveis. Máximo 100c.
 
-2. **Tags traduzidas para {idioma_nome}**: termos comuns em {idioma_nome}; nomes próprios preservam. Total máximo 450c.
+2. **Tags traduzidas para o idioma-alvo**: termos comuns no idioma-alvo; nomes próprios preservam. Total máximo 450c.
 
 3. **Travessão `—` ou pipe `|` permitidos no title** como separador narrativo (exceção documentada, mesma regra do PT).
 
 ---
 
-## ANTI-PADRÕES BANIDOS EM {idioma_nome.upper()}
+## ANTI-PADRÕES BANIDOS NO IDIOMA-ALVO
 
-Lista completa carregada de BO_ANTIPADROES.json para {target_language}:
-
-{antipadroes_idioma_alvo_formatado}
+Lista completa carregada de BO_ANTIPADROES.json para o idioma-alvo: seção 7 do <context>.
 
 **Regra de ouro**: adjetivo só é banido quando usado **vazio**. Com fato concreto, passa.
 
@@ -381,7 +275,7 @@ NUNCA deixe estourar 38c em nenhum idioma traduzido.
 
 ## Técnicos (regras duras)
 
-- **Overlay: 38 caracteres por linha em {idioma_nome}**. Regra DURA. Se estourou, reformule preservando efeito.
+- **Overlay: 38 caracteres por linha no idioma-alvo**. Regra DURA. Se estourou, reformule preservando efeito.
 - **2 linhas por legenda** (obrigatório, igual ao PT).
 - **Timestamps copiados exatamente do PT**: não altere nada.
 - **CTA overlay: texto fixo da seção 4 do <context>**. Não gere, apenas insira.
@@ -392,7 +286,7 @@ NUNCA deixe estourar 38c em nenhum idioma traduzido.
 
 ## Editoriais (regras duras)
 
-- **Zero clichês banidos** do idioma-alvo (lista em <task>).
+- **Zero clichês banidos** do idioma-alvo (lista na seção 7 do <context>).
 - **Zero travessões no corpo narrativo** do post e overlay (exceções: header do post, title do YouTube).
 - **Zero invenção**: nunca adicione fato ausente do original.
 - **Preservar efeito emocional** do original. Quando literal distorce o efeito, reformule.
@@ -408,14 +302,14 @@ NUNCA deixe estourar 38c em nenhum idioma traduzido.
 </constraints>
 
 <format>
-Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences:
+Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences. Os campos entre `<...>` vêm do <context>: código do idioma-alvo e as 2 linhas do CTA fixo (seção 4) com suas contagens de caracteres.
 
-{{
-  "idioma": "{target_language}",
+{
+  "idioma": "<código do idioma-alvo>",
 
-  "overlay": {{
+  "overlay": {
     "captions": [
-      {{
+      {
         "index": 1,
         "start_seconds": 0.0,
         "end_seconds": 6.0,
@@ -427,32 +321,32 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences:
         "total_chars": 0,
         "is_hook": true,
         "anchor_type": null
-      }}
+      }
     ],
-    "cta": {{
+    "cta": {
       "index": 0,
       "start_seconds": 0.0,
       "end_seconds": 0.0,
-      "text_line_1": "{cta_l1}",
-      "text_line_2": "{cta_l2}",
-      "text_full": "{cta_l1}\\n{cta_l2}",
-      "line_1_chars": {len(cta_l1)},
-      "line_2_chars": {len(cta_l2)},
+      "text_line_1": "<Linha 1 do CTA>",
+      "text_line_2": "<Linha 2 do CTA>",
+      "text_full": "<Linha 1 do CTA>\\n<Linha 2 do CTA>",
+      "line_1_chars": <chars da Linha 1 do CTA>,
+      "line_2_chars": <chars da Linha 2 do CTA>,
       "is_cta": true,
       "elastic_duration": true
-    }}
-  }},
+    }
+  },
 
   "post_text": "🎶 [Obra] — [Intérprete]\\n\\n🎭 [P1 traduzido]\\n\\n...",
 
-  "youtube": {{
+  "youtube": {
     "title": "Title traduzido",
     "title_chars": 0,
     "tags_list": ["tag1", "tag2", "tag3"],
     "tags_count": 0
-  }},
+  },
 
-  "verificacoes": {{
+  "verificacoes": {
     "overlay_todas_linhas_dentro_38c": true,
     "overlay_todas_legendas_com_2_linhas": true,
     "overlay_timestamps_preservados": true,
@@ -467,34 +361,34 @@ Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences:
     "travessoes_detectados_no_corpo": 0,
     "efeito_vs_literal_aplicado": "descrição de 1 frase das reformulações feitas para preservar efeito",
     "alertas": []
-  }}
-}}
+  }
+}
 </format>
 
 <self_check>
 Antes de retornar, execute rigorosamente:
 
-V1: **Overlay: 38c por linha**. Para cada legenda, `line_1_chars ≤ 38` e `line_2_chars ≤ 38`. Se alguma estourou em {idioma_nome}, reformule preservando o efeito. Regra DURA — nunca deixe passar.
+V1: **Overlay: 38c por linha**. Para cada legenda, `line_1_chars ≤ 38` e `line_2_chars ≤ 38`. Se alguma estourou no idioma-alvo, reformule preservando o efeito. Regra DURA — nunca deixe passar.
 
 V2: **Overlay: 2 linhas por legenda** (inclusive CTA). Se alguma só tem 1 linha, reformule para 2 linhas balanceadas.
 
 V3: **Timestamps preservados (VERIFICAÇÃO PROGRAMÁTICA OBRIGATÓRIA)**: `start_seconds`, `end_seconds`, `index` de cada caption COPIADOS EXATAMENTE do original PT. Qualquer alteração é bug e será rejeitada pelo validador pós-LLM que compara par-a-par (i-ésima caption traduzida vs i-ésima caption PT). Math.isclose(abs_tol=0.001).
 
-V4: **CTA usa texto fixo**: `cta.text_line_1 == "{cta_l1}"` e `cta.text_line_2 == "{cta_l2}"`. Sem desvio.
+V4: **CTA usa texto fixo**: `cta.text_line_1` e `cta.text_line_2` idênticos às linhas 1 e 2 da seção 4 do <context>. Sem desvio.
 
 V5: **Post ≤ 1900c**: conte todo o texto traduzido. Se estourou, comprima parágrafos intermediários (nunca corte estrutura).
 
 V6: **Hashtags do post em EN**: cole idênticas ao original. Se você traduziu alguma, REVERTA.
 
-V7: **Ficha técnica: rótulos traduzidos**: confira tabela no <context>. Se algum rótulo ficou em EN no output {idioma_nome}, traduza.
+V7: **Ficha técnica: rótulos traduzidos**: confira tabela no <context>. Se algum rótulo ficou em EN no output do idioma-alvo, traduza.
 
-V8: **Valores da ficha**: nacionalidade, tipo vocal, data, idioma original — traduzidos para {idioma_nome}. Nomes próprios (obra, compositor, intérprete) — preservados.
+V8: **Valores da ficha**: nacionalidade, tipo vocal, data, idioma original — traduzidos para o idioma-alvo. Nomes próprios (obra, compositor, intérprete) — preservados.
 
-V9: **YouTube title ≤ 100c** em {idioma_nome}.
+V9: **YouTube title ≤ 100c** no idioma-alvo.
 
 V10: **YouTube tags: entre 8 e 15 em `tags_list`**, sum(len(tag)) + separadores ≤ 450c quando concatenadas com ", ". Schema usa `tags_list` (array) como fonte única; string CSV é derivada downstream pelo código, não pelo LLM.
 
-V11: **Clichês banidos zerados**: releia tudo contra a lista em <task>. Se encontrar termo vazio, substitua.
+V11: **Clichês banidos zerados**: releia tudo contra a lista da seção 7 do <context>. Se encontrar termo vazio, substitua.
 
 V12: **Travessões zerados no corpo narrativo**: no post (exceto header) e no overlay. Se apareceu algum, troque por ponto, vírgula, dois-pontos.
 
@@ -508,3 +402,160 @@ V16: **JSON válido**: campos obrigatórios preenchidos.
 
 Se qualquer verificação falha, corrija antes de retornar.
 </self_check>"""
+
+
+def build_bo_translation_prompt_partes(
+    target_language: str,
+    overlay_pt: dict,
+    post_pt: str,
+    youtube_pt: dict,
+    antipadroes_idioma_alvo_formatado: str,
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt de tradução BO separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`), iguais para todo idioma
+      e projeto — vai no bloco system cacheável.
+    - dinâmico: <context> desta chamada (idioma-alvo, fontes PT, CTA,
+      rótulos da ficha, antipadrões) — vai na mensagem user.
+
+    Parâmetros: ver `build_bo_translation_prompt`.
+
+    Raises:
+        ValueError: se target_language inválido
+        KeyError: se overlay_pt não tiver `captions` (schema errado)
+    """
+    import json as _json
+
+    if target_language not in _IDIOMA_NOMES:
+        raise ValueError(
+            f"target_language '{target_language}' inválido. "
+            f"Use um de: {list(_IDIOMA_NOMES.keys())}"
+        )
+
+    if "captions" not in overlay_pt:
+        raise KeyError(
+            "overlay_pt deve estar no schema v1 com chave 'captions'. "
+            "Recebido: " + str(list(overlay_pt.keys()))
+        )
+
+    idioma_nome = _IDIOMA_NOMES[target_language]
+    cta_l1, cta_l2 = get_cta_overlay(target_language)
+    labels = _FICHA_LABELS[target_language]
+
+    bc = brand_config or {}
+    brand_identity = bc.get("identity_prompt_redator", "")
+
+    brand_block = ""
+    if brand_identity:
+        brand_block = (
+            "\n\n═══════════════════════════════\n"
+            "CONTEXTO DA MARCA (Best of Opera)\n"
+            "═══════════════════════════════\n"
+            f"{brand_identity}"
+        )
+
+    overlay_str = _json.dumps(overlay_pt, ensure_ascii=False, indent=2)[:6000]
+    youtube_str = _json.dumps(youtube_pt, ensure_ascii=False, indent=2)
+
+    # Tabela de rótulos da ficha técnica para este idioma
+    labels_table = "\n".join(
+        f"  - {_FICHA_LABELS['en'][k]} → {v}"
+        for k, v in labels.items()
+    )
+
+    contexto = f"""<context>
+## 0. IDIOMA-ALVO DESTA CHAMADA
+
+Você vai traduzir para: **{idioma_nome}** (código `{target_language}`).
+
+Todas as regras de "idioma-alvo" valem para {idioma_nome}: 38 caracteres por linha em {idioma_nome}, clichês de {idioma_nome} banidos, título e tags em {idioma_nome}.{brand_block}
+
+## 1. OVERLAY APROVADO EM PT (fonte)
+
+{overlay_str}
+
+## 2. POST APROVADO EM PT (fonte)
+
+{post_pt[:3000]}
+
+## 3. YOUTUBE APROVADO EM PT (fonte)
+
+{youtube_str}
+
+## 4. CTA FIXO DO OVERLAY EM {idioma_nome.upper()}
+
+A última legenda do overlay (CTA) NÃO é traduzida por você. Use o texto fixo abaixo, já aprovado e validado:
+
+```
+Linha 1: {cta_l1}
+Linha 2: {cta_l2}
+```
+
+Isso vira `cta.text_line_1` e `cta.text_line_2` no output (`line_1_chars`: {len(cta_l1)}, `line_2_chars`: {len(cta_l2)}). O timestamp do CTA preserva o do original PT.
+
+## 5. RÓTULOS DA FICHA TÉCNICA EM {idioma_nome.upper()}
+
+Traduza os rótulos da ficha conforme tabela abaixo. Valores (nacionalidade, tipo vocal, etc.) também traduzem para {idioma_nome}, EXCETO nomes próprios (intérprete, obra, compositor — preservados).
+
+{labels_table}
+
+Exemplos de valores que traduzem:
+- "Italian" → "{labels.get('nationality', 'Nationality')}": value em {idioma_nome}
+- "Lyric tenor" → equivalente em {idioma_nome}
+- "Italian" (Original language) → traduz
+
+Nomes próprios NÃO traduzem:
+- "Luciano Pavarotti" → preserva
+- "Nessun Dorma" → preserva
+- "Turandot" → preserva
+- "Giacomo Puccini" → preserva
+
+## 6. HASHTAGS DO POST
+
+**Hashtags preservam-se EXATAMENTE em inglês**. Não traduza `#BestOfOpera`, `#Puccini`, `#Turandot`, etc. Copie byte-a-byte.
+
+## 7. ANTI-PADRÕES BANIDOS EM {idioma_nome.upper()}
+
+Lista completa carregada de BO_ANTIPADROES.json para {target_language}:
+
+{antipadroes_idioma_alvo_formatado}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_bo_translation_prompt(
+    target_language: str,
+    overlay_pt: dict,
+    post_pt: str,
+    youtube_pt: dict,
+    antipadroes_idioma_alvo_formatado: str,
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói prompt de tradução BO para um idioma-alvo.
+
+    Parâmetros:
+    - target_language: string do idioma (en | es | de | fr | it | pl)
+    - overlay_pt: dict do overlay aprovado em PT (schema v1 com `captions`)
+    - post_pt: string do post aprovado em PT
+    - youtube_pt: dict com `title`, `tags` aprovados em PT
+    - antipadroes_idioma_alvo_formatado: lista formatada de antipadrões para o
+          idioma-alvo, carregada de BO_ANTIPADROES.json['idiomas'][target_language]
+    - brand_config: configuração da marca
+
+    Retorna: string do prompt completo (instruções fixas + <context>). O
+    service usa `build_bo_translation_prompt_partes` para mandar as
+    instruções fixas como system cacheável.
+
+    Raises:
+        ValueError: se target_language inválido
+        KeyError: se overlay_pt não tiver `captions` (schema errado)
+    """
+    estatico, dinamico = build_bo_translation_prompt_partes(
+        target_language, overlay_pt, post_pt, youtube_pt,
+        antipadroes_idioma_alvo_formatado, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
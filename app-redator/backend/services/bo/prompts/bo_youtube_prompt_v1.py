@@ -22,71 +22,16 @@ MUDANÇAS vs versão original do ZIP:
   documentada no Bible v2 §6.3 (atualização de Bible prevista no plano)
 - Valida que overlay_aprovado e hook_escolhido estão no schema v1 (captions +
   hook_text); raise se não.
+- Instruções fixas separadas do <context> do projeto
+  (`build_bo_youtube_prompt_partes`): o service manda as fixas como bloco
+  system com cache_control (prompt caching)
 """
 
 
-def build_bo_youtube_prompt(
-    research_data: dict,
-    hook_escolhido: dict,
-    overlay_aprovado: dict,
-    post_aprovado: str,
-    antipadroes_pt: str,
-    brand_config: dict | None = None,
-) -> str:
-    """
-    Constrói prompt de geração de title + tags YouTube para Best of Opera.
-
-    Parâmetros:
-    - research_data: output completo do BO_research_v1
-    - hook_escolhido: dict com `hook_text` (schema v1)
-    - overlay_aprovado: dict com `captions` (schema v1)
-    - post_aprovado: string do post completo já aprovado (PT)
-    - antipadroes_pt: string formatada de antipadrões PT
-    - brand_config: configuração da marca
-
-    Raises:
-        KeyError: se overlay_aprovado ou hook_escolhido não estão no schema v1
-    """
-    import json as _json
-
-    if "captions" not in overlay_aprovado:
-        raise KeyError(
-            "overlay_aprovado deve estar no schema v1 com chave 'captions'. "
-            "Recebido: " + str(list(overlay_aprovado.keys()))
-        )
-    if "hook_text" not in hook_escolhido:
-        raise KeyError(
-            "hook_escolhido deve ter chave 'hook_text' (schema v1 dos hooks). "
-            "Recebido: " + str(list(hook_escolhido.keys()))
-        )
-
-    bc = brand_config or {}
-    brand_identity = bc.get("identity_prompt_redator", "")
-
-    brand_block = ""
-    if brand_identity:
-        brand_block = (
-            "\n\n═══════════════════════════════\n"
-            "CONTEXTO DA MARCA (Best of Opera)\n"
-            "═══════════════════════════════\n"
-            f"{brand_identity}"
-        )
-
-    # Extrair classificação
-    classificacao = research_data.get("classificacao_refinada", {})
-    dim_1 = classificacao.get("dimensao_1_formacao", "")
-    dim_3_pai = classificacao.get("dimensao_3_pai", "")
-    dim_3_sub = classificacao.get("dimensao_3_sub", "")
-
-    # Overlay summary (primeiras 5 legendas indicam ponto-chave)
-    overlay_captions = overlay_aprovado.get("captions", [])
-    overlay_texts = [c.get("text_full", "") for c in overlay_captions[:5]]
-    overlay_summary = "\n".join(f"- {t}" for t in overlay_texts)
-
-    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:5000]
-    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
-
-    return f"""<role>
+# Instruções fixas do prompt — iguais para todo projeto. Vão no bloco system
+# com cache_control (prompt caching); o que varia por projeto fica no
+# <context> e vai na mensagem user.
+_PROMPT_ESTATICO = """<role>
 Você é o especialista em SEO e title de YouTube Shorts para o canal "Best of Opera". Seu papel: gerar um title de até 100 caracteres e um conjunto de tags de até 450 caracteres no total, em português brasileiro.
 
 ## Diferenças entre YouTube e Instagram
@@ -105,34 +50,11 @@ Tags: mix de **genéricas** (música clássica, ópera, etc. — atingem cauda l
 
 ## Seu tom
 
-Conciso. Específico. Sem clichês. Fato concreto acima de adjetivo vago.{brand_block}
+Conciso. Específico. Sem clichês. Fato concreto acima de adjetivo vago.
 </role>
 
-<context>
-## 1. RESEARCH (fonte factual)
-
-{research_str}
-
-## 2. HOOK ESCOLHIDO PELO OPERADOR
-
-{hook_str}
-
-## 3. PRIMEIRAS LEGENDAS DO OVERLAY (indicam o ponto-chave narrativo)
-
-{overlay_summary}
-
-## 4. POST APROVADO (referência de tom e escopo temático)
-
-{post_aprovado[:1500]}
-
-## 5. CLASSIFICAÇÃO
-
-- Formação: {dim_1}
-- Gênero: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
-</context>
-
 <task>
-Gere title e tags conforme especificação.
+Gere title e tags do vídeo descrito no <context> (mensagem do usuário) conforme especificação.
 
 ## TITLE — Estrutura híbrida
 
@@ -167,7 +89,7 @@ Ex: "Escrita em 6 semanas sob pressão | Vissi d'arte — Callas"
 - Inclui ao menos o nome da obra OU do intérprete (elementos buscáveis)
 - Inclui ao menos 1 elemento de curiosidade (ponto-chave, paradoxo, fato surpreendente)
 - Sem clickbait vazio ("Você não vai acreditar...")
-- Sem adjetivos banidos (lista em <constraints>)
+- Sem adjetivos banidos (lista de anti-padrões do <context>)
 - Sem emojis (YouTube Shorts: emojis em title ficam estranhos)
 - Sem pontos de exclamação (cheira a clickbait)
 - Sem ALL CAPS
@@ -256,9 +178,7 @@ tags_list (15 tags, soma + separadores = 382c):
 
 - **Title em PT-BR** (nativo; traduzido na Etapa 6).
 - **Tags em PT-BR principalmente**, nomes próprios em idioma original.
-- **Zero adjetivos banidos no title** (lista PT abaixo):
-
-{antipadroes_pt}
+- **Zero adjetivos banidos no title** (lista PT na seção ANTI-PADRÕES PROIBIDOS do <context>).
 
 - **Zero invenção**: todo fato no title vem do research.
 - **Title coerente com hook escolhido e overlay**: o ponto-chave do title está alinhado ao que o overlay desenvolve.
@@ -268,28 +188,28 @@ tags_list (15 tags, soma + separadores = 382c):
 <format>
 Retorne EXATAMENTE este JSON, sem preâmbulo, sem markdown fences, sem comentários:
 
-{{
+{
   "title": "Texto do title, máximo 100c",
 
   "tags_list": ["tag1", "tag2", "tag3", "tag4", "tag5", "tag6", "tag7", "tag8"],
 
-  "metadata": {{
+  "metadata": {
     "title_forma_usada": "A | B | C",
     "ponto_chave_narrativo": "Qual é o ponto-chave expresso no title",
     "elementos_buscaveis": ["obra", "intérprete", "compositor"],
     "tags_genericas_count": 0,
     "tags_especificas_count": 0
-  }},
+  },
 
-  "quality_checks": {{
+  "quality_checks": {
     "no_emojis": true,
     "no_exclamation_in_title": true,
     "no_all_caps_in_title": true,
     "no_hashtags": true,
     "adjetivos_banidos_detectados": [],
     "alertas": []
-  }}
-}}
+  }
+}
 
 **Nota sobre schema**: `tags_list` (array) é a ÚNICA fonte da verdade para as tags. O código downstream calcula `tags_csv = ", ".join(tags_list)` e `tags_chars = len(tags_csv)`; NÃO retorne esses campos (eram fonte de divergência entre LLM e realidade). Validadores pós-LLM recomputam `title_chars = len(title)` e `tags_count = len(tags_list)` — também não reportados por você.
 </format>
@@ -303,7 +223,7 @@ V2: **Tags: sum dos chars + separadores ≤ 450c**: para cada tag em `tags_list`
 
 V3: **Tags entre 8 e 15**: `len(tags_list)` ∈ [8, 15].
 
-V4: **Zero adjetivos banidos no title**: releia contra lista em <constraints>. Substitua vazios.
+V4: **Zero adjetivos banidos no title**: releia contra a lista de anti-padrões do <context>. Substitua vazios.
 
 V5: **Title coerente com hook e overlay**: o ponto-chave do title reflete o ângulo que o overlay desenvolve. Se divergir, realinhe.
 
@@ -315,3 +235,126 @@ V8: **Travessão/pipe permitido só no title**: se algum apareceu em alguma tag
 
 Se alguma verificação falha, corrija antes de retornar.
 </self_check>"""
+
+
+def build_bo_youtube_prompt_partes(
+    research_data: dict,
+    hook_escolhido: dict,
+    overlay_aprovado: dict,
+    post_aprovado: str,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> tuple[str, str]:
+    """
+    Constrói o prompt separado em (estático, dinâmico).
+
+    - estático: instruções fixas (`_PROMPT_ESTATICO`) — bloco system cacheável.
+    - dinâmico: <context> do projeto — mensagem user.
+
+    Parâmetros: ver `build_bo_youtube_prompt`.
+
+    Raises:
+        KeyError: se overlay_aprovado ou hook_escolhido não estão no schema v1
+    """
+    import json as _json
+
+    if "captions" not in overlay_aprovado:
+        raise KeyError(
+            "overlay_aprovado deve estar no schema v1 com chave 'captions'. "
+            "Recebido: " + str(list(overlay_aprovado.keys()))
+        )
+    if "hook_text" not in hook_escolhido:
+        raise KeyError(
+            "hook_escolhido deve ter chave 'hook_text' (schema v1 dos hooks). "
+            "Recebido: " + str(list(hook_escolhido.keys()))
+        )
+
+    bc = brand_config or {}
+    brand_identity = bc.get("identity_prompt_redator", "")
+
+    brand_block = ""
+    if brand_identity:
+        brand_block = (
+            "\n\n═══════════════════════════════\n"
+            "CONTEXTO DA MARCA (Best of Opera)\n"
+            "═══════════════════════════════\n"
+            f"{brand_identity}"
+        )
+
+    # Extrair classificação
+    classificacao = research_data.get("classificacao_refinada", {})
+    dim_1 = classificacao.get("dimensao_1_formacao", "")
+    dim_3_pai = classificacao.get("dimensao_3_pai", "")
+    dim_3_sub = classificacao.get("dimensao_3_sub", "")
+
+    # Overlay summary (primeiras 5 legendas indicam ponto-chave)
+    overlay_captions = overlay_aprovado.get("captions", [])
+    overlay_texts = [c.get("text_full", "") for c in overlay_captions[:5]]
+    overlay_summary = "\n".join(f"- {t}" for t in overlay_texts)
+
+    research_str = _json.dumps(research_data, ensure_ascii=False, indent=2)[:5000]
+    hook_str = _json.dumps(hook_escolhido, ensure_ascii=False, indent=2)
+
+    contexto = f"""<context>{brand_block}
+
+## 1. RESEARCH (fonte factual)
+
+{research_str}
+
+## 2. HOOK ESCOLHIDO PELO OPERADOR
+
+{hook_str}
+
+## 3. PRIMEIRAS LEGENDAS DO OVERLAY (indicam o ponto-chave narrativo)
+
+{overlay_summary}
+
+## 4. POST APROVADO (referência de tom e escopo temático)
+
+{post_aprovado[:1500]}
+
+## 5. CLASSIFICAÇÃO
+
+- Formação: {dim_1}
+- Gênero: {dim_3_pai} {f"→ {dim_3_sub}" if dim_3_sub else ""}
+
+## ANTI-PADRÕES PROIBIDOS (PT)
+
+{antipadroes_pt}
+</context>"""
+
+    return _PROMPT_ESTATICO, contexto
+
+
+def build_bo_youtube_prompt(
+    research_data: dict,
+    hook_escolhido: dict,
+    overlay_aprovado: dict,
+    post_aprovado: str,
+    antipadroes_pt: str,
+    brand_config: dict | None = None,
+) -> str:
+    """
+    Constrói prompt de geração de title + tags YouTube para Best of Opera.
+
+    Parâmetros:
+    - research_data: output completo do BO_research_v1
+    - hook_escolhido: dict com `hook_text` (schema v1)
+    - overlay_aprovado: dict com `captions` (schema v1)
+    - post_aprovado: string do post completo já aprovado (PT)
+    - antipadroes_pt: string formatada de antipadrões PT
+    - brand_config: configuração da marca
+
+    Retorna: string do prompt completo (instruções fixas + <context>). O
+    service usa `build_bo_youtube_prompt_partes` para mandar as instruções
+    fixas como system cacheável.
+
+    Raises:
+        KeyError: se overlay_aprovado ou hook_escolhido não estão no schema v1
+    """
+    estatico, dinamico = build_bo_youtube_prompt_partes(
+        research_data=research_data, hook_escolhido=hook_escolhido,
+        overlay_aprovado=overlay_aprovado, post_aprovado=post_aprovado,
+        antipadroes_pt=antipadroes_pt, brand_config=brand_config,
+    )
+    return f"{estatico}\n\n{dinamico}"
@@ -18,8 +18,11 @@ from backend.prompts.youtube_prompt import (
     build_youtube_prompt,
     build_youtube_prompt_with_custom,
 )
+from backend.services.llm_cache import TTL_CRIATIVO, TTL_DETERMINISTICO
+from backend.services.llm_gateway import INTERATIVO, criar_mensagem
+from backend.services.prompt_cache import system_cacheavel
 
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0)
+client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0, max_retries=0)
 MODEL = "claude-sonnet-4-6"
 
 
@@ -76,56 +79,64 @@ def _build_language_system_prompt(language: str) -> str:
     )
 
 
-def _check_language_leak(text: str, target_language: str) -> None:
-    """Log warning if the last sentence of generated text appears to contain Portuguese."""
+def _palavras_pt_vazadas(text: str, target_language: str) -> set[str]:
+    """Palavras PT comuns na última frase (≥3 = provável vazamento de idioma); vazio se ok."""
     if target_language == "português":
-        return
+        return set()
     # Get last meaningful sentence
     sentences = [s.strip() for s in text.replace("\n", " ").split(".") if s.strip()]
     if not sentences:
-        return
-    last = sentences[-1].lower()
-    words = set(last.split())
-    found = words & _PT_COMMON_WORDS
-    if len(found) >= 3:
+        return set()
+    found = set(sentences[-1].lower().split()) & _PT_COMMON_WORDS
+    return found if len(found) >= 3 else set()
+
+
+def _sem_vazamento_idioma(target_language: str, preparar=lambda t: t):
+    """Predicado `aceitar` do llm_cache: resposta com vazamento de PT não vai para o cache."""
+    def _aceitar(message) -> bool:
+        try:
+            return not _palavras_pt_vazadas(preparar(message.content[0].text), target_language)
+        except (AttributeError, IndexError):
+            return False
+    return _aceitar
+
+
+def _check_language_leak(text: str, target_language: str) -> None:
+    """Log warning if the last sentence of generated text appears to contain Portuguese."""
+    found = _palavras_pt_vazadas(text, target_language)
+    if found:
         logger.warning(
             f"Possível trecho em português detectado na geração — revisar manualmente. "
             f"Idioma alvo: {target_language}. Palavras PT encontradas: {found}"
         )
 
 
-def _call_claude(prompt: str, system: str | None = None, temperature: float = 0.8) -> str:
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            kwargs: dict = dict(
-                model=MODEL,
-                max_tokens=2048,
-                temperature=temperature,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            if system:
-                kwargs["system"] = system
-            message = client.messages.create(**kwargs)
-            # R7 X: detectar truncamento antes de consumir saída parcial.
-            if message.stop_reason != "end_turn":
-                logger.warning(
-                    f"[LLM stop_reason] _call_claude: stop_reason={message.stop_reason}, model={MODEL}"
-                )
-                raise LLMTruncatedResponseError(
-                    f"_call_claude: stop_reason={message.stop_reason}"
-                )
-            return message.content[0].text.strip()
-        except Exception as e:
-            error_str = str(e).lower()
-            retryable = any(code in error_str for code in ("429", "500", "502", "503", "529", "overloaded"))
-            if retryable and attempt < max_retries - 1:
-                wait = (attempt + 1) * 10
-                logger.warning(f"[_call_claude] Erro retentável, aguardando {wait}s ({attempt+1}/{max_retries}): {e}")
-                import time
-                time.sleep(wait)
-                continue
-            raise
+def _call_claude(
+    prompt: str, system: str | None = None, temperature: float = 0.8,
+    cache_ttl: int = 0, aceitar=None,
+) -> str:
+    """Retry de 429/5xx (com retry-after) fica no llm_gateway.
+
+    `cache_ttl`/`aceitar`: cache de respostas (llm_cache) — ver llm_gateway.
+    """
+    kwargs: dict = dict(
+        model=MODEL,
+        max_tokens=2048,
+        temperature=temperature,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    if system:
+        kwargs["system"] = system
+    message = criar_mensagem(client, origem="claude", cache_ttl=cache_ttl, aceitar=aceitar, **kwargs)
+    # R7 X: detectar truncamento antes de consumir saída parcial.
+    if message.stop_reason != "end_turn":
+        logger.warning(
+            f"[LLM stop_reason] _call_claude: stop_reason={message.stop_reason}, model={MODEL}"
+        )
+        raise LLMTruncatedResponseError(
+            f"_call_claude: stop_reason={message.stop_reason}"
+        )
+    return message.content[0].text.strip()
 
 
 def _strip_json_fences(raw: str) -> str:
@@ -148,6 +159,15 @@ def _strip_json_fences(raw: str) -> str:
     return text.strip()
 
 
+def _resposta_json_valida(message) -> bool:
+    """Só vai para o cache de respostas o que parseia — JSON quebrado não fica preso."""
+    try:
+        json.loads(_strip_json_fences(message.content[0].text))
+        return True
+    except (ValueError, AttributeError, IndexError):
+        return False
+
+
 def detect_metadata_from_text(youtube_url: str, title: str, description: str) -> dict:
     """Use Claude to extract music metadata from YouTube title and description."""
     prompt = f"""You are a classical music expert (opera, instrumental, orchestral, choral, and all subgenres). Based on the YouTube video title and description below, extract the metadata for this performance.
@@ -189,7 +209,9 @@ Return ONLY a JSON object with these exact keys:
 
 Return the JSON object and nothing else."""
 
-    message = client.messages.create(
+    message = criar_mensagem(
+        client, origem="detect_metadata",
+        cache_ttl=TTL_DETERMINISTICO, aceitar=_resposta_json_valida,
         model=MODEL,
         max_tokens=1024,
         messages=[{"role": "user", "content": prompt}],
@@ -263,7 +285,9 @@ Return the JSON object and nothing else."""
     else:
         content = prompt_text
 
-    message = client.messages.create(
+    message = criar_mensagem(
+        client, origem="detect_metadata",
+        cache_ttl=TTL_DETERMINISTICO, aceitar=_resposta_json_valida,
         model=MODEL,
         max_tokens=1024,
         messages=[{"role": "user", "content": content}],
@@ -371,7 +395,9 @@ Return the JSON object and nothing else."""
 def detect_metadata_from_text_rc(youtube_url: str, title: str, description: str) -> dict:
     """RC: extract metadata from YouTube title/description for instrumental music."""
     prompt = _build_rc_detect_prompt_text(youtube_url, title, description)
-    message = client.messages.create(
+    message = criar_mensagem(
+        client, origem="detect_metadata",
+        cache_ttl=TTL_DETERMINISTICO, aceitar=_resposta_json_valida,
         model=MODEL,
         max_tokens=1024,
         messages=[{"role": "user", "content": prompt}],
@@ -400,7 +426,9 @@ def detect_metadata_rc(youtube_url: str, screenshot_base64: Optional[str] = None
     else:
         content = prompt_text
 
-    message = client.messages.create(
+    message = criar_mensagem(
+        client, origem="detect_metadata",
+        cache_ttl=TTL_DETERMINISTICO, aceitar=_resposta_json_valida,
         model=MODEL,
         max_tokens=1024,
         messages=[{"role": "user", "content": content}],
@@ -424,7 +452,10 @@ def generate_overlay(project, custom_prompt: Optional[str] = None, brand_config=
         prompt = build_overlay_prompt_with_custom(project, custom_prompt, brand_config=brand_config)
     else:
         prompt = build_overlay_prompt(project, brand_config=brand_config)
-    raw = _call_claude(prompt, system=system, temperature=0.7)
+    raw = _call_claude(
+        prompt, system=system, temperature=0.7,
+        cache_ttl=TTL_CRIATIVO, aceitar=_resposta_json_valida,
+    )
     parsed = json.loads(_strip_json_fences(raw))
 
     # Apply orthographic cleaning (ERR-056) + warning se acima do limite
@@ -584,7 +615,7 @@ def generate_research_bo(project, brand_config=None) -> str:
     )
     logger.info(f"[BO Research] Prompt: {len(prompt)} chars (~{len(prompt)//4} tokens)")
 
-    result = _call_claude(prompt, temperature=0.7)
+    result = _call_claude(prompt, temperature=0.7, cache_ttl=TTL_DETERMINISTICO)
     logger.info(f"[BO Research] Completo, {len(result)} chars resultado")
     project.research_data = result
     return result
@@ -597,7 +628,7 @@ def generate_hooks(project, brand_config=None) -> list:
     lang = detect_hook_language(project)
     system = _build_language_system_prompt(lang)
     prompt = build_hook_generation_prompt(project, brand_config=brand_config)
-    raw = _call_claude(prompt, system=system)
+    raw = _call_claude(prompt, system=system, cache_ttl=TTL_CRIATIVO, aceitar=_resposta_json_valida)
     parsed = json.loads(_strip_json_fences(raw))
 
     if not isinstance(parsed, list):
@@ -664,7 +695,9 @@ def generate_post(project, custom_prompt: Optional[str] = None, brand_config=Non
         prompt = build_post_prompt_with_custom(project, custom_prompt, brand_config=brand_config)
     else:
         prompt = build_post_prompt(project, brand_config=brand_config)
-    result = _call_claude(prompt, system=system)
+    result = _call_claude(
+        prompt, system=system, cache_ttl=TTL_CRIATIVO, aceitar=_sem_vazamento_idioma(lang),
+    )
     _check_language_leak(result, lang)
     result = _sanitize_post(result)
     return {"text": result, "warning": warning}
@@ -693,7 +726,10 @@ def generate_youtube(project, custom_prompt: Optional[str] = None, brand_config=
         prompt = build_youtube_prompt_with_custom(project, custom_prompt, brand_config=brand_config)
     else:
         prompt = build_youtube_prompt(project, brand_config=brand_config)
-    raw = _call_claude(prompt, system=system)
+    raw = _call_claude(
+        prompt, system=system, cache_ttl=TTL_CRIATIVO,
+        aceitar=_sem_vazamento_idioma(lang, preparar=_strip_markdown_preamble),
+    )
     raw = _strip_markdown_preamble(raw)
     _check_language_leak(raw, lang)
     lines = [l.strip() for l in raw.strip().splitlines() if l.strip()]
@@ -718,49 +754,62 @@ import time as _time
 _rc_logger = logging.getLogger("rc_pipeline")
 
 
-def _call_claude_api_with_retry(system: str, prompt: str, max_tokens: int, temperature: float) -> str:
-    """Chama client.messages.create com retry para 529/overloaded. Retorna raw text."""
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            _rc_logger.info(f"[RC _call_claude_api] Tentativa {attempt+1}/{max_retries}, {len(prompt)} chars")
-            start = _time.time()
-            message = client.messages.create(
-                model=MODEL, max_tokens=max_tokens, temperature=temperature,
-                system=system, messages=[{"role": "user", "content": prompt}],
-            )
-            # R7 X: detectar truncamento antes de consumir saída parcial.
-            # Cobre tradução via cascata: translate_service.py:907
-            # → _call_claude_json → _call_claude_api_with_retry (aqui).
-            if message.stop_reason != "end_turn":
-                _rc_logger.warning(
-                    f"[LLM stop_reason] _call_claude_api_with_retry: stop_reason={message.stop_reason}, model={MODEL}"
-                )
-                raise LLMTruncatedResponseError(
-                    f"_call_claude_api_with_retry: stop_reason={message.stop_reason}"
-                )
-            raw = message.content[0].text.strip()
-            elapsed = _time.time() - start
-            _rc_logger.info(f"[RC _call_claude_api] Resposta: {len(raw)} chars em {elapsed:.1f}s")
-            return raw
-        except Exception as api_error:
-            error_str = str(api_error)
-            if ("529" in error_str or "overloaded" in error_str.lower()) and attempt < max_retries - 1:
-                wait = (attempt + 1) * 10  # 10s, 20s, 30s
-                _rc_logger.warning(f"[RC _call_claude_api] API overloaded, aguardando {wait}s antes de retry...")
-                _time.sleep(wait)
-                continue
-            else:
-                raise
-    raise RuntimeError("Unreachable")
-
+def _call_claude_api_with_retry(
+    system: str, prompt: str, max_tokens: int, temperature: float,
+    system_estatico: str | None = None,
+    prioridade: int = INTERATIVO,
+    cache_ttl: int = 0,
+) -> str:
+    """Chama client.messages.create via llm_gateway (retry 429/529 com retry-after). Retorna raw text.
 
-def _call_claude_json(prompt: str, max_tokens: int = 2000, temperature: float = 0.5) -> dict:
-    """Chama Claude e parseia resposta JSON. Retry para 529 + limpeza agressiva."""
+    `system_estatico` (instruções fixas do prompt RC) vai como bloco system
+    cacheável antes de `system`; o `prompt` fica só com o <context>.
+    `prioridade`: INTERATIVO ou LOTE (tradução) na fila do governador.
+    `cache_ttl`: cache de respostas (llm_cache); só grava resposta que parseia.
+    """
+    system_blocos = system_cacheavel(system_estatico, system) if system_estatico else system
+    _rc_logger.info(f"[RC _call_claude_api] {len(prompt)} chars")
+    start = _time.time()
+    message = criar_mensagem(
+        client, origem="claude_json", prioridade=prioridade,
+        cache_ttl=cache_ttl, aceitar=_resposta_json_valida,
+        model=MODEL, max_tokens=max_tokens, temperature=temperature,
+        system=system_blocos, messages=[{"role": "user", "content": prompt}],
+    )
+    # R7 X: detectar truncamento antes de consumir saída parcial.
+    # Cobre tradução via cascata: translate_service.py:907
+    # → _call_claude_json → _call_claude_api_with_retry (aqui).
+    if message.stop_reason != "end_turn":
+        _rc_logger.warning(
+            f"[LLM stop_reason] _call_claude_api_with_retry: stop_reason={message.stop_reason}, model={MODEL}"
+        )
+        raise LLMTruncatedResponseError(
+            f"_call_claude_api_with_retry: stop_reason={message.stop_reason}"
+        )
+    raw = message.content[0].text.strip()
+    elapsed = _time.time() - start
+    _rc_logger.info(f"[RC _call_claude_api] Resposta: {len(raw)} chars em {elapsed:.1f}s")
+    return raw
+
+
+def _call_claude_json(
+    prompt: str, max_tokens: int = 2000, temperature: float = 0.5,
+    system_estatico: str | None = None,
+    prioridade: int = INTERATIVO,
+    cache_ttl: int = 0,
+) -> dict:
+    """Chama Claude e parseia resposta JSON. Retry para 529 + limpeza agressiva.
+
+    `system_estatico`: instruções fixas (builders `*_partes`) mandadas como
+    system cacheável; `prioridade` na fila do llm_gateway; `cache_ttl` no
+    cache de respostas — ver `_call_claude_api_with_retry`.
+    """
     _rc_logger.info(f"[RC _call_claude_json] Enviando {len(prompt)} chars, max_tokens={max_tokens}, temp={temperature}")
     system = "Return RAW JSON only. Rules: 1) First character must be { or [. 2) Last character must be } or ]. 3) No ```json fences. 4) No text before or after the JSON."
 
-    raw = _call_claude_api_with_retry(system, prompt, max_tokens, temperature)
+    raw = _call_claude_api_with_retry(
+        system, prompt, max_tokens, temperature, system_estatico, prioridade, cache_ttl,
+    )
 
     # Tentativa 1: parse direto com strip_json_fences
     cleaned = _strip_json_fences(raw)
@@ -798,7 +847,7 @@ def _call_claude_json(prompt: str, max_tokens: int = 2000, temperature: float =
     _rc_logger.info("[RC _call_claude_json] Limpeza falhou. Fazendo retry com nova chamada...")
     raw2 = _call_claude_api_with_retry(
         system + " CRITICAL: Your previous response was not valid JSON. Return ONLY the JSON object, nothing else.",
-        prompt, max_tokens, temperature,
+        prompt, max_tokens, temperature, system_estatico, prioridade, cache_ttl,
     )
 
     cleaned2 = _strip_json_fences(raw2)
@@ -1314,7 +1363,7 @@ def generate_research_rc(project, brand_config=None) -> dict:
     prompt = build_rc_research_prompt(metadata)
     _rc_logger.info(f"[RC Research] Prompt: {len(prompt)} chars (~{len(prompt)//4} tokens)")
 
-    result = _call_claude_json(prompt, max_tokens=8192, temperature=0.7)
+    result = _call_claude_json(prompt, max_tokens=8192, temperature=0.7, cache_ttl=TTL_DETERMINISTICO)
     _rc_logger.info(f"[RC Research] Completo, {len(json.dumps(result))} chars resultado")
     project.research_data = result
     return result
@@ -1322,14 +1371,20 @@ def generate_research_rc(project, brand_config=None) -> dict:
 
 def generate_hooks_rc(project, brand_config=None) -> dict:
     """Gera ganchos para RC usando pesquisa como base. Salva em project.hooks_json."""
-    from backend.prompts.rc_hook_prompt import build_rc_hook_prompt
+    from backend.prompts.rc_hook_prompt import build_rc_hook_prompt_partes
 
     _rc_logger.info(f"[RC Hooks] Iniciando para project {project.id}")
     metadata = _extract_rc_metadata(project)
-    prompt = build_rc_hook_prompt(metadata, project.research_data or {}, brand_config=brand_config)
-    _rc_logger.info(f"[RC Hooks] Prompt: {len(prompt)} chars (~{len(prompt)//4} tokens)")
+    system, prompt = build_rc_hook_prompt_partes(
+        metadata, project.research_data or {}, brand_config=brand_config,
+    )
+    _rc_logger.info(
+        f"[RC Hooks] Prompt: {len(system)} chars fixos (cache) + {len(prompt)} chars de contexto"
+    )
 
-    result = _call_claude_json(prompt, max_tokens=4096, temperature=0.85)
+    result = _call_claude_json(
+        prompt, max_tokens=4096, temperature=0.85, system_estatico=system, cache_ttl=TTL_CRIATIVO,
+    )
 
     # Se o JSON veio como lista (fallback de extração por brackets),
     # wrappear no formato esperado
@@ -1357,7 +1412,7 @@ def generate_overlay_rc(project, brand_config=None) -> list:
     brand_slug == "reels-classics" antes de chamar esta função, então a remoção
     é segura. Ver docs/rc_v3_migration/NOTAS_EXECUCAO.md "P4 · brand_config removido".
     """
-    from backend.prompts.rc_overlay_prompt import build_rc_overlay_prompt
+    from backend.prompts.rc_overlay_prompt import build_rc_overlay_prompt_partes
 
     _rc_logger.info(f"[RC Overlay] Iniciando para project {project.id}, hook='{(project.selected_hook or '')[:50]}'")
     metadata = _extract_rc_metadata(project)
@@ -1372,14 +1427,16 @@ def generate_overlay_rc(project, brand_config=None) -> list:
                 hook_tipo = h.get("tipo", "")
                 break
 
-    prompt = build_rc_overlay_prompt(
+    system, prompt = build_rc_overlay_prompt_partes(
         metadata, project.research_data or {},
         project.selected_hook or "", hook_fio,
         hook_tipo=hook_tipo,
     )
-    _rc_logger.info(f"[RC Overlay] Prompt: {len(prompt)} chars (~{len(prompt)//4} tokens)")
+    _rc_logger.info(
+        f"[RC Overlay] Prompt: {len(system)} chars fixos (cache) + {len(prompt)} chars de contexto"
+    )
 
-    response = _call_claude_json(prompt, max_tokens=4096, temperature=0.85)
+    response = _call_claude_json(prompt, max_tokens=4096, temperature=0.85, system_estatico=system)
     overlay_json, audit = _process_overlay_rc(response, project)
     _validate_overlay_rc(overlay_json)
     _rc_logger.info(f"[RC Overlay] Completo, {len(overlay_json)} legendas")
@@ -1391,17 +1448,19 @@ def generate_overlay_rc(project, brand_config=None) -> list:
 
 def generate_post_rc(project, brand_config=None) -> str:
     """Gera descrição Instagram para RC. Salva em project.post_text."""
-    from backend.prompts.rc_post_prompt import build_rc_post_prompt
+    from backend.prompts.rc_post_prompt import build_rc_post_prompt_partes
 
     _rc_logger.info(f"[RC Post] Iniciando para project {project.id}")
     metadata = _extract_rc_metadata(project)
-    prompt = build_rc_post_prompt(
+    system, prompt = build_rc_post_prompt_partes(
         metadata, project.research_data or {}, project.overlay_json or [],
         brand_config=brand_config,
     )
-    _rc_logger.info(f"[RC Post] Prompt: {len(prompt)} chars (~{len(prompt)//4} tokens)")
+    _rc_logger.info(
+        f"[RC Post] Prompt: {len(system)} chars fixos (cache) + {len(prompt)} chars de contexto"
+    )
 
-    response = _call_claude_json(prompt, max_tokens=4096, temperature=0.7)
+    response = _call_claude_json(prompt, max_tokens=4096, temperature=0.7, system_estatico=system)
     post_text = _format_post_rc(response)
     post_text = _sanitize_rc(post_text)
     _rc_logger.info(f"[RC Post] Completo, {len(post_text)} chars texto final")
@@ -0,0 +1,209 @@
+"""
+Jobs em background do redator — tabela redator_jobs
+===================================================
+
+generate_all, generate-automation-rc e translate eram `def` síncronos: cada
+request segurava uma thread do threadpool do Starlette (40 por padrão) e uma
+sessão de banco aberta durante a cadeia LLM inteira (minutos). Poucos
+usuários simultâneos esgotavam o pool e estouravam o timeout HTTP.
+
+Agora a rota só valida, marca o projeto e chama `enfileirar(...)`, que grava
+o job e devolve na hora (202 + id). O corpo roda num pool próprio
+(REDATOR_JOBS_WORKERS) com sessão própria:
+
+- `Progresso.etapa("post")` marca a etapa atual e registra a duração de
+  cada uma em `etapas` — o timing por etapa fica no job, não só no log.
+- HTTPException levantada no corpo vira `erro` + `http_status`, com o mesmo
+  detalhe que a rota síncrona devolvia.
+- Mesmo (projeto, tipo) já pendente/executando: devolve o job existente
+  (duplo clique não dispara duas cadeias).
+- Restart: jobs pendentes/executando viram erro (`recuperar_orfaos`, chamado
+  no startup junto com a recuperação dos projetos).
+
+O cliente acompanha por GET /api/jobs/{id} ou SSE em /api/jobs/{id}/eventos.
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable
+
+from fastapi import HTTPException
+
+from backend.config import REDATOR_JOBS_WORKERS
+
+if TYPE_CHECKING:
+    from backend.models import JobRedator
+
+logger = logging.getLogger(__name__)
+
+ATIVOS = ("pendente", "executando")
+TERMINAIS = ("concluido", "erro")
+
+_ERRO_RESTART = "Interrompido por restart do servidor. Tente novamente."
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _nova_sessao():
+    from backend.database import SessionLocal
+    return SessionLocal()
+
+
+def _agora() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, REDATOR_JOBS_WORKERS),
+                thread_name_prefix="redator-job",
+            )
+        return _executor
+
+
+def _atualizar(job_id: str, **campos) -> None:
+    from backend.models import JobRedator
+
+    db = _nova_sessao()
+    try:
+        job = db.get(JobRedator, job_id)
+        if job is None:
+            return
+        for campo, valor in campos.items():
+            setattr(job, campo, valor)
+        db.commit()
+    finally:
+        db.close()
+
+
+class Progresso:
+    """Etapa atual + duração de cada etapa, gravadas no job enquanto ele roda."""
+
+    def __init__(self, job_id: str, project_id: int) -> None:
+        self.job_id = job_id
+        self.project_id = project_id
+        self.etapas: list[dict] = []
+
+    @contextmanager
+    def etapa(self, nome: str):
+        self._gravar(etapa=nome)
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self.etapas.append({"etapa": nome, "duracao_sec": round(time.monotonic() - inicio, 1)})
+            self._gravar(etapas=list(self.etapas))
+
+    def _gravar(self, **campos) -> None:
+        # Progresso é informativo: falha ao gravar não derruba a cadeia LLM
+        try:
+            _atualizar(self.job_id, **campos)
+        except Exception as e:
+            logger.warning(f"[Jobs] progresso de {self.job_id} não gravado: {e}")
+
+
+def enfileirar(db, tipo: str, project_id: int, corpo: Callable) -> JobRedator:
+    """Cria o job e agenda `corpo(db, progresso) -> dict` no pool de jobs.
+
+    `corpo` recebe uma sessão própria (a do request já terá fechado) e o
+    `Progresso` (com `project_id`); o dict devolvido vira `resultado`.
+    """
+    from backend.models import JobRedator
+
+    with _lock:
+        existente = (
+            db.query(JobRedator)
+            .filter(
+                JobRedator.project_id == project_id,
+                JobRedator.tipo == tipo,
+                JobRedator.status.in_(ATIVOS),
+            )
+            .first()
+        )
+        if existente is not None:
+            logger.info(f"[Jobs] {tipo} projeto={project_id} já em andamento ({existente.id})")
+            return existente
+        job = JobRedator(
+            id=uuid.uuid4().hex, project_id=project_id, tipo=tipo,
+            status="pendente", etapas=[], created_at=_agora(),
+        )
+        db.add(job)
+        db.commit()
+    _obter_executor().submit(_executar, job.id, tipo, project_id, corpo)
+    return job
+
+
+def _executar(job_id: str, tipo: str, project_id: int, corpo: Callable) -> None:
+    progresso = Progresso(job_id, project_id)
+    _atualizar(job_id, status="executando", started_at=_agora())
+    inicio = time.monotonic()
+    db = _nova_sessao()
+    try:
+        campos = {"status": "concluido", "resultado": corpo(db, progresso), "http_status": 200}
+    except HTTPException as e:
+        campos = {"status": "erro", "erro": str(e.detail), "http_status": e.status_code}
+    except Exception as e:
+        logger.exception(f"[Jobs] {tipo} projeto={project_id} falhou")
+        campos = {"status": "erro", "erro": str(e), "http_status": 500}
+    finally:
+        db.close()
+    try:
+        _atualizar(job_id, etapa=None, etapas=progresso.etapas, finished_at=_agora(), **campos)
+    except Exception:
+        logger.exception(f"[Jobs] resultado de {job_id} não gravado")
+    print(
+        f"[TIMING] job {tipo} projeto={project_id}: {time.monotonic() - inicio:.1f}s "
+        f"{[(e['etapa'], e['duracao_sec']) for e in progresso.etapas]}",
+        flush=True,
+    )
+
+
+def job_out(job) -> dict:
+    return {
+        "job_id": job.id,
+        "project_id": job.project_id,
+        "tipo": job.tipo,
+        "status": job.status,
+        "etapa": job.etapa,
+        "etapas": job.etapas or [],
+        "resultado": job.resultado,
+        "erro": job.erro,
+        "http_status": job.http_status,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def buscar(job_id: str) -> dict | None:
+    from backend.models import JobRedator
+
+    db = _nova_sessao()
+    try:
+        job = db.get(JobRedator, job_id)
+        return job_out(job) if job is not None else None
+    finally:
+        db.close()
+
+
+def recuperar_orfaos(db) -> int:
+    """Jobs que estavam na fila/rodando quando o processo caiu viram erro."""
+    from backend.models import JobRedator
+
+    orfaos = db.query(JobRedator).filter(JobRedator.status.in_(ATIVOS)).all()
+    for job in orfaos:
+        job.status = "erro"
+        job.erro = _ERRO_RESTART
+        job.http_status = 503
+        job.finished_at = _agora()
+    return len(orfaos)
@@ -0,0 +1,156 @@
+"""
+Cache de respostas LLM — tabela cache_respostas_llm
+====================================================
+
+Duplo clique em "regenerar", retry do operador após 503 e detect-metadata
+da mesma URL mandavam o MESMO prompt de novo e pagavam a chamada inteira.
+
+`llm_gateway.criar_mensagem(..., cache_ttl=N)` consulta aqui antes de entrar
+na fila: a chave é o sha256 de modelo + temperatura + max_tokens + system +
+mensagens + tools (o prompt completo, imagens inclusive). Só respostas
+completas (`stop_reason == "end_turn"`) são guardadas, e só os blocos de
+texto — é o que os services leem.
+
+Opt-in por callsite:
+- TTL_DETERMINISTICO: pesquisa, detecção de metadados, temperatura 0 (esta
+  última automática no gateway).
+- TTL_CRIATIVO: gerações/regenerações — janela curta, só para deduplicar.
+- `ignorar()`: "regenerar de verdade" (forcar_nova nas rotas) pula a
+  leitura; a resposta nova substitui a antiga.
+"""
+from __future__ import annotations
+
+import contextvars
+import datetime
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from backend.config import (
+    LLM_CACHE_ATIVO,
+    LLM_CACHE_TTL_CRIATIVO_SEC,
+    LLM_CACHE_TTL_DETERMINISTICO_SEC,
+)
+
+logger = logging.getLogger(__name__)
+
+TTL_DETERMINISTICO = LLM_CACHE_TTL_DETERMINISTICO_SEC
+TTL_CRIATIVO = LLM_CACHE_TTL_CRIATIVO_SEC
+
+# Limpeza das linhas expiradas a cada N gravações
+_LIMPEZA_A_CADA = 100
+
+_ignorar: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_ignorar", default=False)
+_lock = threading.Lock()
+_stats: dict[str, dict[str, int]] = {}
+_gravacoes = 0
+
+
+def _nova_sessao():
+    from backend.database import SessionLocal
+    return SessionLocal()
+
+
+def _agora() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+@contextmanager
+def ignorar(ativo: bool = True):
+    """Dentro do bloco, chamadas LLM não leem o cache (regenerar de verdade)."""
+    token = _ignorar.set(ativo)
+    try:
+        yield
+    finally:
+        _ignorar.reset(token)
+
+
+def chave(kwargs: dict) -> str:
+    campos = {k: kwargs.get(k) for k in ("model", "temperature", "max_tokens", "system", "messages", "tools")}
+    serializado = json.dumps(campos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+def _contar(origem: str, campo: str) -> None:
+    with _lock:
+        _stats.setdefault(origem, {"hits": 0, "misses": 0, "bypass": 0})[campo] += 1
+
+
+def buscar(origem: str, kwargs: dict):
+    """Resposta cacheada (objeto com content/stop_reason/usage) ou None."""
+    if not LLM_CACHE_ATIVO:
+        return None
+    if _ignorar.get():
+        _contar(origem, "bypass")
+        return None
+    from backend.models import RespostaLLMCache
+
+    try:
+        db = _nova_sessao()
+        try:
+            row = db.get(RespostaLLMCache, chave(kwargs))
+            dados = row.resposta if row is not None and row.expira_em > _agora() else None
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"[LLM cache] leitura indisponível ({origem}): {e}")
+        return None
+    if dados is None:
+        _contar(origem, "misses")
+        return None
+    _contar(origem, "hits")
+    logger.info(f"[LLM cache] hit {origem}")
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=t) for t in dados["textos"]],
+        stop_reason=dados["stop_reason"],
+        usage=SimpleNamespace(
+            input_tokens=0, output_tokens=0,
+            cache_read_input_tokens=0, cache_creation_input_tokens=0,
+        ),
+        do_cache=True,
+    )
+
+
+def gravar(origem: str, kwargs: dict, response, ttl_sec: int) -> None:
+    """Guarda os blocos de texto de uma resposta completa por `ttl_sec`."""
+    global _gravacoes
+    if not LLM_CACHE_ATIVO or ttl_sec <= 0 or getattr(response, "stop_reason", None) != "end_turn":
+        return
+    from backend.models import RespostaLLMCache
+
+    textos = [b.text for b in response.content if getattr(b, "type", None) == "text"]
+    agora = _agora()
+    with _lock:
+        _gravacoes += 1
+        limpar = _gravacoes % _LIMPEZA_A_CADA == 0
+    try:
+        db = _nova_sessao()
+        try:
+            db.merge(RespostaLLMCache(
+                chave=chave(kwargs), origem=origem,
+                resposta={"textos": textos, "stop_reason": response.stop_reason},
+                created_at=agora, expira_em=agora + datetime.timedelta(seconds=ttl_sec),
+            ))
+            if limpar:
+                db.query(RespostaLLMCache).filter(RespostaLLMCache.expira_em <= agora).delete()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"[LLM cache] gravação indisponível ({origem}): {e}")
+
+
+def cache_stats() -> dict[str, dict]:
+    """hits/misses/bypass por origem + taxa de acerto."""
+    with _lock:
+        snapshot = {origem: dict(v) for origem, v in _stats.items()}
+    for v in snapshot.values():
+        consultas = v["hits"] + v["misses"]
+        v["taxa_hit"] = round(v["hits"] / consultas, 3) if consultas else 0.0
+    return snapshot
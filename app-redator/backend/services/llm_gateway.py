@@ -0,0 +1,286 @@
+"""
+Gateway Anthropic — governador de concorrência/rate limit do processo
+=====================================================================
+
+Antes, cada tradução abria o próprio ThreadPoolExecutor(6) e cada service
+tinha seu retry (sleep fixo 10/20/30s, tenacity): dois usuários traduzindo
+juntos = 12 chamadas simultâneas sem freio, e todas batendo no 429 juntas.
+
+Agora TODA chamada `messages.create` passa por `criar_mensagem(client, ...)`:
+
+- Baldes de tokens do processo inteiro: requisições/min (LLM_RPM) e
+  tokens/min (LLM_TPM — input não cacheado + output; estimado por chars/4 +
+  max_tokens na entrada e acertado pelo `usage` real na saída).
+- Teto de chamadas em voo (LLM_MAX_CONCORRENTES).
+- Prioridade: INTERATIVO (regenerações, detecção, geração) passa na frente
+  de LOTE (tradução) na fila de espera.
+- 429/529/5xx/conexão: respeita `retry-after` da resposta; 429 pausa o
+  governador inteiro (todas as threads esperam), não só quem tomou o erro.
+  Os clients são criados com `max_retries=0` — este é o único retry.
+- `cache_ttl`: consulta/grava o cache de respostas (llm_cache) antes de
+  entrar na fila; chamadas com temperatura 0 usam o TTL determinístico.
+  `aceitar(response)` filtra o que é gravado (ex.: JSON que não parseia não
+  fica preso no cache).
+
+Sync de propósito (ver decisão sync-first em bo_translate_service_v2): as
+rotas e os services são `def` e rodam em threads; o governador coordena as
+threads com uma Condition.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import anthropic
+
+from backend.config import LLM_MAX_CONCORRENTES, LLM_RPM, LLM_TPM
+from backend.services import llm_cache
+from backend.services.prompt_cache import registrar_uso
+
+logger = logging.getLogger(__name__)
+
+INTERATIVO = 0
+LOTE = 1
+
+MAX_TENTATIVAS = 4
+_STATUS_RETENTAVEIS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class _Balde:
+    """Token bucket: `capacidade` por minuto, reposição contínua."""
+
+    def __init__(self, por_minuto: int, agora: float) -> None:
+        self.capacidade = float(por_minuto)
+        self.taxa = por_minuto / 60.0
+        self.nivel = self.capacidade
+        self.atualizado = agora
+
+    def _repor(self, agora: float) -> None:
+        self.nivel = min(self.capacidade, self.nivel + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    def espera(self, qtd: float, agora: float) -> float:
+        """Segundos até `qtd` caber no balde (pedido maior que o balde = balde cheio)."""
+        self._repor(agora)
+        falta = min(qtd, self.capacidade) - self.nivel
+        return falta / self.taxa if falta > 0 else 0.0
+
+    def consumir(self, qtd: float) -> None:
+        self.nivel -= qtd
+
+    def devolver(self, qtd: float) -> None:
+        """Acerto pós-resposta: positivo devolve, negativo cobra (pode ficar < 0)."""
+        self.nivel = min(self.capacidade, self.nivel + qtd)
+
+
+class GovernadorLLM:
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        max_concorrentes: int,
+        relogio=time.monotonic,
+        dormir=time.sleep,
+    ) -> None:
+        self._relogio = relogio
+        self._dormir = dormir
+        agora = relogio()
+        self._req = _Balde(rpm, agora)
+        self._tok = _Balde(tpm, agora)
+        self._max_concorrentes = max_concorrentes
+        self._em_voo = 0
+        self._pausado_ate = 0.0
+        self._fila: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._contadores = {"chamadas": 0, "retries": 0, "espera_total_sec": 0.0}
+
+    # ── Fila ──────────────────────────────────────────────────────────────
+
+    def adquirir(self, prioridade: int, tokens: int) -> None:
+        """Bloqueia até ser o primeiro da fila e caber nos baldes/teto."""
+        ticket = (prioridade, next(self._seq))
+        inicio = self._relogio()
+        with self._cond:
+            heapq.heappush(self._fila, ticket)
+            try:
+                while True:
+                    agora = self._relogio()
+                    espera = None
+                    if self._fila[0] == ticket and self._em_voo < self._max_concorrentes:
+                        espera = max(
+                            self._pausado_ate - agora,
+                            self._req.espera(1, agora),
+                            self._tok.espera(tokens, agora),
+                        )
+                        if espera <= 0:
+                            heapq.heappop(self._fila)
+                            self._req.consumir(1)
+                            self._tok.consumir(tokens)
+                            self._em_voo += 1
+                            self._contadores["espera_total_sec"] += agora - inicio
+                            self._cond.notify_all()
+                            return
+                    self._cond.wait(timeout=espera)
+            except BaseException:
+                self._fila.remove(ticket)
+                heapq.heapify(self._fila)
+                self._cond.notify_all()
+                raise
+
+    def liberar(self, tokens_estimados: int, tokens_reais: int) -> None:
+        with self._cond:
+            self._em_voo -= 1
+            self._tok.devolver(tokens_estimados - tokens_reais)
+            self._cond.notify_all()
+
+    def pausar(self, segundos: float) -> None:
+        """Ninguém sai da fila antes de `segundos` (429 vale para o processo)."""
+        with self._cond:
+            self._pausado_ate = max(self._pausado_ate, self._relogio() + segundos)
+            self._cond.notify_all()
+
+    # ── Chamada ───────────────────────────────────────────────────────────
+
+    def criar_mensagem(
+        self, client, *, origem: str, prioridade: int = INTERATIVO,
+        cache_ttl: int = 0, aceitar=None, **kwargs
+    ):
+        """`client.messages.create(**kwargs)` sob o governador, com retry e cache opcional."""
+        if not cache_ttl and kwargs.get("temperature") == 0:
+            cache_ttl = llm_cache.TTL_DETERMINISTICO
+        if cache_ttl:
+            cacheada = llm_cache.buscar(origem, kwargs)
+            if cacheada is not None:
+                return cacheada
+        estimativa = _estimar_tokens(kwargs)
+        for tentativa in range(MAX_TENTATIVAS):
+            self.adquirir(prioridade, estimativa)
+            reais = estimativa
+            try:
+                response = client.messages.create(**kwargs)
+                reais = _tokens_cobrados(response, estimativa)
+                with self._cond:
+                    self._contadores["chamadas"] += 1
+                registrar_uso(origem, response)
+                if cache_ttl and (aceitar is None or aceitar(response)):
+                    llm_cache.gravar(origem, kwargs, response, cache_ttl)
+                return response
+            except Exception as exc:
+                status = getattr(exc, "status_code", None)
+                retentavel = status in _STATUS_RETENTAVEIS or isinstance(exc, anthropic.APIConnectionError)
+                if not retentavel or tentativa == MAX_TENTATIVAS - 1:
+                    raise
+                espera = _retry_after(exc)
+                if espera is None:
+                    espera = min(60.0, 5.0 * 2 ** tentativa)
+                logger.warning(
+                    "[LLM gateway] %s: %s (status=%s), nova tentativa em %.1fs (%d/%d)",
+                    origem, type(exc).__name__, status, espera, tentativa + 1, MAX_TENTATIVAS,
+                )
+                with self._cond:
+                    self._contadores["retries"] += 1
+            finally:
+                self.liberar(estimativa, reais)
+            if status == 429:
+                self.pausar(espera)
+            else:
+                self._dormir(espera)
+        raise RuntimeError("Unreachable")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._contadores,
+                "espera_total_sec": round(self._contadores["espera_total_sec"], 1),
+                "em_voo": self._em_voo,
+                "na_fila": len(self._fila),
+                "pausado_sec": round(max(0.0, self._pausado_ate - self._relogio()), 1),
+            }
+
+
+def _estimar_tokens(kwargs: dict) -> int:
+    """chars/4 de system + mensagens + max_tokens (o output reservado)."""
+    chars = 0
+    partes = [kwargs.get("system") or ""]
+    partes += [m.get("content", "") for m in kwargs.get("messages", [])]
+    for parte in partes:
+        if isinstance(parte, str):
+            chars += len(parte)
+        else:
+            chars += sum(len(b.get("text", "")) for b in parte if isinstance(b, dict))
+    return chars // 4 + int(kwargs.get("max_tokens", 0))
+
+
+def _tokens_cobrados(response, estimativa: int) -> int:
+    """Input não cacheado + escrita de cache + output. Leitura de cache não conta."""
+    usage = getattr(response, "usage", None)
+    valores = [
+        getattr(usage, campo, None)
+        for campo in ("input_tokens", "cache_creation_input_tokens", "output_tokens")
+    ]
+    if not isinstance(valores[0], int):
+        return estimativa
+    return sum(v for v in valores if isinstance(v, int))
+
+
+def _retry_after(exc) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    valor_ms = headers.get("retry-after-ms")
+    if valor_ms:
+        try:
+            return float(valor_ms) / 1000
+        except ValueError:
+            pass
+    valor = headers.get("retry-after")
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_governador = GovernadorLLM(LLM_RPM, LLM_TPM, LLM_MAX_CONCORRENTES)
+_executor_lote: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def criar_mensagem(
+    client, *, origem: str, prioridade: int = INTERATIVO, cache_ttl: int = 0, aceitar=None, **kwargs
+):
+    """Ponto único de `messages.create` — ver docstring do módulo."""
+    return _governador.criar_mensagem(
+        client, origem=origem, prioridade=prioridade,
+        cache_ttl=cache_ttl, aceitar=aceitar, **kwargs
+    )
+
+
+def executor_lote() -> ThreadPoolExecutor:
+    """Pool do processo para trabalho LLM em lote (idiomas da tradução).
+
+    Compartilhado entre requests: duas traduções simultâneas dividem as
+    mesmas threads em vez de abrir 6 cada. Deixa 2 vagas do governador
+    livres para chamadas interativas.
+    """
+    global _executor_lote
+    with _executor_lock:
+        if _executor_lote is None:
+            _executor_lote = ThreadPoolExecutor(
+                max_workers=max(1, LLM_MAX_CONCORRENTES - 2),
+                thread_name_prefix="llm-lote",
+            )
+        return _executor_lote
+
+
+def gateway_stats() -> dict:
+    return _governador.stats()
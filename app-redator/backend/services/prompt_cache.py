@@ -0,0 +1,92 @@
+"""
+Prompt caching Anthropic — blocos system cacheáveis + contadores de uso
+=======================================================================
+
+Os prompts BO/RC têm centenas de linhas de instruções fixas e poucas linhas
+de dados do projeto. Os builders devolvem as duas partes separadas
+(`build_*_prompt_partes` → `(estatico, dinamico)`); os callsites mandam o
+estático como bloco system com `cache_control` e o dinâmico como mensagem
+user. Chamadas seguintes com o mesmo prefixo (6 idiomas da tradução, retries
+de validação, próximos projetos dentro do TTL de 5 min) leem o prefixo do
+cache: ~10% do custo de input e menos latência até o primeiro token.
+
+Prefixos abaixo do mínimo do modelo (1024 tokens no Sonnet) não são
+cacheados pela API — o `cache_control` é ignorado sem erro.
+
+`registrar_uso(origem, response)` loga por chamada input/cache_read/
+cache_write/output e acumula totais por origem (`uso_stats()`), para medir
+a economia real.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_CAMPOS_USO = (
+    "input_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "output_tokens",
+)
+
+_lock = threading.Lock()
+_totais: dict[str, dict[str, int]] = {}
+
+
+def system_cacheavel(estatico: str, extra: str | None = None) -> list[dict]:
+    """Monta o `system` em blocos: instruções fixas com cache_control + extra.
+
+    `extra` (ex.: instrução de idioma, regras de JSON) entra DEPOIS do ponto
+    de cache — varia por chamada sem invalidar o prefixo.
+    """
+    blocos = [{"type": "text", "text": estatico, "cache_control": {"type": "ephemeral"}}]
+    if extra:
+        blocos.append({"type": "text", "text": extra})
+    return blocos
+
+
+def _contagem(usage, campo: str) -> int:
+    valor = getattr(usage, campo, None)
+    return valor if isinstance(valor, int) else 0
+
+
+def registrar_uso(origem: str, response) -> dict[str, int]:
+    """Loga e acumula o uso de tokens de uma resposta Anthropic.
+
+    Retorna as contagens desta chamada. Nunca levanta — telemetria não pode
+    derrubar a geração.
+    """
+    usage = getattr(response, "usage", None)
+    uso = {campo: _contagem(usage, campo) for campo in _CAMPOS_USO}
+    with _lock:
+        acumulado = _totais.setdefault(origem, {"chamadas": 0, **{c: 0 for c in _CAMPOS_USO}})
+        acumulado["chamadas"] += 1
+        for campo, valor in uso.items():
+            acumulado[campo] += valor
+    logger.info(
+        "[LLM uso] %s: input=%d cache_read=%d cache_write=%d output=%d",
+        origem,
+        uso["input_tokens"],
+        uso["cache_read_input_tokens"],
+        uso["cache_creation_input_tokens"],
+        uso["output_tokens"],
+    )
+    return uso
+
+
+def uso_stats() -> dict[str, dict]:
+    """Totais por origem desde o start do processo + taxa de acerto do cache.
+
+    `taxa_cache` = tokens de input lidos do cache / todos os tokens de input
+    (cache_read + cache_write + input não cacheado).
+    """
+    with _lock:
+        snapshot = {origem: dict(v) for origem, v in _totais.items()}
+    for v in snapshot.values():
+        total_input = (
+            v["input_tokens"] + v["cache_read_input_tokens"] + v["cache_creation_input_tokens"]
+        )
+        v["taxa_cache"] = round(v["cache_read_input_tokens"] / total_input, 3) if total_input else 0.0
+    return snapshot
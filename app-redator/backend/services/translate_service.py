@@ -1,7 +1,10 @@
 from __future__ import annotations
+import hashlib
 import html
 import logging
 import re
+import threading
+import time
 import requests
 from backend.config import GOOGLE_TRANSLATE_API_KEY
 
@@ -90,34 +93,178 @@ def get_target_languages(source_lang: str) -> list[str]:
     return list(ALL_LANGUAGES)
 
 
-def translate_text(text: str, target_lang: str, _max_retries: int = 3) -> str:
-    """Traduz texto via Google Translate v2 com retry e backoff."""
-    if not text or not text.strip():
-        return ""
+# Google Translate v2 aceita vários `q` por requisição (até 128 segmentos).
+# Todos os segmentos de um idioma (parágrafos, valores de crédito, palavras
+# de hashtag, tags) vão juntos, numa Session com conexão reaproveitada.
+_GT_MAX_SEGMENTOS = 128
+_GT_MAX_CHARS = 30000
+# Memória persistente só para segmentos curtos — hashtags, créditos, tags e
+# instrumentos se repetem entre projetos; parágrafos de storytelling não.
+_MEMORIA_MAX_CHARS = 300
+_MEMORIA_LOCAL_MAX = 5000
+
+_session = requests.Session()
+_memoria_local: dict[tuple[str, str], str] = {}
+_memoria_lock = threading.Lock()
+
+
+def _nova_sessao_memoria():
+    from backend.database import SessionLocal
+    return SessionLocal()
+
+
+def _chave_memoria(texto: str, target_lang: str) -> str:
+    return hashlib.sha256(f"{target_lang}\0{texto}".encode("utf-8")).hexdigest()
+
+
+def _memoria_buscar(textos: list[str], target_lang: str) -> dict[str, str]:
+    """Traduções já conhecidas: cache do processo, depois tabela memoria_traducao."""
+    from backend.models import MemoriaTraducao
+
+    achados: dict[str, str] = {}
+    faltam: list[str] = []
+    with _memoria_lock:
+        for texto in textos:
+            if len(texto) > _MEMORIA_MAX_CHARS:
+                continue
+            if (target_lang, texto) in _memoria_local:
+                achados[texto] = _memoria_local[(target_lang, texto)]
+            else:
+                faltam.append(texto)
+    if not faltam:
+        return achados
+
+    chaves = {_chave_memoria(t, target_lang): t for t in faltam}
+    try:
+        db = _nova_sessao_memoria()
+        try:
+            rows = db.query(MemoriaTraducao).filter(MemoriaTraducao.chave.in_(list(chaves))).all()
+        finally:
+            db.close()
+    except Exception as e:
+        _logger.warning(f"[TRANSLATE] Memória de tradução indisponível (leitura): {e}")
+        return achados
+    do_banco = {chaves[r.chave]: r.traducao for r in rows}
+    with _memoria_lock:
+        for texto, traducao in do_banco.items():
+            _memoria_local[(target_lang, texto)] = traducao
+    achados.update(do_banco)
+    return achados
+
+
+def _memoria_gravar(traducoes: dict[str, str], target_lang: str) -> None:
+    from backend.models import MemoriaTraducao
+
+    curtos = {t: tr for t, tr in traducoes.items() if len(t) <= _MEMORIA_MAX_CHARS and tr}
+    if not curtos:
+        return
+    with _memoria_lock:
+        if len(_memoria_local) + len(curtos) > _MEMORIA_LOCAL_MAX:
+            _memoria_local.clear()
+        for texto, traducao in curtos.items():
+            _memoria_local[(target_lang, texto)] = traducao
+    try:
+        db = _nova_sessao_memoria()
+        try:
+            # Um INSERT só para o lote; chave já gravada por outra tradução
+            # concorrente é ignorada em vez de derrubar o lote inteiro
+            if db.get_bind().dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            linhas = [
+                {"chave": _chave_memoria(texto, target_lang), "idioma": target_lang,
+                 "texto": texto, "traducao": traducao}
+                for texto, traducao in curtos.items()
+            ]
+            db.execute(
+                insert(MemoriaTraducao)
+                .values(linhas)
+                .on_conflict_do_nothing(index_elements=["chave"])
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    except Exception as e:
+        _logger.warning(f"[TRANSLATE] Memória de tradução indisponível (gravação): {e}")
+
+
+def _lotes_google(textos: list[str]) -> list[list[str]]:
+    """Fatia em requisições de até _GT_MAX_SEGMENTOS segmentos / _GT_MAX_CHARS chars."""
+    lotes: list[list[str]] = []
+    atual: list[str] = []
+    chars = 0
+    for texto in textos:
+        if atual and (len(atual) >= _GT_MAX_SEGMENTOS or chars + len(texto) > _GT_MAX_CHARS):
+            lotes.append(atual)
+            atual, chars = [], 0
+        atual.append(texto)
+        chars += len(texto)
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def _google_translate_lote(textos: list[str], target_lang: str, _max_retries: int = 3) -> list[str]:
+    """Uma requisição Google Translate v2 com vários `q`, com retry e backoff."""
     for attempt in range(_max_retries):
         try:
-            resp = requests.post(TRANSLATE_URL, data={
-                "q": text,
+            resp = _session.post(TRANSLATE_URL, data={
+                "q": textos,
                 "target": target_lang,
                 "format": "text",
                 "key": GOOGLE_TRANSLATE_API_KEY,
-            })
+            }, timeout=60)
             resp.raise_for_status()
-            translated = resp.json()["data"]["translations"][0]["translatedText"]
-            return html.unescape(translated)
+            translations = resp.json()["data"]["translations"]
+            return [html.unescape(t["translatedText"]) for t in translations]
         except Exception as e:
             if attempt < _max_retries - 1:
-                import time
                 wait = (attempt + 1) * 5
-                _logger.warning(f"[TRANSLATE] Retry {attempt+1}/{_max_retries} '{text[:30]}...' "
-                               f"→ {target_lang}: {e}. Aguardando {wait}s...")
+                _logger.warning(f"[TRANSLATE] Retry {attempt+1}/{_max_retries} lote de {len(textos)} "
+                               f"('{textos[0][:30]}...') → {target_lang}: {e}. Aguardando {wait}s...")
                 time.sleep(wait)
             else:
-                _logger.error(f"[TRANSLATE] FALHA DEFINITIVA '{text[:30]}...' "
-                              f"→ {target_lang}: {e}")
+                _logger.error(f"[TRANSLATE] FALHA DEFINITIVA lote de {len(textos)} "
+                              f"('{textos[0][:30]}...') → {target_lang}: {e}")
                 raise
 
 
+def translate_texts(texts: list[str], target_lang: str) -> list[str]:
+    """Traduz vários textos para um idioma: dedup + memória + requisições em lote.
+
+    Devolve na mesma ordem de `texts`; vazios/só espaço viram "".
+    """
+    unicos = list(dict.fromkeys(t for t in texts if t and t.strip()))
+    if not unicos:
+        return ["" for _ in texts]
+    traducoes = _memoria_buscar(unicos, target_lang)
+    faltam = [t for t in unicos if t not in traducoes]
+    lotes = _lotes_google(faltam)
+    for lote in lotes:
+        novas = dict(zip(lote, _google_translate_lote(lote, target_lang)))
+        traducoes.update(novas)
+        _memoria_gravar(novas, target_lang)
+    _logger.info(
+        f"[TRANSLATE] {target_lang}: {len(texts)} segmentos, {len(unicos)} únicos, "
+        f"{len(unicos) - len(faltam)} da memória, {len(lotes)} requisição(ões)"
+    )
+    return [traducoes[t] if t and t.strip() else "" for t in texts]
+
+
+def translate_text(text: str, target_lang: str) -> str:
+    """Traduz um texto via Google Translate v2 (ver `translate_texts`)."""
+    return translate_texts([text], target_lang)[0]
+
+
+def _traduzir_lote(textos: list[str], target_lang: str) -> dict[str, str]:
+    """texto → tradução, todos numa passada de `translate_texts`."""
+    return dict(zip(textos, translate_texts(textos, target_lang)))
+
+
 def extract_post_section2(post_text: str) -> tuple:
     """Split post into (before_section2, section2, after_section2).
 
@@ -248,11 +395,27 @@ def _translate_credit_labels(section3_and_rest: str, target_lang: str) -> str:
 _FLAG_RE = re.compile(r"[\U0001F1E0-\U0001F1FF]{2}")
 
 
-def _translate_credit_values(credits: str, target_lang: str) -> str:
+def _credit_values(credits: str) -> list[str]:
+    """Valores traduzíveis das linhas de crédito (após o ':', sem bandeira)."""
+    valores = []
+    for line in credits.split("\n"):
+        if ":" not in line or _FLAG_RE.search(line):
+            continue
+        value = line.split(":", 1)[1].strip()
+        if value:
+            valores.append(value)
+    return valores
+
+
+def _translate_credit_values(credits: str, target_lang: str,
+                             traducoes: dict[str, str] | None = None) -> str:
     """Traduz apenas os VALORES das linhas de crédito (após o ':').
 
     Pula linhas que contêm emoji de bandeira — são nomes próprios/entidades.
+    traducoes: lote já traduzido pelo caller; sem ele, traduz os valores num lote.
     """
+    if traducoes is None:
+        traducoes = _traduzir_lote(_credit_values(credits), target_lang)
     lines = credits.split("\n")
     result: list[str] = []
     for line in lines:
@@ -264,7 +427,7 @@ def _translate_credit_values(credits: str, target_lang: str) -> str:
         if not value_stripped:
             result.append(line)
             continue
-        translated_value = translate_text(value_stripped, target_lang)
+        translated_value = traducoes[value_stripped]
         result.append(f"{label}: {translated_value}")
     return "\n".join(result)
 
@@ -319,10 +482,30 @@ def _split_credits_cta_hashtags(after_text: str) -> tuple[str, str, str]:
     return credits, cta, hashtags
 
 
-def _translate_hashtags(hashtag_line: str, target_lang: str) -> str:
-    """Translate hashtags while preserving # prefix and brand tags."""
+# Preserve brand hashtags (don't translate known brand names)
+_BRAND_HASHTAGS = {"bestofopera", "reelsclassics"}
+
+
+def _hashtag_words(hashtag_line: str) -> list[str]:
+    """Palavras de hashtag a traduzir (sem '#', sem as de marca)."""
+    if not hashtag_line:
+        return []
+    return [
+        tag[1:] for tag in hashtag_line.strip().split()
+        if tag.startswith("#") and tag[1:].lower() not in _BRAND_HASHTAGS
+    ]
+
+
+def _translate_hashtags(hashtag_line: str, target_lang: str,
+                        traducoes: dict[str, str] | None = None) -> str:
+    """Translate hashtags while preserving # prefix and brand tags.
+
+    traducoes: lote já traduzido pelo caller; sem ele, traduz as palavras num lote.
+    """
     if not hashtag_line or not hashtag_line.strip():
         return hashtag_line
+    if traducoes is None:
+        traducoes = _traduzir_lote(_hashtag_words(hashtag_line), target_lang)
     tags = hashtag_line.strip().split()
     result = []
     for tag in tags:
@@ -330,60 +513,77 @@ def _translate_hashtags(hashtag_line: str, target_lang: str) -> str:
             result.append(tag)
             continue
         word = tag[1:]
-        # Preserve brand hashtags (don't translate known brand names)
-        brand_hashtags = {"bestofopera", "reelsclassics"}
-        if word.lower() in brand_hashtags:
+        if word.lower() in _BRAND_HASHTAGS:
             result.append(tag)
             continue
-        translated = translate_text(word, target_lang)
+        translated = traducoes[word]
         # Hashtags can't have spaces — collapse
         translated = translated.replace(" ", "")
         result.append(f"#{translated}")
     return " ".join(result)
 
 
-def _translate_header_rc(header_lines: list, target_lang: str) -> list:
+def _split_header_l2(header_lines: list) -> tuple[str, str, str, str] | None:
+    """L2 do header RC → (artista, separador, instrumento, emoji final) ou None."""
+    if len(header_lines) < 2:
+        return None
+    line2 = header_lines[1]
+
+    # Aceitar en-dash, vírgula ou hífen (_sanitize_rc converte – para ,)
+    sep_found = None
+    for sep in [" – ", ", ", " - "]:
+        if sep in line2:
+            sep_found = sep
+            break
+    if not sep_found:
+        return None
+
+    parts = line2.split(sep_found, 1)
+    artist_name = parts[0].strip()
+    instrument_part = parts[1].strip()
+
+    # Separar emoji final se houver
+    emoji_suffix = ""
+    clean_instrument = instrument_part
+    if instrument_part:
+        last_char = instrument_part[-1]
+        if ord(last_char) > 8000:
+            emoji_suffix = " " + last_char
+            clean_instrument = instrument_part[:-1].strip()
+        elif len(instrument_part) >= 2 and ord(instrument_part[-2]) > 8000:
+            emoji_suffix = " " + instrument_part[-2:]
+            clean_instrument = instrument_part[:-2].strip()
+    return artist_name, sep_found, clean_instrument, emoji_suffix
+
+
+def _header_segments(header_lines: list, target_lang: str) -> list[str]:
+    """Segmentos do header RC que vão ao Google (só o instrumento da L2)."""
+    if not header_lines or target_lang == "pt":
+        return []
+    l2 = _split_header_l2(header_lines)
+    return [l2[2]] if l2 and l2[2] else []
+
+
+def _translate_header_rc(header_lines: list, target_lang: str,
+                         traducoes: dict[str, str] | None = None) -> list:
     """Traduz seletivamente o header RC.
     L1: [emojis] Compositor – Obra → NÃO traduzir (nomes próprios)
     L2: Artista – instrumento [emoji] → traduzir APENAS instrumento
     L3: Orquestra – Regente → NÃO traduzir (nomes próprios)
+    traducoes: lote já traduzido pelo caller; sem ele, traduz o instrumento.
     """
     if not header_lines or target_lang == "pt":
         return list(header_lines)
 
     result = list(header_lines)
-
-    if len(result) >= 2:
-        line2 = result[1]
-
-        # Aceitar en-dash, vírgula ou hífen (_sanitize_rc converte – para ,)
-        sep_found = None
-        for sep in [" – ", ", ", " - "]:
-            if sep in line2:
-                sep_found = sep
-                break
-
-        if sep_found:
-            parts = line2.split(sep_found, 1)
-            artist_name = parts[0].strip()
-            instrument_part = parts[1].strip()
-
-            # Separar emoji final se houver
-            emoji_suffix = ""
-            clean_instrument = instrument_part
-            if instrument_part:
-                last_char = instrument_part[-1]
-                if ord(last_char) > 8000:
-                    emoji_suffix = " " + last_char
-                    clean_instrument = instrument_part[:-1].strip()
-                elif len(instrument_part) >= 2 and ord(instrument_part[-2]) > 8000:
-                    emoji_suffix = " " + instrument_part[-2:]
-                    clean_instrument = instrument_part[:-2].strip()
-
-            if clean_instrument:
-                translated_instrument = translate_text(clean_instrument, target_lang)
-                if translated_instrument:
-                    result[1] = f"{artist_name}{sep_found}{translated_instrument.strip()}{emoji_suffix}"
+    l2 = _split_header_l2(result)
+    if l2 and l2[2]:
+        artist_name, sep_found, clean_instrument, emoji_suffix = l2
+        if traducoes is None:
+            traducoes = _traduzir_lote([clean_instrument], target_lang)
+        translated_instrument = traducoes[clean_instrument]
+        if translated_instrument:
+            result[1] = f"{artist_name}{sep_found}{translated_instrument.strip()}{emoji_suffix}"
 
     return result
 
@@ -413,9 +613,12 @@ def _translate_post_fallback(post_text: str, target_lang: str,
                 hashtag_lines.append(line.strip())
             else:
                 text_lines.append(line)
-        translated_text = translate_text("\n".join(text_lines), target_lang)
+        body = "\n".join(text_lines)
+        hashtag_line = " ".join(hashtag_lines)
+        traducoes = _traduzir_lote([body] + _hashtag_words(hashtag_line), target_lang)
+        translated_text = traducoes[body]
         if hashtag_lines:
-            translated_ht = _translate_hashtags(" ".join(hashtag_lines), target_lang)
+            translated_ht = _translate_hashtags(hashtag_line, target_lang, traducoes)
             return translated_text.rstrip() + "\n" + translated_ht
         return translated_text
 
@@ -445,16 +648,25 @@ def _translate_post_fallback(post_text: str, target_lang: str,
         else:
             story_paragraphs.append(para)
 
-    # Traduzir seletivamente
-    translated_header = _translate_header_rc(header_lines, target_lang)
-
-    translated_paragraphs = []
+    # Traduzir seletivamente — header, parágrafos e hashtags num lote só
+    protegidos = []
     for para in story_paragraphs:
-        src = para
         repl = {}
         if protected_names:
-            src, repl = _protect_proper_names(src, protected_names)
-        translated = translate_text(src, target_lang)
+            para, repl = _protect_proper_names(para, protected_names)
+        protegidos.append((para, repl))
+    traducoes = _traduzir_lote(
+        _header_segments(header_lines, target_lang)
+        + [src for src, _ in protegidos]
+        + _hashtag_words(hashtags_text),
+        target_lang,
+    )
+
+    translated_header = _translate_header_rc(header_lines, target_lang, traducoes)
+
+    translated_paragraphs = []
+    for src, repl in protegidos:
+        translated = traducoes[src]
         if repl:
             translated = _restore_proper_names(translated, repl)
         if translated and translated.strip():
@@ -462,7 +674,7 @@ def _translate_post_fallback(post_text: str, target_lang: str,
 
     translated_cta = RC_POST_CTA.get(target_lang, RC_POST_CTA.get("en", cta_text))
 
-    translated_hashtags = _translate_hashtags(hashtags_text, target_lang) if hashtags_text else ""
+    translated_hashtags = _translate_hashtags(hashtags_text, target_lang, traducoes) if hashtags_text else ""
 
     # Reassemblar com \n simples e • como separadores
     result_lines = list(translated_header)
@@ -501,18 +713,23 @@ def translate_post_text(post_text: str, target_lang: str,
     repl = {}
     if protected_names:
         section2, repl = _protect_proper_names(section2, protected_names)
-    translated_section2 = translate_text(section2, target_lang)
-    if repl:
-        translated_section2 = _restore_proper_names(translated_section2, repl)
 
     # Split after into credits, CTA, and hashtags
     credits, cta, hashtags = _split_credits_cta_hashtags(after)
 
-    # Translate each part: labels via hardcoded map, values via Google Translate
+    # Translate each part: labels via hardcoded map, the rest via Google
+    # Translate — section 2, CTA, credit values and hashtags in one batch
     label_translated = _translate_credit_labels(credits, target_lang)
-    translated_credits = _translate_credit_values(label_translated, target_lang)
-    translated_cta = translate_text(cta, target_lang) if cta else ""
-    translated_hashtags = _translate_hashtags(hashtags, target_lang) if hashtags else ""
+    traducoes = _traduzir_lote(
+        [section2, cta] + _credit_values(label_translated) + _hashtag_words(hashtags),
+        target_lang,
+    )
+    translated_section2 = traducoes[section2]
+    if repl:
+        translated_section2 = _restore_proper_names(translated_section2, repl)
+    translated_credits = _translate_credit_values(label_translated, target_lang, traducoes)
+    translated_cta = traducoes[cta] if cta else ""
+    translated_hashtags = _translate_hashtags(hashtags, target_lang, traducoes) if hashtags else ""
 
     # Reassemble — strip each part to avoid double blank lines
     parts = [before.strip("\n"), translated_section2.strip("\n"), translated_credits.strip("\n")]
@@ -537,6 +754,18 @@ def translate_overlay_json(overlay_json: list, target_lang: str,
 
     is_rc = brand_slug == "reels-classics"
     overlay_json = overlay_json or []
+
+    # Todas as legendas (menos CTA, que é fixo) numa requisição só
+    protegidos: dict[int, tuple[str, dict[str, str]]] = {}
+    for i, entry in enumerate(overlay_json):
+        if not entry.get("_is_cta"):
+            src_text = entry.get("text", "")
+            replacements = {}
+            if protected_names:
+                src_text, replacements = _protect_proper_names(src_text, protected_names)
+            protegidos[i] = (src_text, replacements)
+    traducoes = _traduzir_lote([src for src, _ in protegidos.values()], target_lang)
+
     result = []
     for i, entry in enumerate(overlay_json):
         if entry.get("_is_cta"):
@@ -545,11 +774,8 @@ def translate_overlay_json(overlay_json: list, target_lang: str,
             else:
                 translated_text = BO_CTA.get(target_lang, BO_CTA["en"])
         else:
-            src_text = entry.get("text", "")
-            replacements = {}
-            if protected_names:
-                src_text, replacements = _protect_proper_names(src_text, protected_names)
-            translated_text = translate_text(src_text, target_lang)
+            src_text, replacements = protegidos[i]
+            translated_text = traducoes[src_text]
             if replacements:
                 translated_text = _restore_proper_names(translated_text, replacements)
             if is_rc:
@@ -581,7 +807,7 @@ def translate_tags(tags: str, target_lang: str) -> str:
     if not tags:
         return ""
     tag_list = [t.strip() for t in tags.split(",")]
-    translated = [translate_text(t, target_lang) for t in tag_list if t]
+    translated = translate_texts([t for t in tag_list if t], target_lang)
     return ", ".join(translated)
 
 
@@ -591,7 +817,9 @@ def translate_tags(tags: str, target_lang: str) -> str:
 
 import json as _json
 import logging as _logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
+
+from backend.services.llm_gateway import INTERATIVO, LOTE, executor_lote
 
 _translate_logger = _logging.getLogger("translate_claude")
 
@@ -869,6 +1097,7 @@ def translate_one_claude(
     target_lang: str,
     brand_slug: str,
     project,
+    prioridade: int = INTERATIVO,
 ) -> dict | None:
     """Traduz overlay + post para 1 idioma via Claude.
     Retorna {"overlay": [...], "post": "...", "verificacoes": {...}} ou None se falhar.
@@ -877,6 +1106,8 @@ def translate_one_claude(
     sem chamar LLM. PT é intocável — já foi aprovado pelo operador.
 
     Pós-tradução, valida limites de caracteres e registra excedentes em alertas (F6.6).
+
+    `prioridade`: INTERATIVO (retraduzir 1 idioma) ou LOTE (translate_project_parallel).
     """
     from backend.services.claude_service import _call_claude_json
     from backend.config import load_brand_config
@@ -938,7 +1169,9 @@ def translate_one_claude(
             protected_names=protected_names,
         )
 
-        result = _call_claude_json(prompt=prompt, max_tokens=2048, temperature=0.3)
+        result = _call_claude_json(
+            prompt=prompt, max_tokens=2048, temperature=0.3, prioridade=prioridade,
+        )
 
         if not result or "overlay" not in result:
             _translate_logger.warning(
@@ -1006,6 +1239,7 @@ def translate_project_parallel(
             target_lang=lang,
             brand_slug=brand_slug,
             project=project,
+            prioridade=LOTE,
         )
 
         if claude_result and claude_result.get("overlay") and claude_result.get("post"):
@@ -1066,16 +1300,18 @@ def translate_project_parallel(
             return lang, None, "failed"
 
     results: dict = {}
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = {executor.submit(_translate_one, lang): lang for lang in target_languages}
-        for future in as_completed(futures):
-            lang = futures[future]
-            try:
-                r_lang, r_data, r_source = future.result()
-                results[r_lang] = {"data": r_data, "source": r_source} if r_data else None
-            except Exception as e:
-                _translate_logger.error(f"[TRANSLATE] {lang}: exceção thread: {e}")
-                results[lang] = None
+    # Pool compartilhado do processo (llm_gateway): traduções simultâneas de
+    # vários usuários dividem as mesmas threads, com prioridade LOTE.
+    executor = executor_lote()
+    futures = {executor.submit(_translate_one, lang): lang for lang in target_languages}
+    for future in as_completed(futures):
+        lang = futures[future]
+        try:
+            r_lang, r_data, r_source = future.result()
+            results[r_lang] = {"data": r_data, "source": r_source} if r_data else None
+        except Exception as e:
+            _translate_logger.error(f"[TRANSLATE] {lang}: exceção thread: {e}")
+            results[lang] = None
 
     return results
 
@@ -12,6 +12,25 @@ async function request<T>(path: string, options?: RequestInit): Promise<T> {
   return res.json();
 }
 
+/** Job em background (generate, translate) — ver GET /api/jobs/{id}. */
+export interface RedatorJob {
+  job_id: string;
+  status: 'pendente' | 'executando' | 'concluido' | 'erro';
+  etapa: string | null;
+  etapas: { etapa: string; duracao_sec: number }[];
+  resultado: any;
+  erro: string | null;
+}
+
+async function aguardarJob<T>(job: RedatorJob): Promise<T> {
+  while (job.status !== 'concluido' && job.status !== 'erro') {
+    await new Promise((r) => setTimeout(r, 2000));
+    job = await request<RedatorJob>(`/jobs/${job.job_id}`);
+  }
+  if (job.status === 'erro') throw new Error(job.erro || 'Job failed');
+  return job.resultado as T;
+}
+
 export interface Project {
   id: number;
   created_at: string;
@@ -100,8 +119,8 @@ export const api = {
   updateProject: (id: number, data: Record<string, string>) =>
     request<Project>(`/projects/${id}`, { method: 'PUT', body: JSON.stringify(data) }),
 
-  generate: (id: number) =>
-    request<Project>(`/projects/${id}/generate`, { method: 'POST' }),
+  generate: async (id: number) =>
+    aguardarJob<Project>(await request<RedatorJob>(`/projects/${id}/generate`, { method: 'POST' })),
   regenerateOverlay: (id: number, customPrompt?: string) =>
     request<Project>(`/projects/${id}/regenerate-overlay`, {
       method: 'POST',
@@ -134,8 +153,8 @@ export const api = {
       body: JSON.stringify({ youtube_title: title, youtube_tags: tags }),
     }),
 
-  translate: (id: number) =>
-    request<Project>(`/projects/${id}/translate`, { method: 'POST' }),
+  translate: async (id: number) =>
+    aguardarJob<Project>(await request<RedatorJob>(`/projects/${id}/translate`, { method: 'POST' })),
   retranslate: (id: number, lang: string) =>
     request<ExportData>(`/projects/${id}/retranslate/${lang}`, { method: 'POST' }),
   updateTranslation: (id: number, lang: string, data: Partial<ExportData>) =>
@@ -131,6 +131,13 @@ def mock_anthropic(monkeypatch):
     yield fake
 
 
+@pytest.fixture(autouse=True)
+def _sem_cache_llm(monkeypatch):
+    """Desliga o cache de respostas LLM — um banco local com cache_respostas_llm
+    devolveria respostas de outra execução no lugar do fake."""
+    monkeypatch.setattr("backend.services.llm_cache.LLM_CACHE_ATIVO", False)
+
+
 @pytest.fixture
 def anthropic_response(mock_anthropic):
     """Retorna o `FakeAnthropicMessages` para o teste configurar resposta canned."""
@@ -0,0 +1,87 @@
+"""Tests para jobs — execução em background, timing por etapa, dedup e recuperação."""
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from backend.models import JobRedator
+from backend.services import jobs
+
+
+class _ExecutorInline:
+    """Roda o job na hora (ou guarda, com `rodar=False`) — sem threads no teste."""
+
+    def __init__(self, rodar: bool = True) -> None:
+        self.rodar = rodar
+        self.agendados = 0
+
+    def submit(self, fn, *args):
+        self.agendados += 1
+        if self.rodar:
+            fn(*args)
+
+
+@pytest.fixture
+def fila(monkeypatch, in_memory_db):
+    fabrica = sessionmaker(bind=in_memory_db.get_bind(), autoflush=False)
+    executor = _ExecutorInline()
+    monkeypatch.setattr(jobs, "_nova_sessao", fabrica)
+    monkeypatch.setattr(jobs, "_obter_executor", lambda: executor)
+    return executor
+
+
+def test_job_grava_resultado_e_duracao_por_etapa(fila, in_memory_db):
+    def _corpo(db, progresso):
+        with progresso.etapa("post"):
+            pass
+        with progresso.etapa("overlay"):
+            pass
+        return {"id": progresso.project_id}
+
+    job = jobs.enfileirar(in_memory_db, "generate", 7, _corpo)
+    estado = jobs.buscar(job.id)
+
+    assert estado["status"] == "concluido"
+    assert estado["resultado"] == {"id": 7}
+    assert estado["http_status"] == 200
+    assert estado["etapa"] is None
+    assert [e["etapa"] for e in estado["etapas"]] == ["post", "overlay"]
+    assert estado["finished_at"] is not None
+
+
+def test_http_exception_do_corpo_vira_erro_com_status(fila, in_memory_db):
+    def _corpo(db, progresso):
+        with progresso.etapa("claude"):
+            raise HTTPException(503, "sobrecarregado")
+
+    job = jobs.enfileirar(in_memory_db, "translate", 1, _corpo)
+    estado = jobs.buscar(job.id)
+
+    assert estado["status"] == "erro"
+    assert estado["http_status"] == 503
+    assert estado["erro"] == "sobrecarregado"
+    assert estado["etapas"][0]["etapa"] == "claude"
+
+
+def test_mesmo_projeto_e_tipo_em_andamento_reaproveita_o_job(fila, in_memory_db):
+    fila.rodar = False
+    primeiro = jobs.enfileirar(in_memory_db, "generate", 3, lambda db, p: {})
+    segundo = jobs.enfileirar(in_memory_db, "generate", 3, lambda db, p: {})
+    outro_tipo = jobs.enfileirar(in_memory_db, "translate", 3, lambda db, p: {})
+
+    assert segundo.id == primeiro.id
+    assert outro_tipo.id != primeiro.id
+    assert fila.agendados == 2
+
+
+def test_recuperar_orfaos_marca_jobs_interrompidos(fila, in_memory_db):
+    fila.rodar = False
+    job = jobs.enfileirar(in_memory_db, "automation_rc", 5, lambda db, p: {})
+
+    assert jobs.recuperar_orfaos(in_memory_db) == 1
+    in_memory_db.commit()
+
+    recuperado = in_memory_db.get(JobRedator, job.id)
+    assert recuperado.status == "erro"
+    assert recuperado.http_status == 503
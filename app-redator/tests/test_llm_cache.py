@@ -0,0 +1,138 @@
+"""Tests para llm_cache — resposta idêntica servida do banco, bypass e validação."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import llm_cache
+from backend.services.llm_gateway import GovernadorLLM
+
+
+class _ClientContador:
+    """`messages.create` devolve uma resposta nova (texto numerado) por chamada."""
+
+    def __init__(self, texto: str = "resposta", stop_reason: str = "end_turn") -> None:
+        self.texto = texto
+        self.stop_reason = stop_reason
+        self.chamadas = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.chamadas += 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=f"{self.texto} {self.chamadas}")],
+            stop_reason=self.stop_reason,
+            usage=None,
+        )
+
+
+@pytest.fixture
+def cache(monkeypatch, in_memory_db):
+    monkeypatch.setattr(llm_cache, "_nova_sessao", lambda: in_memory_db)
+    monkeypatch.setattr(llm_cache, "_stats", {})
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_ATIVO", True)
+    return in_memory_db
+
+
+def _chamar(gov, client, **extra):
+    return gov.criar_mensagem(
+        client, origem="teste", model="m", max_tokens=10, temperature=0.7,
+        messages=[{"role": "user", "content": "prompt"}], **extra,
+    )
+
+
+def _gov():
+    return GovernadorLLM(rpm=1000, tpm=10**6, max_concorrentes=2)
+
+
+def test_mesmo_prompt_e_servido_do_cache(cache):
+    gov, client = _gov(), _ClientContador()
+
+    primeira = _chamar(gov, client, cache_ttl=60)
+    segunda = _chamar(gov, client, cache_ttl=60)
+
+    assert client.chamadas == 1
+    assert segunda.content[0].text == primeira.content[0].text == "resposta 1"
+    assert segunda.do_cache is True
+    assert llm_cache.cache_stats()["teste"] == {"hits": 1, "misses": 1, "bypass": 0, "taxa_hit": 0.5}
+
+
+def test_sem_cache_ttl_nao_consulta_nem_grava(cache):
+    gov, client = _gov(), _ClientContador()
+    _chamar(gov, client)
+    _chamar(gov, client)
+    assert client.chamadas == 2
+    assert llm_cache.cache_stats() == {}
+
+
+def test_temperatura_zero_usa_cache_deterministico_por_padrao(cache):
+    gov, client = _gov(), _ClientContador()
+    for _ in range(2):
+        gov.criar_mensagem(
+            client, origem="teste", model="m", max_tokens=10, temperature=0,
+            messages=[{"role": "user", "content": "prompt"}],
+        )
+    assert client.chamadas == 1
+
+
+def test_ignorar_pula_a_leitura_e_substitui_a_resposta(cache):
+    gov, client = _gov(), _ClientContador()
+    _chamar(gov, client, cache_ttl=60)
+
+    with llm_cache.ignorar():
+        nova = _chamar(gov, client, cache_ttl=60)
+    depois = _chamar(gov, client, cache_ttl=60)
+
+    assert client.chamadas == 2
+    assert nova.content[0].text == depois.content[0].text == "resposta 2"
+    assert llm_cache.cache_stats()["teste"]["bypass"] == 1
+
+
+def test_resposta_rejeitada_ou_truncada_nao_vai_para_o_cache(cache):
+    gov = _gov()
+    invalida = _ClientContador()
+    _chamar(gov, invalida, cache_ttl=60, aceitar=lambda r: False)
+    _chamar(gov, invalida, cache_ttl=60, aceitar=lambda r: False)
+    assert invalida.chamadas == 2
+
+    truncada = _ClientContador(texto="outra", stop_reason="max_tokens")
+    gov.criar_mensagem(
+        truncada, origem="teste", model="m", max_tokens=5, cache_ttl=60,
+        messages=[{"role": "user", "content": "outro prompt"}],
+    )
+    gov.criar_mensagem(
+        truncada, origem="teste", model="m", max_tokens=5, cache_ttl=60,
+        messages=[{"role": "user", "content": "outro prompt"}],
+    )
+    assert truncada.chamadas == 2
+
+
+def test_chave_muda_com_modelo_e_temperatura():
+    base = {"model": "a", "temperature": 0.7, "messages": [{"role": "user", "content": "x"}]}
+    assert llm_cache.chave(base) == llm_cache.chave(dict(base))
+    assert llm_cache.chave(base) != llm_cache.chave({**base, "model": "b"})
+    assert llm_cache.chave(base) != llm_cache.chave({**base, "temperature": 0.8})
+
+
+def test_resposta_com_vazamento_de_idioma_nao_vai_para_o_cache(cache):
+    from backend.services.claude_service import _sem_vazamento_idioma
+
+    gov = _gov()
+    vazada = _ClientContador(texto="A great voice. Uma voz com o drama da noite e")
+    _chamar(gov, vazada, cache_ttl=60, aceitar=_sem_vazamento_idioma("English"))
+    _chamar(gov, vazada, cache_ttl=60, aceitar=_sem_vazamento_idioma("English"))
+    assert vazada.chamadas == 2
+
+    limpa = _ClientContador(texto="A great voice")
+    gov.criar_mensagem(
+        limpa, origem="teste", model="m", max_tokens=10, cache_ttl=60,
+        aceitar=_sem_vazamento_idioma("English"),
+        messages=[{"role": "user", "content": "prompt limpo"}],
+    )
+    gov.criar_mensagem(
+        limpa, origem="teste", model="m", max_tokens=10, cache_ttl=60,
+        aceitar=_sem_vazamento_idioma("English"),
+        messages=[{"role": "user", "content": "prompt limpo"}],
+    )
+    assert limpa.chamadas == 1
@@ -0,0 +1,116 @@
+"""Tests para llm_gateway — baldes RPM/TPM, prioridade e retry-after."""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.llm_gateway import INTERATIVO, LOTE, GovernadorLLM, _Balde
+
+
+class _ErroAPI(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class _ClientRoteiro:
+    """`messages.create` devolve/levanta os itens do roteiro em ordem."""
+
+    def __init__(self, *roteiro) -> None:
+        self.roteiro = list(roteiro)
+        self.chamadas = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.chamadas += 1
+        item = self.roteiro.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def _resposta(input_tokens: int = 10, output_tokens: int = 5):
+    usage = SimpleNamespace(
+        input_tokens=input_tokens, cache_read_input_tokens=0,
+        cache_creation_input_tokens=0, output_tokens=output_tokens,
+    )
+    return SimpleNamespace(usage=usage, stop_reason="end_turn")
+
+
+def test_balde_espera_proporcional_ao_que_falta():
+    balde = _Balde(60, agora=0.0)  # 1 por segundo
+    balde.consumir(60)
+    assert balde.espera(3, agora=0.0) == pytest.approx(3.0)
+    assert balde.espera(3, agora=2.0) == pytest.approx(1.0)
+    # pedido maior que o balde espera só o balde encher
+    assert balde.espera(500, agora=2.0) == pytest.approx(58.0)
+
+
+def test_interativo_passa_na_frente_do_lote():
+    gov = GovernadorLLM(rpm=1000, tpm=10**6, max_concorrentes=1)
+    gov.adquirir(INTERATIVO, 1)  # ocupa a única vaga
+    ordem: list[str] = []
+
+    def _pedir(nome, prioridade):
+        gov.adquirir(prioridade, 1)
+        ordem.append(nome)
+        gov.liberar(1, 1)
+
+    lote = threading.Thread(target=_pedir, args=("lote", LOTE))
+    lote.start()
+    time.sleep(0.05)
+    interativo = threading.Thread(target=_pedir, args=("interativo", INTERATIVO))
+    interativo.start()
+    time.sleep(0.05)
+
+    gov.liberar(1, 1)
+    lote.join(2)
+    interativo.join(2)
+    assert ordem == ["interativo", "lote"]
+
+
+def test_retry_after_do_529_e_respeitado():
+    esperas: list[float] = []
+    gov = GovernadorLLM(rpm=1000, tpm=10**6, max_concorrentes=2, dormir=esperas.append)
+    client = _ClientRoteiro(_ErroAPI(529, {"retry-after": "7"}), _resposta())
+
+    gov.criar_mensagem(client, origem="teste", model="m", max_tokens=10, messages=[])
+    assert client.chamadas == 2
+    assert esperas == [7.0]
+
+
+def test_429_pausa_o_governador_inteiro():
+    gov = GovernadorLLM(rpm=1000, tpm=10**6, max_concorrentes=2)
+    client = _ClientRoteiro(_ErroAPI(429, {"retry-after-ms": "80"}), _resposta())
+
+    inicio = time.monotonic()
+    gov.criar_mensagem(client, origem="teste", model="m", max_tokens=10, messages=[])
+    assert time.monotonic() - inicio >= 0.08
+    assert gov.stats()["retries"] == 1
+
+
+def test_erro_nao_retentavel_propaga_sem_retry():
+    gov = GovernadorLLM(rpm=1000, tpm=10**6, max_concorrentes=2)
+    client = _ClientRoteiro(_ErroAPI(400), _resposta())
+
+    with pytest.raises(_ErroAPI):
+        gov.criar_mensagem(client, origem="teste", model="m", max_tokens=10, messages=[])
+    assert client.chamadas == 1
+    assert gov.stats()["em_voo"] == 0
+
+
+def test_tokens_estimados_sao_acertados_pelo_usage_real():
+    gov = GovernadorLLM(rpm=1000, tpm=6000, max_concorrentes=2)
+    client = _ClientRoteiro(_resposta(input_tokens=100, output_tokens=100))
+
+    # estimativa = 4000 chars / 4 + max_tokens 4000 = 5000 tokens
+    gov.criar_mensagem(
+        client, origem="teste", model="m", max_tokens=4000,
+        messages=[{"role": "user", "content": "x" * 4000}],
+    )
+    # devolveu 5000 - 200: cabe outra chamada do mesmo tamanho sem esperar
+    assert gov._tok.espera(5000, time.monotonic()) == 0.0
@@ -0,0 +1,62 @@
+"""Tests para prompt_cache — system cacheável nos callsites BO + contadores de uso."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import anthropic
+
+from backend.services import prompt_cache
+from backend.services.bo.bo_hooks_service import _call_anthropic_hooks
+from backend.services.bo.prompts.bo_translation_prompt_v1 import (
+    build_bo_translation_prompt,
+    build_bo_translation_prompt_partes,
+)
+
+
+def test_callsite_manda_instrucoes_fixas_como_system_cacheavel(anthropic_response):
+    anthropic_response.set_json_response({"hooks": []})
+    client = anthropic.Anthropic()
+
+    _call_anthropic_hooks("<context>projeto</context>", client, system="INSTRUÇÕES FIXAS")
+
+    kwargs = anthropic_response.last_kwargs
+    assert kwargs["system"] == [
+        {"type": "text", "text": "INSTRUÇÕES FIXAS", "cache_control": {"type": "ephemeral"}},
+    ]
+    assert kwargs["messages"] == [{"role": "user", "content": "<context>projeto</context>"}]
+
+
+def test_system_cacheavel_extra_fica_depois_do_ponto_de_cache():
+    blocos = prompt_cache.system_cacheavel("fixo", "Return RAW JSON only.")
+    assert "cache_control" in blocos[0]
+    assert blocos[1] == {"type": "text", "text": "Return RAW JSON only."}
+
+
+def test_traducao_prefixo_estatico_igual_para_todos_idiomas():
+    args = dict(
+        overlay_pt={"captions": [{"text": "Uma voz"}]},
+        post_pt="Descrição",
+        youtube_pt={"title": "Título", "tags": ["opera"]},
+        antipadroes_idioma_alvo_formatado="",
+    )
+    estatico_en, contexto_en = build_bo_translation_prompt_partes("en", **args)
+    estatico_de, contexto_de = build_bo_translation_prompt_partes("de", **args)
+
+    assert estatico_en == estatico_de
+    assert contexto_en != contexto_de
+    assert build_bo_translation_prompt("en", **args) == f"{estatico_en}\n\n{contexto_en}"
+
+
+def test_registrar_uso_acumula_por_origem(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "_totais", {})
+    usage = SimpleNamespace(
+        input_tokens=50, cache_read_input_tokens=900,
+        cache_creation_input_tokens=0, output_tokens=300,
+    )
+    prompt_cache.registrar_uso("bo_translate", SimpleNamespace(usage=usage))
+    prompt_cache.registrar_uso("bo_translate", SimpleNamespace(usage=None))
+
+    stats = prompt_cache.uso_stats()["bo_translate"]
+    assert stats["chamadas"] == 2
+    assert stats["cache_read_input_tokens"] == 900
+    assert stats["taxa_cache"] == 0.947
@@ -0,0 +1,93 @@
+"""Tests para a tradução Google em lote — dedup, 1 requisição por idioma, memória."""
+from __future__ import annotations
+
+import pytest
+
+from backend.services import translate_service
+from backend.services.translate_service import translate_post_text, translate_texts
+
+
+class _GoogleFake:
+    """Session fake: traduz prefixando o idioma e registra os `q` de cada POST."""
+
+    def __init__(self) -> None:
+        self.requisicoes: list[list[str]] = []
+
+    def post(self, url, data=None, timeout=None):
+        self.requisicoes.append(list(data["q"]))
+        traducoes = [{"translatedText": f"{data['target']}:{q}"} for q in data["q"]]
+        return _Resposta({"data": {"translations": traducoes}})
+
+
+class _Resposta:
+    def __init__(self, payload: dict) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._payload
+
+
+@pytest.fixture
+def google(monkeypatch, in_memory_db):
+    fake = _GoogleFake()
+    monkeypatch.setattr(translate_service, "_session", fake)
+    monkeypatch.setattr(translate_service, "_memoria_local", {})
+    monkeypatch.setattr(translate_service, "_nova_sessao_memoria", lambda: in_memory_db)
+    return fake
+
+
+_POST_RC = "\n".join([
+    "🎻✨ Bach – Chaconne",
+    "Hilary Hahn – violino 🎻",
+    "•",
+    "Primeiro parágrafo sobre Bach.",
+    "•",
+    "Segundo parágrafo.",
+    "•",
+    "👉 Siga, o melhor da música clássica, diariamente no seu feed.",
+    "•",
+    "•",
+    "•",
+    "#violino #bach #musicaclassica #violino #reelsclassics",
+])
+
+
+def test_post_rc_traduz_tudo_numa_requisicao_sem_duplicatas(google):
+    traduzido = translate_post_text(_POST_RC, "en", protected_names=["Bach"])
+
+    assert len(google.requisicoes) == 1
+    (enviados,) = google.requisicoes
+    assert len(enviados) == len(set(enviados))
+    assert "reelsclassics" not in enviados
+    assert "Primeiro parágrafo sobre PROPERNAME00." in enviados
+    assert "en:Primeiro parágrafo sobre Bach." in traduzido
+    assert "Hilary Hahn – en:violino 🎻" in traduzido
+    assert traduzido.endswith("#en:violino #en:bach #en:musicaclassica #en:violino #reelsclassics")
+
+
+def test_memoria_persistente_serve_segmentos_repetidos_entre_projetos(google):
+    translate_texts(["violino", "bach"], "de")
+    translate_service._memoria_local.clear()  # "reinício": só o banco sobra
+
+    assert translate_texts(["bach", "", "violino"], "de") == ["de:bach", "", "de:violino"]
+    assert google.requisicoes == [["violino", "bach"]]
+
+
+def test_chave_ja_gravada_por_traducao_concorrente_nao_perde_o_lote(google):
+    translate_service._memoria_gravar({"bach": "de:bach"}, "de")
+    translate_service._memoria_gravar({"bach": "de:bach", "violino": "de:violino"}, "de")
+    translate_service._memoria_local.clear()
+
+    assert translate_texts(["bach", "violino"], "de") == ["de:bach", "de:violino"]
+    assert google.requisicoes == []
+
+
+def test_lotes_respeitam_limite_de_segmentos(google, monkeypatch):
+    monkeypatch.setattr(translate_service, "_GT_MAX_SEGMENTOS", 2)
+    resultado = translate_texts(["a", "b", "c", "a"], "fr")
+
+    assert resultado == ["fr:a", "fr:b", "fr:c", "fr:a"]
+    assert google.requisicoes == [["a", "b"], ["c"]]
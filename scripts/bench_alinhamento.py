@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark: merge_transcricoes em árias longas — varredura gulosa antiga vs
+alinhador indexado (janela temporal + poda pelo teto do ratio + DP global).
+
+Gera uma ária sintética com muitos versos repetidos (o caso difícil: o mesmo
+texto aparece várias vezes e só o tempo desempata), uma transcrição guiada
+(texto da letra, timestamps imprecisos) e uma cega (timestamps corretos,
+texto com erros, segmentos faltando/sobrando). Mede a latência e quantos
+guiados receberam o timestamp do cego certo.
+
+Uso:
+    python scripts/bench_alinhamento.py [--versos 160] [--rodadas 5]
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app-editor", "backend"))
+
+PALAVRAS = (
+    "amor cuore mio la donna è mobile qual piuma al vento muta d accento e di pensier "
+    "nessun dorma tu pure o principessa nella tua fredda stanza guardi le stelle che "
+    "tremano d amore e di speranza vincerò all alba"
+).split()
+
+
+def _encontrar_melhor_match_antigo(texto, versos, normalizar):
+    """Cópia da implementação anterior (referência de semântica e custo)."""
+    texto_norm = normalizar(texto)
+    melhor_score, melhor_verso, melhor_indice = 0, "", None
+    for i, verso in enumerate(versos):
+        verso_norm = normalizar(verso)
+        score = SequenceMatcher(None, texto_norm, verso_norm).ratio()
+        if verso_norm in texto_norm or texto_norm in verso_norm:
+            score = max(score, 0.85)
+        if score > melhor_score:
+            melhor_score, melhor_verso, melhor_indice = score, verso, i
+    for i in range(len(versos) - 1):
+        combinado_norm = normalizar(versos[i] + " " + versos[i + 1])
+        score = SequenceMatcher(None, texto_norm, combinado_norm).ratio()
+        if score > melhor_score:
+            melhor_score, melhor_verso, melhor_indice = score, versos[i] + " " + versos[i + 1], i
+    return melhor_verso, melhor_score, melhor_indice
+
+
+def _merge_guloso_antigo(cega, guiada, letra, al):
+    """Loop guloso anterior (mark-used, busca em todos os cegos). Retorna {gi: ci}."""
+    versos = [v.strip() for v in letra.split("\n") if v.strip()]
+    versos_limpos = [re.sub(r"^\[.*?\]\s*", "", v) for v in versos]
+    cegos = [{"norm": al.normalizar(s["text"]), "start": al._parse_timestamp_sec(s["start"]), "usado": False}
+             for s in cega]
+    pares = {}
+    for gi, g in enumerate(guiada):
+        gnorm = al.normalizar(g["text"])
+        gstart = al._parse_timestamp_sec(g["start"])
+        _encontrar_melhor_match_antigo(g["text"], versos_limpos, al.normalizar)
+        melhor, melhor_ci = 0, None
+        for ci, c in enumerate(cegos):
+            if c["usado"]:
+                continue
+            st = SequenceMatcher(None, gnorm, c["norm"]).ratio()
+            if c["norm"] and gnorm and (c["norm"] in gnorm or gnorm in c["norm"]):
+                st = max(st, 0.85)
+            total = st * 0.7 + max(0, 1.0 - abs(gstart - c["start"]) / 30.0) * 0.3
+            if total > melhor:
+                melhor, melhor_ci = total, ci
+        if melhor_ci is not None and melhor >= 0.5:
+            cegos[melhor_ci]["usado"] = True
+            pares[gi] = melhor_ci
+    return pares
+
+
+def _aria(n_versos: int, rnd: random.Random):
+    refrao = [" ".join(rnd.choice(PALAVRAS) for _ in range(rnd.randint(3, 7))) for _ in range(6)]
+    versos = []
+    while len(versos) < n_versos:
+        # ~metade da ária é refrão/repetição
+        versos.append(rnd.choice(refrao) if rnd.random() < 0.5
+                      else " ".join(rnd.choice(PALAVRAS) for _ in range(rnd.randint(3, 8))))
+    t = 5.0
+    guiada, cega = [], []
+    for i, verso in enumerate(versos):
+        dur = rnd.uniform(2.5, 6.0)
+        g_start = max(0.0, t + rnd.uniform(-2.5, 2.5))
+        guiada.append({"start": f"{g_start:.3f}", "end": f"{g_start + dur:.3f}", "text": verso, "_id": i})
+        if rnd.random() > 0.08:  # cega perde alguns segmentos
+            palavras = verso.split()
+            if rnd.random() < 0.4:
+                palavras[rnd.randrange(len(palavras))] = rnd.choice(PALAVRAS)
+            cega.append({"start": f"{t:.3f}", "end": f"{t + dur:.3f}", "text": " ".join(palavras), "_id": i})
+        if rnd.random() < 0.05:  # ruído/aplauso transcrito
+            cega.append({"start": f"{t + dur / 2:.3f}", "end": f"{t + dur:.3f}", "text": "bravo", "_id": None})
+        t += dur + rnd.uniform(0.2, 1.5)
+    cega.sort(key=lambda s: float(s["start"]))
+    return "\n".join(versos), guiada, cega
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--versos", type=int, default=160)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from app.services import alinhamento as al
+
+    # Captura a atribuição do merge novo (índices nas listas ordenadas por tempo)
+    capturado = {}
+    atribuicao = al._atribuicao_monotonica
+
+    def _espiar(*a):
+        capturado["pares"] = atribuicao(*a)
+        return capturado["pares"]
+    al._atribuicao_monotonica = _espiar
+
+    rnd = random.Random(7)
+    t_antigo, t_novo, certos_antigo, certos_novo, total = [], [], 0, 0, 0
+    for _ in range(args.rodadas):
+        letra, guiada, cega = _aria(args.versos, rnd)
+        guiada.sort(key=lambda s: float(s["start"]))
+
+        t0 = time.perf_counter()
+        pares = _merge_guloso_antigo(cega, guiada, letra, al)
+        t_antigo.append(time.perf_counter() - t0)
+        certos_antigo += sum(1 for gi, ci in pares.items() if cega[ci]["_id"] == guiada[gi]["_id"])
+
+        al._indice_versos.cache_clear()
+        t0 = time.perf_counter()
+        al.merge_transcricoes(cega, guiada, letra)
+        t_novo.append(time.perf_counter() - t0)
+        certos_novo += sum(1 for gi, ci in capturado["pares"].items() if cega[ci]["_id"] == guiada[gi]["_id"])
+        total += len(guiada)
+
+    print(f"ária sintética: {args.versos} versos × {args.rodadas} rodadas ({total} guiados)")
+    for nome, tempos, certos in (("guloso", t_antigo, certos_antigo), ("indexado", t_novo, certos_novo)):
+        print(f"  {nome:<9} mediana={statistics.median(tempos) * 1000:8.1f} ms  "
+              f"timestamp do cego certo: {certos}/{total} ({certos / total:.1%})")
+    print(f"  → {statistics.median(t_antigo) / statistics.median(t_novo):.1f}x mais rápido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark: is_posted com varredura linear (implementação antiga) vs PostedIndex.
+
+Monta um registry de ~10k linhas a partir do dataset da curadoria (linhas
+reais + variações sintéticas até --linhas), confere que as duas versões dão
+exatamente o mesmo resultado para todas as consultas e mede a latência.
+
+Uso:
+    python scripts/bench_is_posted.py [--csv app-curadoria/backend/dataset_v3_categorizado.csv]
+                                      [--linhas 10000] [--consultas 500]
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import time
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(RAIZ, "app-curadoria", "backend"))
+
+SUFIXOS = ["live", "2019", "berlin", "gala", "concert", "encore", "tenor", "soprano", "vienna", "arena"]
+
+
+def _is_posted_linear(registry, na, ns):
+    """Cópia da implementação anterior (referência de semântica)."""
+    if not na and not ns:
+        return False
+    stop = {"", "the", "and", "de", "di", "la", "le", "el", "a", "o", "in", "of"}
+    for ra, rs in registry:
+        if ra == na and rs == ns:
+            return True
+        aw = set(na.split()) - stop
+        rw = set(ra.split()) - stop
+        am = (len(aw & rw) >= min(2, len(aw)) or ra in na or na in ra) if aw and rw else False
+        sw = set(ns.split()) - stop
+        rsw = set(rs.split()) - stop
+        sm = (len(sw & rsw) >= min(2, len(sw)) or rs in ns or ns in rs) if sw and rsw else False
+        if am and sm:
+            return True
+    return False
+
+
+def _carregar(caminho, normalize_str):
+    pares = []
+    with open(caminho, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            a = (row.get("Nome do Cantor") or "").strip()
+            s = (row.get("Nome da Música") or row.get("Nome da Musica") or "").strip()
+            if a:
+                pares.append((normalize_str(a), normalize_str(s)))
+    return pares
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=os.path.join(RAIZ, "app-curadoria", "backend", "dataset_v3_categorizado.csv"))
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    from services.scoring import PostedIndex, normalize_str
+
+    rnd = random.Random(42)
+    reais = _carregar(args.csv, normalize_str)
+    registry = set(reais)
+    artistas = sorted({a for a, _ in reais})
+    musicas = sorted({s for _, s in reais if s})
+    while len(registry) < args.linhas:
+        registry.add((
+            f"{rnd.choice(artistas)} {rnd.choice(SUFIXOS)}",
+            f"{rnd.choice(musicas)} {rnd.choice(SUFIXOS)}",
+        ))
+    registry = set(list(registry)[:args.linhas])
+    print(f"registry: {len(registry)} linhas ({len(set(reais))} reais de {args.csv})")
+
+    # Consultas: pares postados, variações (match fuzzy) e combinações sem relação
+    base = list(registry)
+    consultas = []
+    for _ in range(args.consultas):
+        a, s = rnd.choice(base)
+        tipo = rnd.random()
+        if tipo < 0.25:
+            consultas.append((a, s))
+        elif tipo < 0.5:
+            consultas.append((f"{a} {rnd.choice(SUFIXOS)}", s.split(" ")[0]))
+        else:
+            consultas.append((rnd.choice(artistas), f"{rnd.choice(musicas)} {rnd.choice(SUFIXOS)}"))
+
+    t0 = time.perf_counter()
+    indice = PostedIndex(registry)
+    print(f"build do índice: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    lin, idx, divergencias, positivos = [], [], 0, 0
+    for na, ns in consultas:
+        t0 = time.perf_counter()
+        esperado = _is_posted_linear(registry, na, ns)
+        lin.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        obtido = indice.contem(na, ns) if (na or ns) else False
+        idx.append((time.perf_counter() - t0) * 1000)
+        divergencias += esperado != obtido
+        positivos += esperado
+
+    for nome, tempos in (("linear", lin), ("índice", idx)):
+        print(
+            f"  {nome:<8} mediana={statistics.median(tempos):8.3f} ms "
+            f"p95={sorted(tempos)[int(len(tempos) * 0.95) - 1]:8.3f} ms "
+            f"página de 25 vídeos={statistics.mean(tempos) * 25:8.1f} ms"
+        )
+    print(f"  → {statistics.mean(lin) / statistics.mean(idx):.0f}x mais rápido; "
+          f"{positivos}/{len(consultas)} postados; divergências: {divergencias}")
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
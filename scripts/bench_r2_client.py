@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: latência por chamada de head_object com cliente boto3 novo
+por chamada (comportamento antigo de `_get_s3_client`) vs cliente compartilhado.
+
+Mede os dois fluxos mais pesados em head_object:
+  - check_conflict: 1 head do marker `.youtube_id` por projeto
+  - pacote: exists() de post.txt/subtitles.srt/youtube.txt para cada idioma
+
+Uso:
+    # contra o R2 real (mesmas env vars de shared/storage_service.py)
+    python scripts/bench_r2_client.py "<r2_base_key>" [--n 20]
+
+    # sem R2: servidor HTTP local que responde HEAD (isola custo de cliente/conexão)
+    python scripts/bench_r2_client.py --local [--n 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+IDIOMAS = ["en", "pt", "es", "de", "fr", "it", "pl"]
+ARQUIVOS_PACOTE = ["post.txt", "subtitles.srt", "youtube.txt"]
+
+
+class _HeadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("ETag", '"bench"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _servidor_local() -> str:
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _HeadHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def _medir(nome: str, obter_cliente, bucket: str, keys: list, n: int):
+    latencias = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        for key in keys:
+            try:
+                obter_cliente().head_object(Bucket=bucket, Key=key)
+            except Exception:
+                pass  # 404 conta como chamada (exists() retorna False)
+        latencias.append((time.perf_counter() - t0) * 1000 / len(keys))
+    print(
+        f"  {nome:<22} {statistics.median(latencias):7.2f} ms/chamada (mediana) "
+        f"p95={sorted(latencias)[int(len(latencias) * 0.95) - 1]:7.2f} ms"
+    )
+    return statistics.median(latencias)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base", nargs="?", default="bench/Artista - Musica")
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--local", action="store_true")
+    args = parser.parse_args()
+
+    if args.local:
+        os.environ.update(
+            R2_ENDPOINT=_servidor_local(), R2_ACCESS_KEY="bench",
+            R2_SECRET_KEY="bench", R2_BUCKET="bench",
+        )
+
+    from shared import storage_service as ss
+    if not ss._r2_configured():
+        print("ERRO: R2_ENDPOINT / R2_ACCESS_KEY / R2_SECRET_KEY / R2_BUCKET nao estao no ambiente.",
+              file=sys.stderr)
+        return 1
+
+    nome_base = args.base.rsplit("/", 1)[-1]
+    fluxos = {
+        "check_conflict": [f"{args.base}/video/.youtube_id"],
+        "pacote": [
+            f"{args.base}/{nome_base} - {idioma.upper()}/{arq}"
+            for idioma in IDIOMAS for arq in ARQUIVOS_PACOTE
+        ],
+    }
+
+    for fluxo, keys in fluxos.items():
+        print(f"{fluxo} ({len(keys)} head_object por rodada, {args.n} rodadas)")
+        antes = _medir("cliente por chamada", ss._new_s3_client, ss.R2_BUCKET, keys, args.n)
+        depois = _medir("cliente compartilhado", ss._get_s3_client, ss.R2_BUCKET, keys, args.n)
+        print(f"  → {antes / depois:.1f}x mais rápido\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
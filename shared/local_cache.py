@@ -0,0 +1,254 @@
+"""Cache local em disco dos objetos do R2 (usado por StorageService.ensure_local).
+
+Antes o cache em LOCAL_TMP crescia sem limite. Agora:
+
+- orçamento em bytes (STORAGE_CACHE_MAX_MB) com despejo LRU — os arquivos
+  usados há mais tempo saem primeiro até o novo objeto caber;
+- pinning: arquivos em uso por uma task (`with storage.pinned(key):`) nunca
+  são despejados;
+- validação contra o R2: um hit é conferido por ETag/tamanho (head_object) no
+  máximo a cada STORAGE_CACHE_VALIDATE_SEC; divergiu → baixa de novo;
+- contadores de hit/miss/despejo expostos por `stats()`.
+
+O índice vive em memória e é reconstruído a partir do disco no primeiro uso
+(arquivos de um processo anterior entram sem ETag e são validados pelo
+tamanho no próximo acesso). Thread-safe: ensure_local roda tanto no event
+loop quanto em threads.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+# Marca dos downloads em andamento (`.part` e `.part.json`, nunca indexados)
+SUFIXO_PARCIAL = ".part"
+
+
+@dataclass
+class _Entrada:
+    caminho: str
+    tamanho: int
+    etag: Optional[str] = None
+    validado_em: float = 0.0
+    pins: int = 0
+
+
+class LocalCache:
+    """Índice LRU dos arquivos cacheados em `raiz`, limitado a `max_bytes`."""
+
+    def __init__(self, raiz: str, max_bytes: int, validar_a_cada_sec: float = 300):
+        self.raiz = raiz
+        self.max_bytes = max_bytes
+        self.validar_a_cada_sec = validar_a_cada_sec
+        self._entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._lock = threading.RLock()
+        # key → [Lock, usuários]; a entrada sai quando o último usuário solta
+        self._locks_chave: dict[str, list] = {}
+        self._pins_pendentes: dict[str, int] = {}
+        self._carregado = False
+        self._stats = {"hits": 0, "misses": 0, "revalidados": 0, "invalidados": 0,
+                       "despejos": 0, "bytes_despejados": 0}
+
+    # --- índice ---
+
+    def _carregar(self):
+        """Reconstrói o índice a partir do disco (uma vez por processo)."""
+        if self._carregado:
+            return
+        self._carregado = True
+        base = Path(self.raiz)
+        if not base.exists():
+            return
+        arquivos = []
+        for f in base.rglob("*"):
+            if not f.is_file():
+                continue
+            if SUFIXO_PARCIAL in f.suffixes:
+                f.unlink(missing_ok=True)
+                continue
+            st = f.stat()
+            arquivos.append((st.st_atime, str(f.relative_to(base)), str(f), st.st_size))
+        for _, key, caminho, tamanho in sorted(arquivos):
+            self._entradas[key] = _Entrada(caminho=caminho, tamanho=tamanho)
+        if arquivos:
+            logger.info(f"[cache] Índice reconstruído: {len(arquivos)} arquivo(s), {self.bytes_usados() / _MB:.0f}MB")
+
+    def bytes_usados(self) -> int:
+        with self._lock:
+            return sum(e.tamanho for e in self._entradas.values())
+
+    @contextmanager
+    def lock_da_chave(self, key: str):
+        """Lock por key — evita dois downloads simultâneos do mesmo objeto.
+
+        Contado por usuário: a entrada é descartada quando ninguém mais espera
+        pela key, então o dicionário não cresce com cada key já vista.
+        """
+        with self._lock:
+            par = self._locks_chave.setdefault(key, [threading.Lock(), 0])
+            par[1] += 1
+        try:
+            with par[0]:
+                yield
+        finally:
+            with self._lock:
+                par[1] -= 1
+                if not par[1]:
+                    self._locks_chave.pop(key, None)
+
+    def buscar(self, key: str) -> Optional[_Entrada]:
+        """Entrada cacheada (e marca como usada agora) ou None."""
+        with self._lock:
+            self._carregar()
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                return None
+            if not os.path.exists(entrada.caminho):
+                self._entradas.pop(key, None)
+                return None
+            self._entradas.move_to_end(key)
+            return entrada
+
+    def precisa_validar(self, entrada: _Entrada) -> bool:
+        return time.monotonic() - entrada.validado_em >= self.validar_a_cada_sec
+
+    def confere(self, entrada: _Entrada, etag: Optional[str], tamanho: Optional[int]) -> bool:
+        """True se a cópia local bate com o objeto remoto (ETag quando conhecido, senão tamanho)."""
+        if tamanho is not None and entrada.tamanho != tamanho:
+            return False
+        if entrada.etag and etag and entrada.etag != etag:
+            return False
+        return True
+
+    def marcar_validado(self, key: str, etag: Optional[str]):
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada:
+                entrada.validado_em = time.monotonic()
+                entrada.etag = etag or entrada.etag
+                self._stats["revalidados"] += 1
+
+    def registrar(self, key: str, caminho: str, etag: Optional[str] = None):
+        """Indexa um arquivo recém-baixado como o mais recente."""
+        with self._lock:
+            self._carregar()
+            anterior = self._entradas.pop(key, None)
+            self._entradas[key] = _Entrada(
+                caminho=caminho,
+                tamanho=os.path.getsize(caminho),
+                etag=etag,
+                validado_em=time.monotonic(),
+                pins=anterior.pins if anterior else self._pins_pendentes.pop(key, 0),
+            )
+
+    def remover(self, key: str) -> bool:
+        """Tira do índice e apaga do disco (invalidação explícita)."""
+        with self._lock:
+            self._carregar()
+            entrada = self._entradas.pop(key, None)
+            caminho = entrada.caminho if entrada else os.path.join(self.raiz, key)
+            if entrada and entrada.pins:
+                self._pins_pendentes[key] = entrada.pins
+            if os.path.exists(caminho):
+                os.remove(caminho)
+                self._stats["invalidados"] += 1
+                return True
+            return False
+
+    def contar(self, evento: str):
+        with self._lock:
+            self._stats[evento] += 1
+
+    # --- despejo ---
+
+    def reservar(self, novos_bytes: int, manter: str = None) -> int:
+        """Despeja entradas LRU não-pinadas até `novos_bytes` caberem no orçamento.
+
+        Retorna bytes liberados. Se só restarem arquivos pinados, o orçamento
+        é excedido (com aviso) em vez de falhar o download.
+        """
+        with self._lock:
+            self._carregar()
+            usado = self.bytes_usados()
+            liberado = 0
+            for key in list(self._entradas):
+                if usado + novos_bytes - liberado <= self.max_bytes:
+                    break
+                entrada = self._entradas[key]
+                if entrada.pins or key == manter:
+                    continue
+                try:
+                    os.remove(entrada.caminho)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"[cache] Falha ao despejar {key}: {e}")
+                    continue
+                self._entradas.pop(key)
+                liberado += entrada.tamanho
+                self._stats["despejos"] += 1
+                self._stats["bytes_despejados"] += entrada.tamanho
+                logger.info(f"[cache] Despejado {key} ({entrada.tamanho / _MB:.1f}MB)")
+            if usado + novos_bytes - liberado > self.max_bytes:
+                logger.warning(
+                    f"[cache] Orçamento excedido: {(usado + novos_bytes - liberado) / _MB:.0f}MB "
+                    f"> {self.max_bytes / _MB:.0f}MB (restante pinado)"
+                )
+            return liberado
+
+    def liberar_tudo(self) -> int:
+        """Despeja tudo que não está pinado (limpeza de emergência de disco)."""
+        with self._lock:
+            orcamento = self.max_bytes
+            self.max_bytes = 0
+            try:
+                return self.reservar(0)
+            finally:
+                self.max_bytes = orcamento
+
+    # --- pinning ---
+
+    @contextmanager
+    def pinned(self, *keys: str):
+        """Impede o despejo das keys enquanto o bloco roda (pode pinar antes do download)."""
+        with self._lock:
+            self._carregar()
+            for key in keys:
+                entrada = self._entradas.get(key)
+                if entrada:
+                    entrada.pins += 1
+                else:
+                    self._pins_pendentes[key] = self._pins_pendentes.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for key in keys:
+                    entrada = self._entradas.get(key)
+                    if entrada and entrada.pins:
+                        entrada.pins -= 1
+                    elif self._pins_pendentes.get(key):
+                        self._pins_pendentes[key] -= 1
+                        if not self._pins_pendentes[key]:
+                            self._pins_pendentes.pop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / total, 3) if total else None,
+                "arquivos": len(self._entradas),
+                "pinados": sum(1 for e in self._entradas.values() if e.pins),
+                "usado_mb": round(self.bytes_usados() / _MB, 1),
+                "limite_mb": round(self.max_bytes / _MB, 1),
+            }
@@ -0,0 +1,384 @@
+"""Camada de transferência R2: multipart paralelo, download retomável e MB/s por transferência.
+
+- Upload: boto3 upload_file com TransferConfig explícita (chunk e concorrência
+  configuráveis) — arquivos acima de R2_MULTIPART_THRESHOLD_MB sobem em partes
+  paralelas.
+- Download: range requests paralelos gravados direto em `{dest}.part` (pwrite
+  no offset de cada parte). O progresso fica em `{dest}.part.json`; uma queda
+  de conexão no meio de um original de 1 GB retoma só as partes que faltam,
+  na próxima tentativa do sync_retry. If-Match com o ETag garante que partes
+  de versões diferentes do objeto nunca se misturam.
+- ZIP em streaming: MultipartUploadWriter + escrever_zip_streaming montam um
+  ZIP a partir de objetos remotos direto num multipart upload, sem arquivo
+  temporário (pacote de exportação do editor).
+
+Usado por StorageService.upload_file/download_file — quem chama continua com a
+mesma API (ensure_local, renders, uploads da curadoria).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+R2_MULTIPART_THRESHOLD_MB = int(os.getenv("R2_MULTIPART_THRESHOLD_MB", "16"))
+R2_MULTIPART_CHUNK_MB = int(os.getenv("R2_MULTIPART_CHUNK_MB", "16"))
+R2_TRANSFER_CONCURRENCY = int(os.getenv("R2_TRANSFER_CONCURRENCY", "8"))
+
+SUFIXO_PARCIAL = ".part"
+SUFIXO_ESTADO = ".part.json"
+
+# Leitura do corpo de cada range em blocos (memória O(bloco) por thread)
+_BLOCO_LEITURA = 1 * _MB
+
+_transfer_config = None
+
+
+def transfer_config():
+    """TransferConfig compartilhada (threshold, chunk e concorrência de multipart)."""
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        _transfer_config = TransferConfig(
+            multipart_threshold=R2_MULTIPART_THRESHOLD_MB * _MB,
+            multipart_chunksize=R2_MULTIPART_CHUNK_MB * _MB,
+            max_concurrency=R2_TRANSFER_CONCURRENCY,
+            use_threads=True,
+        )
+    return _transfer_config
+
+
+def _log_taxa(operacao: str, key: str, n_bytes: int, inicio: float, extra: str = ""):
+    dt = max(time.monotonic() - inicio, 1e-6)
+    logger.info(
+        f"[storage:r2] {operacao} {key} {n_bytes / _MB:.1f}MB em {dt:.1f}s "
+        f"({n_bytes / _MB / dt:.1f} MB/s){extra}"
+    )
+
+
+def upload(client, bucket: str, key: str, local_path: str, content_type: str) -> dict:
+    """Upload (multipart paralelo acima do threshold). Retorna o head_object pós-upload."""
+    inicio = time.monotonic()
+    client.upload_file(
+        local_path, bucket, key,
+        ExtraArgs={"ContentType": content_type},
+        Config=transfer_config(),
+    )
+    # Verificação pós-upload: confirmar que o arquivo existe no R2
+    head = client.head_object(Bucket=bucket, Key=key)
+    _log_taxa("upload", key, os.path.getsize(local_path), inicio)
+    return head
+
+
+class _EstadoDownload:
+    """Partes já gravadas em `{dest}.part`, persistidas em `{dest}.part.json`."""
+
+    def __init__(self, dest: str, etag: str, tamanho: int, chunk: int):
+        self.caminho = dest + SUFIXO_ESTADO
+        self.etag = etag
+        self.tamanho = tamanho
+        self.chunk = chunk
+        self.feitas: set[int] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def carregar(cls, dest: str, etag: str, tamanho: int, chunk: int) -> "_EstadoDownload":
+        estado = cls(dest, etag, tamanho, chunk)
+        parcial = dest + SUFIXO_PARCIAL
+        try:
+            with open(estado.caminho) as f:
+                salvo = json.load(f)
+            if (salvo.get("etag") == etag and salvo.get("tamanho") == tamanho
+                    and salvo.get("chunk") == chunk and os.path.exists(parcial)):
+                estado.feitas = set(salvo.get("feitas", []))
+        except (OSError, ValueError):
+            pass
+        return estado
+
+    def marcar(self, parte: int):
+        with self._lock:
+            self.feitas.add(parte)
+            tmp = self.caminho + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"etag": self.etag, "tamanho": self.tamanho, "chunk": self.chunk,
+                           "feitas": sorted(self.feitas)}, f)
+            os.replace(tmp, self.caminho)
+
+    def limpar(self):
+        for p in (self.caminho, self.caminho + ".tmp"):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+
+def download_retomavel(client, bucket: str, key: str, dest: str, head: Optional[dict] = None) -> str:
+    """Baixa `key` para `dest` em partes paralelas, retomando um `.part` anterior.
+
+    O arquivo final só aparece em `dest` (rename atômico) quando todas as
+    partes foram gravadas. Exceções de rede propagam com o progresso salvo —
+    a próxima chamada continua de onde parou.
+    """
+    from botocore.exceptions import (
+        ClientError, HTTPClientError, IncompleteReadError, ConnectionError as BotoConnectionError,
+    )
+
+    if head is None:
+        head = client.head_object(Bucket=bucket, Key=key)
+    etag = head.get("ETag", "")
+    tamanho = int(head.get("ContentLength") or 0)
+    chunk = max(1, R2_MULTIPART_CHUNK_MB) * _MB
+    parcial = dest + SUFIXO_PARCIAL
+
+    estado = _EstadoDownload.carregar(dest, etag, tamanho, chunk)
+    if not estado.feitas:
+        # Começo do zero: descartar .part de outra versão/configuração
+        with open(parcial, "wb") as f:
+            f.truncate(tamanho)
+    n_partes = max(1, -(-tamanho // chunk))
+    faltando = [i for i in range(n_partes) if i not in estado.feitas]
+    retomado = n_partes - len(faltando)
+    a_baixar = sum(min(tamanho, (i + 1) * chunk) - i * chunk for i in faltando)
+    inicio = time.monotonic()
+
+    fd = os.open(parcial, os.O_WRONLY)
+    try:
+        def _baixar_parte(i: int):
+            ini = i * chunk
+            fim = min(tamanho, ini + chunk) - 1
+            kwargs = {"Bucket": bucket, "Key": key, "IfMatch": etag} if etag else {"Bucket": bucket, "Key": key}
+            if tamanho:
+                kwargs["Range"] = f"bytes={ini}-{fim}"
+            offset = ini
+            try:
+                corpo = client.get_object(**kwargs)["Body"]
+                try:
+                    for bloco in iter(lambda: corpo.read(_BLOCO_LEITURA), b""):
+                        os.pwrite(fd, bloco, offset)
+                        offset += len(bloco)
+                finally:
+                    corpo.close()
+            except (HTTPClientError, IncompleteReadError, BotoConnectionError) as e:
+                # Queda no meio da parte: vira ConnectionError para o sync_retry retomar
+                raise ConnectionError(f"Parte {i} de {key} interrompida: {e}") from e
+            if tamanho and offset != fim + 1:
+                raise ConnectionError(f"Parte {i} de {key} incompleta ({offset - ini}/{fim - ini + 1} bytes)")
+            estado.marcar(i)
+
+        try:
+            if len(faltando) <= 1:
+                for i in faltando:
+                    _baixar_parte(i)
+            else:
+                with ThreadPoolExecutor(max_workers=min(R2_TRANSFER_CONCURRENCY, len(faltando))) as pool:
+                    for fut in [pool.submit(_baixar_parte, i) for i in faltando]:
+                        fut.result()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("412", "PreconditionFailed"):
+                # Objeto mudou no meio do download: descartar partes da versão antiga
+                estado.limpar()
+                raise ConnectionError(f"{key} mudou durante o download — reiniciando") from e
+            raise
+    finally:
+        os.close(fd)
+
+    os.replace(parcial, dest)
+    estado.limpar()
+    extra = f" (retomado: {retomado}/{n_partes} partes já baixadas)" if retomado else ""
+    _log_taxa("download", key, a_baixar, inicio, extra)
+    return dest
+
+
+class MultipartUploadWriter:
+    """Arquivo só-escrita que sobe direto para o R2 como multipart upload.
+
+    Buffer de uma parte (R2_MULTIPART_CHUNK_MB, mínimo 5 MB exigido pelo S3)
+    e até R2_TRANSFER_CONCURRENCY partes em voo — memória O(chunk), zero disco.
+    Sem seek(): o zipfile detecta stream não-seekable e usa data descriptors.
+    Use como context manager; exceção dentro do bloco aborta o upload.
+    """
+
+    _PARTE_MINIMA = 5 * _MB
+
+    def __init__(self, client, bucket: str, key: str, content_type: str = "application/octet-stream"):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.tamanho_parte = max(self._PARTE_MINIMA, R2_MULTIPART_CHUNK_MB * _MB)
+        self._upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type,
+        )["UploadId"]
+        self._buf = bytearray()
+        self._pos = 0
+        self._n_partes = 0
+        self._futuros = []
+        self._em_voo = threading.BoundedSemaphore(max(1, R2_TRANSFER_CONCURRENCY))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, R2_TRANSFER_CONCURRENCY))
+        self._inicio = time.monotonic()
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def write(self, dados) -> int:
+        self._buf += dados
+        self._pos += len(dados)
+        while len(self._buf) >= self.tamanho_parte:
+            self._enviar_parte(bytes(self._buf[:self.tamanho_parte]))
+            del self._buf[:self.tamanho_parte]
+        return len(dados)
+
+    def _enviar_parte(self, dados: bytes):
+        self._n_partes += 1
+        numero = self._n_partes
+        self._em_voo.acquire()
+
+        def _subir():
+            from shared.retry import sync_retry
+            try:
+                @sync_retry(max_attempts=3, backoff_base=2.0, exceptions=(ConnectionError, OSError))
+                def _upload_part():
+                    return self.client.upload_part(
+                        Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                        PartNumber=numero, Body=dados,
+                    )
+                return {"PartNumber": numero, "ETag": _upload_part()["ETag"]}
+            finally:
+                self._em_voo.release()
+
+        self._futuros.append(self._pool.submit(_subir))
+
+    def close(self) -> dict:
+        """Sobe o resto do buffer e completa o upload. Retorna o head_object final.
+
+        Falha em parte ou no complete aborta o upload — multipart incompleto
+        fica cobrando armazenamento no bucket até alguém abortar.
+        """
+        try:
+            try:
+                if self._buf or not self._n_partes:
+                    self._enviar_parte(bytes(self._buf))
+                    self._buf.clear()
+                partes = [f.result() for f in self._futuros]
+            finally:
+                self._pool.shutdown(wait=True)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": partes},
+            )
+        except BaseException:
+            self.abort()
+            raise
+        _log_taxa("upload (stream)", self.key, self._pos, self._inicio, f" em {len(partes)} parte(s)")
+        return self.client.head_object(Bucket=self.bucket, Key=self.key)
+
+    def abort(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+        except Exception as e:
+            logger.warning(f"[storage:r2] abort_multipart_upload falhou {self.key}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+# Extensões que valem deflate num ZIP (texto); mídia já vem comprimida → ZIP_STORED
+_EXTENSOES_TEXTO = (".txt", ".srt", ".ass", ".json", ".csv")
+
+
+def escrever_zip_streaming(destino, entradas: list, abrir_fonte, prefetch: int = 4) -> dict:
+    """Escreve um ZIP em `destino` (stream só-escrita) a partir de objetos remotos.
+
+    Args:
+        destino: arquivo/stream com write() — ex.: MultipartUploadWriter
+        entradas: [(arcname, key)] na ordem do ZIP
+        abrir_fonte: key → (tamanho, iterável de blocos) ou None se o objeto não existe
+        prefetch: quantos objetos são buscados em paralelo à frente do escritor
+    Returns:
+        {"incluidos": [...arcnames], "faltando": [...keys], "bytes": total}
+    """
+    import queue
+    import zipfile
+
+    cancelado = threading.Event()
+    _FIM = object()
+
+    def _produzir(key: str, fila: "queue.Queue"):
+        def _por(item):
+            while not cancelado.is_set():
+                try:
+                    fila.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise InterruptedError
+        try:
+            fonte = abrir_fonte(key)
+            if fonte is None:
+                _por(None)
+                return
+            tamanho, blocos = fonte
+            _por(tamanho)
+            for bloco in blocos:
+                _por(bloco)
+            _por(_FIM)
+        except InterruptedError:
+            pass
+        except BaseException as e:
+            try:
+                _por(e)
+            except InterruptedError:
+                pass
+
+    resultado = {"incluidos": [], "faltando": [], "bytes": 0}
+    # Memória limitada: cada fila guarda no máximo 8 blocos
+    filas = [queue.Queue(maxsize=8) for _ in entradas]
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as pool:
+        for (_, key), fila in zip(entradas, filas):
+            pool.submit(_produzir, key, fila)
+        try:
+            with zipfile.ZipFile(destino, "w", allowZip64=True) as zf:
+                for (arcname, key), fila in zip(entradas, filas):
+                    cabecalho = fila.get()
+                    if cabecalho is None:
+                        resultado["faltando"].append(key)
+                        continue
+                    if isinstance(cabecalho, BaseException):
+                        raise cabecalho
+                    info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+                    info.compress_type = (
+                        zipfile.ZIP_DEFLATED if arcname.lower().endswith(_EXTENSOES_TEXTO) else zipfile.ZIP_STORED
+                    )
+                    info.file_size = cabecalho
+                    with zf.open(info, "w") as saida:
+                        while True:
+                            bloco = fila.get()
+                            if bloco is _FIM:
+                                break
+                            if isinstance(bloco, BaseException):
+                                raise bloco
+                            saida.write(bloco)
+                    resultado["incluidos"].append(arcname)
+                    resultado["bytes"] += cabecalho
+        finally:
+            cancelado.set()
+    return resultado
@@ -18,24 +18,41 @@ Estrutura de pastas no R2 — uma pasta-mãe por vídeo:
         └── pacote.zip
 
 Uso:
-    from shared.storage_service import storage, project_base, lang_prefix
+    from shared.storage_service import storage, async_storage, project_base, lang_prefix
     base = project_base("Pavarotti", "Nessun Dorma")
     storage.upload_file("/tmp/v.mp4", f"{base}/video/original.mp4")
     local = storage.ensure_local(f"{base}/video/original.mp4")
     storage.upload_file("/tmp/p.txt", f"{lang_prefix(base, 'EN')}/post.txt")
+
+    # Em código async: mesma API, I/O do R2 fora do event loop
+    local = await async_storage.ensure_local(f"{base}/video/original.mp4")
 """
+import asyncio
+import functools
 import os
 import re
 import shutil
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
+from shared.local_cache import LocalCache
+from shared import r2_transfer
 from shared.retry import sync_retry
 
 # Exceções transientes de rede do boto3 (ConnectTimeoutError/ReadTimeoutError subclassam ConnectionError)
 _R2_TRANSIENT = (ConnectionError, OSError)
 
 
+class ObjetoInfo(NamedTuple):
+    """Metadados de um objeto, vindos de uma listagem (sem head_object)."""
+    size: int
+    etag: Optional[str]
+    mtime: str  # ISO 8601
+
+
 class R2UploadSizeMismatch(Exception):
     """Upload completou mas tamanho no R2 diverge do local — arquivo corrompido."""
     pass
@@ -48,9 +65,24 @@ R2_ACCESS_KEY = os.getenv("R2_ACCESS_KEY", "")
 R2_SECRET_KEY = os.getenv("R2_SECRET_KEY", "")
 R2_BUCKET = os.getenv("R2_BUCKET", "")
 
+# Pool de conexões do cliente S3 compartilhado (uploads/downloads paralelos + head_object em série)
+R2_MAX_POOL_CONNECTIONS = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+R2_CONNECT_TIMEOUT = float(os.getenv("R2_CONNECT_TIMEOUT", "5"))
+R2_READ_TIMEOUT = float(os.getenv("R2_READ_TIMEOUT", "60"))
+
+# Threads do AsyncStorageService (transferências simultâneas vindas de código async)
+STORAGE_ASYNC_WORKERS = int(os.getenv("STORAGE_ASYNC_WORKERS", "16"))
+
 # Diretório local para cache temporário
 LOCAL_TMP = os.getenv("STORAGE_TMP", "/tmp/r2-cache")
 
+# Orçamento do cache local (LRU) e intervalo de revalidação contra o R2
+STORAGE_CACHE_MAX_MB = int(os.getenv("STORAGE_CACHE_MAX_MB", "4096"))
+STORAGE_CACHE_VALIDATE_SEC = float(os.getenv("STORAGE_CACHE_VALIDATE_SEC", "300"))
+
+# Validade da listagem de prefixo em memória (stat_prefix) — substitui rajadas de head_object
+STORAGE_STAT_CACHE_SEC = float(os.getenv("STORAGE_STAT_CACHE_SEC", "30"))
+
 # Fallback local quando R2 não está configurado (dev)
 LOCAL_STORAGE = os.getenv("STORAGE_PATH", "/storage")
 
@@ -115,7 +147,8 @@ def check_conflict(artista: str, musica: str, youtube_video_id: str, r2_prefix:
     # Verificar se existe pasta com marcador de outro vídeo
     full_base = f"{r2_prefix}/{base}" if r2_prefix else base
     marker_key = f"{full_base}/video/.youtube_id"
-    if storage.exists(marker_key):
+    # Uma listagem da pasta do projeto (cacheada) em vez de head_object no marker
+    if marker_key in storage.stat_prefix(f"{full_base}/"):
         try:
             local = storage.ensure_local(marker_key)
             existing_id = Path(local).read_text().strip()
@@ -152,18 +185,43 @@ def _r2_configured() -> bool:
     return bool(R2_ENDPOINT and R2_ACCESS_KEY and R2_SECRET_KEY and R2_BUCKET)
 
 
-def _get_s3_client():
-    """Cria cliente boto3 configurado para Cloudflare R2."""
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def _new_s3_client():
+    """Cria cliente boto3 configurado para Cloudflare R2 (pool, keep-alive, timeouts)."""
     import boto3
-    return boto3.client(
+    from botocore.config import Config
+    return boto3.session.Session().client(
         "s3",
         endpoint_url=R2_ENDPOINT,
         aws_access_key_id=R2_ACCESS_KEY,
         aws_secret_access_key=R2_SECRET_KEY,
         region_name="auto",
+        config=Config(
+            max_pool_connections=R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=R2_CONNECT_TIMEOUT,
+            read_timeout=R2_READ_TIMEOUT,
+            tcp_keepalive=True,
+        ),
     )
 
 
+def _get_s3_client():
+    """Cliente boto3 compartilhado pelo processo.
+
+    Clientes boto3 são thread-safe; criar um por chamada custava resolução de
+    credenciais, setup de endpoint e um handshake TLS novo a cada head_object.
+    """
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = _new_s3_client()
+    return _s3_client
+
+
 def _local_path_for_key(key: str) -> str:
     """Retorna path local no /tmp para cache de um key R2."""
     p = Path(LOCAL_TMP) / key
@@ -171,6 +229,20 @@ def _local_path_for_key(key: str) -> str:
     return str(p)
 
 
+_cache = LocalCache(LOCAL_TMP, STORAGE_CACHE_MAX_MB * 1024 * 1024, STORAGE_CACHE_VALIDATE_SEC)
+
+# Listagens recentes por prefixo: {prefixo: (monotonic, {key: ObjetoInfo})}
+_stat_cache: dict = {}
+_stat_lock = threading.Lock()
+
+
+def _invalidar_stat(key: str):
+    """Descarta listagens em cache que contêm `key` (escrita/remoção neste processo)."""
+    with _stat_lock:
+        for prefixo in [p for p in _stat_cache if key.startswith(p)]:
+            _stat_cache.pop(prefixo, None)
+
+
 def _fallback_path(key: str) -> str:
     """Retorna path no storage local (dev) para um key."""
     p = Path(LOCAL_STORAGE) / key
@@ -189,6 +261,7 @@ class StorageService:
             dest = _fallback_path(key)
             if os.path.abspath(local_path) != os.path.abspath(dest):
                 shutil.copy2(local_path, dest)
+            _invalidar_stat(key)
             logger.debug(f"[storage:local] {local_path} → {dest}")
             return key
 
@@ -214,22 +287,30 @@ class StorageService:
         def _upload():
             import mimetypes
             content_type = mimetypes.guess_type(local_path)[0] or 'application/octet-stream'
-            client = _get_s3_client()
-            client.upload_file(local_path, R2_BUCKET, key,
-                               ExtraArgs={'ContentType': content_type})
+            # Multipart paralelo acima do threshold; head_object pós-upload confirma existência
+            return r2_transfer.upload(_get_s3_client(), R2_BUCKET, key, local_path, content_type)
 
-            # Verificação pós-upload: confirmar que o arquivo existe no R2
-            client.head_object(Bucket=R2_BUCKET, Key=key)
+        head = _upload()
+        _invalidar_stat(key)
 
-        _upload()
+        # Cópia local do key ficou obsoleta (ou é o próprio arquivo enviado)
+        if os.path.abspath(local_path) == os.path.abspath(_local_path_for_key(key)):
+            _cache.registrar(key, local_path, head.get("ETag"))
+        else:
+            _cache.remover(key)
 
         logger.info(f"[storage:r2] upload OK {key} ({local_size / 1024 / 1024:.1f}MB){probe_info}")
         return key
 
     def download_file(self, key: str, local_path: Optional[str] = None) -> str:
-        """Baixa arquivo do R2 para disco local. Retorna path local."""
-        dest = local_path or _local_path_for_key(key)
+        """Baixa arquivo do R2 para disco local. Retorna path local.
 
+        Download em partes paralelas para `{dest}.part`, com rename atômico no
+        fim; uma retentativa retoma as partes que faltam em vez de recomeçar.
+        """
+        return self._download(key, local_path or _local_path_for_key(key))
+
+    def _download(self, key: str, dest: str, head: Optional[dict] = None) -> str:
         if not _r2_configured():
             src = _fallback_path(key)
             if os.path.abspath(src) != os.path.abspath(dest):
@@ -239,19 +320,22 @@ class StorageService:
 
         Path(dest).parent.mkdir(parents=True, exist_ok=True)
 
+        # head do chamador só vale na 1ª tentativa (o objeto pode ter mudado → 412)
+        heads = [head]
+
         @sync_retry(max_attempts=3, backoff_base=2.0, exceptions=_R2_TRANSIENT)
         def _download():
-            client = _get_s3_client()
-            client.download_file(R2_BUCKET, key, dest)
+            r2_transfer.download_retomavel(_get_s3_client(), R2_BUCKET, key, dest, heads.pop() if heads else None)
 
         _download()
-        logger.info(f"[storage:r2] download {key} → {dest}")
         return dest
 
     def ensure_local(self, key: str) -> str:
         """Garante que o arquivo está disponível localmente.
 
-        Verifica cache /tmp primeiro. Se não tem, baixa do R2.
+        Verifica o cache local primeiro (revalidado por ETag/tamanho a cada
+        STORAGE_CACHE_VALIDATE_SEC). Se não tem ou está obsoleto, despeja LRU
+        até caber no orçamento e baixa do R2.
         Para dev (sem R2), retorna o path local direto.
         """
         if not _r2_configured():
@@ -262,19 +346,78 @@ class StorageService:
                 return local
             raise FileNotFoundError(f"Arquivo não encontrado: {key}")
 
-        cached = _local_path_for_key(key)
-        if os.path.exists(cached):
+        with _cache.lock_da_chave(key):
+            head = None
+            entrada = _cache.buscar(key)
+            if entrada is not None:
+                if not _cache.precisa_validar(entrada):
+                    _cache.contar("hits")
+                    return entrada.caminho
+                try:
+                    head = self._head(key)
+                except Exception as e:
+                    # Falha de rede na validação não deve derrubar quem já tem o arquivo
+                    logger.warning(f"[storage:cache] Validação de {key} falhou ({e}) — usando cópia local")
+                    _cache.contar("hits")
+                    return entrada.caminho
+                if head is None:
+                    # Apagado no R2: a cópia local não pode continuar sendo servida
+                    _cache.remover(key)
+                    raise FileNotFoundError(f"Arquivo não encontrado no R2: {key}")
+                if _cache.confere(entrada, head.get("ETag"), head.get("ContentLength")):
+                    _cache.marcar_validado(key, head.get("ETag"))
+                    _cache.contar("hits")
+                    return entrada.caminho
+                logger.info(f"[storage:cache] {key} mudou no R2 — baixando de novo")
+
+            _cache.contar("misses")
+            if head is None:
+                head = self._head(key)
+            if head is None:
+                raise FileNotFoundError(f"Arquivo não encontrado no R2: {key}")
+            _cache.reservar(head.get("ContentLength") or 0, manter=key)
+
+            # Rename atômico no fim do download: leitores de uma versão anterior mantêm o inode antigo
+            cached = self._download(key, _local_path_for_key(key), head)
+            _cache.registrar(key, cached, head.get("ETag"))
             return cached
 
-        return self.download_file(key, cached)
+    def _head(self, key: str) -> Optional[dict]:
+        """head_object do key (ETag/ContentLength) ou None se não existe."""
+        from botocore.exceptions import ClientError
+
+        @sync_retry(max_attempts=3, backoff_base=2.0, exceptions=_R2_TRANSIENT)
+        def _head_object():
+            client = _get_s3_client()
+            return client.head_object(Bucket=R2_BUCKET, Key=key)
+
+        try:
+            return _head_object()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
 
     def invalidate_cache(self, key: str):
         """Remove cache local de um key R2 para forçar re-download."""
-        cached = _local_path_for_key(key)
-        if os.path.exists(cached):
-            os.remove(cached)
+        if _cache.remover(key):
             logger.info(f"[storage] Cache invalidado: {key}")
 
+    def pinned(self, *keys: str):
+        """Context manager: impede o despejo do cache local destas keys durante o bloco.
+
+        Ex: with storage.pinned(edicao.arquivo_video_completo): ... FFmpeg ...
+        """
+        return _cache.pinned(*keys)
+
+    def cache_stats(self) -> dict:
+        """Contadores do cache local (hits/misses/despejos, uso vs orçamento)."""
+        return _cache.stats()
+
+    def trim_cache(self) -> int:
+        """Despeja todo o cache local não pinado. Retorna bytes liberados."""
+        return _cache.liberar_tudo()
+
     def get_presigned_url(self, key: str, expires_in: int = 3600) -> str:
         """Gera URL temporária para download direto do R2."""
         if not _r2_configured():
@@ -316,6 +459,7 @@ class StorageService:
             path = _fallback_path(key)
             if os.path.exists(path):
                 os.remove(path)
+                _invalidar_stat(key)
                 return True
             return False
 
@@ -326,6 +470,8 @@ class StorageService:
 
         try:
             _delete()
+            _cache.remover(key)
+            _invalidar_stat(key)
             logger.info(f"[storage:r2] delete {key}")
             return True
         except Exception as e:
@@ -384,6 +530,122 @@ class StorageService:
 
         return _list()
 
+    def _abrir_objeto(self, key: str, bloco: int = 1024 * 1024):
+        """(tamanho, iterador de blocos) lendo direto do R2, sem passar pelo disco. None se não existe."""
+        if not _r2_configured():
+            path = _fallback_path(key)
+            if not os.path.exists(path):
+                return None
+
+            def _ler_local():
+                with open(path, "rb") as f:
+                    while True:
+                        dados = f.read(bloco)
+                        if not dados:
+                            return
+                        yield dados
+            return os.path.getsize(path), _ler_local()
+
+        from botocore.exceptions import ClientError
+
+        @sync_retry(max_attempts=3, backoff_base=2.0, exceptions=_R2_TRANSIENT)
+        def _get():
+            return _get_s3_client().get_object(Bucket=R2_BUCKET, Key=key)
+
+        try:
+            resp = _get()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
+        return resp["ContentLength"], resp["Body"].iter_chunks(chunk_size=bloco)
+
+    def iter_chunks(self, key: str, bloco: int = 1024 * 1024):
+        """Gera o conteúdo do objeto em blocos (para StreamingResponse). FileNotFoundError se não existe."""
+        fonte = self._abrir_objeto(key, bloco)
+        if fonte is None:
+            raise FileNotFoundError(f"Arquivo não encontrado: {key}")
+        yield from fonte[1]
+
+    def upload_zip_stream(self, key: str, entradas: list, prefetch: int = 4) -> dict:
+        """Monta um ZIP a partir de objetos do storage e sobe direto para `key`.
+
+        Nada passa pelo disco: os objetos são lidos em paralelo (`prefetch` à
+        frente) e o ZIP é escrito direto num multipart upload — memória O(chunk).
+        Mídia entra como ZIP_STORED (já comprimida), texto como ZIP_DEFLATED.
+        Objetos inexistentes são pulados.
+
+        Args:
+            entradas: [(arcname, key_origem)] na ordem do ZIP
+        Returns:
+            {"incluidos": [...], "faltando": [...], "bytes": total}
+        """
+        inicio = time.monotonic()
+        if not _r2_configured():
+            with open(_fallback_path(key), "wb") as destino:
+                resultado = r2_transfer.escrever_zip_streaming(destino, entradas, self._abrir_objeto, prefetch)
+        else:
+            with r2_transfer.MultipartUploadWriter(
+                _get_s3_client(), R2_BUCKET, key, "application/zip",
+            ) as destino:
+                resultado = r2_transfer.escrever_zip_streaming(destino, entradas, self._abrir_objeto, prefetch)
+            _cache.remover(key)
+        _invalidar_stat(key)
+        logger.info(
+            f"[storage] zip {key}: {len(resultado['incluidos'])} arquivo(s), "
+            f"{resultado['bytes'] / 1024 / 1024:.1f}MB em {time.monotonic() - inicio:.1f}s"
+        )
+        return resultado
+
+    def stat_prefix(self, prefix: str, max_age: float = STORAGE_STAT_CACHE_SEC) -> dict:
+        """Lista um prefixo uma vez e retorna {key: ObjetoInfo(size, etag, mtime)}.
+
+        Substitui N chamadas de exists()/head_object por um list_objects_v2
+        paginado. O resultado fica em memória por `max_age` segundos e também
+        atende sub-prefixos (listar a pasta do projeto cobre as pastas de
+        idioma). Escritas/remoções feitas por este processo invalidam a
+        listagem; mudanças de outro processo aparecem após `max_age`.
+        Passe o prefixo com "/" no fim para não casar pastas vizinhas.
+        """
+        agora = time.monotonic()
+        if max_age > 0:
+            with _stat_lock:
+                for prefixo, (quando, mapa) in _stat_cache.items():
+                    if prefix.startswith(prefixo) and agora - quando < max_age:
+                        return {k: v for k, v in mapa.items() if k.startswith(prefix)}
+
+        if not _r2_configured():
+            import datetime as _dt
+            mapa = {}
+            base = Path(LOCAL_STORAGE) / prefix
+            raiz = base if prefix.endswith("/") or base.is_dir() else base.parent
+            if raiz.exists():
+                for f in raiz.rglob("*"):
+                    key = str(f.relative_to(LOCAL_STORAGE))
+                    if f.is_file() and key.startswith(prefix):
+                        st = f.stat()
+                        mapa[key] = ObjetoInfo(st.st_size, None, _dt.datetime.fromtimestamp(st.st_mtime).isoformat())
+        else:
+            @sync_retry(max_attempts=3, backoff_base=2.0, exceptions=_R2_TRANSIENT)
+            def _list():
+                client = _get_s3_client()
+                items = {}
+                paginator = client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(Bucket=R2_BUCKET, Prefix=prefix):
+                    for obj in page.get("Contents", []):
+                        items[obj["Key"]] = ObjetoInfo(
+                            obj["Size"], obj.get("ETag"), obj["LastModified"].isoformat(),
+                        )
+                return items
+
+            mapa = _list()
+
+        with _stat_lock:
+            for prefixo in [p for p, (quando, _) in _stat_cache.items() if agora - quando >= STORAGE_STAT_CACHE_SEC]:
+                _stat_cache.pop(prefixo, None)
+            _stat_cache[prefix] = (agora, mapa)
+        return dict(mapa)
+
     def upload_text(self, key: str, content: str) -> str:
         """Escreve texto no R2 (cria temp file, faz upload, apaga)."""
         import tempfile
@@ -401,5 +663,74 @@ class StorageService:
         return Path(local).read_text(encoding="utf-8")
 
 
-# Singleton
+class AsyncStorageService:
+    """Mesma API do StorageService para código async.
+
+    Cada chamada roda o método síncrono num pool de threads dedicado, para que
+    um upload/download de vários segundos não congele o event loop (health
+    checks, /fila-status, outras tasks do worker). Pool próprio em vez do
+    executor padrão: transferências longas não disputam threads com o resto
+    do processo.
+    """
+
+    def __init__(self, sync: StorageService, max_workers: int = STORAGE_ASYNC_WORKERS):
+        self.sync = sync
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="storage")
+
+    async def _rodar(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def upload_file(self, local_path: str, key: str) -> str:
+        return await self._rodar(self.sync.upload_file, local_path, key)
+
+    async def download_file(self, key: str, local_path: Optional[str] = None) -> str:
+        return await self._rodar(self.sync.download_file, key, local_path)
+
+    async def ensure_local(self, key: str) -> str:
+        return await self._rodar(self.sync.ensure_local, key)
+
+    async def invalidate_cache(self, key: str):
+        return await self._rodar(self.sync.invalidate_cache, key)
+
+    async def get_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        return await self._rodar(self.sync.get_presigned_url, key, expires_in)
+
+    async def exists(self, key: str) -> bool:
+        return await self._rodar(self.sync.exists, key)
+
+    async def delete(self, key: str) -> bool:
+        return await self._rodar(self.sync.delete, key)
+
+    async def list_files(self, prefix: str) -> list:
+        return await self._rodar(self.sync.list_files, prefix)
+
+    async def list_files_with_metadata(self, prefix: str) -> list:
+        return await self._rodar(self.sync.list_files_with_metadata, prefix)
+
+    async def upload_zip_stream(self, key: str, entradas: list, prefetch: int = 4) -> dict:
+        return await self._rodar(self.sync.upload_zip_stream, key, entradas, prefetch)
+
+    async def stat_prefix(self, prefix: str, max_age: float = STORAGE_STAT_CACHE_SEC) -> dict:
+        return await self._rodar(self.sync.stat_prefix, prefix, max_age)
+
+    async def upload_text(self, key: str, content: str) -> str:
+        return await self._rodar(self.sync.upload_text, key, content)
+
+    async def read_text(self, key: str) -> str:
+        return await self._rodar(self.sync.read_text, key)
+
+    def pinned(self, *keys: str):
+        """Context manager síncrono (só mexe no índice em memória)."""
+        return self.sync.pinned(*keys)
+
+    def cache_stats(self) -> dict:
+        return self.sync.cache_stats()
+
+    async def trim_cache(self) -> int:
+        return await self._rodar(self.sync.trim_cache)
+
+
+# Singletons
 storage = StorageService()
+async_storage = AsyncStorageService(storage)